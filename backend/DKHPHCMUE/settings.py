@@ -167,6 +167,19 @@ CORS_ALLOWED_ORIGINS = config(
 )
 CORS_ALLOW_CREDENTIALS = True
 
+# Caches
+# 'config' backs the current học kỳ / phase cache when CONFIG_CACHE_BACKEND=django;
+# point it at a shared store (e.g. Redis) so invalidation reaches every worker
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'config': {
+        'BACKEND': config('CONFIG_CACHE_DJANGO_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CONFIG_CACHE_LOCATION', default='config-cache'),
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -4,5 +4,11 @@ from .repositories import (
     IDangKyTKBRepository,
     ILichSuDangKyRepository,
     ILichHocDinhKyRepository,
-    IHocPhiRepository
+    IHocPhiRepository,
+    IRegistrationContextRepository,
+    LichHocSlotDTO,
+    RegistrationTargetDTO,
+    RegisteredLopDTO,
+    RegistrationContextDTO,
+    LopHocPhanSeatDTO
 )
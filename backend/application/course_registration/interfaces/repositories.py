@@ -2,7 +2,64 @@
 Application Layer - Course Registration Repository Interfaces
 """
 from abc import ABC, abstractmethod
-from typing import Optional, List, Any
+from typing import Optional, List, Dict, Any
+from dataclasses import dataclass, field
+from datetime import date
+
+
+# ============== DTOs ==============
+
+@dataclass
+class LichHocSlotDTO:
+    """One weekly session of a class (thu + tiet range, optionally bounded by dates)"""
+    thu: int
+    tiet_bat_dau: int
+    tiet_ket_thuc: int
+    ngay_bat_dau: Optional[date] = None
+    ngay_ket_thuc: Optional[date] = None
+
+
+@dataclass
+class RegistrationTargetDTO:
+    """A class the student is trying to register, with per-student flags"""
+    lop_hoc_phan_id: str
+    ma_lop: str
+    hoc_phan_id: str
+    ten_hoc_phan: str
+    mon_hoc_id: str
+    so_luong_hien_tai: int
+    so_luong_toi_da: int
+    is_ghi_danh: bool
+    is_registered: bool
+    has_registered_mon_hoc: bool
+    lich_hocs: List[LichHocSlotDTO] = field(default_factory=list)
+
+
+@dataclass
+class RegisteredLopDTO:
+    """A class the student already holds in the semester (for conflict checks)"""
+    lop_hoc_phan_id: str
+    ma_lop: str
+    ten_hoc_phan: str
+    lich_hocs: List[LichHocSlotDTO] = field(default_factory=list)
+
+
+@dataclass
+class RegistrationContextDTO:
+    """Everything a registration needs for (sinh_vien, lop_hoc_phan(s), hoc_ky)"""
+    phase: Optional[str]
+    targets: Dict[str, RegistrationTargetDTO] = field(default_factory=dict)
+    registered_lops: List[RegisteredLopDTO] = field(default_factory=list)
+
+
+@dataclass
+class LopHocPhanSeatDTO:
+    """Live seat counters of a class (the part of the catalog that changes per request)"""
+    so_luong_hien_tai: int
+    so_luong_toi_da: int
+
+
+# ============== Interfaces ==============
 
 class ILopHocPhanRepository(ABC):
     @abstractmethod
@@ -13,10 +70,25 @@ class ILopHocPhanRepository(ABC):
     def update_so_luong(self, id: str, amount: int) -> None:
         pass
 
+    @abstractmethod
+    def try_reserve_slot(self, id: str) -> bool:
+        """Atomically claim one seat; return False if the class is full"""
+        pass
+
+    @abstractmethod
+    def try_reserve_slots(self, ids: List[str]) -> List[str]:
+        """Claim one seat in each class; return the ids that were claimed (must run inside a transaction)"""
+        pass
+
     @abstractmethod
     def find_all_by_hoc_ky(self, hoc_ky_id: str) -> List[Any]:
         pass
 
+    @abstractmethod
+    def find_seat_counts_by_hoc_ky(self, hoc_ky_id: str) -> Dict[str, LopHocPhanSeatDTO]:
+        """lop_hoc_phan_id -> live seat counters for every class of the semester"""
+        pass
+
     @abstractmethod
     def get_by_mon_hoc_and_hoc_ky(self, mon_hoc_id: str, hoc_ky_id: str) -> List[Any]:
         pass
@@ -41,6 +113,11 @@ class IDangKyHocPhanRepository(ABC):
     @abstractmethod
     def create(self, data: dict) -> Any:
         pass
+
+    @abstractmethod
+    def bulk_create(self, data_list: List[dict]) -> List[Any]:
+        """Insert several registrations in one statement, in input order"""
+        pass
         
     @abstractmethod
     def find_by_sinh_vien_and_lop_hoc_phan(self, sinh_vien_id: str, lop_hoc_phan_id: str) -> Optional[Any]:
@@ -72,6 +149,10 @@ class IDangKyTKBRepository(ABC):
     @abstractmethod
     def create(self, data: dict) -> Any:
         pass
+
+    @abstractmethod
+    def bulk_create(self, data_list: List[dict]) -> None:
+        pass
         
     @abstractmethod
     def delete_by_dang_ky_id(self, dang_ky_id: str) -> None:
@@ -90,6 +171,11 @@ class ILichSuDangKyRepository(ABC):
     def upsert_and_log(self, sinh_vien_id: str, hoc_ky_id: str, dang_ky_hoc_phan_id: str, hanh_dong: str) -> None:
         pass
 
+    @abstractmethod
+    def bulk_log(self, sinh_vien_id: str, hoc_ky_id: str, dang_ky_hoc_phan_ids: List[str], hanh_dong: str) -> None:
+        """Same as upsert_and_log for several registrations, with one detail insert"""
+        pass
+
     @abstractmethod
     def find_by_sinh_vien_and_hoc_ky(self, sinh_vien_id: str, hoc_ky_id: str) -> Optional[Any]:
         pass
@@ -103,3 +189,13 @@ class IHocPhiRepository(ABC):
     @abstractmethod
     def get_hoc_phi_by_sinh_vien(self, sinh_vien_id: str, hoc_ky_id: str) -> Optional[Any]:
         pass
+
+class IRegistrationContextRepository(ABC):
+    @abstractmethod
+    def load(self, sinh_vien_id: str, hoc_ky_id: str, lop_hoc_phan_ids: List[str]) -> RegistrationContextDTO:
+        """
+        Load phase, target classes, ghi danh / duplicate flags and the student's
+        current schedule in a fixed number of queries, independent of how many
+        classes the student already holds
+        """
+        pass
@@ -1,18 +1,23 @@
 """
 Application Layer - Chuyen Lop Hoc Phan Use Case
 """
-from typing import List, Any, Optional
+from typing import Optional
 from core.types import ServiceResult
 from django.db import transaction
+from domain.course_registration import LopHocPhanDaChuyen
 from application.course_registration.interfaces import (
     ILopHocPhanRepository,
     IDangKyHocPhanRepository,
     IDangKyTKBRepository,
-    ILichSuDangKyRepository
+    ILichSuDangKyRepository,
+    IRegistrationContextRepository
 )
+from application.course_registration.use_cases.dang_ky_lop_hoc_phan_use_case import build_occupancy, to_tkb_sessions
 from infrastructure.persistence.enrollment.repositories import KyPhaseRepository
 from infrastructure.persistence.sinh_vien.sinh_vien_repository import SinhVienRepository
 from infrastructure.persistence.common.repositories import HocKyRepository
+from infrastructure.persistence.course_registration.repositories import RegistrationContextRepository
+from infrastructure.events import EventBus, get_event_bus
 
 class ChuyenLopHocPhanUseCase:
     """
@@ -27,7 +32,9 @@ class ChuyenLopHocPhanUseCase:
         lich_su_repo: ILichSuDangKyRepository,
         ky_phase_repo: KyPhaseRepository,
         sinh_vien_repo: SinhVienRepository,
-        hoc_ky_repo: HocKyRepository = None
+        hoc_ky_repo: HocKyRepository = None,
+        registration_context_repo: Optional[IRegistrationContextRepository] = None,
+        event_bus: Optional[EventBus] = None
     ):
         self.lop_hoc_phan_repo = lop_hoc_phan_repo
         self.dang_ky_hp_repo = dang_ky_hp_repo
@@ -36,6 +43,8 @@ class ChuyenLopHocPhanUseCase:
         self.ky_phase_repo = ky_phase_repo
         self.sinh_vien_repo = sinh_vien_repo
         self.hoc_ky_repo = hoc_ky_repo or HocKyRepository()
+        self.registration_context_repo = registration_context_repo or RegistrationContextRepository()
+        self.event_bus = event_bus or get_event_bus()
         
     def execute(self, sinh_vien_id: str, lop_cu_id: str, lop_moi_id: str, hoc_ky_id: Optional[str] = None) -> ServiceResult:
         """
@@ -76,7 +85,7 @@ class ChuyenLopHocPhanUseCase:
             if not lop_moi:
                 return ServiceResult.fail("Lớp học phần mới không tồn tại", error_code="NEW_CLASS_NOT_FOUND")
             
-            # Check Quantity
+            # Check Quantity (fast path only - the seat is claimed in step 7)
             if (lop_moi.so_luong_hien_tai or 0) >= (lop_moi.so_luong_toi_da or 50):
                 return ServiceResult.fail("Lớp học phần mới đã đầy", error_code="NEW_CLASS_FULL")
 
@@ -89,28 +98,28 @@ class ChuyenLopHocPhanUseCase:
             if lop_cu.hoc_phan.mon_hoc_id != lop_moi.hoc_phan.mon_hoc_id:
                 return ServiceResult.fail("Lớp mới không thuộc cùng môn học với lớp cũ", error_code="SUBJECT_MISMATCH")
 
-            # 6. Check Time Conflict (Excluding Old Class)
-            new_schedules = list(lop_moi.lichhocdinhky_set.all())
-            
-            # Get all registered classes
-            existing_registrations = self.dang_ky_tkb_repo.find_registered_lop_hoc_phans_by_hoc_ky(sinh_vien_id, hoc_ky_id)
-            
-            for reg in existing_registrations:
-                # Skip the old class we are moving away from
-                if str(reg.lop_hoc_phan.id) == lop_cu_id:
-                    continue
-                    
-                existing_lhp = reg.lop_hoc_phan
-                existing_schedules = existing_lhp.lichhocdinhky_set.all()
-                
-                if self._check_conflict(new_schedules, existing_schedules):
-                    return ServiceResult.fail(
-                        f"Trùng lịch học với lớp {existing_lhp.ma_lop}", 
-                        error_code="TIME_CONFLICT"
-                    )
+            # 6. Check Time Conflict (Excluding Old Class; sessions from PostgreSQL and the MongoDB TKB)
+            context = self.registration_context_repo.load(sinh_vien_id, hoc_ky_id, [lop_moi_id])
+            target = context.targets.get(str(lop_moi_id))
+            occupancy = build_occupancy(context.registered_lops)
+
+            # Skip the old class we are moving away from
+            conflict = occupancy.find_conflict(
+                to_tkb_sessions(target.lich_hocs if target else []),
+                exclude_lop_hoc_phan_id=lop_cu_id
+            )
+            if conflict:
+                return ServiceResult.fail(
+                    f"Trùng lịch học với lớp {conflict.ma_lop}", 
+                    error_code="TIME_CONFLICT"
+                )
 
             # 7. Atomic Transaction
             with transaction.atomic(using='neon'):
+                # Claim Seat in the new class - single conditional UPDATE, before anything is cancelled
+                if not self.lop_hoc_phan_repo.try_reserve_slot(lop_moi_id):
+                    return ServiceResult.fail("Lớp học phần mới đã đầy", error_code="NEW_CLASS_FULL")
+
                 # A. Cancel Old
                 self.dang_ky_tkb_repo.delete_by_dang_ky_id(str(dang_ky_cu.id))
                 self.dang_ky_hp_repo.update_status(str(dang_ky_cu.id), "da_huy")
@@ -128,8 +137,7 @@ class ChuyenLopHocPhanUseCase:
                     "sinh_vien_id": sinh_vien_id,
                     "lop_hoc_phan_id": lop_moi_id
                 })
-                
-                self.lop_hoc_phan_repo.update_so_luong(lop_moi_id, 1)
+
                 
                 # C. Log History
                 # Log cancellation of old
@@ -146,21 +154,11 @@ class ChuyenLopHocPhanUseCase:
                     str(dang_ky_moi.id), 
                     "dang_ky"
                 )
+
+                self.event_bus.publish(LopHocPhanDaChuyen(sinh_vien_id, hoc_ky_id, lop_cu_id, lop_moi_id))
                 
             return ServiceResult.ok(None, "Chuyển lớp học phần thành công")
             
         except Exception as e:
             print(f"Error transferring course: {e}")
             return ServiceResult.fail("Lỗi hệ thống khi chuyển lớp học phần", error_code="INTERNAL_ERROR")
-
-    def _check_conflict(self, schedules1: List[Any], schedules2: List[Any]) -> bool:
-        """
-        Check if any schedule in list 1 overlaps with list 2
-        """
-        for s1 in schedules1:
-            for s2 in schedules2:
-                if s1.thu != s2.thu:
-                    continue
-                if s1.tiet_bat_dau < s2.tiet_ket_thuc and s2.tiet_bat_dau < s1.tiet_ket_thuc:
-                    return True
-        return False
@@ -1,45 +1,48 @@
 """
 Application Layer - Dang Ky Lop Hoc Phan Use Case
 """
+from typing import List, Optional
 from core.types import ServiceResult
 from application.course_registration.interfaces import (
     ILopHocPhanRepository,
     IDangKyHocPhanRepository,
     IDangKyTKBRepository,
     ILichSuDangKyRepository,
-    ILichHocDinhKyRepository
-)
-from application.enrollment.interfaces import (
-    IKyPhaseRepository,
-    IGhiDanhRepository,
-    IHocPhanRepository
+    IRegistrationContextRepository,
+    LichHocSlotDTO,
+    RegisteredLopDTO,
+    RegistrationContextDTO,
+    RegistrationTargetDTO
 )
+from domain.course_registration import TKBOccupancy, TKBSession, LopHocPhanDaDangKy
+from infrastructure.events import EventBus, get_event_bus
 from django.db import transaction
 
+MAX_CART_SIZE = 20
+
 class DangKyLopHocPhanUseCase:
     """
     Use case to register for a course class (Lop Hoc Phan)
+
+    All pre-checks run in memory against one RegistrationContextDTO, so a
+    registration costs a fixed number of queries before the transaction.
     """
-    
+
     def __init__(
         self,
-        ky_phase_repo: IKyPhaseRepository,
+        registration_context_repo: IRegistrationContextRepository,
         lop_hoc_phan_repo: ILopHocPhanRepository,
-        ghi_danh_repo: IGhiDanhRepository,
-        hoc_phan_repo: IHocPhanRepository,
         dang_ky_hp_repo: IDangKyHocPhanRepository,
         dang_ky_tkb_repo: IDangKyTKBRepository,
         lich_su_repo: ILichSuDangKyRepository,
-        lich_hoc_repo: ILichHocDinhKyRepository
+        event_bus: Optional[EventBus] = None
     ):
-        self.ky_phase_repo = ky_phase_repo
+        self.registration_context_repo = registration_context_repo
         self.lop_hoc_phan_repo = lop_hoc_phan_repo
-        self.ghi_danh_repo = ghi_danh_repo
-        self.hoc_phan_repo = hoc_phan_repo
         self.dang_ky_hp_repo = dang_ky_hp_repo
         self.dang_ky_tkb_repo = dang_ky_tkb_repo
         self.lich_su_repo = lich_su_repo
-        self.lich_hoc_repo = lich_hoc_repo
+        self.event_bus = event_bus or get_event_bus()
 
     def execute(self, request_data: dict, user_id: str) -> ServiceResult:
         """
@@ -47,115 +50,241 @@ class DangKyLopHocPhanUseCase:
         """
         lop_hoc_phan_id = request_data.get('lopHocPhanId')
         hoc_ky_id = request_data.get('hocKyId')
-        
+
         if not lop_hoc_phan_id or not hoc_ky_id:
             return ServiceResult.fail("Thiếu thông tin lớp học phần hoặc học kỳ", error_code="INVALID_INPUT")
 
-        # 1. Check Phase
-        phase = self.ky_phase_repo.get_current_phase(hoc_ky_id)
-        if not phase or phase.phase != "dang_ky_hoc_phan":
-            return ServiceResult.fail("Chưa đến giai đoạn đăng ký học phần hoặc phase đã đóng", error_code="PHASE_NOT_OPEN")
-
-        # 2. Check Lop Hoc Phan
-        lop_hoc_phan = self.lop_hoc_phan_repo.find_by_id(lop_hoc_phan_id)
-        if not lop_hoc_phan:
-            return ServiceResult.fail("Lớp học phần không tồn tại", error_code="LHP_NOT_FOUND")
-
-        # 3. Check Ghi Danh
-        is_ghi_danh = self.ghi_danh_repo.is_already_registered(user_id, str(lop_hoc_phan.hoc_phan_id))
-        if not is_ghi_danh:
-            return ServiceResult.fail("Bạn phải ghi danh học phần này trước khi đăng ký lớp", error_code="NOT_GHI_DANH")
-
-        # 4. Check Duplicate Mon Hoc
-        hoc_phan = self.hoc_phan_repo.find_by_id(str(lop_hoc_phan.hoc_phan_id))
-        if not hoc_phan:
-            return ServiceResult.fail("Học phần không tồn tại", error_code="HOC_PHAN_NOT_FOUND")
-            
-        has_registered_mon = self.dang_ky_hp_repo.has_registered_mon_hoc_in_hoc_ky(
-            user_id, 
-            str(hoc_phan.mon_hoc_id), 
-            hoc_ky_id
-        )
-        if has_registered_mon:
-            return ServiceResult.fail("Bạn đã đăng ký một lớp khác của cùng môn trong học kỳ này", error_code="ALREADY_REGISTERED_MON_HOC")
-
-        # 5. Check Slot
-        so_luong_hien_tai = lop_hoc_phan.so_luong_hien_tai or 0
-        so_luong_toi_da = lop_hoc_phan.so_luong_toi_da or 50
-        if so_luong_hien_tai >= so_luong_toi_da:
-            return ServiceResult.fail("Lớp học phần đã đầy", error_code="LHP_FULL")
-
-        # 6. Check Already Registered Class
-        already_registered = self.dang_ky_hp_repo.is_student_registered(user_id, lop_hoc_phan_id)
-        if already_registered:
-            return ServiceResult.fail("Bạn đã đăng ký lớp học phần này rồi", error_code="ALREADY_REGISTERED")
+        # 1. Load Context (phase, class, ghi danh, duplicates, current TKB)
+        context = self.registration_context_repo.load(user_id, hoc_ky_id, [lop_hoc_phan_id])
 
-        # 7. Check TKB Conflict
-        conflict_result = self._check_tkb_conflict(user_id, lop_hoc_phan_id, hoc_ky_id)
-        if not conflict_result.success:
-            return conflict_result
+        # 2. Validate In Memory
+        validation = self._validate(context, context.targets.get(str(lop_hoc_phan_id)))
+        if not validation.success:
+            return validation
 
-        # 8. Transaction
+        # 3. Transaction
         try:
-            with transaction.atomic():
-                # 8.1 Create Dang Ky Hoc Phan
+            with transaction.atomic(using='neon'):
+                # 3.1 Claim Slot - single conditional UPDATE, short-circuits before any insert
+                if not self.lop_hoc_phan_repo.try_reserve_slot(lop_hoc_phan_id):
+                    return ServiceResult.fail("Lớp học phần đã đầy", error_code="LHP_FULL")
+
+                # 3.2 Create Dang Ky Hoc Phan
                 dang_ky = self.dang_ky_hp_repo.create({
                     'sinh_vien_id': user_id,
                     'lop_hoc_phan_id': lop_hoc_phan_id,
                     'trang_thai': 'da_dang_ky',
                     'co_xung_dot': False
                 })
-                
-                # 8.2 Log History
+
+                # 3.3 Log History
                 self.lich_su_repo.upsert_and_log(
-                    user_id, 
-                    hoc_ky_id, 
-                    str(dang_ky.id), 
+                    user_id,
+                    hoc_ky_id,
+                    str(dang_ky.id),
                     "dang_ky"
                 )
-                
-                # 8.3 Create Dang Ky TKB
+
+                # 3.4 Create Dang Ky TKB
                 self.dang_ky_tkb_repo.create({
                     'dang_ky_id': str(dang_ky.id),
                     'sinh_vien_id': user_id,
                     'lop_hoc_phan_id': lop_hoc_phan_id
                 })
-                
-                # 8.4 Update Slot
-                self.lop_hoc_phan_repo.update_so_luong(lop_hoc_phan_id, 1)
-                
+
+                self.event_bus.publish(LopHocPhanDaDangKy(user_id, hoc_ky_id, lop_hoc_phan_id))
+
             return ServiceResult.ok(None, "Đăng ký học phần thành công")
-            
+
         except Exception as e:
             print(f"Error registering course: {e}")
             return ServiceResult.fail("Lỗi khi đăng ký học phần", error_code="INTERNAL_ERROR")
 
-    def _check_tkb_conflict(self, user_id: str, new_lhp_id: str, hoc_ky_id: str) -> ServiceResult:
-        # Get existing schedule
-        registered_lhps = self.dang_ky_tkb_repo.find_registered_lop_hoc_phans_by_hoc_ky(user_id, hoc_ky_id)
-        
-        # Get new class schedule
-        new_lich_hocs = self.lich_hoc_repo.find_by_lop_hoc_phan(new_lhp_id)
-        if not new_lich_hocs:
-            return ServiceResult.ok(None) # No schedule, no conflict
-            
-        for reg in registered_lhps:
-            # Assuming reg is DangKyTKB object with lop_hoc_phan relation
-            existing_lhp = reg.lop_hoc_phan
-            existing_lich_hocs = self.lich_hoc_repo.find_by_lop_hoc_phan(str(existing_lhp.id))
-            
-            for exist_lh in existing_lich_hocs:
-                for new_lh in new_lich_hocs:
-                    if exist_lh.thu == new_lh.thu:
-                        if self._is_time_overlap(
-                            exist_lh.tiet_bat_dau, exist_lh.tiet_ket_thuc,
-                            new_lh.tiet_bat_dau, new_lh.tiet_ket_thuc
-                        ):
-                            return ServiceResult.fail(
-                                f"Xung đột lịch học với môn {existing_lhp.hoc_phan.ten_hoc_phan} - Lớp {existing_lhp.ma_lop}",
-                                error_code="TKB_CONFLICT"
+    def execute_batch(self, request_data: dict, user_id: str) -> ServiceResult:
+        """
+        Register a whole cart of classes against one loaded context.
+
+        Every item is validated in memory (cart items are also checked against
+        each other), seats are claimed together and the registration rows are
+        written with bulk inserts. Items fail independently; the response lists
+        one result per requested class.
+        """
+        lop_hoc_phan_ids = request_data.get('lopHocPhanIds')
+        hoc_ky_id = request_data.get('hocKyId')
+
+        if not lop_hoc_phan_ids or not isinstance(lop_hoc_phan_ids, list) or not hoc_ky_id:
+            return ServiceResult.fail("Thiếu danh sách lớp học phần hoặc học kỳ", error_code="INVALID_INPUT")
+
+        # Keep request order, drop duplicates
+        lop_hoc_phan_ids = list(dict.fromkeys(str(lop_id) for lop_id in lop_hoc_phan_ids))
+        if len(lop_hoc_phan_ids) > MAX_CART_SIZE:
+            return ServiceResult.fail(
+                f"Chỉ được đăng ký tối đa {MAX_CART_SIZE} lớp học phần mỗi lần",
+                error_code="INVALID_INPUT"
+            )
+
+        # 1. Load Context once for the whole cart
+        context = self.registration_context_repo.load(user_id, hoc_ky_id, lop_hoc_phan_ids)
+
+        if context.phase != "dang_ky_hoc_phan":
+            return ServiceResult.fail("Chưa đến giai đoạn đăng ký học phần hoặc phase đã đóng", error_code="PHASE_NOT_OPEN")
+
+        # 2. Validate In Memory - accepted items join the occupancy so later items see them
+        occupancy = build_occupancy(context.registered_lops)
+        cart_mon_hoc_ids = set()
+        results = {}
+        accepted = []
+        for lop_id in lop_hoc_phan_ids:
+            target = context.targets.get(lop_id)
+            validation = self._validate_target(target, occupancy)
+            if validation.success and target.mon_hoc_id in cart_mon_hoc_ids:
+                validation = ServiceResult.fail(
+                    "Giỏ đăng ký có nhiều lớp của cùng một môn học",
+                    error_code="ALREADY_REGISTERED_MON_HOC"
+                )
+            if not validation.success:
+                results[lop_id] = self._item_result(lop_id, target, validation)
+                continue
+
+            cart_mon_hoc_ids.add(target.mon_hoc_id)
+            occupancy.add(to_tkb_sessions(target.lich_hocs), lop_id, target.ma_lop, target.ten_hoc_phan)
+            accepted.append(lop_id)
+
+        # 3. Transaction
+        if accepted:
+            try:
+                with transaction.atomic(using='neon'):
+                    # 3.1 Claim Slots - one locked read + one UPDATE for the whole cart
+                    claimed = set(self.lop_hoc_phan_repo.try_reserve_slots(accepted))
+                    for lop_id in accepted:
+                        if lop_id not in claimed:
+                            results[lop_id] = self._item_result(
+                                lop_id, context.targets[lop_id],
+                                ServiceResult.fail("Lớp học phần đã đầy", error_code="LHP_FULL")
                             )
+                    accepted = [lop_id for lop_id in accepted if lop_id in claimed]
+
+                    if accepted:
+                        # 3.2 Create Dang Ky Hoc Phan
+                        dang_kys = self.dang_ky_hp_repo.bulk_create([
+                            {
+                                'sinh_vien_id': user_id,
+                                'lop_hoc_phan_id': lop_id,
+                                'trang_thai': 'da_dang_ky',
+                                'co_xung_dot': False
+                            }
+                            for lop_id in accepted
+                        ])
+
+                        # 3.3 Log History
+                        self.lich_su_repo.bulk_log(
+                            user_id,
+                            hoc_ky_id,
+                            [str(dang_ky.id) for dang_ky in dang_kys],
+                            "dang_ky"
+                        )
+
+                        # 3.4 Create Dang Ky TKB
+                        self.dang_ky_tkb_repo.bulk_create([
+                            {
+                                'dang_ky_id': str(dang_ky.id),
+                                'sinh_vien_id': user_id,
+                                'lop_hoc_phan_id': lop_id
+                            }
+                            for dang_ky, lop_id in zip(dang_kys, accepted)
+                        ])
+
+                        for lop_id in accepted:
+                            self.event_bus.publish(LopHocPhanDaDangKy(user_id, hoc_ky_id, lop_id))
+
+            except Exception as e:
+                print(f"Error registering course cart: {e}")
+                return ServiceResult.fail("Lỗi khi đăng ký học phần", error_code="INTERNAL_ERROR")
+
+        for lop_id in accepted:
+            results[lop_id] = self._item_result(
+                lop_id, context.targets[lop_id],
+                ServiceResult.ok(None, "Đăng ký học phần thành công")
+            )
+
+        items = [results[lop_id] for lop_id in lop_hoc_phan_ids]
+        return ServiceResult.ok(
+            {
+                'results': items,
+                'soLuongThanhCong': len(accepted),
+                'soLuongThatBai': len(items) - len(accepted)
+            },
+            f"Đăng ký thành công {len(accepted)}/{len(items)} lớp học phần"
+        )
+
+    def _item_result(self, lop_id: str, target: Optional[RegistrationTargetDTO], result: ServiceResult) -> dict:
+        return {
+            'lopHocPhanId': lop_id,
+            'maLop': target.ma_lop if target else None,
+            'tenHocPhan': target.ten_hoc_phan if target else None,
+            'isSuccess': result.success,
+            'message': result.message,
+            'errorCode': result.error_code
+        }
+
+    def _validate(self, context: RegistrationContextDTO, target: Optional[RegistrationTargetDTO]) -> ServiceResult:
+        """
+        Run every pre-check against the loaded context, in the original order
+        """
+        # Check Phase
+        if context.phase != "dang_ky_hoc_phan":
+            return ServiceResult.fail("Chưa đến giai đoạn đăng ký học phần hoặc phase đã đóng", error_code="PHASE_NOT_OPEN")
+
+        return self._validate_target(target, build_occupancy(context.registered_lops))
+
+    def _validate_target(self, target: Optional[RegistrationTargetDTO], occupancy: TKBOccupancy) -> ServiceResult:
+        # Check Lop Hoc Phan
+        if not target:
+            return ServiceResult.fail("Lớp học phần không tồn tại", error_code="LHP_NOT_FOUND")
+
+        # Check Ghi Danh
+        if not target.is_ghi_danh:
+            return ServiceResult.fail("Bạn phải ghi danh học phần này trước khi đăng ký lớp", error_code="NOT_GHI_DANH")
+
+        # Check Duplicate Mon Hoc
+        if target.has_registered_mon_hoc:
+            return ServiceResult.fail("Bạn đã đăng ký một lớp khác của cùng môn trong học kỳ này", error_code="ALREADY_REGISTERED_MON_HOC")
+
+        # Check Slot (fast path only - the authoritative claim happens in the transaction)
+        if target.so_luong_hien_tai >= target.so_luong_toi_da:
+            return ServiceResult.fail("Lớp học phần đã đầy", error_code="LHP_FULL")
+
+        # Check Already Registered Class
+        if target.is_registered:
+            return ServiceResult.fail("Bạn đã đăng ký lớp học phần này rồi", error_code="ALREADY_REGISTERED")
+
+        # Check TKB Conflict
+        conflict = occupancy.find_conflict(to_tkb_sessions(target.lich_hocs))
+        if conflict:
+            return ServiceResult.fail(
+                f"Xung đột lịch học với môn {conflict.ten_hoc_phan} - Lớp {conflict.ma_lop}",
+                error_code="TKB_CONFLICT"
+            )
         return ServiceResult.ok(None)
 
-    def _is_time_overlap(self, start1: int, end1: int, start2: int, end2: int) -> bool:
-        return max(start1, start2) <= min(end1, end2)
+
+def build_occupancy(registered_lops: List[RegisteredLopDTO]) -> TKBOccupancy:
+    """Occupancy of the classes already in the student's TKB (PostgreSQL + MongoDB sessions)"""
+    occupancy = TKBOccupancy()
+    for existing_lhp in registered_lops:
+        occupancy.add(
+            to_tkb_sessions(existing_lhp.lich_hocs),
+            existing_lhp.lop_hoc_phan_id,
+            existing_lhp.ma_lop,
+            existing_lhp.ten_hoc_phan
+        )
+    return occupancy
+
+
+def to_tkb_sessions(lich_hocs: List[LichHocSlotDTO]) -> List[TKBSession]:
+    """Convert loaded slots to domain sessions, dropping any that cannot be placed on the grid"""
+    sessions = (
+        TKBSession.create(lh.thu, lh.tiet_bat_dau, lh.tiet_ket_thuc, lh.ngay_bat_dau, lh.ngay_ket_thuc)
+        for lh in lich_hocs
+    )
+    return [session for session in sessions if session]
@@ -5,7 +5,7 @@ from typing import List, Dict, Any, Optional
 from collections import defaultdict
 from core.types import ServiceResult
 from application.course_registration.interfaces import IDangKyHocPhanRepository
-from infrastructure.persistence.mongodb_service import get_mongodb_service
+from infrastructure.persistence.tkb_read_model import get_tkb_read_model, TKBSemester
 import logging
 
 logger = logging.getLogger(__name__)
@@ -20,7 +20,7 @@ class GetDanhSachLopDaDangKyUseCase:
     
     def __init__(self, dang_ky_hp_repo: IDangKyHocPhanRepository):
         self.dang_ky_hp_repo = dang_ky_hp_repo
-        self.mongo_service = get_mongodb_service()
+        self.tkb_read_model = get_tkb_read_model()
         
     def execute(self, sinh_vien_id: str, hoc_ky_id: str) -> ServiceResult:
         """
@@ -30,8 +30,8 @@ class GetDanhSachLopDaDangKyUseCase:
             # 1. Get registered classes
             dang_kys = self.dang_ky_hp_repo.find_by_sinh_vien_and_hoc_ky(sinh_vien_id, hoc_ky_id)
             
-            # 2. Build MongoDB TKB map
-            mongo_tkb_map = self._build_mongo_tkb_map(hoc_ky_id)
+            # 2. Get the shared TKB read model for this semester
+            tkb_semester = self.tkb_read_model.get(hoc_ky_id)
             
             # 3. Group by môn học
             mon_hoc_map: Dict[str, Dict] = {}
@@ -51,7 +51,7 @@ class GetDanhSachLopDaDangKyUseCase:
                     }
                 
                 # Get TKB from MongoDB (primary source) or PostgreSQL (fallback)
-                tkb_list = self._get_tkb_for_lop(ma_mon, lhp.ma_lop, mongo_tkb_map, lhp)
+                tkb_list = self._get_tkb_for_lop(ma_mon, lhp.ma_lop, tkb_semester, lhp)
                 
                 # Add lớp to môn học
                 mon_hoc_map[ma_mon]["danhSachLop"].append({
@@ -74,55 +74,25 @@ class GetDanhSachLopDaDangKyUseCase:
             traceback.print_exc()
             return ServiceResult.fail("Lỗi khi lấy danh sách lớp đã đăng ký", error_code="INTERNAL_ERROR")
     
-    def _build_mongo_tkb_map(self, hoc_ky_id: str) -> Dict[str, Dict]:
-        """Build a map of maHocPhan -> { tenLop -> tkb_info } from MongoDB"""
-        tkb_map = {}
-        
-        if not self.mongo_service.is_available:
-            logger.warning("MongoDB not available, TKB will be empty")
-            return tkb_map
-        
-        try:
-            # Get all TKB for this semester (keep snake_case for internal processing)
-            all_tkb = self.mongo_service.get_tkb_by_hoc_ky(hoc_ky_id, transform_to_camel=False)
-            
-            for tkb_doc in all_tkb:
-                ma_hoc_phan = tkb_doc.get('ma_hoc_phan')
-                danh_sach_lop = tkb_doc.get('danhSachLop', [])
-                
-                if ma_hoc_phan not in tkb_map:
-                    tkb_map[ma_hoc_phan] = {}
-                
-                for lop in danh_sach_lop:
-                    ten_lop = lop.get('ten_lop')
-                    if ten_lop:
-                        tkb_map[ma_hoc_phan][ten_lop] = lop
-            
-            logger.debug(f"Built TKB map with {len(tkb_map)} môn học")
-            
-        except Exception as e:
-            logger.error(f"Failed to build TKB map: {e}")
-        
-        return tkb_map
-    
     def _get_tkb_for_lop(
         self, 
         ma_mon: str, 
         ten_lop: str, 
-        mongo_tkb_map: Dict, 
+        tkb_semester: TKBSemester, 
         lhp: Any
     ) -> List[Dict]:
         """Get TKB info for a specific class - Priority: MongoDB > PostgreSQL"""
         tkb_list = []
         
-        # Try MongoDB first
-        mongo_lop = mongo_tkb_map.get(ma_mon, {}).get(ten_lop)
+        # Try MongoDB first - every weekly session of the class
+        mongo_sessions = tkb_semester.get_sessions(ma_mon, ten_lop)
         
-        if mongo_lop:
+        if mongo_sessions:
             # Found in MongoDB - use this data
-            tkb_info = self._format_mongo_tkb(mongo_lop, lhp)
-            if tkb_info:
-                tkb_list.append(tkb_info)
+            for mongo_lop in mongo_sessions:
+                tkb_info = self._format_mongo_tkb(mongo_lop, lhp)
+                if tkb_info:
+                    tkb_list.append(tkb_info)
         else:
             # Fallback to PostgreSQL if no MongoDB data
             tkb_list = self._get_tkb_from_postgres(lhp)
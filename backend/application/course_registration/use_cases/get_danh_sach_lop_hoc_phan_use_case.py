@@ -7,7 +7,8 @@ from application.course_registration.interfaces import (
     ILopHocPhanRepository,
     IDangKyHocPhanRepository
 )
-from infrastructure.persistence.mongodb_service import get_mongodb_service
+from infrastructure.persistence.tkb_read_model import get_tkb_read_model, TKBSemester
+from infrastructure.persistence.catalog_snapshot import get_catalog_snapshot_store, CatalogSnapshotStore
 import logging
 
 logger = logging.getLogger(__name__)
@@ -21,16 +22,23 @@ class GetDanhSachLopHocPhanUseCase:
     - TKB is stored in MongoDB collection 'thoi_khoa_bieu_mon_hoc'
     - Each document has: maHocPhan, hocKyId, danhSachLop[]
     - We need to match MongoDB TKB with PostgreSQL LopHocPhan by tenLop
+
+    The grouped catalog is the same for every student, so it is built once per
+    học kỳ (shared snapshot). Per request only the seat counters (one light
+    query) and the student's registered classes are applied, in memory.
     """
     
     def __init__(
         self,
         lop_hoc_phan_repo: ILopHocPhanRepository,
-        dang_ky_hp_repo: IDangKyHocPhanRepository
+        dang_ky_hp_repo: IDangKyHocPhanRepository,
+        catalog_store: Optional[CatalogSnapshotStore] = None
     ):
         self.lop_hoc_phan_repo = lop_hoc_phan_repo
         self.dang_ky_hp_repo = dang_ky_hp_repo
-        self.mongo_service = get_mongodb_service()
+        self.tkb_read_model = get_tkb_read_model()
+        self.catalog_store = catalog_store or get_catalog_snapshot_store()
+        self._phong_names: Dict[str, str] = {}
         
     def execute(self, sinh_vien_id: str, hoc_ky_id: str) -> ServiceResult:
         """
@@ -40,59 +48,49 @@ class GetDanhSachLopHocPhanUseCase:
             # 1. Get registered class IDs
             registered_ids = set(self.dang_ky_hp_repo.find_registered_class_ids(sinh_vien_id, hoc_ky_id))
             
-            # 2. Get all classes for semester from PostgreSQL
-            all_classes = self.lop_hoc_phan_repo.find_all_by_hoc_ky(hoc_ky_id)
-            
-            # 3. Get all TKB from MongoDB for this semester
-            mongo_tkb_map = self._build_mongo_tkb_map(hoc_ky_id)
-            
-            # 4. Group by MonHoc
-            mon_hoc_map: Dict[str, Any] = {}
+            # 2. Shared catalog, rebuilt only when the TKB version moves
+            tkb_semester = self.tkb_read_model.get(hoc_ky_id)
+            catalog = self.catalog_store.get(
+                hoc_ky_id,
+                tkb_semester.version,
+                lambda: self._build_catalog(hoc_ky_id, tkb_semester)
+            )
             
-            for lhp in all_classes:
-                # Skip if registered
-                if str(lhp.id) in registered_ids:
-                    continue
-                    
-                mon_hoc = lhp.hoc_phan.mon_hoc
-                ma_mon = mon_hoc.ma_mon
-                
-                if ma_mon not in mon_hoc_map:
-                    mon_hoc_map[ma_mon] = {
-                        "monHocId": str(mon_hoc.id),
-                        "maMon": ma_mon,
-                        "tenMon": mon_hoc.ten_mon,
-                        "soTinChi": mon_hoc.so_tin_chi,
-                        "laMonChung": mon_hoc.la_mon_chung,
-                        "loaiMon": mon_hoc.loai_mon,
-                        "danhSachLop": []
-                    }
-                
-                # Get TKB from MongoDB (primary source)
-                tkb_list = self._get_tkb_for_lop(ma_mon, lhp.ma_lop, mongo_tkb_map, lhp)
-                
-                mon_hoc_map[ma_mon]["danhSachLop"].append({
-                    "id": str(lhp.id),
-                    "maLop": lhp.ma_lop,
-                    "tenLop": lhp.ma_lop,
-                    "soLuongHienTai": lhp.so_luong_hien_tai or 0,
-                    "soLuongToiDa": lhp.so_luong_toi_da or 50,
-                    "tkb": tkb_list
-                })
+            # 3. Live seat counters
+            seats = self.lop_hoc_phan_repo.find_seat_counts_by_hoc_ky(hoc_ky_id)
             
-            # 5. Categorize
+            # 4. Per-student view: drop registered classes, overlay seats, categorize
             mon_chung = []
             bat_buoc = []
             tu_chon = []
             
-            for dto in mon_hoc_map.values():
-                # Clean up internal fields
-                la_mon_chung = dto.pop("laMonChung", False)
-                loai_mon = dto.pop("loaiMon", "")
+            for mon in catalog:
+                danh_sach_lop = []
+                for lop in mon["danhSachLop"]:
+                    # Skip if registered
+                    if lop["id"] in registered_ids:
+                        continue
+                    lop = dict(lop)
+                    seat = seats.get(lop["id"])
+                    if seat is not None:
+                        lop["soLuongHienTai"] = seat.so_luong_hien_tai
+                        lop["soLuongToiDa"] = seat.so_luong_toi_da
+                    danh_sach_lop.append(lop)
+                
+                if not danh_sach_lop:
+                    continue
+                
+                dto = {
+                    "monHocId": mon["monHocId"],
+                    "maMon": mon["maMon"],
+                    "tenMon": mon["tenMon"],
+                    "soTinChi": mon["soTinChi"],
+                    "danhSachLop": danh_sach_lop
+                }
                 
-                if la_mon_chung:
+                if mon["laMonChung"]:
                     mon_chung.append(dto)
-                elif loai_mon == "chuyen_nganh":
+                elif mon["loaiMon"] == "chuyen_nganh":
                     bat_buoc.append(dto)
                 else:
                     tu_chon.append(dto)
@@ -109,48 +107,66 @@ class GetDanhSachLopHocPhanUseCase:
             traceback.print_exc()
             return ServiceResult.fail("Lỗi khi lấy danh sách lớp học phần", error_code="INTERNAL_ERROR")
     
-    def _build_mongo_tkb_map(self, hoc_ky_id: str) -> Dict[str, Dict]:
+    def _build_catalog(self, hoc_ky_id: str, tkb_semester: TKBSemester) -> List[Dict[str, Any]]:
         """
-        Build a map of maHocPhan -> { tenLop -> tkb_info }
-        from MongoDB thoi_khoa_bieu_mon_hoc collection
-        
-        Note: MongoDB data can have both camelCase or snake_case fields
+        Every class of the semester grouped by MonHoc, with formatted TKB.
+        Student-independent; seat counters here are only the build-time values.
         """
-        tkb_map = {}
+        all_classes = self.lop_hoc_phan_repo.find_all_by_hoc_ky(hoc_ky_id)
+        self._load_phong_names(tkb_semester)
         
-        if not self.mongo_service.is_available:
-            logger.warning("MongoDB not available, TKB will be empty")
-            return tkb_map
+        mon_hoc_map: Dict[str, Any] = {}
         
-        try:
-            # Get all TKB for this semester (keep snake_case for internal processing)
-            all_tkb = self.mongo_service.get_tkb_by_hoc_ky(hoc_ky_id, transform_to_camel=False)
+        for lhp in all_classes:
+            mon_hoc = lhp.hoc_phan.mon_hoc
+            ma_mon = mon_hoc.ma_mon
             
-            for tkb_doc in all_tkb:
-                ma_hoc_phan = tkb_doc.get('ma_hoc_phan')
-                danh_sach_lop = tkb_doc.get('danhSachLop', [])
-                
-                if ma_hoc_phan not in tkb_map:
-                    tkb_map[ma_hoc_phan] = {}
-                
-                for lop in danh_sach_lop:
-                    # MongoDB now uses snake_case internally
-                    ten_lop = lop.get('ten_lop')
-                    if ten_lop:
-                        tkb_map[ma_hoc_phan][ten_lop] = lop  # Store raw snake_case data
+            if ma_mon not in mon_hoc_map:
+                mon_hoc_map[ma_mon] = {
+                    "monHocId": str(mon_hoc.id),
+                    "maMon": ma_mon,
+                    "tenMon": mon_hoc.ten_mon,
+                    "soTinChi": mon_hoc.so_tin_chi,
+                    "laMonChung": mon_hoc.la_mon_chung,
+                    "loaiMon": mon_hoc.loai_mon,
+                    "danhSachLop": []
+                }
             
-            logger.debug(f"Built TKB map with {len(tkb_map)} môn học")
+            # Get TKB from MongoDB (primary source)
+            tkb_list = self._get_tkb_for_lop(ma_mon, lhp.ma_lop, tkb_semester, lhp)
             
-        except Exception as e:
-            logger.error(f"Failed to build TKB map: {e}")
+            mon_hoc_map[ma_mon]["danhSachLop"].append({
+                "id": str(lhp.id),
+                "maLop": lhp.ma_lop,
+                "tenLop": lhp.ma_lop,
+                "soLuongHienTai": lhp.so_luong_hien_tai or 0,
+                "soLuongToiDa": lhp.so_luong_toi_da or 50,
+                "tkb": tkb_list
+            })
         
-        return tkb_map
+        return list(mon_hoc_map.values())
+    
+    def _load_phong_names(self, tkb_semester: TKBSemester) -> None:
+        """Resolve every room referenced by the semester's TKB in one query"""
+        phong_ids = tkb_semester.phong_ids()
+        if not phong_ids:
+            return
+        try:
+            from infrastructure.persistence.models import Phong
+            self._phong_names = {
+                str(phong_id): ma_phong
+                for phong_id, ma_phong in Phong.objects.using('neon').filter(
+                    id__in=phong_ids
+                ).values_list('id', 'ma_phong')
+            }
+        except Exception as e:
+            logger.error(f"Failed to load phong names: {e}")
     
     def _get_tkb_for_lop(
         self, 
         ma_mon: str, 
         ten_lop: str, 
-        mongo_tkb_map: Dict, 
+        tkb_semester: TKBSemester, 
         lhp: Any
     ) -> List[Dict]:
         """
@@ -159,14 +175,15 @@ class GetDanhSachLopHocPhanUseCase:
         """
         tkb_list = []
         
-        # Try MongoDB first
-        mongo_lop = mongo_tkb_map.get(ma_mon, {}).get(ten_lop)
+        # Try MongoDB first - every weekly session of the class
+        mongo_sessions = tkb_semester.get_sessions(ma_mon, ten_lop)
         
-        if mongo_lop:
+        if mongo_sessions:
             # Found in MongoDB - use this data
-            tkb_info = self._format_mongo_tkb(mongo_lop, lhp)
-            if tkb_info:
-                tkb_list.append(tkb_info)
+            for mongo_lop in mongo_sessions:
+                tkb_info = self._format_mongo_tkb(mongo_lop, lhp)
+                if tkb_info:
+                    tkb_list.append(tkb_info)
         else:
             # Fallback to PostgreSQL if no MongoDB data
             tkb_list = self._get_tkb_from_postgres(lhp)
@@ -243,6 +260,9 @@ class GetDanhSachLopHocPhanUseCase:
         if not phong_hoc_id:
             return "TBA"
         
+        if str(phong_hoc_id) in self._phong_names:
+            return self._phong_names[str(phong_hoc_id)]
+        
         try:
             from infrastructure.persistence.models import Phong
             phong = Phong.objects.using('neon').filter(id=phong_hoc_id).first()
@@ -13,6 +13,8 @@ from application.course_registration.interfaces import (
 from infrastructure.persistence.enrollment.repositories import KyPhaseRepository
 from infrastructure.persistence.sinh_vien.sinh_vien_repository import SinhVienRepository
 from infrastructure.persistence.common.repositories import HocKyRepository
+from infrastructure.events import EventBus, get_event_bus
+from domain.course_registration import LopHocPhanDaHuy
 
 class HuyDangKyHocPhanUseCase:
     """
@@ -27,7 +29,8 @@ class HuyDangKyHocPhanUseCase:
         lich_su_repo: ILichSuDangKyRepository,
         ky_phase_repo: KyPhaseRepository,
         sinh_vien_repo: SinhVienRepository,
-        hoc_ky_repo: HocKyRepository = None
+        hoc_ky_repo: HocKyRepository = None,
+        event_bus: Optional[EventBus] = None
     ):
         self.lop_hoc_phan_repo = lop_hoc_phan_repo
         self.dang_ky_hp_repo = dang_ky_hp_repo
@@ -36,6 +39,7 @@ class HuyDangKyHocPhanUseCase:
         self.ky_phase_repo = ky_phase_repo
         self.sinh_vien_repo = sinh_vien_repo
         self.hoc_ky_repo = hoc_ky_repo or HocKyRepository()
+        self.event_bus = event_bus or get_event_bus()
         
     def execute(self, sinh_vien_id: str, lop_hoc_phan_id: str, hoc_ky_id: Optional[str] = None) -> ServiceResult:
         """
@@ -91,6 +95,8 @@ class HuyDangKyHocPhanUseCase:
                 
                 # 4.4: Update Quantity
                 self.lop_hoc_phan_repo.update_so_luong(lop_hoc_phan_id, -1)
+
+                self.event_bus.publish(LopHocPhanDaHuy(sinh_vien_id, hoc_ky_id, lop_hoc_phan_id))
                 
             return ServiceResult.ok(None, "Hủy đăng ký học phần thành công")
             
@@ -2,6 +2,7 @@
 Application Layer - Huy Dang Ky Lop Hoc Phan Use Case
 """
 from datetime import datetime
+from typing import Optional
 from core.types import ServiceResult
 from application.course_registration.interfaces import (
     IDangKyHocPhanRepository,
@@ -10,6 +11,8 @@ from application.course_registration.interfaces import (
     ILopHocPhanRepository
 )
 from application.enrollment.interfaces import IDotDangKyRepository
+from domain.course_registration import LopHocPhanDaHuy
+from infrastructure.events import EventBus, get_event_bus
 from django.db import transaction
 
 class HuyDangKyLopHocPhanUseCase:
@@ -23,13 +26,15 @@ class HuyDangKyLopHocPhanUseCase:
         dot_dang_ky_repo: IDotDangKyRepository,
         dang_ky_tkb_repo: IDangKyTKBRepository,
         lich_su_repo: ILichSuDangKyRepository,
-        lop_hoc_phan_repo: ILopHocPhanRepository
+        lop_hoc_phan_repo: ILopHocPhanRepository,
+        event_bus: Optional[EventBus] = None
     ):
         self.dang_ky_hp_repo = dang_ky_hp_repo
         self.dot_dang_ky_repo = dot_dang_ky_repo
         self.dang_ky_tkb_repo = dang_ky_tkb_repo
         self.lich_su_repo = lich_su_repo
         self.lop_hoc_phan_repo = lop_hoc_phan_repo
+        self.event_bus = event_bus or get_event_bus()
 
     def execute(self, request_data: dict, user_id: str) -> ServiceResult:
         """
@@ -82,6 +87,8 @@ class HuyDangKyLopHocPhanUseCase:
                 
                 # 3.4 Decrement Slot
                 self.lop_hoc_phan_repo.update_so_luong(lop_hoc_phan_id, -1)
+
+                self.event_bus.publish(LopHocPhanDaHuy(user_id, hoc_ky_id, lop_hoc_phan_id))
                 
             return ServiceResult.ok(None, "Hủy đăng ký học phần thành công")
             
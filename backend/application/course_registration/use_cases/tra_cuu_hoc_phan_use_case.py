@@ -1,7 +1,7 @@
 from typing import List, Dict, Any, Optional
 from application.enrollment.interfaces.repositories import IHocPhanRepository
 from core.types.service_result import ServiceResult
-from infrastructure.persistence.mongodb_service import get_mongodb_service
+from infrastructure.persistence.tkb_read_model import get_tkb_read_model, TKBSemester
 import logging
 
 logger = logging.getLogger(__name__)
@@ -19,7 +19,7 @@ class TraCuuHocPhanUseCase:
     
     def __init__(self, hoc_phan_repo: IHocPhanRepository):
         self.hoc_phan_repo = hoc_phan_repo
-        self.mongo_service = get_mongodb_service()
+        self.tkb_read_model = get_tkb_read_model()
 
     def execute(self, hoc_ky_id: str) -> ServiceResult[List[Dict[str, Any]]]:
         """
@@ -47,9 +47,9 @@ class TraCuuHocPhanUseCase:
             # Get all LopHocPhan for this hoc_ky, grouped by mon_hoc
             lop_hoc_phans = self.hoc_phan_repo.find_lop_hoc_phan_by_hoc_ky(hoc_ky_id)
             
-            # Build MongoDB TKB map for fast lookup
-            mongo_tkb_map = self._build_mongo_tkb_map(hoc_ky_id)
-            logger.debug(f"[TRA_CUU] Built TKB map with {len(mongo_tkb_map)} môn học")
+            # Shared TKB read model for fast lookup
+            tkb_semester = self.tkb_read_model.get(hoc_ky_id)
+            logger.debug(f"[TRA_CUU] TKB read model has {len(tkb_semester)} môn học")
             
             # Group by mon_hoc
             mon_hoc_map: Dict[str, Dict[str, Any]] = {}
@@ -79,7 +79,7 @@ class TraCuuHocPhanUseCase:
                     }
                 
                 # Get TKB from MongoDB (primary source)
-                tkb_string = self._get_tkb_for_lop(ma_mon, lhp.ma_lop, mongo_tkb_map, lhp)
+                tkb_string = self._get_tkb_for_lop(ma_mon, lhp.ma_lop, tkb_semester, lhp)
                 
                 # Get giangVien - GiangVien.id is OneToOne with Users
                 giang_vien_name = ""
@@ -123,50 +123,11 @@ class TraCuuHocPhanUseCase:
             traceback.print_exc()
             return ServiceResult.fail(str(e))
     
-    def _build_mongo_tkb_map(self, hoc_ky_id: str) -> Dict[str, Dict]:
-        """
-        Build a map of ma_mon -> { ten_lop -> tkb_info }
-        from MongoDB thoi_khoa_bieu_mon_hoc collection
-        """
-        tkb_map = {}
-        
-        if not self.mongo_service.is_available:
-            logger.warning("[TRA_CUU] MongoDB not available, TKB will be empty")
-            return tkb_map
-        
-        try:
-            # Get all TKB for this semester (snake_case for internal processing)
-            all_tkb = self.mongo_service.get_tkb_by_hoc_ky(hoc_ky_id, transform_to_camel=False)
-            logger.debug(f"[TRA_CUU] Found {len(all_tkb)} TKB documents in MongoDB")
-            
-            for tkb_doc in all_tkb:
-                ma_hoc_phan = tkb_doc.get('ma_hoc_phan')
-                danh_sach_lop = tkb_doc.get('danhSachLop', [])
-                
-                if ma_hoc_phan not in tkb_map:
-                    tkb_map[ma_hoc_phan] = {}
-                
-                for lop in danh_sach_lop:
-                    # MongoDB uses snake_case internally
-                    ten_lop = lop.get('ten_lop')
-                    if ten_lop:
-                        # Store all sessions for this class (same class can have multiple days)
-                        if ten_lop not in tkb_map[ma_hoc_phan]:
-                            tkb_map[ma_hoc_phan][ten_lop] = []
-                        tkb_map[ma_hoc_phan][ten_lop].append(lop)
-            
-            logger.debug(f"[TRA_CUU] Built TKB map with {len(tkb_map)} môn học")
-            
-        except Exception as e:
-            logger.error(f"[TRA_CUU] Failed to build TKB map: {e}")
-        
-        return tkb_map
-    
     def _get_tkb_for_lop(
         self, 
         ma_mon: str, 
         ten_lop: str, 
-        mongo_tkb_map: Dict,
+        tkb_semester: TKBSemester,
         lhp: Any
     ) -> str:
         """
@@ -174,7 +135,7 @@ class TraCuuHocPhanUseCase:
         Priority: MongoDB > "Chưa có TKB"
         """
         # Try MongoDB first
-        mongo_sessions = mongo_tkb_map.get(ma_mon, {}).get(ten_lop)
+        mongo_sessions = tkb_semester.get_sessions(ma_mon, ten_lop)
         
         if mongo_sessions:
             # Format all sessions for this class
@@ -6,6 +6,7 @@ from .get_gv_lop_hoc_phan_detail_use_case import GetGVLopHocPhanDetailUseCase
 from .get_gv_students_of_lhp_use_case import GetGVStudentsOfLHPUseCase
 from .get_gv_grades_use_case import GetGVGradesUseCase
 from .upsert_gv_grades_use_case import UpsertGVGradesUseCase
+from .import_gv_grades_use_case import ImportGVGradesUseCase
 from .get_gv_tkb_weekly_use_case import GetGVTKBWeeklyUseCase
 
 __all__ = [
@@ -14,5 +15,6 @@ __all__ = [
     'GetGVStudentsOfLHPUseCase',
     'GetGVGradesUseCase',
     'UpsertGVGradesUseCase',
+    'ImportGVGradesUseCase',
     'GetGVTKBWeeklyUseCase',
 ]
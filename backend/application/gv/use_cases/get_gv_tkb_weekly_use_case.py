@@ -1,10 +1,10 @@
 """
 Application Layer - GV Use Case: Get TKB Weekly
-Fetches schedules from MongoDB (primary source)
+Fetches schedules from the shared TKB read model (MongoDB is the primary source)
 """
 from core.types import ServiceResult
 from application.gv.interfaces import IGVTKBRepository, GVTKBItemDTO
-from infrastructure.persistence.mongodb_service import get_mongodb_service
+from infrastructure.persistence.tkb_read_model import get_tkb_read_model
 from datetime import date, timedelta
 from typing import List, Dict, Any
 import logging
@@ -20,7 +20,7 @@ class GetGVTKBWeeklyUseCase:
     
     def __init__(self, tkb_repository: IGVTKBRepository):
         self.tkb_repository = tkb_repository
-        self.mongo_service = get_mongodb_service()
+        self.tkb_read_model = get_tkb_read_model()
     
     def execute(
         self, 
@@ -33,44 +33,16 @@ class GetGVTKBWeeklyUseCase:
         Execute get TKB weekly logic using MongoDB
         """
         try:
-            from infrastructure.persistence.models import LopHocPhan
+            # 1. Sessions of every LopHocPhan assigned to this GV
+            entries = self.tkb_read_model.by_giang_vien(gv_user_id, hoc_ky_id)
             
-            # 1. Get LopHocPhan assigned to this GV
-            lop_hoc_phans = LopHocPhan.objects.using('neon').select_related(
-                'hoc_phan',
-                'hoc_phan__mon_hoc',
-            ).filter(
-                giang_vien_id=gv_user_id,
-                hoc_phan__id_hoc_ky=hoc_ky_id,
-            )
-            
-            logger.info(f"🔍 GV TKB: gv_user_id={gv_user_id}, hoc_ky_id={hoc_ky_id}, lop_count={lop_hoc_phans.count()}")
-            
-            if not lop_hoc_phans.exists():
-                return ServiceResult.ok([])
-            
-            # 2. Build MongoDB TKB map
-            mongo_tkb_map = self._build_mongo_tkb_map(hoc_ky_id)
-            logger.info(f"🔍 MongoDB TKB map has {len(mongo_tkb_map)} courses")
+            logger.info(f"🔍 GV TKB: gv_user_id={gv_user_id}, hoc_ky_id={hoc_ky_id}, session_count={len(entries)}")
             
             tkb_items = []
             
-            # 3. Generate TKB items for each LopHocPhan
-            for lop in lop_hoc_phans:
-                mon_hoc = lop.hoc_phan.mon_hoc if lop.hoc_phan else None
-                if not mon_hoc:
-                    continue
-                
-                ma_mon = mon_hoc.ma_mon
-                ten_lop = lop.ma_lop
-                
-                # Get schedule from MongoDB
-                mongo_lop = mongo_tkb_map.get(ma_mon, {}).get(ten_lop)
-                
-                if not mongo_lop:
-                    logger.debug(f"No MongoDB schedule for {ma_mon}/{ten_lop}")
-                    continue
-                
+            # 2. Generate TKB items for each session
+            for entry in entries:
+                mongo_lop = entry.session
                 thu = mongo_lop.get('thu_trong_tuan')
                 tiet_bat_dau = mongo_lop.get('tiet_bat_dau')
                 tiet_ket_thuc = mongo_lop.get('tiet_ket_thuc')
@@ -81,7 +53,7 @@ class GetGVTKBWeeklyUseCase:
                 if not thu:
                     continue
                 
-                logger.info(f"🔍 LHP {ten_lop}: thu={thu}, tiet={tiet_bat_dau}-{tiet_ket_thuc}")
+                logger.info(f"🔍 LHP {entry.ma_lop}: thu={thu}, tiet={tiet_bat_dau}-{tiet_ket_thuc}")
                 
                 phong_text = self._get_phong_name(phong_hoc_id)
                 
@@ -102,12 +74,12 @@ class GetGVTKBWeeklyUseCase:
                                     "ma_phong": phong_text
                                 },
                                 "lop_hoc_phan": {
-                                    "id": str(lop.id),
-                                    "ma_lop": lop.ma_lop,
+                                    "id": entry.lop_hoc_phan_id,
+                                    "ma_lop": entry.ma_lop,
                                 },
                                 "mon_hoc": {
-                                    "ma_mon": ma_mon,
-                                    "ten_mon": mon_hoc.ten_mon,
+                                    "ma_mon": entry.ma_mon,
+                                    "ten_mon": entry.ten_mon,
                                 },
                                 "ngay_hoc": current_date.isoformat(),
                             })
@@ -125,34 +97,6 @@ class GetGVTKBWeeklyUseCase:
             logger.error(f"Error in GV TKB weekly: {e}")
             return ServiceResult.fail(str(e))
     
-    def _build_mongo_tkb_map(self, hoc_ky_id: str) -> Dict[str, Dict]:
-        """Build a map of maHocPhan -> { tenLop -> tkb_info } from MongoDB"""
-        tkb_map = {}
-        
-        if not self.mongo_service.is_available:
-            logger.warning("MongoDB not available, TKB will be empty")
-            return tkb_map
-        
-        try:
-            all_tkb = self.mongo_service.get_tkb_by_hoc_ky(hoc_ky_id, transform_to_camel=False)
-            
-            for tkb_doc in all_tkb:
-                ma_hoc_phan = tkb_doc.get('ma_hoc_phan')
-                danh_sach_lop = tkb_doc.get('danhSachLop', [])
-                
-                if ma_hoc_phan not in tkb_map:
-                    tkb_map[ma_hoc_phan] = {}
-                
-                for lop in danh_sach_lop:
-                    ten_lop = lop.get('ten_lop')
-                    if ten_lop:
-                        tkb_map[ma_hoc_phan][ten_lop] = lop
-            
-        except Exception as e:
-            logger.error(f"Failed to build TKB map: {e}")
-        
-        return tkb_map
-    
     def _get_phong_name(self, phong_hoc_id) -> str:
         """Get room name from ID"""
         if not phong_hoc_id:
@@ -0,0 +1,107 @@
+"""
+Application Layer - GV Use Case: Import a grade sheet for a Lop Hoc Phan
+"""
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Iterable, List, Tuple, Any
+
+from core.types import ServiceResult
+from application.gv.interfaces import IGVLopHocPhanRepository, IGVGradeRepository
+from infrastructure.imports import TableFormatError
+
+# Accepted headers, compared after normalize_header
+MSSV_COLUMNS = ('mssv', 'masosinhvien', 'masv')
+DIEM_COLUMNS = ('diem', 'diemso', 'diemtongket')
+
+
+class ImportGVGradesUseCase:
+    """
+    Use case to apply a .xlsx / .csv grade sheet (MSSV, điểm) to a LopHocPhan (only if GV is assigned)
+    Valid rows are upserted in one statement; every other row is reported with its error.
+    A blank điểm leaves that student's grade unchanged.
+    """
+
+    def __init__(
+        self,
+        lhp_repository: IGVLopHocPhanRepository,
+        grade_repository: IGVGradeRepository
+    ):
+        self.lhp_repository = lhp_repository
+        self.grade_repository = grade_repository
+
+    def execute(
+        self,
+        lhp_id: str,
+        gv_user_id: str,
+        rows: Iterable[Tuple[int, Dict[str, str]]]
+    ) -> ServiceResult:
+        """
+        Args:
+            lhp_id: UUID of LopHocPhan
+            gv_user_id: UUID of the GiangVien's user account
+            rows: (row number, {normalised header: value}) from infrastructure.imports.read_table
+
+        Returns:
+            ServiceResult with {summary, results}
+        """
+        try:
+            if not self.lhp_repository.verify_gv_owns_lhp(lhp_id, gv_user_id):
+                return ServiceResult.forbidden("Bạn không có quyền cập nhật điểm lớp học phần này")
+
+            try:
+                rows = list(rows)
+            except TableFormatError as e:
+                return ServiceResult.fail(str(e), error_code="INVALID_FILE")
+            if not rows:
+                return ServiceResult.fail("File không có dòng dữ liệu nào", error_code="INVALID_FILE")
+
+            students = self.lhp_repository.get_students_of_lhp(lhp_id, gv_user_id) or []
+            by_mssv = {sv.mssv: sv.id for sv in students}
+
+            results: List[Dict[str, Any]] = []
+            grades: List[Dict[str, Any]] = []
+            graded_rows: List[Dict[str, Any]] = []
+            seen = set()
+            for row, values in rows:
+                mssv = next((values[key] for key in MSSV_COLUMNS if values.get(key)), '')
+                raw = next((values[key] for key in DIEM_COLUMNS if values.get(key)), '')
+                result = {'row': row, 'mssv': mssv}
+                results.append(result)
+
+                if not mssv:
+                    result.update(status='failed', error="Thiếu MSSV")
+                elif mssv not in by_mssv:
+                    result.update(status='failed', error="Sinh viên không thuộc lớp học phần này")
+                elif mssv in seen:
+                    result.update(status='failed', error="MSSV xuất hiện nhiều lần trong file")
+                elif not raw:
+                    result.update(status='skipped')
+                else:
+                    try:
+                        diem = Decimal(raw.replace(',', '.'))
+                    except InvalidOperation:
+                        diem = None
+                    if diem is None or not diem.is_finite():
+                        result.update(status='failed', error=f"Điểm không hợp lệ: {raw}")
+                    elif diem < 0 or diem > 10:
+                        result.update(status='failed', error="Điểm phải từ 0 đến 10")
+                    else:
+                        grades.append({"sinh_vien_id": by_mssv[mssv], "diem_so": float(diem)})
+                        graded_rows.append(result)
+                if mssv:
+                    seen.add(mssv)
+
+            if grades and not self.grade_repository.upsert_grades(lhp_id, grades):
+                return ServiceResult.fail("Không thể cập nhật điểm")
+            for result in graded_rows:
+                result['status'] = 'updated'
+
+            summary = {'total': len(results)}
+            for status in ('updated', 'skipped', 'failed'):
+                summary[status] = sum(1 for r in results if r['status'] == status)
+            return ServiceResult.ok(
+                {'summary': summary, 'results': results},
+                message=f"Đã cập nhật điểm cho {summary['updated']} sinh viên"
+            )
+
+        except Exception as e:
+            return ServiceResult.fail(str(e))
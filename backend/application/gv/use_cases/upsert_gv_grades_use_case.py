@@ -55,8 +55,12 @@ class UpsertGVGradesUseCase:
                 if diem is not None and (diem < 0 or diem > 10):
                     return ServiceResult.fail("Điểm phải từ 0 đến 10")
             
-            # Validate all students are registered in LHP
+            # One row per student: the bulk upsert cannot touch a row twice
             sinh_vien_ids = [g["sinh_vien_id"] for g in grades]
+            if len(set(sinh_vien_ids)) != len(sinh_vien_ids):
+                return ServiceResult.fail("Một sinh viên xuất hiện nhiều lần trong danh sách điểm")
+            
+            # Validate all students are registered in LHP
             if not self.grade_repository.validate_students_in_lhp(lhp_id, sinh_vien_ids):
                 return ServiceResult.fail("Một số sinh viên không thuộc lớp học phần này")
             
@@ -44,6 +44,7 @@ class CreatePaymentUseCase:
             
             # 3. Create payment via gateway
             from infrastructure.gateways import PaymentGatewayFactory, CreatePaymentRequest
+            from infrastructure.gateways.transport import GatewayTransportError
             
             gateway = PaymentGatewayFactory.create(provider)
             
@@ -60,16 +61,24 @@ class CreatePaymentUseCase:
             else:
                 redirect_url = f"{frontend_url}/payment/result"
             
-            gateway_response = gateway.create_payment(CreatePaymentRequest(
-                amount=amount,
-                order_info=f"Thanh toan hoc phi HK {hoc_ky_id}",
-                redirect_url=redirect_url,
-                ipn_url=ipn_url,
-                metadata={
-                    "sinhVienId": sinh_vien_id,
-                    "hocKyId": hoc_ky_id
-                }
-            ))
+            try:
+                gateway_response = gateway.create_payment(CreatePaymentRequest(
+                    amount=amount,
+                    order_info=f"Thanh toan hoc phi HK {hoc_ky_id}",
+                    redirect_url=redirect_url,
+                    ipn_url=ipn_url,
+                    metadata={
+                        "sinhVienId": sinh_vien_id,
+                        "hocKyId": hoc_ky_id
+                    }
+                ))
+            except GatewayTransportError as e:
+                print(f"[CREATE_PAYMENT] Gateway unavailable: {e}")
+                return ServiceResult.fail(
+                    message="Cổng thanh toán tạm thời không phản hồi, vui lòng thử lại sau",
+                    status_code=503,
+                    error_code="GATEWAY_UNAVAILABLE"
+                )
             
             # 4. Save transaction to DB
             transaction = self.payment_repo.create_transaction(
@@ -2,10 +2,23 @@
 Payment use cases
 """
 from abc import ABC, abstractmethod
-from typing import Optional
+from dataclasses import dataclass
+from typing import Optional, List, Dict, Any
 from infrastructure.persistence.models import PaymentTransactions, HocPhi
 
 
+@dataclass
+class IpnInboxItemDTO:
+    """One deduplicated gateway callback waiting in (or done with) the IPN inbox"""
+    id: str
+    provider: str
+    order_id: str
+    transaction_id: str
+    result_code: str
+    status: str  # pending | processed | rejected | failed
+    attempts: int = 0
+
+
 class IPaymentRepository(ABC):
     @abstractmethod
     def create_transaction(self, sinh_vien_id: str, hoc_ky_id: str, amount: float, 
@@ -20,6 +33,11 @@ class IPaymentRepository(ABC):
     def update_status(self, order_id: str, status: str) -> Optional[PaymentTransactions]:
         pass
 
+    @abstractmethod
+    def lock_by_order_id(self, order_id: str) -> Optional[PaymentTransactions]:
+        """SELECT ... FOR UPDATE; must be called inside a transaction"""
+        pass
+
 
 class IHocPhiRepository(ABC):
     @abstractmethod
@@ -29,3 +47,29 @@ class IHocPhiRepository(ABC):
     @abstractmethod
     def update_payment_status(self, sinh_vien_id: str, hoc_ky_id: str, status: str) -> bool:
         pass
+
+
+class IPaymentIpnInboxRepository(ABC):
+    @abstractmethod
+    def enqueue(self, provider: str, order_id: str, transaction_id: str, result_code: str,
+                payload: Dict[str, Any]) -> bool:
+        """Store a callback once per (provider, order_id, transaction_id); False if already stored"""
+        pass
+
+    @abstractmethod
+    def find_pending_ids(self, limit: int) -> List[str]:
+        pass
+
+    @abstractmethod
+    def lock_pending(self, item_id: str) -> Optional[IpnInboxItemDTO]:
+        """Row-lock a still pending item, skipping it if another worker holds it"""
+        pass
+
+    @abstractmethod
+    def mark(self, item_id: str, status: str, transaction_pk: Optional[str] = None,
+             error: Optional[str] = None) -> None:
+        pass
+
+    @abstractmethod
+    def record_failure(self, item_id: str, error: str, max_attempts: int) -> None:
+        pass
@@ -0,0 +1,101 @@
+"""
+IPN Inbox Use Cases
+Gateway callbacks are verified and stored once in the inbox (acknowledged
+immediately), then applied by a worker. Gateways retry the same callback
+many times; duplicates stop at the inbox's unique key and never reach
+PaymentTransactions / HocPhi.
+"""
+from typing import Dict, Any
+from decouple import config
+from django.db import transaction as db_transaction
+from core.types import ServiceResult
+from application.payment.interfaces import IPaymentIpnInboxRepository
+from application.payment.process_ipn_use_case import ProcessIPNUseCase
+
+
+class AcceptIPNUseCase:
+    """
+    Verify the signature and enqueue the callback; no payment rows are touched
+    """
+
+    def __init__(self, inbox_repo: IPaymentIpnInboxRepository):
+        self.inbox_repo = inbox_repo
+
+    def execute(self, provider: str, data: Dict[str, Any]) -> ServiceResult[Dict[str, Any]]:
+        try:
+            from infrastructure.gateways import PaymentGatewayFactory, VerifyIPNRequest
+
+            gateway = PaymentGatewayFactory.create(provider)
+            verify_result = gateway.verify_ipn(VerifyIPNRequest(data=data))
+
+            if not verify_result.is_valid:
+                print(f"[IPN] Invalid signature for order {verify_result.order_id}")
+                return ServiceResult.fail(
+                    message="Invalid IPN signature",
+                    error_code="INVALID_SIGNATURE"
+                )
+
+            created = self.inbox_repo.enqueue(
+                provider,
+                verify_result.order_id,
+                verify_result.transaction_id,
+                verify_result.result_code,
+                data
+            )
+
+            return ServiceResult.ok({
+                "orderId": verify_result.order_id,
+                "transactionId": verify_result.transaction_id,
+                "duplicate": not created
+            })
+
+        except Exception as e:
+            print(f"[IPN] Error accepting: {e}")
+            return ServiceResult.fail(str(e), error_code="INTERNAL_ERROR")
+
+
+class ProcessIPNInboxUseCase:
+    """
+    Apply pending inbox items. Each item is handled in its own transaction
+    with the inbox row and the PaymentTransactions row locked, so concurrent
+    workers never apply the same callback or the same order twice at once.
+    """
+
+    def __init__(self, inbox_repo: IPaymentIpnInboxRepository, payment_repo, hoc_phi_repo):
+        self.inbox_repo = inbox_repo
+        self.payment_repo = payment_repo
+        self.ipn = ProcessIPNUseCase(payment_repo, hoc_phi_repo)
+        self.max_attempts = config('IPN_INBOX_MAX_ATTEMPTS', default=5, cast=int)
+
+    def execute(self, limit: int = 100) -> ServiceResult[Dict[str, int]]:
+        counts = {"processed": 0, "rejected": 0, "failed": 0, "skipped": 0}
+
+        for item_id in self.inbox_repo.find_pending_ids(limit):
+            try:
+                with db_transaction.atomic(using='neon'):
+                    item = self.inbox_repo.lock_pending(item_id)
+                    if item is None:
+                        # Taken by another worker or already done
+                        counts["skipped"] += 1
+                        continue
+
+                    payment = self.payment_repo.lock_by_order_id(item.order_id)
+                    if payment is None:
+                        self.inbox_repo.mark(item.id, "rejected", error="TRANSACTION_NOT_FOUND")
+                        counts["rejected"] += 1
+                        continue
+
+                    self.ipn.apply_result(item.provider, payment, item.result_code)
+                    self.inbox_repo.mark(item.id, "processed", transaction_pk=str(payment.id))
+                    counts["processed"] += 1
+
+            except Exception as e:
+                print(f"[IPN] Error processing inbox item {item_id}: {e}")
+                counts["failed"] += 1
+                try:
+                    self.inbox_repo.record_failure(item_id, str(e), self.max_attempts)
+                except Exception as record_error:
+                    # Item stays pending and is retried on the next pass
+                    print(f"[IPN] Could not record failure for {item_id}: {record_error}")
+
+        return ServiceResult.ok(counts)
@@ -41,28 +41,12 @@ class ProcessIPNUseCase:
                     error_code="TRANSACTION_NOT_FOUND"
                 )
             
-            # 3. Check if payment successful
-            is_success = self._is_payment_successful(provider, verify_result.result_code)
-            
-            if is_success:
-                # Update transaction status
-                self.payment_repo.update_status(verify_result.order_id, "success")
-                
-                # Update học phí status
-                self.hoc_phi_repo.update_payment_status(
-                    str(transaction.sinh_vien_id),
-                    str(transaction.hoc_ky_id),
-                    "da_thanh_toan"
-                )
-                
-                print(f"[IPN] Payment successful: {verify_result.order_id}")
-            else:
-                self.payment_repo.update_status(verify_result.order_id, "failed")
-                print(f"[IPN] Payment failed: {verify_result.order_id}, code: {verify_result.result_code}")
+            # 3. Apply result (no-op if the payment was already confirmed)
+            status = self.apply_result(provider, transaction, verify_result.result_code)
             
             return ServiceResult.ok({
                 "orderId": verify_result.order_id,
-                "status": "success" if is_success else "failed",
+                "status": status,
                 "transactionId": verify_result.transaction_id
             })
             
@@ -70,6 +54,35 @@ class ProcessIPNUseCase:
             print(f"[IPN] Error processing: {e}")
             return ServiceResult.fail(str(e), error_code="INTERNAL_ERROR")
     
+    def apply_result(self, provider: str, transaction, result_code: str) -> str:
+        """
+        Update PaymentTransactions and HocPhi for one gateway result; returns the
+        resulting transaction status. A transaction already marked success is
+        left untouched, so replays and late duplicates are no-ops.
+        """
+        order_id = transaction.order_id
+        if transaction.status == "success":
+            print(f"[IPN] Already confirmed, skipping: {order_id}")
+            return "success"
+
+        if self._is_payment_successful(provider, result_code):
+            # Update transaction status
+            self.payment_repo.update_status(order_id, "success")
+            
+            # Update học phí status
+            self.hoc_phi_repo.update_payment_status(
+                str(transaction.sinh_vien_id),
+                str(transaction.hoc_ky_id),
+                "da_thanh_toan"
+            )
+            
+            print(f"[IPN] Payment successful: {order_id}")
+            return "success"
+
+        self.payment_repo.update_status(order_id, "failed")
+        print(f"[IPN] Payment failed: {order_id}, code: {result_code}")
+        return "failed"
+
     def _is_payment_successful(self, provider: str, result_code: str) -> bool:
         """Check if payment was successful based on provider's result code"""
         if provider == "momo":
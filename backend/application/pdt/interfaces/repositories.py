@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Optional, List, Any
+from typing import Optional, List, Any, Callable
 
 class IHocKyRepository(ABC):
     @abstractmethod
@@ -81,6 +81,6 @@ class IChinhSachHocPhiRepository(ABC):
         pass
 
     @abstractmethod
-    def calculate_tuition_bulk(self, hoc_ky_id: str) -> int:
-        # Returns number of students processed
+    def calculate_tuition_bulk(self, hoc_ky_id: str, on_progress: Optional[Callable[[int, int], None]] = None) -> int:
+        # Returns number of students processed; on_progress(done, total) after each chunk
         pass
@@ -4,6 +4,7 @@ import uuid
 from core.types import ServiceResult
 from application.pdt.interfaces.repositories import IKyPhaseRepository, IHocKyRepository
 from application.enrollment.interfaces.repositories import IDotDangKyRepository
+from infrastructure.persistence.config_cache import get_config_cache
 
 
 def parse_datetime(dt_str: str) -> datetime:
@@ -86,6 +87,8 @@ class CreateBulkKyPhaseUseCase:
             })
 
         created_phases = self.ky_phase_repo.create_bulk(mapped_phases, hoc_ky_id)
+        # Phases and học kỳ dates changed
+        get_config_cache().invalidate(hoc_ky_id, current_hoc_ky=True)
 
         # 5. Create Default Dot Dang Ky
         ghi_danh_phase = next((p for p in phases if p.get('phase') == 'ghi_danh'), None)
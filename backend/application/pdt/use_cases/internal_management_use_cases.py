@@ -1,42 +1,51 @@
 from typing import Dict, Any, List
 from core.types import ServiceResult
 from infrastructure.persistence.models import SinhVien, MonHoc, GiangVien, Users, TaiKhoan
-from django.core.paginator import Paginator
 from django.contrib.auth.hashers import make_password
 import uuid
 from datetime import datetime
 from django.utils import timezone
+from infrastructure.security.user_cache import get_user_cache
+from infrastructure.persistence.pdt.management_listings import (
+    SinhVienListing, GiangVienListing, MonHocListing, InvalidCursor, DEFAULT_LIMIT, MAX_LIMIT
+)
 
-class GetDanhSachSinhVienUseCase:
-    def execute(self, page=1, page_size=10000) -> ServiceResult:
-        try:
-            qs = SinhVien.objects.using('neon').select_related('id', 'khoa', 'nganh').all().order_by('ma_so_sinh_vien')
-            paginator = Paginator(qs, page_size)
-            page_obj = paginator.get_page(page)
-            
-            items = []
-            for sv in page_obj:
-                items.append({
-                    'id': str(sv.id.id),
-                    'maSoSinhVien': sv.ma_so_sinh_vien,
-                    'hoTen': sv.id.ho_ten,
-                    'lop': sv.lop,
-                    'tenKhoa': sv.khoa.ten_khoa if sv.khoa else "",
-                    'tenNganh': sv.nganh.ten_nganh if sv.nganh else "",
-                    'khoaHoc': sv.khoa_hoc,
-                    'trangThaiHoatDong': sv.id.tai_khoan.trang_thai_hoat_dong if sv.id.tai_khoan else True,
-                    'ngayNhapHoc': sv.ngay_nhap_hoc,
-                    'email': sv.id.email
-                })
-                
+
+def _list_page(listing, page, page_size, cursor, limit, search, filters) -> ServiceResult:
+    """Keyset page when cursor / limit is given, otherwise the legacy page / pageSize slice"""
+    try:
+        if cursor is None and limit is None:
+            result = listing.offset_page(filters, search, page, page_size)
             return ServiceResult.ok({
-                'items': items,
-                'total': paginator.count,
+                'items': result.items,
+                'total': result.total,
                 'page': page,
                 'pageSize': page_size
             })
-        except Exception as e:
-            return ServiceResult.fail(str(e))
+
+        limit = min(max(int(limit or DEFAULT_LIMIT), 1), MAX_LIMIT)
+        result = listing.page(filters, search, cursor or None, limit)
+        return ServiceResult.ok({
+            'items': result.items,
+            'total': result.total,
+            'pageSize': limit,
+            'nextCursor': result.next_cursor
+        })
+    except InvalidCursor as e:
+        return ServiceResult.fail(str(e), error_code="INVALID_CURSOR")
+    except Exception as e:
+        return ServiceResult.fail(str(e))
+
+class GetDanhSachSinhVienUseCase:
+    def __init__(self, listing: SinhVienListing = None):
+        self.listing = listing or SinhVienListing()
+
+    def execute(self, page=1, page_size=10000, cursor=None, limit=None, search=None, filters=None) -> ServiceResult:
+        return _list_page(self.listing, page, page_size, cursor, limit, search, filters)
+
+    def stream(self, search=None, filters=None) -> ServiceResult:
+        """Every matching row, lazily, for NDJSON dumps"""
+        return ServiceResult.ok(self.listing.stream(filters, search))
 
 class DeleteSinhVienUseCase:
     def execute(self, id: str) -> ServiceResult:
@@ -54,6 +63,7 @@ class DeleteSinhVienUseCase:
                 user.delete(using='neon')
             if tai_khoan:
                 tai_khoan.delete(using='neon')
+            get_user_cache().invalidate(id)
                 
             return ServiceResult.ok(None, "Xóa sinh viên thành công")
         except Exception as e:
@@ -104,6 +114,9 @@ class UpdateSinhVienUseCase:
                 tai_khoan.updated_at = timezone.now()
                 tai_khoan.save(using='neon')
             
+            # Drop the cached auth row so a deactivation applies on the next request
+            get_user_cache().invalidate(id)
+            
             return ServiceResult.ok({
                 'id': str(id),
                 'maSoSinhVien': sv.ma_so_sinh_vien,
@@ -178,41 +191,14 @@ class CreateSinhVienUseCase:
             return ServiceResult.fail(str(e))
 
 class GetDanhSachMonHocUseCase:
-    def execute(self, page=1, page_size=10000) -> ServiceResult:
-        try:
-            qs = MonHoc.objects.using('neon').select_related('khoa').all().order_by('ma_mon')
-            paginator = Paginator(qs, page_size)
-            page_obj = paginator.get_page(page)
-            
-            items = []
-            for mh in page_obj:
+    def __init__(self, listing: MonHocListing = None):
+        self.listing = listing or MonHocListing()
 
-                items.append({
-                    'id': str(mh.id),
-                    'ma_mon': mh.ma_mon,
-                    'ten_mon': mh.ten_mon,
-                    'so_tin_chi': mh.so_tin_chi,
-                    'khoa_id': str(mh.khoa.id) if mh.khoa else None,
-                    'loai_mon': mh.loai_mon,
-                    'la_mon_chung': mh.la_mon_chung,
-                    'thu_tu_hoc': mh.thu_tu_hoc,
-                    'khoa': {
-                        'id': str(mh.khoa.id),
-                        'ten_khoa': mh.khoa.ten_khoa
-                    } if mh.khoa else None,
-                    # Assuming mon_hoc_nganh relation exists or needs to be fetched
-                    # For now returning empty list or fetching if relation exists
-                    'mon_hoc_nganh': [] 
-                })
-                
-            return ServiceResult.ok({
-                'items': items,
-                'total': paginator.count,
-                'page': page,
-                'pageSize': page_size
-            })
-        except Exception as e:
-            return ServiceResult.fail(str(e))
+    def execute(self, page=1, page_size=10000, cursor=None, limit=None, search=None, filters=None) -> ServiceResult:
+        return _list_page(self.listing, page, page_size, cursor, limit, search, filters)
+
+    def stream(self, search=None, filters=None) -> ServiceResult:
+        return ServiceResult.ok(self.listing.stream(filters, search))
 
     def execute_single(self, id: str) -> ServiceResult:
         """Get single MonHoc by ID"""
@@ -287,42 +273,14 @@ class DeleteMonHocUseCase:
             return ServiceResult.fail(str(e))
 
 class GetDanhSachGiangVienUseCase:
-    def execute(self, page=1, page_size=10000) -> ServiceResult:
-        try:
-            qs = GiangVien.objects.using('neon').select_related('id', 'khoa', 'id__tai_khoan').all().order_by('id__ho_ten')
-            paginator = Paginator(qs, page_size)
-            page_obj = paginator.get_page(page)
-            
-            items = []
-            for gv in page_obj:
-                items.append({
-                    'id': str(gv.id.id),
-                    'khoa_id': str(gv.khoa.id) if gv.khoa else None,
-                    'trinh_do': gv.trinh_do,
-                    'chuyen_mon': gv.chuyen_mon,
-                    'kinh_nghiem_giang_day': gv.kinh_nghiem_giang_day,
-                    'users': {
-                        'id': str(gv.id.id),
-                        'ho_ten': gv.id.ho_ten,
-                        'ma_nhan_vien': gv.id.ma_nhan_vien,
-                        'tai_khoan': {
-                            'ten_dang_nhap': gv.id.tai_khoan.ten_dang_nhap if gv.id.tai_khoan else ""
-                        } if gv.id.tai_khoan else None
-                    },
-                    'khoa': {
-                        'id': str(gv.khoa.id),
-                        'ten_khoa': gv.khoa.ten_khoa
-                    } if gv.khoa else None
-                })
-                
-            return ServiceResult.ok({
-                'items': items,
-                'total': paginator.count,
-                'page': page,
-                'pageSize': page_size
-            })
-        except Exception as e:
-            return ServiceResult.fail(str(e))
+    def __init__(self, listing: GiangVienListing = None):
+        self.listing = listing or GiangVienListing()
+
+    def execute(self, page=1, page_size=10000, cursor=None, limit=None, search=None, filters=None) -> ServiceResult:
+        return _list_page(self.listing, page, page_size, cursor, limit, search, filters)
+
+    def stream(self, search=None, filters=None) -> ServiceResult:
+        return ServiceResult.ok(self.listing.stream(filters, search))
 
     def execute_single(self, giang_vien_id: str) -> ServiceResult:
         """Get single giang vien by ID"""
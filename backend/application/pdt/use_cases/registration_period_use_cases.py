@@ -1,6 +1,7 @@
 from typing import List, Optional, Dict, Any
 from core.types import ServiceResult
 from application.enrollment.interfaces import IDotDangKyRepository
+from infrastructure.persistence.config_cache import get_config_cache
 import uuid
 
 class UpdateDotGhiDanhUseCase:
@@ -91,6 +92,8 @@ class UpdateDotGhiDanhUseCase:
                             'is_check_toan_truong': False
                         })
 
+            get_config_cache().invalidate(hoc_ky_id)
+
             # Return updated list
             updated_list = self.dot_dang_ky_repo.find_by_hoc_ky_and_loai(hoc_ky_id, 'ghi_danh')
             return ServiceResult.ok([
@@ -225,6 +228,8 @@ class UpdateDotDangKyUseCase:
                         else:
                             self.dot_dang_ky_repo.create(update_data)
 
+            get_config_cache().invalidate(hoc_ky_id)
+
             # Return updated list
             updated_dots = self.dot_dang_ky_repo.find_by_hoc_ky(hoc_ky_id)
             result_data = [
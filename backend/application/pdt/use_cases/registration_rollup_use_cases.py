@@ -0,0 +1,100 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decouple import config
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core.types import ServiceResult
+from infrastructure.persistence.pdt.registration_rollup import (
+    RegistrationRollup, get_registration_rollup, GRANULARITIES, DIMENSIONS
+)
+
+# Throughput charts read the minute / hour buckets kept by RegistrationRollup
+# (without MongoDB, folded per request from chi_tiet_lich_su_dang_ky).
+
+DEFAULT_WINDOWS = {'minute': timedelta(hours=1), 'hour': timedelta(hours=48)}
+MAX_POINTS = 1440
+
+
+def _iso(t: int) -> str:
+    return datetime.fromtimestamp(t, dt_timezone.utc).isoformat()
+
+
+def _parse_time(value):
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise ValueError(f"Thời gian không hợp lệ: {value}")
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+class GetRegistrationThroughputUseCase:
+    def __init__(self, rollup: RegistrationRollup = None):
+        self.rollup = rollup or get_registration_rollup()
+
+    def execute(self, hoc_ky_id, granularity=None, since=None, until=None, khoa_id=None,
+                lop_hoc_phan_id=None, group_by=None):
+        granularity = granularity or 'minute'
+        if granularity not in GRANULARITIES:
+            return ServiceResult.fail(f"granularity phải là một trong: {', '.join(GRANULARITIES)}")
+        if group_by and group_by not in DIMENSIONS:
+            return ServiceResult.fail(f"group_by phải là một trong: {', '.join(DIMENSIONS)}")
+        try:
+            until = _parse_time(until) or timezone.now()
+            since = _parse_time(since) or until - DEFAULT_WINDOWS[granularity]
+        except ValueError as e:
+            return ServiceResult.fail(str(e))
+        if since > until:
+            return ServiceResult.fail("from phải trước to")
+        if (until - since).total_seconds() / GRANULARITIES[granularity] > MAX_POINTS:
+            return ServiceResult.fail(f"Khoảng thời gian quá dài (tối đa {MAX_POINTS} điểm), hãy dùng granularity=hour")
+
+        try:
+            points = self.rollup.series(hoc_ky_id, granularity, since, until, khoa_id, lop_hoc_phan_id)
+            data = {
+                'granularity': granularity,
+                'from': since.isoformat(),
+                'to': until.isoformat(),
+                'points': [{**point, 't': _iso(point['t'])} for point in points],
+                'tong': {
+                    'dangKy': sum(point['dangKy'] for point in points),
+                    'huyDangKy': sum(point['huyDangKy'] for point in points),
+                },
+            }
+            if group_by:
+                data['breakdown'] = self.rollup.breakdown(hoc_ky_id, group_by, granularity, since, until, khoa_id)
+            return ServiceResult.ok(data)
+        except Exception as e:
+            return ServiceResult.fail(str(e))
+
+
+class StreamRegistrationThroughputUseCase:
+    """
+    Live minute buckets for the PDT charts: a snapshot, then changes as they happen
+
+    A connection occupies a whole sync worker until it ends, so the feed is off
+    unless REGISTRATION_FEED_ENABLED is set, which needs gevent / ASGI workers.
+    One connection lasts REGISTRATION_FEED_MAX_SECONDS (kept under the gunicorn
+    worker timeout); the client then reconnects.
+    """
+
+    def __init__(self, rollup: RegistrationRollup = None):
+        self.rollup = rollup or get_registration_rollup()
+        self.enabled = config('REGISTRATION_FEED_ENABLED', default=False, cast=bool)
+        self.interval = config('REGISTRATION_FEED_INTERVAL_SECONDS', default=2, cast=float)
+        self.duration = config('REGISTRATION_FEED_MAX_SECONDS', default=60, cast=float)
+
+    def execute(self, hoc_ky_id, khoa_id=None, lop_hoc_phan_id=None):
+        if not self.enabled:
+            return ServiceResult.fail(
+                "Luồng cập nhật trực tiếp chưa được bật, hãy dùng GET /api/pdt/bao-cao/dang-ky-theo-thoi-gian",
+                status_code=503,
+                error_code="FEED_DISABLED"
+            )
+        events = self.rollup.feed(hoc_ky_id, khoa_id, lop_hoc_phan_id, interval=self.interval, duration=self.duration)
+        return ServiceResult.ok(
+            (kind, [{**point, 't': _iso(point['t'])} for point in points] if points is not None else None)
+            for kind, points in events
+        )
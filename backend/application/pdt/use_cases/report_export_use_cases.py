@@ -0,0 +1,96 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+
+from core.types import ServiceResult
+from infrastructure.exports import StreamingXlsxWriter, StreamingPdfWriter, ExportJobRunner, get_export_job_runner
+from infrastructure.persistence.pdt.report_export import ReportExportSource, EXPORT_KINDS
+
+# Export files are produced as a byte stream (server-side cursor -> streaming
+# writer), either straight into the HTTP response or, with run_async, into a
+# background job that the client polls and then downloads.
+
+EXPORT_FORMATS = {
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'pdf': 'application/pdf',
+}
+
+
+@dataclass
+class ExportFile:
+    filename: str
+    content_type: str
+    chunks: Iterator[bytes]
+
+
+@dataclass
+class ExportDownload:
+    filename: str
+    content_type: str
+    path: Path
+
+
+class ExportReportUseCase:
+    def __init__(self, source: ReportExportSource = None, runner: ExportJobRunner = None):
+        self.source = source or ReportExportSource()
+        self.runner = runner
+
+    def execute(self, hoc_ky_id, fmt, loai=None, khoa_id=None, run_async=False, requested_by=None):
+        try:
+            loai = loai or 'sinh_vien'
+            if fmt not in EXPORT_FORMATS:
+                return ServiceResult.fail(f"Định dạng không hỗ trợ: {fmt}")
+            if loai not in EXPORT_KINDS:
+                return ServiceResult.fail(f"loai phải là một trong: {', '.join(EXPORT_KINDS)}")
+
+            label = self.source.hoc_ky_label(hoc_ky_id)
+            if label is None:
+                return ServiceResult.not_found("Không tìm thấy học kỳ")
+
+            dataset = self.source.dataset(loai, hoc_ky_id, label, khoa_id)
+            if fmt == 'xlsx':
+                writer = StreamingXlsxWriter(label, dataset.headers, dataset.column_widths)
+            else:
+                writer = StreamingPdfWriter(dataset.title, dataset.headers, dataset.column_widths)
+            filename = f"bao-cao-{loai}-{hoc_ky_id}.{fmt}"
+
+            if run_async:
+                runner = self.runner or get_export_job_runner()
+                job = runner.submit(filename, EXPORT_FORMATS[fmt], requested_by,
+                                    lambda: writer.stream(dataset.rows()))
+                result = ServiceResult.ok(job.to_dict(), "Đang tạo file báo cáo")
+                result.status_code = 202
+                return result
+
+            return ServiceResult.ok(ExportFile(filename, EXPORT_FORMATS[fmt], writer.stream(dataset.rows())))
+        except Exception as e:
+            return ServiceResult.fail(str(e))
+
+
+class GetExportJobUseCase:
+    def __init__(self, runner: ExportJobRunner = None):
+        self.runner = runner or get_export_job_runner()
+
+    def execute(self, job_id, requested_by):
+        job = self.runner.get(job_id)
+        # Someone else's job is reported as missing rather than forbidden
+        if job is None or job.requested_by != str(requested_by):
+            return ServiceResult.not_found("Không tìm thấy yêu cầu xuất báo cáo")
+        return ServiceResult.ok(job.to_dict())
+
+
+class DownloadExportJobUseCase:
+    def __init__(self, runner: ExportJobRunner = None):
+        self.runner = runner or get_export_job_runner()
+
+    def execute(self, job_id, requested_by):
+        job = self.runner.get(job_id)
+        if job is None or job.requested_by != str(requested_by):
+            return ServiceResult.not_found("Không tìm thấy yêu cầu xuất báo cáo")
+        if job.status != 'done':
+            return ServiceResult.fail(f"File báo cáo chưa sẵn sàng (trạng thái: {job.status})", 409, 'EXPORT_NOT_READY')
+
+        path = self.runner.file_path(job)
+        if not path.exists():
+            return ServiceResult.not_found("File báo cáo đã hết hạn")
+        return ServiceResult.ok(ExportDownload(job.filename, job.content_type, path))
@@ -4,6 +4,9 @@ Clears all test/demo data while preserving master data
 """
 from django.db import connections
 from core.types import ServiceResult
+from infrastructure.persistence.config_cache import get_config_cache
+from infrastructure.persistence.catalog_snapshot import get_catalog_snapshot_store
+from infrastructure.persistence.tkb_read_model import get_tkb_read_model
 import logging
 
 logger = logging.getLogger(__name__)
@@ -89,6 +92,8 @@ class ResetDemoDataUseCase:
                 
                 # Clear MongoDB
                 mongo_cleared = self._clear_mongodb()
+                get_config_cache().invalidate()
+                get_catalog_snapshot_store().invalidate()
             
             return ServiceResult.ok({
                 "clearedTables": cleared_tables,
@@ -114,11 +119,20 @@ class ResetDemoDataUseCase:
                 logger.warning("MongoDB not available, skipping")
                 return False
             
+            # Every học kỳ with a schedule or a version, so no worker keeps its snapshot
+            hoc_ky_ids = {doc.get('hoc_ky_id') for doc in mongo.db[mongo.TKB_COLLECTION].find({})}
+            hoc_ky_ids |= {doc.get('_id') for doc in mongo.db[mongo.TKB_VERSION_COLLECTION].find({})}
+            
             # Clear TKB collections
-            mongo.db['thoi_khoa_bieu_mon_hoc'].delete_many({})
+            mongo.db[mongo.TKB_COLLECTION].delete_many({})
             mongo.db['tkb_cache'].delete_many({})
             mongo.db['tai_lieu'].delete_many({})
             
+            # Bump after the delete: a rebuild in between would otherwise keep the old schedule
+            for hoc_ky_id in hoc_ky_ids - {None}:
+                mongo._on_tkb_changed(hoc_ky_id)
+            get_tkb_read_model().invalidate()
+            
             logger.info("✅ MongoDB TKB data cleared")
             return True
             
@@ -1,5 +1,6 @@
 from core.types import ServiceResult
 from application.pdt.interfaces.repositories import IHocKyRepository
+from infrastructure.persistence.config_cache import get_config_cache
 
 class SetHocKyHienHanhUseCase:
     def __init__(self, hoc_ky_repo: IHocKyRepository):
@@ -22,5 +23,6 @@ class SetHocKyHienHanhUseCase:
 
         # Set current semester
         self.hoc_ky_repo.set_current_semester(hoc_ky_id)
+        get_config_cache().invalidate(current_hoc_ky=True)
 
         return ServiceResult.ok(None)
@@ -0,0 +1,225 @@
+from datetime import date, datetime, timedelta
+import json
+from typing import Optional, List, Dict, Any, Iterable, Tuple, Callable
+from decouple import config
+from django.db import DatabaseError
+
+from core.types import ServiceResult
+from infrastructure.exports import ExportJobRunner, get_export_job_runner
+from infrastructure.imports import TableFormatError
+from infrastructure.persistence.pdt.student_import import StudentImportRepository, NewStudent
+from infrastructure.security.password_hashing import hash_passwords
+
+# Accepted headers, compared after normalize_header (no accents, case or separators)
+COLUMNS = {
+    'maSoSinhVien': ('masosinhvien', 'mssv', 'masv'),
+    'hoTen': ('hoten', 'hovaten'),
+    'tenDangNhap': ('tendangnhap', 'username'),
+    'matKhau': ('matkhau', 'password'),
+    'maKhoa': ('makhoa', 'khoa', 'khoaid'),
+    'maNganh': ('manganh', 'nganh', 'nganhid'),
+    'lop': ('lop',),
+    'khoaHoc': ('khoahoc',),
+    'ngayNhapHoc': ('ngaynhaphoc',),
+    'email': ('email',),
+}
+EXCEL_EPOCH = date(1899, 12, 30)
+
+
+def _field(values: Dict[str, str], name: str) -> str:
+    for key in COLUMNS[name]:
+        if values.get(key):
+            return values[key]
+    return ''
+
+
+def _parse_date(value: str) -> Optional[date]:
+    if not value:
+        return None
+    if value.isdigit() and len(value) <= 5:
+        # Date cell read as its Excel serial number
+        return EXCEL_EPOCH + timedelta(days=int(value))
+    for fmt in ('%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y'):
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            pass
+    raise ValueError(f"Ngày nhập học không hợp lệ: {value}")
+
+
+class ImportSinhVienUseCase:
+    """
+    Bulk-create sinh viên accounts from an uploaded .xlsx / .csv
+    Rows that fail validation are reported and skipped; the rest are created.
+
+    Every new account costs one PBKDF2 hash (~0.5s on one core), so over the API
+    only files up to STUDENT_IMPORT_SYNC_MAX_ROWS are imported within the request;
+    larger ones run as a background job (or via manage.py import_sinh_vien).
+    """
+
+    def __init__(self, repository: StudentImportRepository = None,
+                 hasher: Callable[[List[str]], List[str]] = None, runner: ExportJobRunner = None):
+        self.repository = repository or StudentImportRepository(
+            chunk_size=config('STUDENT_IMPORT_CHUNK_SIZE', default=1000, cast=int)
+        )
+        self.hasher = hasher or hash_passwords
+        self.runner = runner
+        self.max_rows = config('STUDENT_IMPORT_MAX_ROWS', default=20000, cast=int)
+        self.sync_max_rows = config('STUDENT_IMPORT_SYNC_MAX_ROWS', default=50, cast=int)
+
+    def execute(self, rows: Iterable[Tuple[int, Dict[str, str]]], default_password: Optional[str] = None,
+                requested_by=None) -> ServiceResult:
+        """
+        With requested_by (an API call), files over sync_max_rows are queued
+        and 202 with the job is returned; poll GetImportSinhVienJobUseCase.
+        """
+        try:
+            rows = list(rows)
+        except TableFormatError as e:
+            return ServiceResult.fail(str(e), error_code="INVALID_FILE")
+        if not rows:
+            return ServiceResult.fail("File không có dòng dữ liệu nào", error_code="INVALID_FILE")
+        if len(rows) > self.max_rows:
+            return ServiceResult.fail(f"Tối đa {self.max_rows} dòng mỗi lần import", error_code="TOO_MANY_ROWS")
+
+        if requested_by is not None and len(rows) > self.sync_max_rows:
+            runner = self.runner or get_export_job_runner()
+            job = runner.submit("import-sinh-vien.json", "application/json", requested_by,
+                                lambda: self._produce(rows, default_password))
+            result = ServiceResult.ok(job.to_dict(), f"Đang import {len(rows)} dòng")
+            result.status_code = 202
+            return result
+
+        return self._import(rows, default_password)
+
+    def _produce(self, rows, default_password) -> Iterable[bytes]:
+        result = self._import(rows, default_password)
+        if not result.success:
+            raise RuntimeError(result.message)
+        yield json.dumps(result.data, ensure_ascii=False).encode('utf-8')
+
+    def _import(self, rows, default_password) -> ServiceResult:
+        try:
+            results: Dict[int, Dict[str, Any]] = {}
+            students = self._validate(rows, default_password, results)
+            self._reject_taken(students, results)
+            students = [s for s in students if s.row not in results]
+
+            for student, hashed in zip(students, self.hasher([s.mat_khau for s in students])):
+                student.mat_khau = hashed
+
+            chunk_size = self.repository.chunk_size
+            for start in range(0, len(students), chunk_size):
+                chunk = students[start:start + chunk_size]
+                try:
+                    self.repository.insert(chunk)
+                    status = {'status': 'created'}
+                except DatabaseError as e:
+                    # Lost a race with another writer; the whole chunk was rolled back
+                    status = {'status': 'failed', 'error': f"Lỗi ghi dữ liệu: {e}"}
+                for student in chunk:
+                    results[student.row] = {'row': student.row, 'maSoSinhVien': student.ma_so_sinh_vien, **status}
+
+            ordered = [results[row] for row in sorted(results)]
+            created = sum(1 for r in ordered if r['status'] == 'created')
+            return ServiceResult.ok({
+                'summary': {'total': len(ordered), 'created': created, 'failed': len(ordered) - created},
+                'results': ordered,
+            }, f"Đã tạo {created}/{len(ordered)} sinh viên")
+        except Exception as e:
+            return ServiceResult.fail(str(e))
+
+    def _validate(self, rows, default_password, results) -> List[NewStudent]:
+        khoa_lookup = self.repository.khoa_lookup()
+        nganh_lookup = self.repository.nganh_lookup()
+        seen = {'maSoSinhVien': set(), 'tenDangNhap': set(), 'email': set()}
+        students = []
+
+        def fail(row, mssv, error):
+            results[row] = {'row': row, 'maSoSinhVien': mssv, 'status': 'failed', 'error': error}
+
+        for row, values in rows:
+            mssv = _field(values, 'maSoSinhVien')
+            ho_ten = _field(values, 'hoTen')
+            ma_khoa = _field(values, 'maKhoa')
+            mat_khau = _field(values, 'matKhau') or default_password
+            missing = [name for name, value in
+                       (('maSoSinhVien', mssv), ('hoTen', ho_ten), ('maKhoa', ma_khoa), ('matKhau', mat_khau))
+                       if not value]
+            if missing:
+                fail(row, mssv, f"Thiếu thông tin bắt buộc: {', '.join(missing)}")
+                continue
+
+            khoa_id = khoa_lookup.get(ma_khoa) or khoa_lookup.get(ma_khoa.upper())
+            if khoa_id is None:
+                fail(row, mssv, f"Khoa không tồn tại: {ma_khoa}")
+                continue
+            nganh_id = None
+            ma_nganh = _field(values, 'maNganh')
+            if ma_nganh:
+                nganh = nganh_lookup.get(ma_nganh) or nganh_lookup.get(ma_nganh.upper())
+                if nganh is None or nganh[1] != khoa_id:
+                    fail(row, mssv, f"Ngành không tồn tại trong khoa: {ma_nganh}")
+                    continue
+                nganh_id = nganh[0]
+            try:
+                ngay_nhap_hoc = _parse_date(_field(values, 'ngayNhapHoc'))
+            except ValueError as e:
+                fail(row, mssv, str(e))
+                continue
+
+            student = NewStudent(
+                row=row, ma_so_sinh_vien=mssv, ho_ten=ho_ten,
+                ten_dang_nhap=_field(values, 'tenDangNhap') or mssv, mat_khau=mat_khau,
+                khoa_id=khoa_id, nganh_id=nganh_id,
+                email=_field(values, 'email') or f"{mssv}@student.edu.vn",
+                lop=_field(values, 'lop') or None, khoa_hoc=_field(values, 'khoaHoc') or None,
+                ngay_nhap_hoc=ngay_nhap_hoc,
+            )
+            keys = {'maSoSinhVien': mssv, 'tenDangNhap': student.ten_dang_nhap, 'email': student.email}
+            duplicate = next((name for name, key in keys.items() if key in seen[name]), None)
+            if duplicate:
+                fail(row, mssv, f"Trùng {duplicate} với dòng khác trong file: {keys[duplicate]}")
+                continue
+            for name, key in keys.items():
+                seen[name].add(key)
+            students.append(student)
+        return students
+
+    def _reject_taken(self, students: List[NewStudent], results) -> None:
+        taken_mssv = self.repository.taken_mssv(s.ma_so_sinh_vien for s in students)
+        taken_usernames = self.repository.taken_usernames(s.ten_dang_nhap for s in students)
+        taken_emails = self.repository.taken_emails(s.email for s in students)
+        for student in students:
+            if student.ma_so_sinh_vien in taken_mssv:
+                error = "Mã số sinh viên đã tồn tại"
+            elif student.ten_dang_nhap in taken_usernames:
+                error = "Tên đăng nhập đã tồn tại"
+            elif student.email in taken_emails:
+                error = "Email đã tồn tại"
+            else:
+                continue
+            results[student.row] = {
+                'row': student.row, 'maSoSinhVien': student.ma_so_sinh_vien, 'status': 'failed', 'error': error
+            }
+
+
+class GetImportSinhVienJobUseCase:
+    """Status of a background import; once done, the same summary / results as a synchronous import"""
+
+    def __init__(self, runner: ExportJobRunner = None):
+        self.runner = runner or get_export_job_runner()
+
+    def execute(self, job_id, requested_by):
+        job = self.runner.get(job_id)
+        if job is None or job.requested_by != str(requested_by):
+            return ServiceResult.not_found("Không tìm thấy yêu cầu import")
+
+        data = job.to_dict()
+        if job.status == 'done':
+            try:
+                with open(self.runner.file_path(job), encoding='utf-8') as f:
+                    data.update(json.load(f))
+            except OSError:
+                return ServiceResult.not_found("Kết quả import đã hết hạn")
+        return ServiceResult.ok(data)
@@ -2,6 +2,7 @@ from datetime import datetime, timedelta
 from django.utils import timezone
 from core.types import ServiceResult
 from infrastructure.persistence.models import KyPhase
+from infrastructure.persistence.config_cache import get_config_cache
 
 class TogglePhaseUseCase:
     def execute(self, hoc_ky_id: str | None, phase_name: str) -> ServiceResult:
@@ -47,7 +48,11 @@ class TogglePhaseUseCase:
                 phase.start_at = start_at
                 phase.end_at = end_at
                 phase.save(using='neon')
-            else:
+
+            # Step 1 ran either way, so the cached phases are stale
+            get_config_cache().invalidate(hoc_ky_id)
+
+            if not phase:
                 return ServiceResult.fail(f"Không tìm thấy phase '{phase_name}' trong học kỳ này (dữ liệu chưa được khởi tạo)")
                 
             return ServiceResult.ok({
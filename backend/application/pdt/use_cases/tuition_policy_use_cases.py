@@ -112,6 +112,11 @@ class GetDanhSachNganhChuaCoChinhSachUseCase:
         return ServiceResult.ok([])
 
 class TinhHocPhiHangLoatUseCase:
+    """
+    Whole-semester recalculation. HocPhi is kept current per registration by
+    the tuition projector, so this is the reconciliation pass (policy changes,
+    missed events), not the normal way fees get computed.
+    """
     def __init__(self, chinh_sach_repo: IChinhSachHocPhiRepository):
         self.chinh_sach_repo = chinh_sach_repo
 
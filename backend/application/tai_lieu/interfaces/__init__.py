@@ -5,4 +5,7 @@ from .repositories import (
     ITaiLieuRepository,
     TaiLieuDTO,
     CreateTaiLieuDTO,
+    TaiLieuFileDTO,
+    TaiLieuBundleDTO,
+    TaiLieuUploadSessionDTO,
 )
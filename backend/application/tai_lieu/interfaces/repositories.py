@@ -4,7 +4,7 @@ Application Layer - TaiLieu Repository Interfaces
 Contracts for infrastructure layer implementations.
 """
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import ContextManager, Iterator, List, Optional
 from dataclasses import dataclass
 from datetime import datetime
 
@@ -33,6 +33,49 @@ class CreateTaiLieuDTO:
     uploaded_by: str
 
 
+@dataclass
+class TaiLieuFileDTO:
+    """DTO for a download: where the file is and what to answer with (url set = presigned redirect)"""
+    key: str
+    filename: str
+    content_type: str
+    ten_tai_lieu: str
+    size: Optional[int] = None
+    etag: Optional[str] = None
+    last_modified: Optional[datetime] = None
+    url: Optional[str] = None
+
+
+@dataclass
+class TaiLieuBundleDTO:
+    """DTO for a "download all" ZIP: its name and the archive as a stream of chunks"""
+    filename: str
+    file_count: int
+    chunks: Iterator[bytes]
+
+
+@dataclass
+class TaiLieuUploadSessionDTO:
+    """DTO for a multipart upload in progress (carried in a signed token between requests)"""
+    key: str
+    upload_id: str
+    lop_hoc_phan_id: str
+    uploaded_by: str
+    filename: str
+    content_type: str
+    ten_tai_lieu: str
+    size: int
+    part_size: int
+
+    @property
+    def part_count(self) -> int:
+        return -(-self.size // self.part_size)
+
+    def expected_part_size(self, part_number: int) -> int:
+        if part_number < self.part_count:
+            return self.part_size
+        return self.size - self.part_size * (self.part_count - 1)
+
 # ============== Interfaces ==============
 
 class ITaiLieuRepository(ABC):
@@ -130,3 +173,27 @@ class ITaiLieuRepository(ABC):
             True if enrolled, False otherwise
         """
         pass
+
+    @abstractmethod
+    def count_by_file_path(self, file_path: str) -> int:
+        """
+        Count TaiLieu referencing a stored file (content-addressed blobs are shared)
+        
+        Args:
+            file_path: Storage key
+            
+        Returns:
+            Number of TaiLieu with this file_path
+        """
+        pass
+
+    @abstractmethod
+    def file_lock(self, file_path: str) -> ContextManager[None]:
+        """
+        Serialize reference changes on one stored file, so a blob is not
+        removed while another TaiLieu starts to reference it
+        
+        Args:
+            file_path: Storage key
+        """
+        pass
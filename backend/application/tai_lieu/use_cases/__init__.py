@@ -8,3 +8,12 @@ from .update_tai_lieu_use_case import UpdateTaiLieuUseCase
 from .download_tai_lieu_use_case import DownloadTaiLieuUseCase
 from .get_sv_tai_lieu_use_case import GetSVTaiLieuUseCase
 from .download_sv_tai_lieu_use_case import DownloadSVTaiLieuUseCase
+from .download_sv_tai_lieu_bundle_use_case import DownloadSVTaiLieuBundleUseCase
+from .multipart_upload_tai_lieu_use_case import (
+    InitiateTaiLieuUploadUseCase,
+    UploadTaiLieuPartUseCase,
+    GetTaiLieuUploadUseCase,
+    CompleteTaiLieuUploadUseCase,
+    AbortTaiLieuUploadUseCase,
+    CleanupTaiLieuUploadsUseCase,
+)
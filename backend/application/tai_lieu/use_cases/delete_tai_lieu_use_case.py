@@ -5,9 +5,23 @@ from core.types.service_result import ServiceResult
 from application.tai_lieu.interfaces.repositories import ITaiLieuRepository
 
 
+def release_file(repository: ITaiLieuRepository, s3_service, file_path: str) -> bool:
+    """
+    Delete a stored file once no TaiLieu references it any more
+    (content-addressed blobs are shared by identical uploads)
+    
+    Returns:
+        True if the file was deleted
+    """
+    with repository.file_lock(file_path):
+        if repository.count_by_file_path(file_path) > 0:
+            return False
+        return s3_service.delete_file(file_path)
+
+
 class DeleteTaiLieuUseCase:
     """
-    Delete TaiLieu from S3 and DB
+    Delete TaiLieu from DB, and its file from S3 when no other TaiLieu shares it
     Only GV who owns the LHP can delete
     """
     
@@ -51,10 +65,6 @@ class DeleteTaiLieuUseCase:
                 error_code="DOCUMENT_NOT_FOUND"
             )
         
-        # Delete from S3
-        if self.s3_service.is_available:
-            self.s3_service.delete_file(document.file_path)
-        
         # Delete from DB
         deleted = self.repository.delete(doc_id)
         
@@ -64,6 +74,10 @@ class DeleteTaiLieuUseCase:
                 error_code="DELETE_FAILED"
             )
         
+        # Delete from S3 with the last reference
+        if self.s3_service.is_available:
+            release_file(self.repository, self.s3_service, document.file_path)
+        
         return ServiceResult.ok(
             data=None,
             message="Xóa tài liệu thành công"
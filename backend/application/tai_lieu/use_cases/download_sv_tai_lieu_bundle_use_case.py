@@ -0,0 +1,101 @@
+"""
+Download all TaiLieu of a LopHocPhan as one ZIP - For SinhVien
+"""
+import os
+from datetime import datetime
+from typing import Iterator, List, Optional
+from core.types.service_result import ServiceResult
+from application.tai_lieu.interfaces.repositories import ITaiLieuRepository, TaiLieuDTO, TaiLieuBundleDTO
+from application.tai_lieu.use_cases.download_tai_lieu_use_case import download_filename
+from infrastructure.exports import StreamingZipWriter, ZipEntry
+
+
+class DownloadSVTaiLieuBundleUseCase:
+    """
+    Stream every TaiLieu of a LopHocPhan in one ZIP, built from storage chunks while it is sent
+    Only SV who is enrolled in the LHP can download (checked once for the whole bundle)
+    """
+
+    def __init__(self, repository: ITaiLieuRepository, s3_service):
+        self.repository = repository
+        self.s3_service = s3_service
+
+    def execute(self, lhp_id: str, sv_user_id: str) -> ServiceResult:
+        """
+        Args:
+            lhp_id: UUID of LopHocPhan
+            sv_user_id: UUID of SinhVien's user account
+
+        Returns:
+            ServiceResult with TaiLieuBundleDTO (files are opened as the stream reaches them)
+        """
+        # Check if student is enrolled
+        is_enrolled = self.repository.is_student_enrolled(lhp_id, sv_user_id)
+
+        if not is_enrolled:
+            return ServiceResult.fail(
+                message="Không có quyền truy cập lớp học phần này",
+                error_code="FORBIDDEN"
+            )
+
+        documents = self.repository.find_by_lop_hoc_phan(lhp_id)
+
+        if not documents:
+            return ServiceResult.fail(
+                message="Lớp học phần chưa có tài liệu",
+                status_code=404,
+                error_code="DOCUMENT_NOT_FOUND"
+            )
+
+        # Check S3 availability
+        if not self.s3_service.is_available:
+            return ServiceResult.fail(
+                message="Dịch vụ lưu trữ không khả dụng",
+                error_code="S3_UNAVAILABLE"
+            )
+
+        return ServiceResult.ok(
+            data=TaiLieuBundleDTO(
+                filename=f"tai-lieu-{lhp_id}.zip",
+                file_count=len(documents),
+                chunks=StreamingZipWriter().stream(self._entries(documents)),
+            ),
+            message="Tải file thành công"
+        )
+
+    def _entries(self, documents: List[TaiLieuDTO]) -> Iterator[ZipEntry]:
+        for document, name in zip(documents, bundle_names(documents)):
+            yield ZipEntry(
+                name=name,
+                open=lambda key=document.file_path: self.s3_service.open_file(key),
+                modified=_parse_datetime(document.created_at),
+            )
+
+
+def bundle_names(documents: List[TaiLieuDTO]) -> List[str]:
+    """
+    Entry names for the ZIP: the document name (with the stored file's extension),
+    flattened to one level and made unique, e.g. "Slide.pdf", "Slide (2).pdf"
+    """
+    names, seen = [], set()
+    for document in documents:
+        extension = os.path.splitext(download_filename(document))[1]
+        name = document.ten_tai_lieu.replace('/', '_').replace('\\', '_').strip().lstrip('.') or document.id
+        stem, own_extension = os.path.splitext(name)
+        if not own_extension:
+            stem, own_extension = name, extension
+
+        candidate, n = stem + own_extension, 2
+        while candidate.lower() in seen:
+            candidate = f"{stem} ({n}){own_extension}"
+            n += 1
+        seen.add(candidate.lower())
+        names.append(candidate)
+    return names
+
+
+def _parse_datetime(value: Optional[str]) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(value) if value else None
+    except ValueError:
+        return None
@@ -4,6 +4,7 @@ Download TaiLieu for SinhVien Use Case
 from typing import Dict, Any, Optional
 from core.types.service_result import ServiceResult
 from application.tai_lieu.interfaces.repositories import ITaiLieuRepository
+from application.tai_lieu.use_cases.download_tai_lieu_use_case import prepare_download
 
 
 class DownloadSVTaiLieuUseCase:
@@ -16,22 +17,21 @@ class DownloadSVTaiLieuUseCase:
         self.repository = repository
         self.s3_service = s3_service
     
-    def execute(self, lhp_id: str, doc_id: str, sv_user_id: str) -> ServiceResult:
+    def execute(self, lhp_id: str, doc_id: str, sv_user_id: str, presign: bool = False) -> ServiceResult:
         """
-        Get file info for download (returns file content)
+        Get file info for download (the bytes are streamed by the view)
         
         Args:
             lhp_id: UUID of LopHocPhan
             doc_id: UUID of TaiLieu
             sv_user_id: UUID of SinhVien's user account
+            presign: Return a presigned URL instead of size / ETag
             
         Returns:
-            ServiceResult with file bytes and metadata
+            ServiceResult with TaiLieuFileDTO
         """
         # Check if student is enrolled
-        print(f"[DEBUG] Checking enrollment: lhp_id={lhp_id}, sv_user_id={sv_user_id}")
         is_enrolled = self.repository.is_student_enrolled(lhp_id, sv_user_id)
-        print(f"[DEBUG] is_enrolled={is_enrolled}")
         
         if not is_enrolled:
             return ServiceResult.fail(
@@ -55,24 +55,4 @@ class DownloadSVTaiLieuUseCase:
                 error_code="S3_UNAVAILABLE"
             )
         
-        # Download file from S3
-        file_bytes = self.s3_service.download_file(document.file_path)
-        
-        if not file_bytes:
-            return ServiceResult.fail(
-                message="Không thể tải file từ S3",
-                error_code="S3_DOWNLOAD_FAILED"
-            )
-        
-        # Extract filename from file_path
-        filename = document.file_path.split('/')[-1] if '/' in document.file_path else document.file_path
-        
-        return ServiceResult.ok(
-            data={
-                "content": file_bytes,
-                "content_type": document.file_type or "application/octet-stream",
-                "filename": filename,
-                "ten_tai_lieu": document.ten_tai_lieu,
-            },
-            message="Tải file thành công"
-        )
+        return prepare_download(self.s3_service, document, presign)
@@ -1,14 +1,72 @@
 """
 Download TaiLieu Use Case - For GV
 """
+import mimetypes
+import os
 from typing import Dict, Any, Optional
+from decouple import config
+from django.utils.http import content_disposition_header
 from core.types.service_result import ServiceResult
-from application.tai_lieu.interfaces.repositories import ITaiLieuRepository
+from application.tai_lieu.interfaces.repositories import ITaiLieuRepository, TaiLieuDTO, TaiLieuFileDTO
+from infrastructure.persistence.s3_service import CONTENT_KEY_PREFIX, is_content_key
+
+
+def download_filename(document: TaiLieuDTO) -> str:
+    """
+    Filename to save the document as: the key's last segment, or for a shared
+    content-addressed blob (named by its hash) the document name with an extension
+    """
+    if not is_content_key(document.file_path):
+        return document.file_path.split('/')[-1] if '/' in document.file_path else document.file_path
+    
+    filename = document.ten_tai_lieu
+    if not os.path.splitext(filename)[1]:
+        filename += mimetypes.guess_extension(document.file_type or '') or ''
+    return filename
+
+
+def prepare_download(s3_service, document: TaiLieuDTO, presign: bool = False) -> ServiceResult:
+    """
+    Describe the stored file without reading it: size and ETag for a streamed
+    (Range / If-None-Match aware) response, or a short-lived presigned URL
+    when the storage backend can issue one
+    """
+    filename = download_filename(document)
+    content_type = document.file_type or "application/octet-stream"
+    file = TaiLieuFileDTO(
+        key=document.file_path,
+        filename=filename,
+        content_type=content_type,
+        ten_tai_lieu=document.ten_tai_lieu,
+    )
+    
+    if presign:
+        file.url = s3_service.get_file_url(
+            document.file_path,
+            expires_in=config('TAI_LIEU_PRESIGNED_URL_SECONDS', default=300, cast=int),
+            content_disposition=content_disposition_header(True, filename),
+            content_type=content_type,
+        )
+        if file.url:
+            return ServiceResult.ok(data=file, message="Tải file thành công")
+        # Backend without presigned URLs (local / memory storage): stream instead
+    
+    head = s3_service.head_file(document.file_path)
+    if not head:
+        return ServiceResult.fail(
+            message="Không thể tải file từ S3",
+            error_code="S3_DOWNLOAD_FAILED"
+        )
+    file.size = head['size']
+    # A blob's content never changes under its hash, so the hash is a strong ETag shared by every copy
+    file.etag = f'"{document.file_path[len(CONTENT_KEY_PREFIX):]}"' if is_content_key(document.file_path) else head['etag']
+    file.last_modified = head['last_modified']
+    return ServiceResult.ok(data=file, message="Tải file thành công")
 
 
 class DownloadTaiLieuUseCase:
     """
-    Get presigned URL or stream file from S3
+    Get presigned URL or describe the file to stream from S3
     Only GV who owns the LHP can download
     """
     
@@ -16,17 +74,18 @@ class DownloadTaiLieuUseCase:
         self.repository = repository
         self.s3_service = s3_service
     
-    def execute(self, lhp_id: str, doc_id: str, gv_user_id: str) -> ServiceResult:
+    def execute(self, lhp_id: str, doc_id: str, gv_user_id: str, presign: bool = False) -> ServiceResult:
         """
-        Get file info for download (returns file content)
+        Get file info for download (the bytes are streamed by the view)
         
         Args:
             lhp_id: UUID of LopHocPhan
             doc_id: UUID of TaiLieu
             gv_user_id: UUID of GiangVien's user account
+            presign: Return a presigned URL instead of size / ETag
             
         Returns:
-            ServiceResult with file bytes and metadata
+            ServiceResult with TaiLieuFileDTO
         """
         # Check if GV owns this LHP
         owner_id = self.repository.get_lop_hoc_phan_owner(lhp_id)
@@ -59,24 +118,4 @@ class DownloadTaiLieuUseCase:
                 error_code="S3_UNAVAILABLE"
             )
         
-        # Download file from S3
-        file_bytes = self.s3_service.download_file(document.file_path)
-        
-        if not file_bytes:
-            return ServiceResult.fail(
-                message="Không thể tải file từ S3",
-                error_code="S3_DOWNLOAD_FAILED"
-            )
-        
-        # Extract filename from file_path
-        filename = document.file_path.split('/')[-1] if '/' in document.file_path else document.file_path
-        
-        return ServiceResult.ok(
-            data={
-                "content": file_bytes,
-                "content_type": document.file_type or "application/octet-stream",
-                "filename": filename,
-                "ten_tai_lieu": document.ten_tai_lieu,
-            },
-            message="Tải file thành công"
-        )
+        return prepare_download(self.s3_service, document, presign)
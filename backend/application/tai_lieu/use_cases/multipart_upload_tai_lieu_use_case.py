@@ -0,0 +1,381 @@
+"""
+Multipart (resumable) TaiLieu Upload Use Cases - For GV
+
+Large files are sent as numbered parts, each its own request:
+initiate -> upload part (any order, retryable) -> complete, or abort.
+The session lives in a signed token, so no table is needed; parts live in storage
+until complete / abort, and CleanupTaiLieuUploadsUseCase aborts the forgotten ones.
+"""
+import dataclasses
+from datetime import datetime, timedelta, timezone
+from typing import BinaryIO, Optional, Union
+
+from decouple import config
+from django.core import signing
+
+from core.types.service_result import ServiceResult
+from application.tai_lieu.interfaces.repositories import (
+    ITaiLieuRepository,
+    CreateTaiLieuDTO,
+    TaiLieuUploadSessionDTO,
+)
+from application.tai_lieu.use_cases.delete_tai_lieu_use_case import release_file
+from infrastructure.storage import MULTIPART_PART_SIZE, MULTIPART_CONCURRENCY
+
+SESSION_SALT = 'tai-lieu-upload'
+# S3 allows at most 10000 parts per upload
+MAX_PARTS = 10000
+
+
+def _session_hours() -> int:
+    return config('TAI_LIEU_UPLOAD_SESSION_HOURS', default=24, cast=int)
+
+
+def _check_owner(repository: ITaiLieuRepository, lhp_id: str, gv_user_id: str) -> Optional[ServiceResult]:
+    owner_id = repository.get_lop_hoc_phan_owner(lhp_id)
+
+    if not owner_id:
+        return ServiceResult.fail(
+            message="Lớp học phần không tồn tại",
+            error_code="LHP_NOT_FOUND"
+        )
+
+    if owner_id != gv_user_id:
+        return ServiceResult.fail(
+            message="Không có quyền truy cập",
+            error_code="FORBIDDEN"
+        )
+    return None
+
+
+def _open_session(upload_id: str, lhp_id: str, gv_user_id: str) -> Union[TaiLieuUploadSessionDTO, ServiceResult]:
+    """The session behind an uploadId token, or the failure to return"""
+    try:
+        values = signing.loads(upload_id, salt=SESSION_SALT, max_age=_session_hours() * 3600)
+        session = TaiLieuUploadSessionDTO(**values)
+    except signing.SignatureExpired:
+        return ServiceResult.fail(
+            message="Phiên upload đã hết hạn",
+            status_code=410,
+            error_code="UPLOAD_EXPIRED"
+        )
+    except (signing.BadSignature, TypeError):
+        return ServiceResult.fail(
+            message="Phiên upload không hợp lệ",
+            status_code=404,
+            error_code="UPLOAD_NOT_FOUND"
+        )
+
+    if session.lop_hoc_phan_id != lhp_id or session.uploaded_by != gv_user_id:
+        return ServiceResult.forbidden("Không có quyền truy cập")
+    return session
+
+
+class InitiateTaiLieuUploadUseCase:
+    """
+    Start a multipart upload
+    Only GV who owns the LHP can upload
+    """
+
+    def __init__(self, repository: ITaiLieuRepository, s3_service):
+        self.repository = repository
+        self.s3_service = s3_service
+        self.max_file_size = config('TAI_LIEU_MULTIPART_MAX_SIZE', default=2 * 1024 ** 3, cast=int)
+
+    def execute(
+        self,
+        lhp_id: str,
+        gv_user_id: str,
+        filename: str,
+        content_type: str,
+        file_size: int,
+        ten_tai_lieu: Optional[str] = None
+    ) -> ServiceResult:
+        """
+        Args:
+            lhp_id: UUID of LopHocPhan
+            gv_user_id: UUID of GiangVien's user account
+            filename: Original filename
+            content_type: MIME type
+            file_size: Size in bytes of the whole file
+            ten_tai_lieu: Custom name for the document
+
+        Returns:
+            ServiceResult with uploadId (token for the other calls), partSize, partCount
+        """
+        if file_size <= 0:
+            return ServiceResult.fail(
+                message="Kích thước file không hợp lệ",
+                error_code="INVALID_FILE_SIZE"
+            )
+        if file_size > self.max_file_size:
+            return ServiceResult.fail(
+                message=f"File vượt quá giới hạn {self.max_file_size // (1024 * 1024)}MB",
+                error_code="FILE_TOO_LARGE"
+            )
+
+        denied = _check_owner(self.repository, lhp_id, gv_user_id)
+        if denied:
+            return denied
+
+        if not self.s3_service.is_available:
+            return ServiceResult.fail(
+                message="Dịch vụ lưu trữ không khả dụng",
+                error_code="S3_UNAVAILABLE"
+            )
+
+        upload = self.s3_service.create_upload(filename, lhp_id, content_type)
+        if not upload:
+            return ServiceResult.fail(
+                message="Không thể khởi tạo upload",
+                error_code="S3_UPLOAD_FAILED"
+            )
+
+        session = TaiLieuUploadSessionDTO(
+            key=upload['key'],
+            upload_id=upload['upload_id'],
+            lop_hoc_phan_id=lhp_id,
+            uploaded_by=gv_user_id,
+            filename=filename,
+            content_type=content_type,
+            ten_tai_lieu=ten_tai_lieu or filename,
+            size=file_size,
+            part_size=max(MULTIPART_PART_SIZE, -(-file_size // MAX_PARTS)),
+        )
+        expires_at = datetime.now(timezone.utc) + timedelta(hours=_session_hours())
+        return ServiceResult.ok(
+            data={
+                "uploadId": signing.dumps(dataclasses.asdict(session), salt=SESSION_SALT, compress=True),
+                "partSize": session.part_size,
+                "partCount": session.part_count,
+                "concurrency": MULTIPART_CONCURRENCY,
+                "expiresAt": expires_at.isoformat(),
+            },
+            message="Khởi tạo upload thành công"
+        )
+
+
+class UploadTaiLieuPartUseCase:
+    """
+    Store one part of a multipart upload (re-sending a part replaces it)
+    """
+
+    def __init__(self, s3_service):
+        self.s3_service = s3_service
+
+    def execute(
+        self,
+        lhp_id: str,
+        gv_user_id: str,
+        upload_id: str,
+        part_number: int,
+        file_obj: BinaryIO,
+        size: int
+    ) -> ServiceResult:
+        """
+        Returns:
+            ServiceResult with partNumber and etag
+        """
+        session = _open_session(upload_id, lhp_id, gv_user_id)
+        if isinstance(session, ServiceResult):
+            return session
+
+        if not 1 <= part_number <= session.part_count:
+            return ServiceResult.fail(
+                message=f"Số thứ tự phần phải từ 1 đến {session.part_count}",
+                error_code="INVALID_PART"
+            )
+        expected = session.expected_part_size(part_number)
+        if size != expected:
+            return ServiceResult.fail(
+                message=f"Phần {part_number} phải có đúng {expected} bytes",
+                error_code="INVALID_PART_SIZE"
+            )
+
+        etag = self.s3_service.upload_part(session.key, session.upload_id, part_number, file_obj, size)
+        if not etag:
+            return ServiceResult.fail(
+                message="Lỗi khi upload file lên S3",
+                error_code="S3_UPLOAD_FAILED"
+            )
+
+        return ServiceResult.ok(
+            data={"partNumber": part_number, "etag": etag},
+            message="Upload phần thành công"
+        )
+
+
+class GetTaiLieuUploadUseCase:
+    """
+    Parts received so far, to resume an interrupted upload
+    """
+
+    def __init__(self, s3_service):
+        self.s3_service = s3_service
+
+    def execute(self, lhp_id: str, gv_user_id: str, upload_id: str) -> ServiceResult:
+        session = _open_session(upload_id, lhp_id, gv_user_id)
+        if isinstance(session, ServiceResult):
+            return session
+
+        parts = self.s3_service.list_parts(session.key, session.upload_id)
+        if parts is None:
+            return ServiceResult.fail(
+                message="Phiên upload không tồn tại",
+                status_code=404,
+                error_code="UPLOAD_NOT_FOUND"
+            )
+
+        received = {part.part_number for part in parts if part.size == session.expected_part_size(part.part_number)}
+        return ServiceResult.ok(
+            data={
+                "partSize": session.part_size,
+                "partCount": session.part_count,
+                "uploadedParts": [
+                    {"partNumber": part.part_number, "size": part.size, "etag": part.etag}
+                    for part in parts
+                ],
+                "missingParts": [n for n in range(1, session.part_count + 1) if n not in received],
+            },
+            message="Lấy trạng thái upload thành công"
+        )
+
+
+class CompleteTaiLieuUploadUseCase:
+    """
+    Join the parts and save the TaiLieu metadata to DB
+    """
+
+    def __init__(self, repository: ITaiLieuRepository, s3_service):
+        self.repository = repository
+        self.s3_service = s3_service
+
+    def execute(self, lhp_id: str, gv_user_id: str, upload_id: str) -> ServiceResult:
+        """
+        Returns:
+            ServiceResult with the same document info as UploadTaiLieuUseCase
+        """
+        session = _open_session(upload_id, lhp_id, gv_user_id)
+        if isinstance(session, ServiceResult):
+            return session
+
+        denied = _check_owner(self.repository, lhp_id, gv_user_id)
+        if denied:
+            return denied
+
+        parts = self.s3_service.list_parts(session.key, session.upload_id)
+        if parts is None:
+            return ServiceResult.fail(
+                message="Phiên upload không tồn tại",
+                status_code=404,
+                error_code="UPLOAD_NOT_FOUND"
+            )
+
+        by_number = {
+            part.part_number: part for part in parts
+            if part.size == session.expected_part_size(part.part_number)
+        }
+        missing = [n for n in range(1, session.part_count + 1) if n not in by_number]
+        if missing:
+            return ServiceResult.fail(
+                message=f"Còn thiếu {len(missing)} phần: {', '.join(map(str, missing[:20]))}",
+                status_code=409,
+                error_code="INCOMPLETE_UPLOAD"
+            )
+
+        complete = [by_number[n] for n in range(1, session.part_count + 1)]
+        if not self.s3_service.complete_upload(session.key, session.upload_id, complete):
+            return ServiceResult.fail(
+                message="Lỗi khi upload file lên S3",
+                error_code="S3_UPLOAD_FAILED"
+            )
+
+        create_dto = CreateTaiLieuDTO(
+            lop_hoc_phan_id=lhp_id,
+            ten_tai_lieu=session.ten_tai_lieu,
+            file_path=session.key,
+            file_type=session.content_type,
+            uploaded_by=gv_user_id
+        )
+
+        try:
+            document = self.repository.create(create_dto)
+        except Exception as e:
+            # Rollback: delete from S3 if DB save fails
+            release_file(self.repository, self.s3_service, session.key)
+            return ServiceResult.fail(
+                message=f"Lỗi khi lưu metadata: {str(e)}",
+                error_code="DB_SAVE_FAILED"
+            )
+
+        return ServiceResult.ok(
+            data={
+                "id": document.id,
+                "tenTaiLieu": document.ten_tai_lieu,
+                "fileType": document.file_type,
+                "fileUrl": "",
+            },
+            message="Upload tài liệu thành công"
+        )
+
+
+class AbortTaiLieuUploadUseCase:
+    """
+    Cancel a multipart upload and free the stored parts
+    """
+
+    def __init__(self, s3_service):
+        self.s3_service = s3_service
+
+    def execute(self, lhp_id: str, gv_user_id: str, upload_id: str) -> ServiceResult:
+        session = _open_session(upload_id, lhp_id, gv_user_id)
+        if isinstance(session, ServiceResult):
+            return session
+
+        if not self.s3_service.abort_upload(session.key, session.upload_id):
+            return ServiceResult.fail(
+                message="Không thể hủy upload",
+                error_code="S3_ABORT_FAILED"
+            )
+        return ServiceResult.ok(data=None, message="Đã hủy upload")
+
+
+class CleanupTaiLieuUploadsUseCase:
+    """
+    Abort multipart uploads nobody completed (closed tab, expired session)
+    """
+
+    def __init__(self, s3_service):
+        self.s3_service = s3_service
+
+    def execute(self, older_than: Optional[timedelta] = None, dry_run: bool = False) -> ServiceResult:
+        """
+        Args:
+            older_than: Age after which an upload is orphaned (default: the session lifetime)
+            dry_run: Only report what would be aborted
+
+        Returns:
+            ServiceResult with found, aborted and failed keys
+        """
+        if older_than is None:
+            older_than = timedelta(hours=_session_hours())
+        cutoff = datetime.now(timezone.utc) - older_than
+        orphaned = [
+            upload for upload in self.s3_service.list_uploads('tai-lieu/')
+            if upload.initiated.astimezone(timezone.utc) < cutoff
+        ]
+
+        failed = []
+        if not dry_run:
+            failed = [
+                upload.key for upload in orphaned
+                if not self.s3_service.abort_upload(upload.key, upload.upload_id)
+            ]
+        return ServiceResult.ok(
+            data={
+                "found": len(orphaned),
+                "aborted": 0 if dry_run else len(orphaned) - len(failed),
+                "failed": failed,
+            },
+            message=f"Đã dọn {0 if dry_run else len(orphaned) - len(failed)} upload dở dang"
+        )
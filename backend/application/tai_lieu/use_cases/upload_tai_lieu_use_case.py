@@ -4,12 +4,16 @@ Upload TaiLieu Use Case - For GV
 from typing import BinaryIO, Dict, Any, Optional
 from core.types.service_result import ServiceResult
 from application.tai_lieu.interfaces.repositories import ITaiLieuRepository, CreateTaiLieuDTO
+from application.tai_lieu.use_cases.delete_tai_lieu_use_case import release_file
 
 
 class UploadTaiLieuUseCase:
     """
     Upload TaiLieu to S3 and save metadata to DB
     Only GV who owns the LHP can upload
+    
+    Files are stored by content (SHA-256), so the same slides uploaded to
+    several LHP share one blob; each TaiLieu row is a reference to it
     """
     
     # Max file size: 100MB
@@ -73,38 +77,52 @@ class UploadTaiLieuUseCase:
                 error_code="S3_UNAVAILABLE"
             )
         
-        # Upload to S3
-        upload_result = self.s3_service.upload_file(
-            file_obj=file_obj,
-            filename=filename,
-            lop_hoc_phan_id=lhp_id,
-            content_type=content_type
-        )
+        # Hash once; the same source is replayed if the blob has to be put again
+        content = self.s3_service.hash_content(file_obj)
         
-        if not upload_result:
+        if content is None:
             return ServiceResult.fail(
                 message="Lỗi khi upload file lên S3",
                 error_code="S3_UPLOAD_FAILED"
             )
         
-        # Save metadata to DB
-        create_dto = CreateTaiLieuDTO(
-            lop_hoc_phan_id=lhp_id,
-            ten_tai_lieu=ten_tai_lieu or filename,
-            file_path=upload_result['key'],
-            file_type=content_type,
-            uploaded_by=gv_user_id
-        )
-        
-        try:
-            document = self.repository.create(create_dto)
-        except Exception as e:
-            # Rollback: delete from S3 if DB save fails
-            self.s3_service.delete_file(upload_result['key'])
-            return ServiceResult.fail(
-                message=f"Lỗi khi lưu metadata: {str(e)}",
-                error_code="DB_SAVE_FAILED"
+        with content:
+            # Upload to S3 (skipped when the same content is already stored)
+            upload_result = self.s3_service.put_content(content, content_type)
+            
+            if not upload_result:
+                return ServiceResult.fail(
+                    message="Lỗi khi upload file lên S3",
+                    error_code="S3_UPLOAD_FAILED"
+                )
+            
+            # Save metadata to DB
+            create_dto = CreateTaiLieuDTO(
+                lop_hoc_phan_id=lhp_id,
+                ten_tai_lieu=ten_tai_lieu or filename,
+                file_path=upload_result['key'],
+                file_type=content_type,
+                uploaded_by=gv_user_id
             )
+            
+            try:
+                with self.repository.file_lock(create_dto.file_path):
+                    # The blob may have gone with its last other reference since it was found
+                    if not upload_result['created'] and not self.s3_service.exists(create_dto.file_path):
+                        restored = self.s3_service.put_content(content, content_type)
+                        if not restored or restored['key'] != create_dto.file_path:
+                            return ServiceResult.fail(
+                                message="Lỗi khi upload file lên S3",
+                                error_code="S3_UPLOAD_FAILED"
+                            )
+                    document = self.repository.create(create_dto)
+            except Exception as e:
+                # Rollback: delete from S3 if DB save fails (unless other TaiLieu share the file)
+                release_file(self.repository, self.s3_service, create_dto.file_path)
+                return ServiceResult.fail(
+                    message=f"Lỗi khi lưu metadata: {str(e)}",
+                    error_code="DB_SAVE_FAILED"
+                )
         
         # Return response matching frontend UploadTaiLieuResponse
         return ServiceResult.ok(
@@ -0,0 +1,4 @@
+"""
+Benchmarks - load and performance harnesses
+Run as modules (python -m benchmarks.<name>); not collected by pytest.
+"""
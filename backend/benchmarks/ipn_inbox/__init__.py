@@ -0,0 +1,21 @@
+"""
+Payment IPN burst benchmark
+A local fake MoMo gateway signs IPN callbacks for seeded payment
+transactions and fires them in bursts, each callback repeated several times
+the way real gateways retry. Reports accept latency, how long the inbox
+worker needs to drain, and whether every order ended up applied exactly once.
+
+Run from backend/ (never against the shared Neon database):
+
+    # inbox: what PaymentIPNView does (verify + enqueue), applied by the in-process worker
+    python -m benchmarks.ipn_inbox --orders 500 --duplicates 5 --concurrency 32
+
+    # sync: the previous path, ProcessIPNUseCase inside the callback, for comparison
+    python -m benchmarks.ipn_inbox --orders 500 --duplicates 5 --mode sync
+
+    python -m benchmarks.ipn_inbox --sqlite /tmp/ipn.sqlite3 --create-schema --orders 100
+
+Callbacks go straight to the use cases (no HTTP layer) so both modes are
+measured on equal terms. Seeding reuses the registration load test (students / học kỳ tagged with a run
+tag); everything is removed afterwards unless --keep-data is given.
+"""
@@ -0,0 +1,221 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from decimal import Decimal
+
+from benchmarks.registration_load.bootstrap import setup_django, create_missing_tables, UnsafeDatabaseError
+
+ACCESS_KEY = 'ipn-bench-access'
+SECRET_KEY = 'ipn-bench-secret'
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.ipn_inbox',
+        description='Fire bursts of duplicate payment IPNs from a fake gateway against a local database.'
+    )
+    parser.add_argument('--orders', type=int, default=500, help='paid orders (one per seeded student)')
+    parser.add_argument('--duplicates', type=int, default=5, help='copies of each success IPN')
+    parser.add_argument('--late-failures', action='store_true', help='also send a failure IPN per order')
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--mode', choices=('inbox', 'sync'), default='inbox')
+    parser.add_argument('--drain-timeout', type=float, default=300.0)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--sqlite', metavar='PATH', help='use a SQLite file instead of Postgres')
+    parser.add_argument('--create-schema', action='store_true', help='create missing app tables first')
+    parser.add_argument('--allow-remote-db', action='store_true')
+    parser.add_argument('--keep-data', action='store_true', help='do not delete the seeded rows')
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    return parser.parse_args(argv)
+
+
+def _percentiles(values):
+    from benchmarks.registration_load.report import _percentile
+    values = sorted(values)
+    return {
+        'p50_ms': round(_percentile(values, 50), 1),
+        'p95_ms': round(_percentile(values, 95), 1),
+        'p99_ms': round(_percentile(values, 99), 1),
+        'max_ms': round(values[-1], 1) if values else 0.0,
+    }
+
+
+def seed_payments(semester, amount: int):
+    """One pending PaymentTransactions + unpaid HocPhi per seeded student; returns [(order_id, amount)]"""
+    from infrastructure.persistence.models import PaymentTransactions, HocPhi, SinhVien
+
+    sinh_vien_ids = list(
+        SinhVien.objects.using('neon')
+        .filter(ma_so_sinh_vien__startswith=semester.tag)
+        .order_by('ma_so_sinh_vien')
+        .values_list('id', flat=True)
+    )
+    now = datetime.now()
+    HocPhi.objects.using('neon').bulk_create([
+        HocPhi(
+            id=uuid.uuid4(), sinh_vien_id=sv_id, hoc_ky_id=semester.hoc_ky_id,
+            tong_hoc_phi=Decimal(amount), trang_thai_thanh_toan='chua_thanh_toan'
+        )
+        for sv_id in sinh_vien_ids
+    ], ignore_conflicts=True)
+    orders = [(f"{semester.tag}-{n:06d}", amount) for n in range(len(sinh_vien_ids))]
+    PaymentTransactions.objects.using('neon').bulk_create([
+        PaymentTransactions(
+            id=uuid.uuid4(), provider='momo', order_id=order_id, sinh_vien_id=sv_id,
+            hoc_ky_id=semester.hoc_ky_id, amount=Decimal(amount), currency='VND',
+            status='pending', created_at=now, updated_at=now
+        )
+        for (order_id, _), sv_id in zip(orders, sinh_vien_ids)
+    ], batch_size=1000)
+    return orders
+
+
+def fire(callbacks, concurrency: int, mode: str):
+    """Deliver every callback; returns per-callback latencies (ms) and non-2xx count"""
+    from django.db import connections
+    from application.payment.ipn_inbox_use_cases import AcceptIPNUseCase
+    from application.payment.process_ipn_use_case import ProcessIPNUseCase
+    from infrastructure.persistence.payment.ipn_inbox_worker import get_ipn_inbox_worker
+    from infrastructure.persistence.payment.repositories import (
+        PaymentRepository, HocPhiPaymentRepository, PaymentIpnInboxRepository
+    )
+
+    worker = get_ipn_inbox_worker()
+
+    def deliver(data):
+        # Same work as PaymentIPNView for each mode, without the HTTP layer
+        started = time.perf_counter()
+        if mode == 'inbox':
+            result = AcceptIPNUseCase(PaymentIpnInboxRepository()).execute('momo', data)
+            if result.success and not result.data['duplicate']:
+                worker.notify()
+        else:
+            result = ProcessIPNUseCase(PaymentRepository(), HocPhiPaymentRepository()).execute('momo', data)
+        latency = (time.perf_counter() - started) * 1000
+        return latency, result.success
+
+    def deliver_all(chunk):
+        try:
+            return [deliver(data) for data in chunk]
+        finally:
+            connections.close_all()
+
+    chunks = [callbacks[i::concurrency] for i in range(concurrency)]
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = [r for chunk_result in pool.map(deliver_all, chunks) for r in chunk_result]
+    return [latency for latency, _ in results], sum(1 for _, ok in results if not ok)
+
+
+def wait_for_drain(timeout: float) -> bool:
+    from infrastructure.persistence.models import PaymentIpnLogs
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if not PaymentIpnLogs.objects.using('neon').filter(payload__status='pending').exists():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def check_consistency(semester, orders, inbox_keys):
+    from infrastructure.persistence.models import PaymentTransactions, HocPhi, PaymentIpnLogs
+    order_ids = [order_id for order_id, _ in orders]
+    statuses = dict(
+        PaymentTransactions.objects.using('neon').filter(order_id__in=order_ids).values_list('order_id', 'status')
+    )
+    unpaid = HocPhi.objects.using('neon').filter(
+        sinh_vien__ma_so_sinh_vien__startswith=semester.tag, hoc_ky_id=semester.hoc_ky_id
+    ).exclude(trang_thai_thanh_toan='da_thanh_toan').count()
+    inbox = {}
+    for payload in PaymentIpnLogs.objects.using('neon').filter(id__in=inbox_keys).values_list('payload', flat=True):
+        inbox[payload['status']] = inbox.get(payload['status'], 0) + 1
+    return {
+        'orders_not_success': sum(1 for order_id in order_ids if statuses.get(order_id) != 'success'),
+        'hoc_phi_unpaid': unpaid,
+        'inbox_rows': sum(inbox.values()),
+        'inbox_status': inbox,
+    }
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    os.environ['MOMO_ACCESS_KEY'] = ACCESS_KEY
+    os.environ['MOMO_SECRET_KEY'] = SECRET_KEY
+    os.environ['MOMO_PARTNER_CODE'] = 'MOMO'
+    os.environ['IPN_INBOX_WORKER'] = 'thread'
+    try:
+        target = setup_django(sqlite_path=args.sqlite, allow_remote_db=args.allow_remote_db)
+    except UnsafeDatabaseError as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    # Imported after django.setup()
+    from infrastructure.persistence.models import PaymentTransactions, PaymentIpnLogs
+    from infrastructure.persistence.payment.repositories import PaymentIpnInboxRepository
+    from infrastructure.persistence.payment.ipn_inbox_worker import get_ipn_inbox_worker
+    from benchmarks.registration_load.mongo_standin import install_mongo_standin
+    from benchmarks.registration_load.seed import SeedConfig, seed_semester, cleanup
+    from .fake_gateway import FakeMomoGateway
+
+    if args.create_schema:
+        created = create_missing_tables()
+        print(f"created {created} tables", file=sys.stderr)
+
+    print(f"seeding {args.orders} orders on {target} ...", file=sys.stderr)
+    semester = seed_semester(SeedConfig(
+        students=args.orders, mon_hoc=1, classes_per_mon=1, picks_per_student=1, random_seed=args.seed
+    ), install_mongo_standin())
+    orders = seed_payments(semester, amount=5000000)
+    gateway = FakeMomoGateway(ACCESS_KEY, SECRET_KEY)
+    callbacks = gateway.burst(orders, args.duplicates, args.late_failures, args.seed)
+    inbox_keys = [
+        PaymentIpnInboxRepository.inbox_key('momo', data['orderId'], str(data['transId'])) for data in callbacks
+    ]
+    print(f"run tag {semester.tag}, {len(callbacks)} callbacks ({args.mode})", file=sys.stderr)
+
+    # The IPN code path prints one line per callback
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        latencies, errors = fire(callbacks, args.concurrency, args.mode)
+        fired = time.perf_counter() - started
+        drained = wait_for_drain(args.drain_timeout) if args.mode == 'inbox' else True
+        total = time.perf_counter() - started
+        worker = get_ipn_inbox_worker()
+        if worker is not None:
+            worker.stop(timeout=10)
+
+    try:
+        report = {
+            'target': target,
+            'mode': args.mode,
+            'callbacks': len(callbacks),
+            'unique_callbacks': len(set(inbox_keys)),
+            'errors': errors,
+            'accept': _percentiles(latencies),
+            'fire_seconds': round(fired, 2),
+            'applied_seconds': round(total, 2),
+            'drained': drained,
+            'callbacks_per_second': round(len(callbacks) / fired, 1) if fired else 0.0,
+            'consistency': check_consistency(semester, orders, set(inbox_keys)),
+        }
+        if args.json:
+            print(json.dumps(report, indent=2))
+        else:
+            for key, value in report.items():
+                print(f"{key:>22}: {value}")
+    finally:
+        if not args.keep_data:
+            PaymentIpnLogs.objects.using('neon').filter(id__in=set(inbox_keys)).delete()
+            PaymentTransactions.objects.using('neon').filter(order_id__startswith=f"{semester.tag}-").delete()
+            cleanup(semester.tag)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,53 @@
+"""
+Fake MoMo gateway: builds IPN payloads signed the way MomoGateway.verify_ipn expects
+"""
+import hashlib
+import hmac
+import random
+from typing import Dict, Any, List, Tuple
+
+SIGNED_FIELDS = (
+    'amount', 'extraData', 'message', 'orderId', 'orderInfo', 'orderType',
+    'partnerCode', 'payType', 'requestId', 'responseTime', 'resultCode', 'transId'
+)
+
+
+class FakeMomoGateway:
+    def __init__(self, access_key: str, secret_key: str, partner_code: str = 'MOMO'):
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.partner_code = partner_code
+
+    def ipn(self, order_id: str, amount: int, trans_id: str, result_code: int = 0) -> Dict[str, Any]:
+        data = {
+            'partnerCode': self.partner_code,
+            'orderId': order_id,
+            'requestId': order_id,
+            'amount': amount,
+            'orderInfo': f"Thanh toan hoc phi {order_id}",
+            'orderType': 'momo_wallet',
+            'transId': trans_id,
+            'resultCode': result_code,
+            'message': 'Successful.' if result_code == 0 else 'Transaction denied.',
+            'payType': 'qr',
+            'responseTime': 1700000000000,
+            'extraData': '',
+        }
+        raw = f"accessKey={self.access_key}" + ''.join(f"&{key}={data[key]}" for key in SIGNED_FIELDS)
+        data['signature'] = hmac.new(self.secret_key.encode('utf-8'), raw.encode('utf-8'), hashlib.sha256).hexdigest()
+        return data
+
+    def burst(self, orders: List[Tuple[str, int]], duplicates: int, late_failures: bool,
+              random_seed: int = 42) -> List[Dict[str, Any]]:
+        """
+        `duplicates` copies of a success IPN per order, plus (optionally) one late
+        failure IPN with a different transId, shuffled together
+        """
+        callbacks = []
+        for n, (order_id, amount) in enumerate(orders):
+            success = self.ipn(order_id, amount, trans_id=str(4000000000 + n))
+            callbacks.extend(dict(success) for _ in range(duplicates))
+            if late_failures:
+                callbacks.append(self.ipn(order_id, amount, trans_id=str(5000000000 + n), result_code=1006))
+        random.Random(random_seed).shuffle(callbacks)
+        return callbacks
@@ -0,0 +1,23 @@
+"""
+Registration load test
+Simulates the opening minute of the dang_ky_hoc_phan phase against a local
+database: seeds a synthetic semester, drives login -> class list -> register
+-> weekly TKB through the real views with N concurrent students, and reports
+latency percentiles, error codes, queries per request and oversubscription.
+
+Run from backend/ (never against the shared Neon database):
+
+    # local Postgres from DB_* in .env (DB_HOST must be localhost)
+    python -m benchmarks.registration_load --students 5000 --ramp 60 --concurrency 64
+
+    # throwaway SQLite file, tables created from the models
+    python -m benchmarks.registration_load --sqlite /tmp/lt.sqlite3 --create-schema --students 200
+
+SQLite allows one writer at a time, so concurrent registrations there can fail
+with "database is locked" (reported as INTERNAL_ERROR); use it to check the
+harness and query counts, and Postgres for latency and oversubscription numbers.
+
+MongoDB is replaced by an in-memory stand-in, so TKB reads exercise the real
+MongoDBService / TKB read model code without a Mongo server. Seeded rows are
+removed at the end unless --keep-data is given.
+"""
@@ -0,0 +1,92 @@
+import argparse
+import json
+import logging
+import sys
+
+from .bootstrap import setup_django, create_missing_tables, UnsafeDatabaseError
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.registration_load',
+        description='Simulate the opening minute of dang_ky_hoc_phan against a local database.'
+    )
+    parser.add_argument('--students', type=int, default=5000)
+    parser.add_argument('--ramp', type=float, default=60.0, help='seconds over which sessions start')
+    parser.add_argument('--concurrency', type=int, default=32, help='worker threads')
+    parser.add_argument('--mon', type=int, default=40, help='number of môn học')
+    parser.add_argument('--classes-per-mon', type=int, default=5)
+    parser.add_argument('--seats', type=int, default=60, help='so_luong_toi_da per class')
+    parser.add_argument('--picks', type=int, default=5, help='môn ghi danh / registered per student')
+    parser.add_argument('--mode', choices=('single', 'batch'), default='single')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--sqlite', metavar='PATH', help='use a SQLite file instead of Postgres')
+    parser.add_argument('--create-schema', action='store_true', help='create missing app tables first')
+    parser.add_argument('--allow-remote-db', action='store_true')
+    parser.add_argument('--keep-data', action='store_true', help='do not delete the seeded rows')
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    try:
+        target = setup_django(sqlite_path=args.sqlite, allow_remote_db=args.allow_remote_db)
+    except UnsafeDatabaseError as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    # Imported after django.setup()
+    from infrastructure.persistence.catalog_snapshot import get_catalog_snapshot_store
+    from infrastructure.persistence.config_cache import get_config_cache
+    from infrastructure.persistence.tkb_read_model import get_tkb_read_model
+    from infrastructure.events import get_event_bus
+    from .mongo_standin import install_mongo_standin
+    from .seed import SeedConfig, seed_semester, cleanup
+    from .runner import RunConfig, run_load
+    from .report import build_report, format_report
+
+    if args.create_schema:
+        created = create_missing_tables()
+        print(f"created {created} tables", file=sys.stderr)
+
+    # Expected 4xx (full class, conflicts) would otherwise log one line per request
+    logging.getLogger('django.request').setLevel(logging.ERROR)
+
+    mongo = install_mongo_standin()
+    get_tkb_read_model().invalidate()
+    get_config_cache().invalidate()
+    get_catalog_snapshot_store().invalidate()
+
+    print(f"seeding {args.students} students on {target} ...", file=sys.stderr)
+    semester = seed_semester(SeedConfig(
+        students=args.students,
+        mon_hoc=args.mon,
+        classes_per_mon=args.classes_per_mon,
+        seats_per_class=args.seats,
+        picks_per_student=args.picks,
+        random_seed=args.seed,
+    ), mongo)
+    print(f"run tag {semester.tag}, hoc ky {semester.hoc_ky_id}", file=sys.stderr)
+
+    try:
+        result = run_load(semester, RunConfig(
+            concurrency=args.concurrency,
+            ramp_seconds=args.ramp,
+            mode=args.mode,
+            random_seed=args.seed,
+        ))
+        # Projections run on the event bus thread; let them settle before checking / cleaning up
+        get_event_bus().flush()
+        report = build_report(semester, result)
+        report['target'] = target
+        report['mode'] = args.mode
+        print(json.dumps(report, indent=2, ensure_ascii=False) if args.json else format_report(report))
+    finally:
+        if not args.keep_data:
+            cleanup(semester.tag)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""
+Django bootstrap for the load test
+Points the 'neon' alias at a local Postgres (or a SQLite file for smoke runs)
+before Django connects, and can create the unmanaged tables from the models.
+"""
+import os
+import sys
+from pathlib import Path
+from typing import Optional
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+LOCAL_HOSTS = {'', 'localhost', '127.0.0.1', '::1'}
+
+
+class UnsafeDatabaseError(RuntimeError):
+    pass
+
+
+def setup_django(sqlite_path: Optional[str] = None, allow_remote_db: bool = False) -> str:
+    """
+    Configure and start Django. Returns a short description of the target DB.
+
+    The load test writes thousands of rows, so a non-local Postgres is refused
+    unless `allow_remote_db` is set.
+    """
+    if str(BACKEND_DIR) not in sys.path:
+        sys.path.insert(0, str(BACKEND_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'DKHPHCMUE.settings')
+
+    from django.conf import settings
+
+    neon = settings.DATABASES['neon']
+    if sqlite_path:
+        settings.DATABASES['neon'] = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': sqlite_path,
+            # Writers from many threads queue on the file lock instead of failing
+            'OPTIONS': {'timeout': 60},
+            'TEST': {},
+        }
+        target = f"sqlite:{sqlite_path}"
+    else:
+        host = neon.get('HOST') or ''
+        if host not in LOCAL_HOSTS and not allow_remote_db:
+            raise UnsafeDatabaseError(
+                f"Refusing to load-test against non-local database host '{host}'. "
+                "Point DB_HOST at a local Postgres or pass --allow-remote-db."
+            )
+        if host in LOCAL_HOSTS:
+            # Local servers rarely have TLS; channel binding would fail without it
+            neon['OPTIONS'] = {'sslmode': os.environ.get('DB_SSLMODE', 'prefer')}
+        target = f"postgres:{host or 'localhost'}/{neon.get('NAME')}"
+
+    import django
+    django.setup()
+
+    # Lets APIClient's 'testserver' host through ALLOWED_HOSTS
+    from django.test.utils import setup_test_environment
+    setup_test_environment()
+    return target
+
+
+def create_missing_tables() -> int:
+    """Create the app tables (unmanaged models) that do not exist yet; returns how many"""
+    from django.apps import apps
+    from django.db import connections
+
+    connection = connections['neon']
+    existing = set(connection.introspection.table_names())
+    created = 0
+    with connection.schema_editor() as editor:
+        for model in apps.get_app_config('persistence').get_models():
+            if model._meta.db_table not in existing:
+                editor.create_model(model)
+                created += 1
+    return created
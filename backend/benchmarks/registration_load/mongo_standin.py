@@ -0,0 +1,105 @@
+"""
+In-memory MongoDB stand-in
+Implements the small subset of the pymongo collection API that MongoDBService
+uses for TKB documents and versions, so the real service code runs unchanged.
+"""
+import copy
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+from infrastructure.persistence import mongodb_service
+from infrastructure.persistence.mongodb_service import MongoDBService
+
+
+def _matches(doc: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    for key, expected in query.items():
+        value = doc.get(key)
+        if isinstance(expected, dict) and '$in' in expected:
+            if value not in expected['$in']:
+                return False
+        elif value != expected:
+            return False
+    return True
+
+
+class _Cursor:
+    def __init__(self, docs: List[Dict[str, Any]]):
+        self._docs = docs
+
+    def sort(self, key: str, direction: int = 1) -> '_Cursor':
+        self._docs.sort(key=lambda d: (d.get(key) is None, d.get(key)), reverse=direction < 0)
+        return self
+
+    def __iter__(self):
+        return iter(self._docs)
+
+
+class InMemoryCollection:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._docs: List[Dict[str, Any]] = []
+
+    def find(self, query: Optional[Dict[str, Any]] = None) -> _Cursor:
+        with self._lock:
+            return _Cursor([copy.deepcopy(d) for d in self._docs if _matches(d, query or {})])
+
+    def find_one(self, query: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            for doc in self._docs:
+                if _matches(doc, query or {}):
+                    return copy.deepcopy(doc)
+        return None
+
+    def insert_one(self, doc: Dict[str, Any]) -> None:
+        with self._lock:
+            self._docs.append(copy.deepcopy(doc))
+
+    def insert_many(self, docs: Iterable[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._docs.extend(copy.deepcopy(d) for d in docs)
+
+    def update_one(self, query: Dict[str, Any], update: Dict[str, Any], upsert: bool = False) -> None:
+        with self._lock:
+            doc = next((d for d in self._docs if _matches(d, query)), None)
+            if doc is None:
+                if not upsert:
+                    return
+                doc = {k: v for k, v in query.items() if not isinstance(v, dict)}
+                self._docs.append(doc)
+            for key, value in update.get('$set', {}).items():
+                doc[key] = copy.deepcopy(value)
+            for key, value in update.get('$inc', {}).items():
+                doc[key] = doc.get(key, 0) + value
+
+    def delete_many(self, query: Dict[str, Any]) -> None:
+        with self._lock:
+            self._docs = [d for d in self._docs if not _matches(d, query)]
+
+    def delete_one(self, query: Dict[str, Any]) -> None:
+        with self._lock:
+            for i, doc in enumerate(self._docs):
+                if _matches(doc, query):
+                    del self._docs[i]
+                    return
+
+
+class InMemoryMongoDB:
+    def __init__(self):
+        self._collections: Dict[str, InMemoryCollection] = {}
+
+    def __getitem__(self, name: str) -> InMemoryCollection:
+        return self._collections.setdefault(name, InMemoryCollection())
+
+
+class InMemoryMongoService(MongoDBService):
+    """MongoDBService backed by InMemoryMongoDB instead of a server"""
+
+    def __init__(self):
+        self.db = InMemoryMongoDB()
+
+
+def install_mongo_standin() -> InMemoryMongoService:
+    """Make get_mongodb_service() return a fresh in-memory service"""
+    service = InMemoryMongoService()
+    mongodb_service._mongodb_service = service
+    return service
@@ -0,0 +1,113 @@
+"""
+Load test report: latency percentiles, error codes, queries per request and
+seat-counter consistency of the seeded classes after the run.
+"""
+from collections import Counter
+from typing import List, Dict, Any
+
+from django.db.models import Count, Q
+
+from infrastructure.persistence.models import LopHocPhan
+
+from .runner import RunResult, STEPS
+from .seed import SeededSemester
+
+
+def _percentile(sorted_values: List[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def summarize_steps(result: RunResult) -> Dict[str, Any]:
+    steps: Dict[str, Any] = {}
+    for step in STEPS + ('session',):
+        samples = [s for s in result.samples if s.step == step]
+        if not samples:
+            continue
+        latencies = sorted(s.latency_ms for s in samples)
+        steps[step] = {
+            'requests': len(samples),
+            'p50_ms': round(_percentile(latencies, 50), 1),
+            'p90_ms': round(_percentile(latencies, 90), 1),
+            'p95_ms': round(_percentile(latencies, 95), 1),
+            'p99_ms': round(_percentile(latencies, 99), 1),
+            'max_ms': round(latencies[-1], 1),
+            'queries_mean': round(sum(s.queries for s in samples) / len(samples), 1),
+            'queries_max': max(s.queries for s in samples),
+            'status': dict(Counter(s.status for s in samples)),
+            'error_codes': dict(Counter(code for s in samples for code in s.error_codes)),
+        }
+    return steps
+
+
+def check_seats(semester: SeededSemester) -> Dict[str, Any]:
+    """
+    Oversubscription: counter above capacity, registrations above capacity, and
+    classes whose counter disagrees with the registrations actually stored.
+    """
+    rows = (
+        LopHocPhan.objects.using('neon')
+        .filter(id__in=semester.lop_hoc_phan_ids)
+        .annotate(so_dang_ky=Count('dangkyhocphan', filter=Q(dangkyhocphan__trang_thai='da_dang_ky')))
+        .values('ma_lop', 'so_luong_toi_da', 'so_luong_hien_tai', 'so_dang_ky')
+    )
+    counter_over, registered_over, drift = [], [], []
+    for row in rows:
+        toi_da = row['so_luong_toi_da'] or 0
+        hien_tai = row['so_luong_hien_tai'] or 0
+        if hien_tai > toi_da:
+            counter_over.append(row['ma_lop'])
+        if row['so_dang_ky'] > toi_da:
+            registered_over.append(row['ma_lop'])
+        if row['so_dang_ky'] != hien_tai:
+            drift.append(row['ma_lop'])
+    return {
+        'classes': len(semester.lop_hoc_phan_ids),
+        'counter_over_capacity': len(counter_over),
+        'registered_over_capacity': len(registered_over),
+        'counter_drift': len(drift),
+        'examples': (registered_over or counter_over or drift)[:5],
+    }
+
+
+def build_report(semester: SeededSemester, result: RunResult) -> Dict[str, Any]:
+    requests = len(result.samples)
+    return {
+        'students': len(semester.students),
+        'wall_seconds': round(result.wall_seconds, 2),
+        'throughput_rps': round(requests / result.wall_seconds, 1) if result.wall_seconds else 0.0,
+        'registrations': {
+            'attempted': result.registrations_attempted,
+            'ok': result.registrations_ok,
+        },
+        'steps': summarize_steps(result),
+        'seats': check_seats(semester),
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [
+        f"students={report['students']} wall={report['wall_seconds']}s "
+        f"throughput={report['throughput_rps']} req/s "
+        f"registrations ok={report['registrations']['ok']}/{report['registrations']['attempted']}",
+        '',
+        f"{'step':<11}{'n':>7}{'p50':>9}{'p90':>9}{'p95':>9}{'p99':>9}{'max':>9}{'q/req':>8}  errors",
+    ]
+    for step, s in report['steps'].items():
+        errors = ', '.join(f"{code}={n}" for code, n in sorted(s['error_codes'].items())) or '-'
+        lines.append(
+            f"{step:<11}{s['requests']:>7}{s['p50_ms']:>9}{s['p90_ms']:>9}{s['p95_ms']:>9}"
+            f"{s['p99_ms']:>9}{s['max_ms']:>9}{s['queries_mean']:>8}  {errors}"
+        )
+    seats = report['seats']
+    lines += [
+        '',
+        f"seats: classes={seats['classes']} counter>max={seats['counter_over_capacity']} "
+        f"registered>max={seats['registered_over_capacity']} counter_drift={seats['counter_drift']}"
+        + (f" e.g. {', '.join(seats['examples'])}" if seats['examples'] else ''),
+    ]
+    return '\n'.join(lines)
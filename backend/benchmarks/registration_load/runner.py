@@ -0,0 +1,172 @@
+"""
+Load runner
+Replays the opening minute of dang_ky_hoc_phan: every seeded student logs in,
+loads the class list, registers for one class of each môn they ghi danh'd and
+reads their weekly TKB, all through the real DRF views (APIClient, in-process).
+"""
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import List, Dict, Any, Optional, Tuple
+
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from .seed import SeededSemester, SeededStudent
+
+STEPS = ('login', 'catalog', 'register', 'tkb_weekly')
+QUERY_ALIASES = ('neon', 'default')
+
+
+@dataclass
+class RunConfig:
+    concurrency: int = 32
+    ramp_seconds: float = 60.0
+    mode: str = 'single'        # 'single' = one POST per class, 'batch' = cart endpoint
+    random_seed: int = 7
+
+
+@dataclass
+class StepSample:
+    step: str
+    latency_ms: float
+    status: int
+    queries: int
+    error_codes: List[str] = field(default_factory=list)
+
+
+@dataclass
+class RunResult:
+    samples: List[StepSample] = field(default_factory=list)
+    wall_seconds: float = 0.0
+    registrations_ok: int = 0
+    registrations_attempted: int = 0
+
+
+class _Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.result = RunResult()
+
+    def add(self, sample: StepSample, attempted: int = 0, ok: int = 0) -> None:
+        with self._lock:
+            self.result.samples.append(sample)
+            self.result.registrations_attempted += attempted
+            self.result.registrations_ok += ok
+
+
+def _timed(step: str, call) -> Tuple[StepSample, Any]:
+    contexts = [CaptureQueriesContext(connections[alias]) for alias in QUERY_ALIASES]
+    for ctx in contexts:
+        ctx.__enter__()
+    start = time.perf_counter()
+    try:
+        response = call()
+    finally:
+        elapsed = (time.perf_counter() - start) * 1000
+        for ctx in contexts:
+            ctx.__exit__(None, None, None)
+    body = getattr(response, 'data', None) or {}
+    sample = StepSample(
+        step=step,
+        latency_ms=elapsed,
+        status=response.status_code,
+        queries=sum(len(ctx.captured_queries) for ctx in contexts),
+    )
+    if isinstance(body, dict) and body.get('errorCode'):
+        sample.error_codes.append(body['errorCode'])
+    return sample, body
+
+
+def _pick_classes(catalog: Dict[str, Any], ma_mons: List[str], rng: random.Random) -> List[str]:
+    """One class per môn, preferring those the list still shows as not full"""
+    by_mon: Dict[str, List[Dict[str, Any]]] = {}
+    for group in ('monChung', 'batBuoc', 'tuChon'):
+        for mon in catalog.get(group) or []:
+            by_mon[mon['maMon']] = mon['danhSachLop']
+
+    picks = []
+    for ma_mon in ma_mons:
+        lops = by_mon.get(ma_mon) or []
+        open_lops = [l for l in lops if (l.get('soLuongHienTai') or 0) < (l.get('soLuongToiDa') or 0)]
+        candidates = open_lops or lops
+        if candidates:
+            picks.append(rng.choice(candidates)['id'])
+    return picks
+
+
+def _student_session(semester: SeededSemester, student: SeededStudent, cfg: RunConfig,
+                     recorder: _Recorder, start_at: float, seed: int) -> None:
+    delay = start_at - time.perf_counter()
+    if delay > 0:
+        time.sleep(delay)
+
+    rng = random.Random(seed)
+    client = APIClient()
+    hoc_ky_id = semester.hoc_ky_id
+    try:
+        sample, body = _timed('login', lambda: client.post(
+            '/api/auth/login', {'tenDangNhap': student.username, 'matKhau': semester.password}, format='json'
+        ))
+        recorder.add(sample)
+        token = (body.get('data') or {}).get('token')
+        if not token:
+            return
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+
+        sample, body = _timed('catalog', lambda: client.get('/api/sv/lop-hoc-phan', {'hocKyId': hoc_ky_id}))
+        recorder.add(sample)
+        lop_ids = _pick_classes(body.get('data') or {}, student.ma_mons, rng)
+
+        if cfg.mode == 'batch' and lop_ids:
+            sample, body = _timed('register', lambda: client.post(
+                '/api/sv/dang-ky-hoc-phan/batch', {'lopHocPhanIds': lop_ids, 'hocKyId': hoc_ky_id}, format='json'
+            ))
+            results = (body.get('data') or {}).get('results') or []
+            sample.error_codes.extend(r['errorCode'] for r in results if r.get('errorCode'))
+            recorder.add(sample, attempted=len(lop_ids), ok=sum(1 for r in results if r.get('isSuccess')))
+        else:
+            for lop_id in lop_ids:
+                sample, body = _timed('register', lambda: client.post(
+                    '/api/sv/dang-ky-hoc-phan', {'lopHocPhanId': lop_id, 'hocKyId': hoc_ky_id}, format='json'
+                ))
+                recorder.add(sample, attempted=1, ok=1 if body.get('isSuccess') else 0)
+
+        week_start = date.fromisoformat(semester.week_start)
+        sample, _ = _timed('tkb_weekly', lambda: client.get('/api/sv/tkb-weekly', {
+            'hocKyId': hoc_ky_id,
+            'dateStart': week_start.isoformat(),
+            'dateEnd': (week_start + timedelta(days=6)).isoformat(),
+        }))
+        recorder.add(sample)
+    except Exception as e:
+        recorder.add(StepSample(step='session', latency_ms=0.0, status=0, queries=0,
+                                error_codes=[f"EXCEPTION:{type(e).__name__}"]))
+    finally:
+        # Worker threads each hold their own DB connections
+        for alias in QUERY_ALIASES:
+            connections[alias].close()
+
+
+def run_load(semester: SeededSemester, cfg: RunConfig, limit: Optional[int] = None) -> RunResult:
+    """Run every student's session, spreading session starts evenly over the ramp"""
+    students = semester.students[:limit] if limit else semester.students
+    recorder = _Recorder()
+    n = max(len(students), 1)
+    t0 = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=cfg.concurrency) as pool:
+        futures = [
+            pool.submit(_student_session, semester, student, cfg, recorder,
+                        t0 + cfg.ramp_seconds * i / n, cfg.random_seed + i)
+            for i, student in enumerate(students)
+        ]
+        for future in futures:
+            future.result()
+
+    recorder.result.wall_seconds = time.perf_counter() - t0
+    return recorder.result
@@ -0,0 +1,213 @@
+"""
+Synthetic semester for the registration load test
+Everything is tagged with a short run tag (in codes / usernames) so a run can
+be removed again with `cleanup(tag)` without touching real data.
+"""
+import random
+import uuid
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import List, Dict, Any, Optional
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from infrastructure.persistence.models import (
+    Khoa, NganhHoc, NienKhoa, HocKy, KyPhase, DotDangKy,
+    MonHoc, HocPhan, LopHocPhan, LichHocDinhKy,
+    TaiKhoan, Users, SinhVien, GhiDanhHocPhan,
+    DangKyHocPhan, DangKyTkb, LichSuDangKy, ChiTietLichSuDangKy, HocPhi, ChiTietHocPhi
+)
+
+BATCH_SIZE = 1000
+# 4 blocks of 3 tiết per day; classes are spread over T2..T7
+TIET_BLOCKS = [(1, 3), (4, 6), (7, 9), (10, 12)]
+
+
+@dataclass
+class SeedConfig:
+    students: int = 5000
+    mon_hoc: int = 40
+    classes_per_mon: int = 5
+    seats_per_class: int = 60
+    picks_per_student: int = 5
+    password: str = 'loadtest123'
+    random_seed: int = 42
+    tag: Optional[str] = None
+
+
+@dataclass
+class SeededStudent:
+    username: str
+    ma_mons: List[str]
+
+
+@dataclass
+class SeededSemester:
+    tag: str
+    hoc_ky_id: str
+    password: str
+    week_start: str
+    students: List[SeededStudent] = field(default_factory=list)
+    lop_hoc_phan_ids: List[str] = field(default_factory=list)
+
+
+def new_tag() -> str:
+    return 'LT' + uuid.uuid4().hex[:4].upper()
+
+
+def seed_semester(cfg: SeedConfig, mongo_service) -> SeededSemester:
+    """Insert the synthetic semester into 'neon' and its TKB into `mongo_service`"""
+    tag = cfg.tag or new_tag()
+    rng = random.Random(cfg.random_seed)
+    now = timezone.now()
+    today = now.date()
+    ngay_bat_dau = today - timedelta(days=today.weekday())
+    ngay_ket_thuc = ngay_bat_dau + timedelta(weeks=15)
+
+    with transaction.atomic(using='neon'):
+        khoa = Khoa.objects.using('neon').create(id=uuid.uuid4(), ma_khoa=f"K{tag}", ten_khoa=f"Khoa {tag}")
+        nganh = NganhHoc.objects.using('neon').create(id=uuid.uuid4(), ma_nganh=f"N{tag}", ten_nganh=f"Nganh {tag}", khoa=khoa)
+        nien_khoa = NienKhoa.objects.using('neon').create(id=uuid.uuid4(), ten_nien_khoa=f"NK-{tag}")
+        hoc_ky = HocKy.objects.using('neon').create(
+            id=uuid.uuid4(), ten_hoc_ky=f"HK {tag}", ma_hoc_ky='1', id_nien_khoa=nien_khoa,
+            ngay_bat_dau=ngay_bat_dau, ngay_ket_thuc=ngay_ket_thuc, trang_thai_hien_tai=False
+        )
+        KyPhase.objects.using('neon').create(
+            id=uuid.uuid4(), hoc_ky=hoc_ky, phase='dang_ky_hoc_phan',
+            start_at=now - timedelta(hours=1), end_at=now + timedelta(days=1), is_enabled=True
+        )
+        DotDangKy.objects.using('neon').create(
+            id=uuid.uuid4(), hoc_ky=hoc_ky, loai_dot='dang_ky', gioi_han_tin_chi=9999,
+            thoi_gian_bat_dau=now - timedelta(hours=1), thoi_gian_ket_thuc=now + timedelta(days=1),
+            is_check_toan_truong=True
+        )
+
+        # Catalog: mon_hoc -> hoc_phan -> lop_hoc_phan (+ weekly session)
+        mon_hocs, hoc_phans, lops, lich_hocs = [], [], [], []
+        tkb_by_mon: Dict[str, List[Dict[str, Any]]] = {}
+        for i in range(cfg.mon_hoc):
+            ma_mon = f"{tag}M{i:03d}"
+            mon = MonHoc(
+                id=uuid.uuid4(), ma_mon=ma_mon, ten_mon=f"Mon {ma_mon}", so_tin_chi=3, khoa=khoa,
+                loai_mon='chuyen_nganh' if i % 3 else 'tu_chon', la_mon_chung=(i % 10 == 0)
+            )
+            hoc_phan = HocPhan(
+                id=uuid.uuid4(), mon_hoc=mon, ten_hoc_phan=f"HP {ma_mon}", so_lop=cfg.classes_per_mon,
+                trang_thai_mo=True, id_hoc_ky=hoc_ky
+            )
+            mon_hocs.append(mon)
+            hoc_phans.append(hoc_phan)
+            for j in range(cfg.classes_per_mon):
+                lop = LopHocPhan(
+                    id=uuid.uuid4(), hoc_phan=hoc_phan, ma_lop=f"{ma_mon}_{j + 1:02d}",
+                    so_luong_toi_da=cfg.seats_per_class, so_luong_hien_tai=0, trang_thai_lop='dang_mo',
+                    ngay_bat_dau=ngay_bat_dau, ngay_ket_thuc=ngay_ket_thuc
+                )
+                thu = 2 + (i + j) % 6
+                tiet_bat_dau, tiet_ket_thuc = TIET_BLOCKS[(i * cfg.classes_per_mon + j) % len(TIET_BLOCKS)]
+                lops.append(lop)
+                lich_hocs.append(LichHocDinhKy(
+                    id=uuid.uuid4(), lop_hoc_phan=lop, thu=thu,
+                    tiet_bat_dau=tiet_bat_dau, tiet_ket_thuc=tiet_ket_thuc
+                ))
+                tkb_by_mon.setdefault(ma_mon, []).append({
+                    'tenLop': lop.ma_lop,
+                    'thuTrongTuan': thu,
+                    'tietBatDau': tiet_bat_dau,
+                    'tietKetThuc': tiet_ket_thuc,
+                    'phongHocId': None,
+                    'ngayBatDau': ngay_bat_dau.isoformat(),
+                    'ngayKetThuc': ngay_ket_thuc.isoformat(),
+                })
+
+        MonHoc.objects.using('neon').bulk_create(mon_hocs, batch_size=BATCH_SIZE)
+        HocPhan.objects.using('neon').bulk_create(hoc_phans, batch_size=BATCH_SIZE)
+        LopHocPhan.objects.using('neon').bulk_create(lops, batch_size=BATCH_SIZE)
+        LichHocDinhKy.objects.using('neon').bulk_create(lich_hocs, batch_size=BATCH_SIZE)
+
+        # Students (one shared hash: hashing 5000 passwords would dominate seeding)
+        mat_khau = make_password(cfg.password)
+        tai_khoans, users, sinh_viens, ghi_danhs = [], [], [], []
+        students: List[SeededStudent] = []
+        picks = min(cfg.picks_per_student, cfg.mon_hoc)
+        for n in range(cfg.students):
+            username = f"{tag.lower()}sv{n:06d}"
+            tai_khoan = TaiKhoan(
+                id=uuid.uuid4(), ten_dang_nhap=username, mat_khau=mat_khau,
+                loai_tai_khoan='sinh_vien', trang_thai_hoat_dong=True, ngay_tao=now
+            )
+            user = Users(
+                id=uuid.uuid4(), ho_ten=f"Sinh Vien {n}", tai_khoan=tai_khoan,
+                email=f"{username}@loadtest.local", created_at=now
+            )
+            sinh_vien = SinhVien(
+                id=user, ma_so_sinh_vien=f"{tag}{n:06d}", lop=f"L{tag}", khoa=khoa, nganh=nganh, khoa_hoc='K50'
+            )
+            chosen = rng.sample(range(cfg.mon_hoc), picks)
+            for i in chosen:
+                ghi_danhs.append(GhiDanhHocPhan(
+                    id=uuid.uuid4(), sinh_vien=sinh_vien, hoc_phan=hoc_phans[i],
+                    ngay_ghi_danh=now, trang_thai='da_ghi_danh'
+                ))
+            tai_khoans.append(tai_khoan)
+            users.append(user)
+            sinh_viens.append(sinh_vien)
+            students.append(SeededStudent(username, [mon_hocs[i].ma_mon for i in chosen]))
+
+        TaiKhoan.objects.using('neon').bulk_create(tai_khoans, batch_size=BATCH_SIZE)
+        Users.objects.using('neon').bulk_create(users, batch_size=BATCH_SIZE)
+        SinhVien.objects.using('neon').bulk_create(sinh_viens, batch_size=BATCH_SIZE)
+        GhiDanhHocPhan.objects.using('neon').bulk_create(ghi_danhs, batch_size=BATCH_SIZE)
+
+    # TLK stores schedules in MongoDB only; go through the real service path
+    for ma_mon, danh_sach_lop in tkb_by_mon.items():
+        mongo_service.save_tkb_mon_hoc(ma_mon, str(hoc_ky.id), danh_sach_lop)
+
+    return SeededSemester(
+        tag=tag,
+        hoc_ky_id=str(hoc_ky.id),
+        password=cfg.password,
+        week_start=ngay_bat_dau.isoformat(),
+        students=students,
+        lop_hoc_phan_ids=[str(lop.id) for lop in lops],
+    )
+
+
+def cleanup(tag: str) -> None:
+    """Delete everything a run with `tag` created, registrations included"""
+    db = 'neon'
+    khoa = Khoa.objects.using(db).filter(ma_khoa=f"K{tag}").first()
+    if not khoa:
+        return
+
+    sinh_viens = SinhVien.objects.using(db).filter(khoa=khoa).values('id')
+    lops = LopHocPhan.objects.using(db).filter(hoc_phan__mon_hoc__khoa=khoa).values('id')
+    hoc_kys = HocKy.objects.using(db).filter(id_nien_khoa__ten_nien_khoa=f"NK-{tag}").values('id')
+
+    with transaction.atomic(using=db):
+        ChiTietLichSuDangKy.objects.using(db).filter(lich_su_dang_ky__sinh_vien__in=sinh_viens).delete()
+        LichSuDangKy.objects.using(db).filter(sinh_vien__in=sinh_viens).delete()
+        DangKyTkb.objects.using(db).filter(sinh_vien__in=sinh_viens).delete()
+        DangKyHocPhan.objects.using(db).filter(sinh_vien__in=sinh_viens).delete()
+        ChiTietHocPhi.objects.using(db).filter(hoc_phi__sinh_vien__in=sinh_viens).delete()
+        HocPhi.objects.using(db).filter(sinh_vien__in=sinh_viens).delete()
+        GhiDanhHocPhan.objects.using(db).filter(sinh_vien__in=sinh_viens).delete()
+        LichHocDinhKy.objects.using(db).filter(lop_hoc_phan__in=lops).delete()
+        LopHocPhan.objects.using(db).filter(hoc_phan__mon_hoc__khoa=khoa).delete()
+        HocPhan.objects.using(db).filter(mon_hoc__khoa=khoa).delete()
+        MonHoc.objects.using(db).filter(khoa=khoa).delete()
+
+        user_ids = list(SinhVien.objects.using(db).filter(khoa=khoa).values_list('id', flat=True))
+        tai_khoan_ids = list(Users.objects.using(db).filter(id__in=user_ids).values_list('tai_khoan_id', flat=True))
+        SinhVien.objects.using(db).filter(khoa=khoa).delete()
+        Users.objects.using(db).filter(id__in=user_ids).delete()
+        TaiKhoan.objects.using(db).filter(id__in=tai_khoan_ids).delete()
+
+        DotDangKy.objects.using(db).filter(hoc_ky__in=hoc_kys).delete()
+        KyPhase.objects.using(db).filter(hoc_ky__in=hoc_kys).delete()
+        HocKy.objects.using(db).filter(id_nien_khoa__ten_nien_khoa=f"NK-{tag}").delete()
+        NienKhoa.objects.using(db).filter(ten_nien_khoa=f"NK-{tag}").delete()
+        NganhHoc.objects.using(db).filter(khoa=khoa).delete()
+        khoa.delete(using=db)
@@ -0,0 +1,17 @@
+"""
+Tài liệu upload throughput benchmark
+Uploads one generated file through the storage stand-in twice: as a single
+streamed S3Service.upload_file (the /tai-lieu/upload path) and as a multipart
+session (initiate -> parts in parallel -> complete) through the GV use cases.
+Reports MB/s for each and per-part latency. No database is touched; the
+LopHocPhan owner check and the TaiLieu insert are answered in process.
+
+Run from backend/:
+
+    python -m benchmarks.tai_lieu_upload --size-mb 512 --part-size-mb 8 --concurrency 4
+    python -m benchmarks.tai_lieu_upload --backend memory --size-mb 128
+    python -m benchmarks.tai_lieu_upload --backend s3 --size-mb 256     # needs AWS_* credentials
+
+With --backend local the objects go to a temporary directory (or --root),
+which is removed afterwards.
+"""
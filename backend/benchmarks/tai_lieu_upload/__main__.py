@@ -0,0 +1,190 @@
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+MB = 1024 * 1024
+LHP_ID = 'bench-lhp'
+GV_ID = 'bench-gv'
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.tai_lieu_upload',
+        description='Compare single-stream and multipart tài liệu uploads on a storage backend.'
+    )
+    parser.add_argument('--backend', choices=('local', 'memory', 's3'), default='local')
+    parser.add_argument('--root', help='directory for --backend local (default: a temporary one)')
+    parser.add_argument('--size-mb', type=int, default=256)
+    parser.add_argument('--part-size-mb', type=int, default=8)
+    parser.add_argument('--concurrency', type=int, default=4, help='parts uploaded at once')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per mode; the best is reported')
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    return parser.parse_args(argv)
+
+
+class _Slice:
+    """Read-only window on a file, like the body of one part request"""
+
+    def __init__(self, path: str, offset: int, length: int):
+        self.file = open(path, 'rb')
+        self.file.seek(offset)
+        self.remaining = length
+
+    def read(self, size: int = -1) -> bytes:
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+class _BenchRepository:
+    """Owner check and TaiLieu insert without a database"""
+
+    def get_lop_hoc_phan_owner(self, lhp_id):
+        return GV_ID
+
+    def create(self, dto):
+        from application.tai_lieu.interfaces import TaiLieuDTO
+        return TaiLieuDTO(
+            id='bench-doc', ten_tai_lieu=dto.ten_tai_lieu, file_path=dto.file_path, file_type=dto.file_type,
+            created_at=None, uploaded_by_id=dto.uploaded_by, uploaded_by_name=None,
+        )
+
+
+def make_source(size: int) -> str:
+    fd, path = tempfile.mkstemp(prefix='tai-lieu-bench-', suffix='.bin')
+    with os.fdopen(fd, 'wb') as out:
+        block = os.urandom(MB)
+        for _ in range(size // MB):
+            out.write(block)
+        out.write(block[:size % MB])
+    return path
+
+
+def single_upload(s3_service, source: str) -> float:
+    started = time.perf_counter()
+    with open(source, 'rb') as file:
+        uploaded = s3_service.upload_file(file, 'recording.bin', LHP_ID, 'application/octet-stream')
+    elapsed = time.perf_counter() - started
+    if not uploaded:
+        raise RuntimeError('single upload failed')
+    s3_service.delete_file(uploaded['key'])
+    return elapsed
+
+
+def multipart_upload(s3_service, source: str, size: int, concurrency: int):
+    from application.tai_lieu.use_cases import (
+        InitiateTaiLieuUploadUseCase, UploadTaiLieuPartUseCase, CompleteTaiLieuUploadUseCase,
+    )
+
+    repository = _BenchRepository()
+    started = time.perf_counter()
+    session = InitiateTaiLieuUploadUseCase(repository, s3_service).execute(
+        LHP_ID, GV_ID, 'recording.bin', 'application/octet-stream', size
+    )
+    if not session.success:
+        raise RuntimeError(session.message)
+    upload_id, part_size = session.data['uploadId'], session.data['partSize']
+    upload_part = UploadTaiLieuPartUseCase(s3_service)
+
+    def send(part_number: int) -> float:
+        offset = (part_number - 1) * part_size
+        length = min(part_size, size - offset)
+        body = _Slice(source, offset, length)
+        part_started = time.perf_counter()
+        try:
+            result = upload_part.execute(LHP_ID, GV_ID, upload_id, part_number, body, length)
+        finally:
+            body.close()
+        if not result.success:
+            raise RuntimeError(result.message)
+        return (time.perf_counter() - part_started) * 1000
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        part_ms = list(pool.map(send, range(1, session.data['partCount'] + 1)))
+    completed = CompleteTaiLieuUploadUseCase(repository, s3_service).execute(LHP_ID, GV_ID, upload_id)
+    elapsed = time.perf_counter() - started
+    if not completed.success:
+        raise RuntimeError(completed.message)
+
+    for obj in s3_service.list_tai_lieu_by_lop(LHP_ID):
+        s3_service.delete_file(obj['key'])
+    return elapsed, sorted(part_ms)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    size = args.size_mb * MB
+    root = None
+    if args.backend == 'local':
+        root = args.root or tempfile.mkdtemp(prefix='tai-lieu-storage-')
+        os.environ['STORAGE_LOCAL_ROOT'] = root
+    os.environ['STORAGE_BACKEND'] = args.backend
+    os.environ['STORAGE_MULTIPART_PART_SIZE'] = str(args.part_size_mb * MB)
+    os.environ['STORAGE_MULTIPART_CONCURRENCY'] = str(args.concurrency)
+    os.environ['TAI_LIEU_MULTIPART_MAX_SIZE'] = str(max(size, 2 * 1024 * MB))
+
+    if str(BACKEND_DIR) not in sys.path:
+        sys.path.insert(0, str(BACKEND_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'DKHPHCMUE.settings')
+    import django
+    django.setup()
+
+    # Imported after django.setup()
+    from infrastructure.persistence.s3_service import get_s3_service
+    from benchmarks.registration_load.report import _percentile
+
+    s3_service = get_s3_service()
+    if not s3_service.is_available:
+        print(f"storage backend '{args.backend}' is not available", file=sys.stderr)
+        return 2
+
+    print(f"generating {args.size_mb} MB ...", file=sys.stderr)
+    source = make_source(size)
+    try:
+        single, multipart, part_ms = [], [], []
+        for run in range(args.repeat):
+            print(f"run {run + 1}/{args.repeat}", file=sys.stderr)
+            single.append(single_upload(s3_service, source))
+            elapsed, latencies = multipart_upload(s3_service, source, size, args.concurrency)
+            multipart.append(elapsed)
+            part_ms = latencies
+    finally:
+        os.unlink(source)
+        if root and not args.root:
+            shutil.rmtree(root, ignore_errors=True)
+
+    report = {
+        'backend': args.backend,
+        'size_mb': args.size_mb,
+        'part_size_mb': args.part_size_mb,
+        'concurrency': args.concurrency,
+        'parts': len(part_ms),
+        'single_seconds': round(min(single), 3),
+        'single_mb_per_s': round(args.size_mb / min(single), 1),
+        'multipart_seconds': round(min(multipart), 3),
+        'multipart_mb_per_s': round(args.size_mb / min(multipart), 1),
+        'part_p50_ms': round(_percentile(part_ms, 50), 1),
+        'part_p95_ms': round(_percentile(part_ms, 95), 1),
+    }
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for key, value in report.items():
+            print(f"{key:>20}: {value}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,7 @@
+from .tkb_occupancy import TKBSession, TKBConflict, TKBOccupancy
+from .events import DomainEvent, LopHocPhanDaDangKy, LopHocPhanDaHuy, LopHocPhanDaChuyen
+
+__all__ = [
+    'TKBSession', 'TKBConflict', 'TKBOccupancy',
+    'DomainEvent', 'LopHocPhanDaDangKy', 'LopHocPhanDaHuy', 'LopHocPhanDaChuyen'
+]
@@ -0,0 +1,32 @@
+"""
+Domain Layer - Registration Events
+Raised by the registration use cases once a student's set of registered
+classes changes; projections (e.g. học phí) subscribe to them.
+"""
+from dataclasses import dataclass
+
+
+class DomainEvent:
+    """Marker base class for domain events"""
+
+
+@dataclass(frozen=True)
+class LopHocPhanDaDangKy(DomainEvent):
+    sinh_vien_id: str
+    hoc_ky_id: str
+    lop_hoc_phan_id: str
+
+
+@dataclass(frozen=True)
+class LopHocPhanDaHuy(DomainEvent):
+    sinh_vien_id: str
+    hoc_ky_id: str
+    lop_hoc_phan_id: str
+
+
+@dataclass(frozen=True)
+class LopHocPhanDaChuyen(DomainEvent):
+    sinh_vien_id: str
+    hoc_ky_id: str
+    lop_cu_id: str
+    lop_moi_id: str
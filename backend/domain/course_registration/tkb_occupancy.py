@@ -0,0 +1,203 @@
+"""
+Domain Layer - TKB Occupancy
+Bitmask model of a student's weekly timetable, used for conflict checks
+
+Each weekday owns TIET_PER_DAY consecutive bits, so a session (thu, tiet range)
+is a contiguous run of bits and two sessions can only clash if their masks
+intersect. Sessions that carry a date range are only treated as clashing
+when their date ranges intersect as well.
+"""
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Optional, List, Dict, Any, Iterable
+
+TIET_PER_DAY = 16
+DAYS_PER_WEEK = 7
+
+
+def _day_index(thu: int) -> int:
+    """Map thu (1=CN, 2=T2, ..., 7=T7; 8 is accepted as CN) to 0..6"""
+    thu = int(thu)
+    if thu == 8:
+        return 0
+    if not 1 <= thu <= DAYS_PER_WEEK:
+        raise ValueError(f"Invalid thu: {thu}")
+    return thu - 1
+
+
+def slot_mask(thu: int, tiet_bat_dau: int, tiet_ket_thuc: int) -> int:
+    """Bitmask for tiet_bat_dau..tiet_ket_thuc (inclusive) on the given day"""
+    start, end = int(tiet_bat_dau), int(tiet_ket_thuc)
+    if start > end:
+        start, end = end, start
+    if start < 1 or end > TIET_PER_DAY:
+        raise ValueError(f"Invalid tiet range: {tiet_bat_dau}-{tiet_ket_thuc}")
+    width = end - start + 1
+    return ((1 << width) - 1) << (_day_index(thu) * TIET_PER_DAY + start - 1)
+
+
+def _parse_date(value: Any) -> Optional[date]:
+    """Accept date, datetime or ISO string (Mongo stores both); anything else is open-ended"""
+    if value is None or value == '':
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace('Z', '+00:00')).date()
+        except ValueError:
+            return None
+    return None
+
+
+@dataclass(frozen=True)
+class TKBSession:
+    """One recurring weekly session"""
+    thu: int
+    tiet_bat_dau: int
+    tiet_ket_thuc: int
+    ngay_bat_dau: Optional[date] = None
+    ngay_ket_thuc: Optional[date] = None
+
+    @property
+    def mask(self) -> int:
+        return slot_mask(self.thu, self.tiet_bat_dau, self.tiet_ket_thuc)
+
+    def overlaps_dates(self, other: 'TKBSession') -> bool:
+        """Missing bounds are treated as open-ended"""
+        if self.ngay_ket_thuc and other.ngay_bat_dau and self.ngay_ket_thuc < other.ngay_bat_dau:
+            return False
+        if other.ngay_ket_thuc and self.ngay_bat_dau and other.ngay_ket_thuc < self.ngay_bat_dau:
+            return False
+        return True
+
+    @classmethod
+    def create(cls, thu, tiet_bat_dau, tiet_ket_thuc, ngay_bat_dau=None, ngay_ket_thuc=None) -> Optional['TKBSession']:
+        """Build a session from loosely typed values; returns None if it cannot be placed on the grid"""
+        if thu is None or tiet_bat_dau is None or tiet_ket_thuc is None:
+            return None
+        try:
+            session = cls(
+                thu=int(thu),
+                tiet_bat_dau=int(tiet_bat_dau),
+                tiet_ket_thuc=int(tiet_ket_thuc),
+                ngay_bat_dau=_parse_date(ngay_bat_dau),
+                ngay_ket_thuc=_parse_date(ngay_ket_thuc)
+            )
+            session.mask
+        except (TypeError, ValueError):
+            return None
+        return session
+
+    @classmethod
+    def from_lich_hoc(cls, lich: Any, ngay_bat_dau: Any = None, ngay_ket_thuc: Any = None) -> Optional['TKBSession']:
+        """Build from a lich_hoc_dinh_ky row; dates come from its lop_hoc_phan"""
+        return cls.create(
+            getattr(lich, 'thu', None),
+            getattr(lich, 'tiet_bat_dau', None),
+            getattr(lich, 'tiet_ket_thuc', None),
+            ngay_bat_dau,
+            ngay_ket_thuc
+        )
+
+    @classmethod
+    def from_mongo(cls, lop: Dict[str, Any]) -> Optional['TKBSession']:
+        """
+        Build from one entry of a thoi_khoa_bieu_mon_hoc danhSachLop list.
+        Entries are stored snake_case but older documents may still be camelCase.
+        """
+        def pick(snake: str, camel: str):
+            value = lop.get(snake)
+            return value if value is not None else lop.get(camel)
+
+        return cls.create(
+            pick('thu_trong_tuan', 'thuTrongTuan'),
+            pick('tiet_bat_dau', 'tietBatDau'),
+            pick('tiet_ket_thuc', 'tietKetThuc'),
+            pick('ngay_bat_dau', 'ngayBatDau'),
+            pick('ngay_ket_thuc', 'ngayKetThuc')
+        )
+
+
+@dataclass(frozen=True)
+class TKBConflict:
+    """The already-held class a new session clashes with"""
+    lop_hoc_phan_id: str
+    ma_lop: str
+    ten_hoc_phan: str
+
+
+class TKBOccupancy:
+    """
+    Weekly occupancy of one student in one hoc ky.
+
+    `mask` is the union of every held session, so the common no-conflict case
+    is one AND per new session. Only when bits collide are the held sessions of
+    that day inspected to honour date ranges and exclusions.
+    """
+
+    def __init__(self):
+        self.mask = 0
+        self._by_day: Dict[int, List[tuple]] = {}
+
+    def add(self, sessions: Iterable[TKBSession], lop_hoc_phan_id: str, ma_lop: str = '', ten_hoc_phan: str = '') -> None:
+        owner = TKBConflict(str(lop_hoc_phan_id), ma_lop or '', ten_hoc_phan or '')
+        for session in sessions:
+            mask = session.mask
+            self.mask |= mask
+            self._by_day.setdefault(_day_index(session.thu), []).append((mask, session, owner))
+
+    def find_conflict(self, sessions: Iterable[TKBSession], exclude_lop_hoc_phan_id: Optional[str] = None) -> Optional[TKBConflict]:
+        """Return the first held class clashing with any of `sessions`, or None"""
+        exclude = str(exclude_lop_hoc_phan_id) if exclude_lop_hoc_phan_id else None
+        for session in sessions:
+            mask = session.mask
+            if not mask & self.mask:
+                continue
+            for held_mask, held_session, owner in self._by_day.get(_day_index(session.thu), []):
+                if owner.lop_hoc_phan_id == exclude:
+                    continue
+                if held_mask & mask and held_session.overlaps_dates(session):
+                    return owner
+        return None
+
+    # ============ CACHE SUPPORT ============
+
+    @staticmethod
+    def cache_key(sinh_vien_id: str, hoc_ky_id: str) -> str:
+        return f"tkb_occupancy:{sinh_vien_id}:{hoc_ky_id}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain-JSON form so the occupancy can be stored in any cache backend"""
+        lops: Dict[str, Dict[str, Any]] = {}
+        for entries in self._by_day.values():
+            for _, session, owner in entries:
+                lop = lops.setdefault(owner.lop_hoc_phan_id, {
+                    'lopHocPhanId': owner.lop_hoc_phan_id,
+                    'maLop': owner.ma_lop,
+                    'tenHocPhan': owner.ten_hoc_phan,
+                    'sessions': []
+                })
+                lop['sessions'].append([
+                    session.thu,
+                    session.tiet_bat_dau,
+                    session.tiet_ket_thuc,
+                    session.ngay_bat_dau.isoformat() if session.ngay_bat_dau else None,
+                    session.ngay_ket_thuc.isoformat() if session.ngay_ket_thuc else None
+                ])
+        return {'mask': self.mask, 'lops': list(lops.values())}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'TKBOccupancy':
+        occupancy = cls()
+        for lop in data.get('lops', []):
+            sessions = [TKBSession.create(*values) for values in lop.get('sessions', [])]
+            occupancy.add(
+                [s for s in sessions if s],
+                lop['lopHocPhanId'],
+                lop.get('maLop', ''),
+                lop.get('tenHocPhan', '')
+            )
+        return occupancy
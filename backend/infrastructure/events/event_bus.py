@@ -0,0 +1,99 @@
+"""
+Event Bus - In-process domain event dispatch
+Use cases publish events inside their transaction; handlers run only after
+that transaction commits, so a rolled back registration never reaches a
+projection and a failing handler never rolls back a registration.
+
+Committed events go on a bounded queue drained by one background thread, so
+the projections (HocPhi delta, rollup khoa lookup + Mongo write) are not paid
+for inside the registration request. One thread keeps a student's events in
+order; when the queue is full, publishing waits for room rather than drop.
+Events still queued when a process dies are repaired by the reconciliation
+passes. EVENT_BUS_QUEUE_SIZE=0 dispatches inline after commit instead.
+"""
+from typing import Callable, Dict, List, Optional, Type
+from functools import partial
+from decouple import config
+from django.db import transaction, close_old_connections
+import queue
+import threading
+import logging
+
+from domain.course_registration.events import DomainEvent
+
+logger = logging.getLogger(__name__)
+
+EventHandler = Callable[[DomainEvent], None]
+
+
+class EventBus:
+    def __init__(self, queue_size: Optional[int] = None):
+        self._lock = threading.Lock()
+        self._handlers: Dict[Type[DomainEvent], List[EventHandler]] = {}
+        queue_size = queue_size if queue_size is not None else config('EVENT_BUS_QUEUE_SIZE', default=1000, cast=int)
+        self._queue: Optional[queue.Queue] = queue.Queue(maxsize=queue_size) if queue_size > 0 else None
+        self._thread: Optional[threading.Thread] = None
+
+    def subscribe(self, event_type: Type[DomainEvent], handler: EventHandler) -> None:
+        with self._lock:
+            self._handlers.setdefault(event_type, []).append(handler)
+
+    def publish(self, event: DomainEvent, using: str = 'neon') -> None:
+        """Dispatch `event` after the current transaction on `using` commits (immediately if none)"""
+        with self._lock:
+            if not self._handlers.get(type(event)):
+                return
+        transaction.on_commit(partial(self._enqueue, event), using=using)
+
+    def flush(self) -> None:
+        """Wait until every queued event has been dispatched"""
+        if self._queue is not None:
+            self._queue.join()
+
+    def _enqueue(self, event: DomainEvent) -> None:
+        if self._queue is None:
+            self.dispatch(event)
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='event-bus', daemon=True)
+                self._thread.start()
+        self._queue.put(event)
+
+    def _run(self) -> None:
+        while True:
+            event = self._queue.get()
+            try:
+                self.dispatch(event)
+            finally:
+                close_old_connections()
+                self._queue.task_done()
+
+    def dispatch(self, event: DomainEvent) -> None:
+        with self._lock:
+            handlers = list(self._handlers.get(type(event), []))
+        for handler in handlers:
+            try:
+                handler(event)
+            except Exception as e:
+                # Projections are repaired by their reconciliation pass
+                logger.error(f"Handler {handler} failed for {event}: {e}", exc_info=True)
+
+
+# Singleton instance
+_event_bus = None
+
+
+def get_event_bus() -> EventBus:
+    """Get event bus singleton, with the default projections subscribed"""
+    global _event_bus
+    if _event_bus is None:
+        from infrastructure.persistence.pdt.tuition_projector import register_tuition_projector
+        from infrastructure.persistence.pdt.report_cache import register_report_cache_invalidation
+        from infrastructure.persistence.pdt.registration_rollup import register_registration_rollup
+        bus = EventBus()
+        register_tuition_projector(bus)
+        register_report_cache_invalidation(bus)
+        register_registration_rollup(bus)
+        _event_bus = bus
+    return _event_bus
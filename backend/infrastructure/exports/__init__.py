@@ -0,0 +1,14 @@
+from .xlsx_stream import StreamingXlsxWriter
+from .pdf_stream import StreamingPdfWriter
+from .zip_stream import StreamingZipWriter, ZipEntry
+from .jobs import ExportJob, ExportJobRunner, get_export_job_runner
+
+__all__ = [
+    'StreamingXlsxWriter',
+    'StreamingPdfWriter',
+    'StreamingZipWriter',
+    'ZipEntry',
+    'ExportJob',
+    'ExportJobRunner',
+    'get_export_job_runner',
+]
@@ -0,0 +1,159 @@
+"""
+Export Jobs - Build large report files in the background
+A job streams the same chunks a download would into REPORT_EXPORT_DIR and
+records its state in a JSON file next to it, so any worker sharing that
+directory can answer status / download requests. Files older than
+REPORT_EXPORT_RETENTION_HOURS are removed when new jobs are submitted.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict, replace
+from pathlib import Path
+from typing import Optional, Callable, Iterable, Dict, Any
+from decouple import config
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+_JOB_ID = re.compile(r'^[0-9a-f]{32}$')
+
+
+@dataclass
+class ExportJob:
+    id: str
+    filename: str
+    content_type: str
+    requested_by: str
+    status: str = 'queued'  # queued | running | done | failed
+    size: int = 0
+    error: Optional[str] = None
+    created_at: str = ''
+    finished_at: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'jobId': self.id,
+            'status': self.status,
+            'filename': self.filename,
+            'size': self.size,
+            'error': self.error,
+            'createdAt': self.created_at,
+            'finishedAt': self.finished_at,
+        }
+
+
+class ExportJobRunner:
+    def __init__(self, directory: Optional[str] = None, workers: Optional[int] = None,
+                 retention_hours: Optional[float] = None):
+        self.directory = Path(directory or config('REPORT_EXPORT_DIR', default=str(Path(settings.BASE_DIR) / 'exports')))
+        self.retention = 3600 * (retention_hours if retention_hours is not None
+                                 else config('REPORT_EXPORT_RETENTION_HOURS', default=24, cast=float))
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers or config('REPORT_EXPORT_WORKERS', default=2, cast=int),
+            thread_name_prefix='report-export',
+        )
+        self._lock = threading.Lock()
+
+    def submit(self, filename: str, content_type: str, requested_by: str,
+               produce: Callable[[], Iterable[bytes]]) -> ExportJob:
+        """Queue produce() to be written to disk; returns the queued job"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.cleanup()
+        job = ExportJob(
+            id=uuid.uuid4().hex,
+            filename=filename,
+            content_type=content_type,
+            requested_by=str(requested_by),
+            created_at=timezone.now().isoformat(),
+        )
+        self._save(job)
+        self._executor.submit(self._run, replace(job), produce)
+        return job
+
+    def get(self, job_id: str) -> Optional[ExportJob]:
+        if not _JOB_ID.match(job_id or ''):
+            return None
+        try:
+            with open(self._meta_path(job_id), encoding='utf-8') as f:
+                return ExportJob(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def file_path(self, job: ExportJob) -> Path:
+        return self.directory / f'{job.id}.bin'
+
+    def cleanup(self) -> int:
+        """Remove jobs (file + metadata) older than the retention period"""
+        if self.retention <= 0 or not self.directory.exists():
+            return 0
+        cutoff = time.time() - self.retention
+        removed = 0
+        for meta in self.directory.glob('*.json'):
+            try:
+                if meta.stat().st_mtime >= cutoff:
+                    continue
+                job_id = meta.stem
+                for path in (meta, self.directory / f'{job_id}.bin', self.directory / f'{job_id}.part'):
+                    if path.exists():
+                        path.unlink()
+                removed += 1
+            except OSError as e:
+                logger.warning(f"Could not remove expired export {meta.name}: {e}")
+        return removed
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+    def _run(self, job: ExportJob, produce: Callable[[], Iterable[bytes]]) -> None:
+        job.status = 'running'
+        self._save(job)
+        partial = self.directory / f'{job.id}.part'
+        try:
+            with open(partial, 'wb') as f:
+                for chunk in produce():
+                    f.write(chunk)
+                    job.size += len(chunk)
+            os.replace(partial, self.file_path(job))
+            job.status = 'done'
+        except Exception as e:
+            logger.error(f"Export job {job.id} failed: {e}", exc_info=True)
+            job.status = 'failed'
+            job.error = str(e)
+            if partial.exists():
+                partial.unlink()
+        finally:
+            job.finished_at = timezone.now().isoformat()
+            self._save(job)
+            connections.close_all()
+
+    def _meta_path(self, job_id: str) -> Path:
+        return self.directory / f'{job_id}.json'
+
+    def _save(self, job: ExportJob) -> None:
+        # Write-then-rename so readers never see a half-written status
+        path = self._meta_path(job.id)
+        tmp = path.with_suffix('.json.tmp')
+        with self._lock:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(asdict(job), f)
+            os.replace(tmp, path)
+
+
+# Singleton instance
+_export_job_runner = None
+
+
+def get_export_job_runner() -> ExportJobRunner:
+    """Get export job runner singleton"""
+    global _export_job_runner
+    if _export_job_runner is None:
+        _export_job_runner = ExportJobRunner()
+    return _export_job_runner
@@ -0,0 +1,152 @@
+"""
+Streaming PDF writer
+Lays rows out as a table on A4 landscape pages and yields each page as soon
+as it is full; only the xref offsets and page ids are kept until the end.
+Uses the standard Helvetica fonts (nothing embedded), so text is limited to
+WinAnsi: Vietnamese diacritics are folded to their base letters.
+"""
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Iterable, Iterator, Sequence, List, Optional, Any
+import unicodedata
+import zlib
+
+PAGE_WIDTH = 842
+PAGE_HEIGHT = 595
+MARGIN = 36
+# Average Helvetica glyph width as a fraction of the font size, used for truncation
+_CHAR_WIDTH = 0.5
+
+_FOLD = str.maketrans({'đ': 'd', 'Đ': 'D'})
+
+
+def fold_text(value: Any) -> str:
+    """Text representable in WinAnsi with the standard fonts"""
+    if value is None:
+        return ''
+    if isinstance(value, datetime):
+        return value.strftime('%d/%m/%Y %H:%M')
+    if isinstance(value, date):
+        return value.strftime('%d/%m/%Y')
+    if isinstance(value, (float, Decimal)):
+        value = f'{value:,.0f}' if value == int(value) else f'{value:,.2f}'
+    text = unicodedata.normalize('NFD', str(value).translate(_FOLD))
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return text.encode('ascii', 'replace').decode('ascii')
+
+
+def _pdf_string(text: str) -> str:
+    return '(' + text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)') + ')'
+
+
+class StreamingPdfWriter:
+    def __init__(self, title: str, headers: Sequence[str], column_widths: Optional[Sequence[float]] = None,
+                 font_size: float = 8):
+        self.title = title
+        self.headers = list(headers)
+        weights = list(column_widths or [1] * len(self.headers))
+        total = sum(weights) or 1
+        usable = PAGE_WIDTH - 2 * MARGIN
+        self.widths = [usable * w / total for w in weights]
+        self.font_size = font_size
+        self.line_height = font_size * 1.5
+        self.rows_written = 0
+        self.pages_written = 0
+
+    def stream(self, rows: Iterable[Sequence[Any]]) -> Iterator[bytes]:
+        # Objects: 1 catalog, 2 page tree, 3/4 fonts, then content + page per page
+        offsets: List[int] = []
+        page_ids: List[int] = []
+        position = 0
+
+        def emit(obj_id: int, body: bytes) -> bytes:
+            nonlocal position
+            offsets.append(position)
+            data = f'{obj_id} 0 obj\n'.encode('ascii') + body + b'\nendobj\n'
+            position += len(data)
+            return data
+
+        def chunk(data: bytes) -> bytes:
+            nonlocal position
+            position += len(data)
+            return data
+
+        yield chunk(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        yield (
+            emit(1, b'<< /Type /Catalog /Pages 2 0 R >>')
+            + emit(3, b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>')
+            + emit(4, b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>')
+        )
+        # Object 2 is written last; keep offsets indexed by object number
+        offsets.insert(1, 0)
+
+        for content in self._pages(rows):
+            content_id = 5 + 2 * self.pages_written
+            page_id = content_id + 1
+            self.pages_written += 1
+            page_ids.append(page_id)
+            compressed = zlib.compress(content.encode('latin-1'))
+            yield (
+                emit(content_id, f'<< /Length {len(compressed)} /Filter /FlateDecode >>\nstream\n'.encode('ascii')
+                     + compressed + b'\nendstream')
+                + emit(page_id, (
+                    f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] '
+                    f'/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents {content_id} 0 R >>'
+                ).encode('ascii'))
+            )
+
+        kids = ' '.join(f'{page_id} 0 R' for page_id in page_ids)
+        offsets[1] = position
+        tail = f'2 0 obj\n<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>\nendobj\n'.encode('ascii')
+        xref_at = position + len(tail)
+        xref = [f'xref\n0 {len(offsets) + 1}\n', '0000000000 65535 f \n']
+        xref.extend(f'{offset:010d} 00000 n \n' for offset in offsets)
+        xref.append(f'trailer\n<< /Size {len(offsets) + 1} /Root 1 0 R >>\nstartxref\n{xref_at}\n%%EOF\n')
+        yield tail + ''.join(xref).encode('ascii')
+
+    def _pages(self, rows: Iterable[Sequence[Any]]) -> Iterator[str]:
+        ops: List[str] = []
+        y = 0.0
+        page = 0
+        for row in rows:
+            if not ops or y < MARGIN + self.line_height:
+                if ops:
+                    yield self._finish_page(ops, page)
+                page += 1
+                ops, y = self._start_page(page)
+            ops.append(self._text_row(row, y, 'F1'))
+            y -= self.line_height
+            self.rows_written += 1
+        if not ops:
+            page += 1
+            ops, y = self._start_page(page)
+        yield self._finish_page(ops, page)
+
+    def _start_page(self, page: int):
+        ops = []
+        y = PAGE_HEIGHT - MARGIN
+        if page == 1:
+            ops.append(f'BT /F2 13 Tf {MARGIN} {y - 13:.2f} Td {_pdf_string(fold_text(self.title))} Tj ET')
+            y -= 13 + self.line_height
+        y -= self.font_size
+        ops.append(self._text_row(self.headers, y, 'F2'))
+        line_y = y - self.font_size * 0.5
+        ops.append(f'0.5 w {MARGIN} {line_y:.2f} m {PAGE_WIDTH - MARGIN} {line_y:.2f} l S')
+        return ops, y - self.line_height
+
+    def _finish_page(self, ops: List[str], page: int) -> str:
+        ops.append(f'BT /F1 {self.font_size} Tf {PAGE_WIDTH - MARGIN - 40} {MARGIN / 2:.2f} Td (Trang {page}) Tj ET')
+        return '\n'.join(ops)
+
+    def _text_row(self, values: Sequence[Any], y: float, font: str) -> str:
+        parts = [f'BT /{font} {self.font_size} Tf']
+        x = float(MARGIN)
+        for value, width in zip(values, self.widths):
+            max_chars = max(int((width - 4) / (self.font_size * _CHAR_WIDTH)), 1)
+            text = fold_text(value)
+            if len(text) > max_chars:
+                text = text[:max(max_chars - 3, 1)] + '...'
+            parts.append(f'1 0 0 1 {x:.2f} {y:.2f} Tm {_pdf_string(text)} Tj')
+            x += width
+        parts.append('ET')
+        return ' '.join(parts)
@@ -0,0 +1,193 @@
+"""
+Streaming XLSX writer
+Produces a valid .xlsx (SpreadsheetML in a zip) as a sequence of byte
+chunks while rows are consumed, so memory stays flat however many rows the
+source yields. Strings are written inline (no shared-strings table) and
+rows beyond Excel's per-sheet limit continue on a new sheet.
+"""
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Iterable, Iterator, Sequence, List, Optional, Any
+from xml.sax.saxutils import escape
+import io
+import re
+import zipfile
+
+MAX_ROWS_PER_SHEET = 1048576
+FLUSH_BYTES = 64 * 1024
+ROWS_PER_WRITE = 500
+
+_ILLEGAL_XML = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only, unseekable buffer: zipfile then streams entries with data descriptors"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self.size = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self.size += len(data)
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        self.size = 0
+        return data
+
+
+def _cell(value: Any, style: int = 0) -> str:
+    s = f' s="{style}"' if style else ''
+    if isinstance(value, str):
+        if not value:
+            return f'<c{s}/>'
+        text = escape(_ILLEGAL_XML.sub('', value))
+        return f'<c t="inlineStr"{s}><is><t xml:space="preserve">{text}</t></is></c>'
+    if value is None:
+        return f'<c{s}/>'
+    if isinstance(value, bool):
+        return f'<c t="b"{s}><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float, Decimal)):
+        return f'<c{s}><v>{value}</v></c>'
+    if isinstance(value, datetime):
+        value = value.strftime('%d/%m/%Y %H:%M')
+    elif isinstance(value, date):
+        value = value.strftime('%d/%m/%Y')
+    return _cell(str(value), style)
+
+
+class StreamingXlsxWriter:
+    def __init__(self, sheet_name: str, headers: Sequence[str], column_widths: Optional[Sequence[float]] = None,
+                 max_rows_per_sheet: int = MAX_ROWS_PER_SHEET):
+        self.sheet_name = re.sub(r'[\[\]:*?/\\]', ' ', sheet_name)[:28] or 'Sheet'
+        self.headers = list(headers)
+        self.column_widths = list(column_widths or [])
+        self.max_rows_per_sheet = max_rows_per_sheet
+        self.rows_written = 0
+
+    def stream(self, rows: Iterable[Sequence[Any]]) -> Iterator[bytes]:
+        sink = _ChunkSink()
+        archive = zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED)
+        try:
+            sheets = 0
+            sheet = None
+            row_number = 0
+            pending: List[str] = []
+
+            for row in rows:
+                if sheet is None or row_number >= self.max_rows_per_sheet:
+                    if sheet is not None:
+                        self._close_sheet(sheet, pending)
+                    sheets += 1
+                    sheet = archive.open(f'xl/worksheets/sheet{sheets}.xml', 'w', force_zip64=True)
+                    self._open_sheet(sheet)
+                    row_number = 1
+                row_number += 1
+                pending.append(self._row(row_number, row))
+                self.rows_written += 1
+                if len(pending) >= ROWS_PER_WRITE:
+                    sheet.write(''.join(pending).encode('utf-8'))
+                    pending = []
+                    if sink.size >= FLUSH_BYTES:
+                        yield sink.drain()
+
+            if sheet is None:
+                # Header-only workbook
+                sheets = 1
+                sheet = archive.open('xl/worksheets/sheet1.xml', 'w')
+                self._open_sheet(sheet)
+            self._close_sheet(sheet, pending)
+
+            self._write_package_parts(archive, sheets)
+            archive.close()
+            yield sink.drain()
+        except BaseException:
+            # Abandoned mid-stream (client gone, source failed): drop the archive unfinished
+            archive.fp = None
+            raise
+
+    def _row(self, number: int, values: Sequence[Any], style: int = 0) -> str:
+        return f'<row r="{number}">' + ''.join(_cell(value, style) for value in values) + '</row>'
+
+    def _open_sheet(self, sheet) -> None:
+        cols = ''
+        if self.column_widths:
+            cols = '<cols>' + ''.join(
+                f'<col min="{i + 1}" max="{i + 1}" width="{width}" customWidth="1"/>'
+                for i, width in enumerate(self.column_widths)
+            ) + '</cols>'
+        sheet.write((
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+            '<sheetViews><sheetView workbookViewId="0"><pane ySplit="1" topLeftCell="A2" activePane="bottomLeft" state="frozen"/></sheetView></sheetViews>'
+            f'{cols}<sheetData>' + self._row(1, self.headers, style=1)
+        ).encode('utf-8'))
+
+    @staticmethod
+    def _close_sheet(sheet, pending: List[str]) -> None:
+        sheet.write((''.join(pending) + '</sheetData></worksheet>').encode('utf-8'))
+        pending.clear()
+        sheet.close()
+
+    def _write_package_parts(self, archive: zipfile.ZipFile, sheets: int) -> None:
+        names = [self.sheet_name if n == 1 else f'{self.sheet_name} ({n})' for n in range(1, sheets + 1)]
+        archive.writestr('[Content_Types].xml', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+            + ''.join(
+                f'<Override PartName="/xl/worksheets/sheet{n}.xml" '
+                'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+                for n in range(1, sheets + 1)
+            ) + '</Types>'
+        ))
+        archive.writestr('_rels/.rels', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+            '</Relationships>'
+        ))
+        archive.writestr('xl/workbook.xml', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"><sheets>'
+            + ''.join(
+                f'<sheet name="{escape(name)}" sheetId="{n}" r:id="rId{n}"/>'
+                for n, name in enumerate(names, start=1)
+            ) + '</sheets></workbook>'
+        ))
+        archive.writestr('xl/_rels/workbook.xml.rels', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            + ''.join(
+                f'<Relationship Id="rId{n}" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+                f'Target="worksheets/sheet{n}.xml"/>'
+                for n in range(1, sheets + 1)
+            )
+            + f'<Relationship Id="rId{sheets + 1}" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+            '</Relationships>'
+        ))
+        # Style 1 = bold header
+        archive.writestr('xl/styles.xml', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+            '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+            '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+            '<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>'
+            '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+            '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+            '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+            '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/></cellXfs>'
+            '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+            '</styleSheet>'
+        ))
@@ -0,0 +1,71 @@
+"""
+Streaming ZIP writer
+Bundles files read chunk by chunk from storage into one .zip produced as a
+sequence of byte chunks: nothing is staged on disk and at most one storage
+chunk plus FLUSH_BYTES is held in memory, however large the bundle. Entries
+are stored uncompressed (documents are mostly PDF / Office / media, which are
+compressed already) with data descriptors, and ZIP64 where sizes or offsets
+pass the 32-bit limits.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Iterable, Iterator, List, Optional
+import zipfile
+
+from infrastructure.exports.xlsx_stream import _ChunkSink
+from infrastructure.storage import StreamedObject
+
+FLUSH_BYTES = 64 * 1024
+# Earliest timestamp a zip entry can carry
+_ZIP_EPOCH = (1980, 1, 1, 0, 0, 0)
+
+
+@dataclass
+class ZipEntry:
+    name: str
+    # Opens the body when the entry is reached; None skips the entry
+    open: Callable[[], Optional[StreamedObject]]
+    modified: Optional[datetime] = None
+
+
+class StreamingZipWriter:
+    def __init__(self, flush_bytes: int = FLUSH_BYTES):
+        self.flush_bytes = flush_bytes
+        self.entries_written = 0
+        self.skipped: List[str] = []
+
+    def stream(self, entries: Iterable[ZipEntry]) -> Iterator[bytes]:
+        sink = _ChunkSink()
+        archive = zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_STORED)
+        try:
+            for entry in entries:
+                body = entry.open()
+                if body is None:
+                    self.skipped.append(entry.name)
+                    continue
+
+                info = zipfile.ZipInfo(entry.name, date_time=self._date_time(entry.modified))
+                # Known up front, so zipfile writes ZIP64 headers only for entries that need them
+                info.file_size = body.content_length
+                try:
+                    with archive.open(info, 'w') as member:
+                        for chunk in body:
+                            member.write(chunk)
+                            if sink.size >= self.flush_bytes:
+                                yield sink.drain()
+                finally:
+                    body.close()
+                self.entries_written += 1
+
+            archive.close()
+            yield sink.drain()
+        except BaseException:
+            # Abandoned mid-stream (client gone, source failed): drop the archive unfinished
+            archive.fp = None
+            raise
+
+    @staticmethod
+    def _date_time(modified: Optional[datetime]):
+        if modified is None:
+            modified = datetime.now()
+        return max(modified.timetuple()[:6], _ZIP_EPOCH)
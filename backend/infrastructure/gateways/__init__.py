@@ -51,18 +51,24 @@ class IPaymentGateway(ABC):
 
 
 class PaymentGatewayFactory:
-    """Factory to create payment gateways"""
+    """
+    Factory to create payment gateways
+    Gateways that call their provider over HTTP share one pooled transport.
+    """
     
     @staticmethod
-    def create(provider: str) -> IPaymentGateway:
+    def create(provider: str, transport=None) -> IPaymentGateway:
+        from .transport import get_gateway_transport
+        
         if provider == "momo":
             from .momo_gateway import MoMoGateway
-            return MoMoGateway()
+            return MoMoGateway(transport or get_gateway_transport())
         elif provider == "vnpay":
+            # Redirect-only: VNPay has no server-to-server call
             from .vnpay_gateway import VNPayGateway
             return VNPayGateway()
         elif provider == "zalopay":
             from .zalopay_gateway import ZaloPayGateway
-            return ZaloPayGateway()
+            return ZaloPayGateway(transport or get_gateway_transport())
         else:
             raise ValueError(f"Unknown payment provider: {provider}")
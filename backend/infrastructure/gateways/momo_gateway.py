@@ -4,15 +4,17 @@ MoMo Payment Gateway Implementation
 import os
 import hashlib
 import hmac
-import requests
 from datetime import datetime
+from typing import Optional
 from . import IPaymentGateway, CreatePaymentRequest, CreatePaymentResponse, VerifyIPNRequest, VerifyIPNResponse
+from .transport import GatewayTransport, get_gateway_transport
 
 
 class MoMoGateway(IPaymentGateway):
     """MoMo Payment Gateway"""
     
-    def __init__(self):
+    def __init__(self, transport: Optional[GatewayTransport] = None):
+        self.transport = transport or get_gateway_transport()
         self.access_key = os.getenv("MOMO_ACCESS_KEY", "")
         self.secret_key = os.getenv("MOMO_SECRET_KEY", "")
         self.partner_code = os.getenv("MOMO_PARTNER_CODE", "MOMO")
@@ -62,14 +64,14 @@ class MoMoGateway(IPaymentGateway):
             "lang": "vi"
         }
         
-        response = requests.post(
+        # Not retried once sent: a create the gateway already accepted would come back as a
+        # duplicate orderId instead of the payUrl (connect failures are still retried)
+        data = self.transport.post_json(
+            "momo",
             f"{self.endpoint}/v2/gateway/api/create",
-            json=payload,
-            headers={"Content-Type": "application/json"}
+            payload
         )
         
-        data = response.json()
-        
         if data.get("resultCode") != 0:
             raise Exception(f"MoMo error: {data.get('message', 'Unknown error')}")
         
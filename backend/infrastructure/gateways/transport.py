@@ -0,0 +1,214 @@
+"""
+Gateway Transport - Shared HTTP client for the payment gateways
+One keep-alive connection pool per process (per gateway host), bounded
+connect/read timeouts, retries with full jitter for calls that are safe to
+repeat, and per-provider latency / error histograms, written to the log as a
+one-line summary per provider every GATEWAY_HTTP_METRICS_LOG_SECONDS.
+"""
+from typing import Dict, Any, Optional, Tuple
+from decouple import config
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+import requests
+import threading
+import random
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the latency buckets; the last bucket is open-ended
+LATENCY_BUCKETS_MS = (25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+RETRYABLE_STATUS = frozenset({429, 502, 503, 504})
+
+
+class GatewayTransportError(Exception):
+    """Gateway could not be reached or kept failing after the allowed attempts"""
+
+    def __init__(self, provider: str, message: str, attempts: int, status_code: Optional[int] = None):
+        super().__init__(f"{provider}: {message} (after {attempts} attempt(s))")
+        self.provider = provider
+        self.attempts = attempts
+        self.status_code = status_code
+
+
+class LatencyHistogram:
+    """Cumulative request count per latency bucket, plus outcome counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.outcomes: Dict[str, int] = {}
+
+    def observe(self, latency_ms: float, outcome: str) -> None:
+        index = next((i for i, bound in enumerate(LATENCY_BUCKETS_MS) if latency_ms <= bound), len(LATENCY_BUCKETS_MS))
+        with self._lock:
+            self.buckets[index] += 1
+            self.count += 1
+            self.total_ms += latency_ms
+            self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile (None if empty or in the open bucket)"""
+        with self._lock:
+            if not self.count:
+                return None
+            rank = q * self.count
+            seen = 0
+            for i, n in enumerate(self.buckets):
+                seen += n
+                if seen >= rank:
+                    return float(LATENCY_BUCKETS_MS[i]) if i < len(LATENCY_BUCKETS_MS) else None
+        return None
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            labels = [f"le_{bound}" for bound in LATENCY_BUCKETS_MS] + ["le_inf"]
+            data = {
+                "count": self.count,
+                "mean_ms": round(self.total_ms / self.count, 1) if self.count else 0.0,
+                "buckets": dict(zip(labels, self.buckets)),
+                "outcomes": dict(self.outcomes),
+            }
+        data["p50_ms"] = self.quantile(0.5)
+        data["p95_ms"] = self.quantile(0.95)
+        return data
+
+
+class GatewayTransport:
+    """
+    Thread-safe: requests.Session with a pooled HTTPAdapter is shared by all
+    gateway instances, so payments reuse warm TLS connections.
+    """
+
+    def __init__(self, connect_timeout: float = 3.05, read_timeout: float = 10.0, max_attempts: int = 3,
+                 backoff_base: float = 0.2, backoff_cap: float = 2.0, pool_size: int = 20,
+                 metrics_log_interval: float = 0):
+        self.timeout: Tuple[float, float] = (connect_timeout, read_timeout)
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.session = requests.Session()
+        # Retries are done here (with metrics), not by urllib3
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        # Seconds between metric summaries in the log (0 = never)
+        self.metrics_log_interval = metrics_log_interval
+        self._metrics_logged_at = time.monotonic()
+
+    def post_json(self, provider: str, url: str, payload: Dict[str, Any], idempotent: bool = False) -> Dict[str, Any]:
+        """
+        POST `payload` as JSON and return the decoded JSON body.
+
+        Connect failures are always retried (nothing reached the gateway);
+        read timeouts, dropped connections and 429/502/503/504 only when
+        `idempotent`. Other responses are returned as decoded JSON.
+        """
+        attempt = 0
+        while True:
+            attempt += 1
+            started = time.perf_counter()
+            try:
+                response = self.session.post(url, json=payload, timeout=self.timeout)
+            except requests.exceptions.ConnectTimeout as e:
+                self._observe(provider, started, "connect_timeout")
+                retryable, reason, status = True, f"connect timeout: {e}", None
+            except requests.exceptions.Timeout as e:
+                self._observe(provider, started, "read_timeout")
+                retryable, reason, status = idempotent, f"read timeout: {e}", None
+            except requests.exceptions.ConnectionError as e:
+                self._observe(provider, started, "connection_error")
+                retryable, reason, status = idempotent or self._never_sent(e), f"connection error: {e}", None
+            else:
+                status = response.status_code
+                if status in RETRYABLE_STATUS or status >= 500:
+                    self._observe(provider, started, f"http_{status}")
+                    retryable, reason = idempotent and status in RETRYABLE_STATUS, f"HTTP {status}"
+                else:
+                    try:
+                        data = response.json()
+                    except ValueError:
+                        self._observe(provider, started, "bad_response")
+                        raise GatewayTransportError(provider, f"non-JSON response (HTTP {status})", attempt, status)
+                    self._observe(provider, started, "ok" if status < 400 else f"http_{status}")
+                    return data
+
+            if not retryable or attempt >= self.max_attempts:
+                raise GatewayTransportError(provider, reason, attempt, status)
+            delay = self._backoff(attempt)
+            logger.warning(f"[{provider}] {reason}; retry {attempt}/{self.max_attempts - 1} in {delay:.2f}s")
+            time.sleep(delay)
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Per-provider histogram snapshot"""
+        with self._lock:
+            histograms = dict(self._histograms)
+        return {provider: histogram.snapshot() for provider, histogram in histograms.items()}
+
+    def log_metrics(self) -> None:
+        """One INFO line per provider: request count, mean / p50 / p95 latency and outcomes"""
+        for provider, snapshot in sorted(self.metrics().items()):
+            logger.info(
+                f"[{provider}] gateway calls={snapshot['count']} mean={snapshot['mean_ms']}ms "
+                f"p50<={snapshot['p50_ms']}ms p95<={snapshot['p95_ms']}ms outcomes={snapshot['outcomes']}"
+            )
+
+    def reset_metrics(self) -> None:
+        with self._lock:
+            self._histograms = {}
+
+    def close(self) -> None:
+        self.session.close()
+
+    def _backoff(self, attempt: int) -> float:
+        """Full jitter: uniform in [0, min(cap, base * 2^(attempt-1))]"""
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * (2 ** (attempt - 1))))
+
+    def _observe(self, provider: str, started: float, outcome: str) -> None:
+        with self._lock:
+            histogram = self._histograms.get(provider)
+            if histogram is None:
+                histogram = self._histograms[provider] = LatencyHistogram()
+        histogram.observe((time.perf_counter() - started) * 1000, outcome)
+        self._maybe_log_metrics()
+
+    def _maybe_log_metrics(self) -> None:
+        if self.metrics_log_interval <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if now - self._metrics_logged_at < self.metrics_log_interval:
+                return
+            self._metrics_logged_at = now
+        self.log_metrics()
+
+    @staticmethod
+    def _never_sent(error: requests.exceptions.ConnectionError) -> bool:
+        """True when the connection could not be opened, i.e. the request never left"""
+        cause = error.args[0] if error.args else None
+        return isinstance(getattr(cause, "reason", cause), NewConnectionError)
+
+
+# Singleton instance
+_gateway_transport = None
+
+
+def get_gateway_transport() -> GatewayTransport:
+    """Get the shared gateway transport (configured from GATEWAY_HTTP_* settings)"""
+    global _gateway_transport
+    if _gateway_transport is None:
+        _gateway_transport = GatewayTransport(
+            connect_timeout=config('GATEWAY_HTTP_CONNECT_TIMEOUT', default=3.05, cast=float),
+            read_timeout=config('GATEWAY_HTTP_READ_TIMEOUT', default=10.0, cast=float),
+            max_attempts=config('GATEWAY_HTTP_MAX_ATTEMPTS', default=3, cast=int),
+            backoff_base=config('GATEWAY_HTTP_BACKOFF_BASE', default=0.2, cast=float),
+            backoff_cap=config('GATEWAY_HTTP_BACKOFF_CAP', default=2.0, cast=float),
+            pool_size=config('GATEWAY_HTTP_POOL_SIZE', default=20, cast=int),
+            metrics_log_interval=config('GATEWAY_HTTP_METRICS_LOG_SECONDS', default=300, cast=float),
+        )
+    return _gateway_transport
@@ -5,15 +5,17 @@ import os
 import hashlib
 import hmac
 import json
-import requests
 from datetime import datetime
+from typing import Optional
 from . import IPaymentGateway, CreatePaymentRequest, CreatePaymentResponse, VerifyIPNRequest, VerifyIPNResponse
+from .transport import GatewayTransport, get_gateway_transport
 
 
 class ZaloPayGateway(IPaymentGateway):
     """ZaloPay Payment Gateway"""
     
-    def __init__(self):
+    def __init__(self, transport: Optional[GatewayTransport] = None):
+        self.transport = transport or get_gateway_transport()
         self.app_id = os.getenv("ZALOPAY_APP_ID", "")
         self.key1 = os.getenv("ZALOPAY_KEY1", "")
         self.key2 = os.getenv("ZALOPAY_KEY2", "")
@@ -67,13 +69,13 @@ class ZaloPayGateway(IPaymentGateway):
         print(f"[ZALOPAY] Request payload: {json.dumps(payload, indent=2)}")
         print(f"[ZALOPAY] Redirect URL in embed_data: {request.redirect_url}")
         
-        response = requests.post(
+        # Not retried once sent: a create ZaloPay already accepted would come back as a
+        # duplicate app_trans_id instead of the order_url (connect failures are still retried)
+        result = self.transport.post_json(
+            "zalopay",
             f"{self.endpoint}/v2/create",
-            json=payload,
-            headers={"Content-Type": "application/json"}
+            payload
         )
-        
-        result = response.json()
         print(f"[ZALOPAY] Response: {json.dumps(result, indent=2)}")
         
         if result.get("return_code") != 1:
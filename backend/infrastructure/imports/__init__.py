@@ -0,0 +1,7 @@
+from .tabular import read_table, normalize_header, TableFormatError
+
+__all__ = [
+    'read_table',
+    'normalize_header',
+    'TableFormatError',
+]
@@ -0,0 +1,148 @@
+"""
+Tabular reader for uploaded import files (.csv / .xlsx)
+The first sheet of a workbook is read with iterparse, one row at a time, and
+cleared as it goes; the shared-strings table is the only part held in memory.
+Rows come out as (row number, {normalised header: text}) so error reports
+can point at the line the user sees in Excel.
+"""
+import codecs
+import csv
+import posixpath
+import re
+import unicodedata
+import zipfile
+from typing import Dict, Iterator, List, Tuple, BinaryIO
+from xml.etree import ElementTree
+
+_MAIN = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_REL = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+_PKG_REL = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+_CELL_REF = re.compile(r'([A-Z]+)(\d+)')
+_FOLD = str.maketrans({'đ': 'd', 'Đ': 'D'})
+
+Row = Tuple[int, Dict[str, str]]
+
+
+class TableFormatError(ValueError):
+    pass
+
+
+def normalize_header(value: str) -> str:
+    """'Mã số sinh viên' / 'ma_so_sinh_vien' / 'maSoSinhVien' -> 'masosinhvien'"""
+    text = unicodedata.normalize('NFD', str(value or '').translate(_FOLD))
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return re.sub(r'[^a-z0-9]', '', text.lower())
+
+
+def read_table(file: BinaryIO, filename: str) -> Iterator[Row]:
+    name = (filename or '').lower()
+    if name.endswith('.csv'):
+        rows = _csv_rows(file)
+    elif name.endswith('.xlsx'):
+        rows = _xlsx_rows(file)
+    else:
+        raise TableFormatError("Chỉ hỗ trợ file .xlsx hoặc .csv")
+    return _with_header(rows)
+
+
+def _with_header(rows: Iterator[Tuple[int, List[str]]]) -> Iterator[Row]:
+    header = None
+    try:
+        for number, values in rows:
+            if not any(v.strip() for v in values):
+                continue
+            if header is None:
+                header = [normalize_header(v) for v in values]
+                continue
+            yield number, {
+                key: values[i].strip() if i < len(values) else ''
+                for i, key in enumerate(header) if key
+            }
+    except (csv.Error, ElementTree.ParseError) as e:
+        raise TableFormatError(f"File không đọc được: {e}")
+    if header is None:
+        raise TableFormatError("File không có dữ liệu")
+
+
+def _csv_rows(file: BinaryIO) -> Iterator[Tuple[int, List[str]]]:
+    text = codecs.getreader('utf-8-sig')(file, errors='replace')
+    for number, values in enumerate(csv.reader(text), start=1):
+        yield number, values
+
+
+def _column_index(ref: str) -> int:
+    index = 0
+    for ch in ref:
+        index = index * 26 + ord(ch) - 64
+    return index - 1
+
+
+def _text(element) -> str:
+    return ''.join(t.text or '' for t in element.iter(f'{_MAIN}t'))
+
+
+def _first_sheet(archive: zipfile.ZipFile) -> str:
+    workbook = ElementTree.fromstring(archive.read('xl/workbook.xml'))
+    sheet = workbook.find(f'{_MAIN}sheets/{_MAIN}sheet')
+    if sheet is None:
+        raise TableFormatError("Workbook không có sheet nào")
+    rel_id = sheet.get(f'{_REL}id')
+    rels = ElementTree.fromstring(archive.read('xl/_rels/workbook.xml.rels'))
+    for rel in rels.iter(f'{_PKG_REL}Relationship'):
+        if rel.get('Id') == rel_id:
+            target = rel.get('Target')
+            return target.lstrip('/') if target.startswith('/') else posixpath.normpath(posixpath.join('xl', target))
+    raise TableFormatError("Workbook không hợp lệ")
+
+
+def _shared_strings(archive: zipfile.ZipFile) -> List[str]:
+    if 'xl/sharedStrings.xml' not in archive.namelist():
+        return []
+    strings = []
+    with archive.open('xl/sharedStrings.xml') as source:
+        for _, element in ElementTree.iterparse(source):
+            if element.tag == f'{_MAIN}si':
+                strings.append(_text(element))
+                element.clear()
+    return strings
+
+
+def _cell_value(cell, strings: List[str]) -> str:
+    kind = cell.get('t')
+    if kind == 'inlineStr':
+        return _text(cell)
+    value = cell.find(f'{_MAIN}v')
+    raw = value.text if value is not None and value.text else ''
+    if kind == 's':
+        return strings[int(raw)] if raw else ''
+    if kind == 'b':
+        return 'true' if raw == '1' else 'false'
+    if kind not in ('str', 'e') and raw.endswith('.0'):
+        # Whole numbers (MSSV typed as a number) without Excel's trailing .0
+        return raw[:-2]
+    return raw
+
+
+def _xlsx_rows(file: BinaryIO) -> Iterator[Tuple[int, List[str]]]:
+    try:
+        archive = zipfile.ZipFile(file)
+        sheet = _first_sheet(archive)
+        strings = _shared_strings(archive)
+        source = archive.open(sheet)
+    except (zipfile.BadZipFile, KeyError, ElementTree.ParseError):
+        raise TableFormatError("File .xlsx không hợp lệ")
+
+    with archive, source:
+        number = 0
+        for _, element in ElementTree.iterparse(source):
+            if element.tag != f'{_MAIN}row':
+                continue
+            number = int(element.get('r') or number + 1)
+            values: List[str] = []
+            for cell in element.iter(f'{_MAIN}c'):
+                match = _CELL_REF.match(cell.get('r') or '')
+                index = _column_index(match.group(1)) if match else len(values)
+                values.extend([''] * (index - len(values)))
+                values.append(_cell_value(cell, strings))
+            element.clear()
+            yield number, values
@@ -8,3 +8,7 @@ class PersistenceConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'infrastructure.persistence'
     verbose_name = 'Infrastructure Persistence'
+
+    def ready(self):
+        from infrastructure.persistence.payment.ipn_inbox_worker import start_ipn_inbox_worker
+        start_ipn_inbox_worker()
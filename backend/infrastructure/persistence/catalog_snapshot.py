@@ -0,0 +1,82 @@
+"""
+Catalog Snapshot - Shared per-học kỳ class catalog
+The class list shown to students is the same for everyone except the live
+seat counters and each student's own registrations, so it is built once per
+học kỳ and reused until the classes or the TKB change.
+
+A snapshot is tagged with the TKB read model version it was built from
+(TLK writes bump it whenever classes are scheduled), expires after
+CATALOG_SNAPSHOT_SECONDS, and is dropped explicitly by `invalidate()` when
+classes change in PostgreSQL.
+"""
+from typing import Optional, Dict, Any, Callable, Tuple
+from decouple import config
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogSnapshotStore:
+    """Process-wide, single-flight store of per-học kỳ catalog snapshots"""
+
+    def __init__(self, ttl: Optional[float] = None):
+        self.ttl = ttl if ttl is not None else config('CATALOG_SNAPSHOT_SECONDS', default=300, cast=float)
+        self._lock = threading.Lock()
+        self._snapshots: Dict[str, Tuple[Any, Any, float]] = {}
+        self._build_locks: Dict[str, threading.Lock] = {}
+
+    def _fresh(self, hoc_ky_id: str, version: Any) -> Optional[Any]:
+        with self._lock:
+            cached = self._snapshots.get(hoc_ky_id)
+        if cached and cached[1] == version and time.monotonic() < cached[2]:
+            return cached[0]
+        return None
+
+    def get(self, hoc_ky_id: str, version: Any, builder: Callable[[], Any]) -> Any:
+        """
+        Snapshot for (hoc_ky_id, version), building it with `builder()` if
+        missing or stale. Concurrent misses for the same học kỳ wait for a
+        single build instead of all hitting the database.
+        """
+        hoc_ky_id = str(hoc_ky_id)
+        if self.ttl <= 0:
+            return builder()
+
+        snapshot = self._fresh(hoc_ky_id, version)
+        if snapshot is not None:
+            return snapshot
+
+        with self._lock:
+            build_lock = self._build_locks.setdefault(hoc_ky_id, threading.Lock())
+
+        with build_lock:
+            snapshot = self._fresh(hoc_ky_id, version)
+            if snapshot is not None:
+                return snapshot
+
+            snapshot = builder()
+            logger.debug(f"Built catalog snapshot for HK {hoc_ky_id} (TKB v{version})")
+            with self._lock:
+                self._snapshots[hoc_ky_id] = (snapshot, version, time.monotonic() + self.ttl)
+            return snapshot
+
+    def invalidate(self, hoc_ky_id: Optional[str] = None) -> None:
+        with self._lock:
+            if hoc_ky_id is None:
+                self._snapshots.clear()
+            else:
+                self._snapshots.pop(str(hoc_ky_id), None)
+
+
+# Singleton instance
+_catalog_snapshot_store = None
+
+
+def get_catalog_snapshot_store() -> CatalogSnapshotStore:
+    """Get catalog snapshot store singleton"""
+    global _catalog_snapshot_store
+    if _catalog_snapshot_store is None:
+        _catalog_snapshot_store = CatalogSnapshotStore()
+    return _catalog_snapshot_store
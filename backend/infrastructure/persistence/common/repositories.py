@@ -6,6 +6,7 @@ Concrete implementations of common repository interfaces
 from typing import Optional, List, Any
 from infrastructure.persistence.models import HocKy, NienKhoa, NganhHoc as Nganh
 from application.common.interfaces import IHocKyRepository, INienKhoaRepository, INganhRepository
+from infrastructure.persistence.config_cache import get_config_cache
 
 
 class HocKyRepository(IHocKyRepository):
@@ -13,9 +14,8 @@ class HocKyRepository(IHocKyRepository):
     
     def find_hien_hanh(self) -> Optional[HocKy]:
         """Find the current active semester"""
-        return HocKy.objects.using('neon').filter(
-            trang_thai_hien_tai=True
-        ).select_related('id_nien_khoa').first()
+        from infrastructure.persistence.enrollment.repositories import load_current_hoc_ky
+        return get_config_cache().current_hoc_ky(load_current_hoc_ky)
     
     def find_by_id(self, id: str) -> Optional[HocKy]:
         """Find semester by ID"""
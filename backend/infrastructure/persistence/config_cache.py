@@ -0,0 +1,175 @@
+"""
+Config Cache - Current học kỳ and phase lookups
+These rows change only when PDT toggles a phase or sets the current học kỳ,
+yet are read on almost every student request.
+
+Cached values:
+- the current HocKy (with id_nien_khoa)
+- the enabled KyPhase rows of a học kỳ, with their start_at/end_at windows,
+  so the active phase is picked in memory as time passes
+
+Backends (CONFIG_CACHE_BACKEND):
+- 'local'  : per-process dict (default)
+- 'django' : the Django cache alias CONFIG_CACHE_ALIAS, shared by workers
+             when it points at a shared store
+
+The PDT use cases that change these rows call `invalidate(...)`. With the
+local backend other workers pick the change up within CONFIG_CACHE_SECONDS.
+"""
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Callable, Tuple
+from decouple import config
+from django.utils import timezone
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+CURRENT_HOC_KY_KEY = 'config:hoc_ky_hien_hanh'
+
+
+def phase_key(hoc_ky_id: str) -> str:
+    return f"config:ky_phase:{hoc_ky_id}"
+
+
+class LocalConfigBackend:
+    """In-process TTL store"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values: Dict[str, Tuple[Any, float]] = {}
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            cached = self._values.get(key)
+            if cached is None:
+                return None
+            if time.monotonic() >= cached[1]:
+                self._values.pop(key, None)
+                return None
+            return cached[0]
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._values[key] = (value, time.monotonic() + ttl)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._values.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class DjangoConfigBackend:
+    """
+    Django cache framework store (LocMemCache by default, Redis/Memcached
+    in a multi-worker deployment). `clear()` empties the whole alias, so the
+    alias should be dedicated to this cache.
+    """
+
+    def __init__(self, alias: Optional[str] = None):
+        self.alias = alias or config('CONFIG_CACHE_ALIAS', default='config')
+
+    @property
+    def cache(self):
+        from django.core.cache import caches
+        return caches[self.alias]
+
+    def get(self, key: str) -> Optional[Any]:
+        return self.cache.get(key)
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self.cache.set(key, value, timeout=ttl)
+
+    def delete(self, key: str) -> None:
+        self.cache.delete(key)
+
+    def clear(self) -> None:
+        self.cache.clear()
+
+
+def is_phase_open(phase: Any, now: datetime) -> bool:
+    """True if `now` lies inside the phase's start_at/end_at window (missing bounds are open)"""
+    start_at = getattr(phase, 'start_at', None)
+    end_at = getattr(phase, 'end_at', None)
+    if start_at is not None:
+        if timezone.is_naive(start_at):
+            start_at = timezone.make_aware(start_at)
+        if now < start_at:
+            return False
+    if end_at is not None:
+        if timezone.is_naive(end_at):
+            end_at = timezone.make_aware(end_at)
+        if now > end_at:
+            return False
+    return True
+
+
+class ConfigCache:
+    """Cache of current học kỳ / enabled phases; CONFIG_CACHE_SECONDS=0 disables it"""
+
+    def __init__(self, backend=None, ttl: Optional[float] = None):
+        self.ttl = ttl if ttl is not None else config('CONFIG_CACHE_SECONDS', default=30, cast=float)
+        if backend is None:
+            kind = config('CONFIG_CACHE_BACKEND', default='local')
+            backend = DjangoConfigBackend() if kind == 'django' else LocalConfigBackend()
+        self.backend = backend
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def _get_or_load(self, key: str, loader: Callable[[], Any]) -> Any:
+        if not self.enabled:
+            return loader()
+
+        # Values are wrapped in a tuple so that "no row" is cached as well
+        cached = self.backend.get(key)
+        if cached is not None:
+            return cached[0]
+
+        value = loader()
+        self.backend.set(key, (value,), self.ttl)
+        return value
+
+    def current_hoc_ky(self, loader: Callable[[], Any]) -> Optional[Any]:
+        return self._get_or_load(CURRENT_HOC_KY_KEY, loader)
+
+    def enabled_phases(self, hoc_ky_id: str, loader: Callable[[], List[Any]]) -> List[Any]:
+        return self._get_or_load(phase_key(hoc_ky_id), loader)
+
+    def current_phase(self, hoc_ky_id: str, loader: Callable[[], List[Any]], now: Optional[datetime] = None) -> Optional[Any]:
+        """First enabled phase whose window contains `now`"""
+        now = now or timezone.now()
+        for phase in self.enabled_phases(hoc_ky_id, loader):
+            if is_phase_open(phase, now):
+                return phase
+        return None
+
+    def invalidate(self, hoc_ky_id: Optional[str] = None, current_hoc_ky: bool = False) -> None:
+        """
+        Drop the phases of `hoc_ky_id` (and the current học kỳ if asked);
+        with no arguments everything is dropped.
+        """
+        if hoc_ky_id is None and not current_hoc_ky:
+            self.backend.clear()
+            return
+        if hoc_ky_id is not None:
+            self.backend.delete(phase_key(str(hoc_ky_id)))
+        if current_hoc_ky:
+            self.backend.delete(CURRENT_HOC_KY_KEY)
+
+
+# Singleton instance
+_config_cache = None
+
+
+def get_config_cache() -> ConfigCache:
+    """Get config cache singleton"""
+    global _config_cache
+    if _config_cache is None:
+        _config_cache = ConfigCache()
+    return _config_cache
@@ -1,8 +1,10 @@
 """
 Infrastructure Layer - Course Registration Repository Implementations
 """
-from typing import Optional, List, Any
-from django.db.models import F
+from typing import Optional, List, Dict, Any
+from django.db.models import F, Q, Value, Exists, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.db.models.lookups import LessThan
 from django.utils import timezone
 from application.course_registration.interfaces import (
     ILopHocPhanRepository,
@@ -11,7 +13,13 @@ from application.course_registration.interfaces import (
     ILichSuDangKyRepository,
     ILichSuDangKyRepository,
     ILichHocDinhKyRepository,
-    IHocPhiRepository
+    IHocPhiRepository,
+    IRegistrationContextRepository,
+    LichHocSlotDTO,
+    RegistrationTargetDTO,
+    RegisteredLopDTO,
+    RegistrationContextDTO,
+    LopHocPhanSeatDTO
 )
 from infrastructure.persistence.models import (
     LopHocPhan,
@@ -20,9 +28,13 @@ from infrastructure.persistence.models import (
     LichSuDangKy,
     ChiTietLichSuDangKy,
     LichHocDinhKy,
+    GhiDanhHocPhan,
+    KyPhase,
     HocPhi,
     TaiLieu
 )
+from infrastructure.persistence.tkb_read_model import get_tkb_read_model
+from domain.course_registration import TKBSession
 import uuid
 
 class LopHocPhanRepository(ILopHocPhanRepository):
@@ -37,6 +49,44 @@ class LopHocPhanRepository(ILopHocPhanRepository):
             so_luong_hien_tai=F('so_luong_hien_tai') + amount
         )
 
+    def try_reserve_slot(self, id: str) -> bool:
+        """
+        Claim one seat with a single conditional UPDATE.
+        The row lock taken by UPDATE serializes concurrent claims, and the
+        WHERE clause is re-evaluated after the lock is acquired, so the class
+        can never go above so_luong_toi_da.
+        """
+        updated = LopHocPhan.objects.using('neon').filter(
+            LessThan(
+                Coalesce(F('so_luong_hien_tai'), Value(0)),
+                Coalesce(F('so_luong_toi_da'), Value(50))
+            ),
+            id=id
+        ).update(
+            so_luong_hien_tai=Coalesce(F('so_luong_hien_tai'), Value(0)) + 1
+        )
+        return updated == 1
+
+    def try_reserve_slots(self, ids: List[str]) -> List[str]:
+        """
+        Claim one seat in each class with a locked read and a single UPDATE.
+        Rows are locked in id order so concurrent carts cannot deadlock, and
+        stay locked until the caller's transaction ends.
+        """
+        rows = LopHocPhan.objects.using('neon').select_for_update().filter(
+            id__in=ids
+        ).order_by('id').values('id', 'so_luong_hien_tai', 'so_luong_toi_da')
+
+        claimable = [
+            str(row['id']) for row in rows
+            if (row['so_luong_hien_tai'] or 0) < (row['so_luong_toi_da'] or 50)
+        ]
+        if claimable:
+            LopHocPhan.objects.using('neon').filter(id__in=claimable).update(
+                so_luong_hien_tai=Coalesce(F('so_luong_hien_tai'), Value(0)) + 1
+            )
+        return claimable
+
     def find_all_by_hoc_ky(self, hoc_ky_id: str) -> List[LopHocPhan]:
         return list(LopHocPhan.objects.using('neon').filter(
             hoc_phan__id_hoc_ky=hoc_ky_id
@@ -50,6 +100,15 @@ class LopHocPhanRepository(ILopHocPhanRepository):
             'lichhocdinhky_set__phong'
         ).order_by('hoc_phan__mon_hoc__ma_mon', 'ma_lop'))
 
+    def find_seat_counts_by_hoc_ky(self, hoc_ky_id: str) -> Dict[str, LopHocPhanSeatDTO]:
+        rows = LopHocPhan.objects.using('neon').filter(
+            hoc_phan__id_hoc_ky=hoc_ky_id
+        ).values_list('id', 'so_luong_hien_tai', 'so_luong_toi_da')
+        return {
+            str(lop_id): LopHocPhanSeatDTO(hien_tai or 0, toi_da or 50)
+            for lop_id, hien_tai, toi_da in rows
+        }
+
     def get_by_mon_hoc_and_hoc_ky(self, mon_hoc_id: str, hoc_ky_id: str) -> List[LopHocPhan]:
         return list(LopHocPhan.objects.using('neon').filter(
             hoc_phan__mon_hoc_id=mon_hoc_id,
@@ -107,9 +166,16 @@ class DangKyHocPhanRepository(IDangKyHocPhanRepository):
         if 'id' not in data:
             data['id'] = uuid.uuid4()
         dang_ky = DangKyHocPhan(**data)
-        dang_ky.save(using='neon')
+        dang_ky.save(using='neon', force_insert=True)
         return dang_ky
 
+    def bulk_create(self, data_list: List[dict]) -> List[DangKyHocPhan]:
+        now = timezone.now()
+        return DangKyHocPhan.objects.using('neon').bulk_create([
+            DangKyHocPhan(**{'id': uuid.uuid4(), 'ngay_dang_ky': now, **data})
+            for data in data_list
+        ])
+
     def find_by_sinh_vien_and_lop_hoc_phan(self, sinh_vien_id: str, lop_hoc_phan_id: str) -> Optional[DangKyHocPhan]:
         return DangKyHocPhan.objects.using('neon').filter(
             sinh_vien_id=sinh_vien_id,
@@ -139,9 +205,15 @@ class DangKyTKBRepository(IDangKyTKBRepository):
         if 'id' not in data:
             data['id'] = uuid.uuid4()
         tkb = DangKyTkb(**data)
-        tkb.save(using='neon')
+        tkb.save(using='neon', force_insert=True)
         return tkb
 
+    def bulk_create(self, data_list: List[dict]) -> None:
+        DangKyTkb.objects.using('neon').bulk_create([
+            DangKyTkb(**{'id': uuid.uuid4(), **data})
+            for data in data_list
+        ])
+
     def delete_by_dang_ky_id(self, dang_ky_id: str) -> None:
         DangKyTkb.objects.using('neon').filter(dang_ky_id=dang_ky_id).delete()
 
@@ -177,6 +249,25 @@ class LichSuDangKyRepository(ILichSuDangKyRepository):
             thoi_gian=timezone.now()
         )
 
+    def bulk_log(self, sinh_vien_id: str, hoc_ky_id: str, dang_ky_hoc_phan_ids: List[str], hanh_dong: str) -> None:
+        lich_su, created = LichSuDangKy.objects.using('neon').get_or_create(
+            sinh_vien_id=sinh_vien_id,
+            hoc_ky_id=hoc_ky_id,
+            defaults={'id': uuid.uuid4()}
+        )
+
+        now = timezone.now()
+        ChiTietLichSuDangKy.objects.using('neon').bulk_create([
+            ChiTietLichSuDangKy(
+                id=uuid.uuid4(),
+                lich_su_dang_ky_id=lich_su.id,
+                dang_ky_hoc_phan_id=dang_ky_hoc_phan_id,
+                hanh_dong=hanh_dong,
+                thoi_gian=now
+            )
+            for dang_ky_hoc_phan_id in dang_ky_hoc_phan_ids
+        ])
+
     def find_by_sinh_vien_and_hoc_ky(self, sinh_vien_id: str, hoc_ky_id: str) -> Optional[LichSuDangKy]:
         try:
             return LichSuDangKy.objects.using('neon').select_related(
@@ -197,6 +288,153 @@ class LichHocDinhKyRepository(ILichHocDinhKyRepository):
             lop_hoc_phan_id=lop_hoc_phan_id
         ).select_related('phong'))
 
+class RegistrationContextRepository(IRegistrationContextRepository):
+    """
+    Loads the registration pre-check data in two statements:
+      1. target classes + current phase + ghi danh / duplicate flags (subqueries)
+      2. weekly sessions of the targets and of every class already in the student's TKB
+    Sessions scheduled by TLK are then merged in from the shared TKB read model.
+    """
+
+    def __init__(self, tkb_read_model=None):
+        self.tkb_read_model = tkb_read_model
+
+    def load(self, sinh_vien_id: str, hoc_ky_id: str, lop_hoc_phan_ids: List[str]) -> RegistrationContextDTO:
+        now = timezone.now()
+        current_phase = KyPhase.objects.using('neon').filter(
+            hoc_ky_id=hoc_ky_id,
+            is_enabled=True,
+            start_at__lte=now,
+            end_at__gte=now
+        ).order_by('pk').values('phase')[:1]
+
+        active_dang_ky = DangKyHocPhan.objects.using('neon').filter(
+            sinh_vien_id=sinh_vien_id,
+            trang_thai='da_dang_ky'
+        )
+
+        # Statement 1
+        rows = list(LopHocPhan.objects.using('neon').filter(
+            id__in=lop_hoc_phan_ids
+        ).annotate(
+            current_phase=Subquery(current_phase),
+            is_ghi_danh=Exists(GhiDanhHocPhan.objects.using('neon').filter(
+                sinh_vien_id=sinh_vien_id,
+                hoc_phan_id=OuterRef('hoc_phan_id')
+            )),
+            is_registered=Exists(active_dang_ky.filter(
+                lop_hoc_phan_id=OuterRef('id')
+            )),
+            has_registered_mon_hoc=Exists(active_dang_ky.filter(
+                lop_hoc_phan__hoc_phan__mon_hoc_id=OuterRef('hoc_phan__mon_hoc_id'),
+                lop_hoc_phan__hoc_phan__id_hoc_ky=hoc_ky_id
+            ))
+        ).values(
+            'id', 'ma_lop', 'hoc_phan_id', 'hoc_phan__ten_hoc_phan', 'hoc_phan__mon_hoc_id',
+            'so_luong_hien_tai', 'so_luong_toi_da',
+            'current_phase', 'is_ghi_danh', 'is_registered', 'has_registered_mon_hoc'
+        ))
+
+        if rows:
+            phase = rows[0]['current_phase']
+        else:
+            # Unknown class ids: still report the phase so the caller keeps its check order
+            phase_rows = list(current_phase)
+            phase = phase_rows[0]['phase'] if phase_rows else None
+
+        context = RegistrationContextDTO(phase=phase)
+        for row in rows:
+            context.targets[str(row['id'])] = RegistrationTargetDTO(
+                lop_hoc_phan_id=str(row['id']),
+                ma_lop=row['ma_lop'],
+                hoc_phan_id=str(row['hoc_phan_id']),
+                ten_hoc_phan=row['hoc_phan__ten_hoc_phan'],
+                mon_hoc_id=str(row['hoc_phan__mon_hoc_id']),
+                so_luong_hien_tai=row['so_luong_hien_tai'] or 0,
+                so_luong_toi_da=row['so_luong_toi_da'] or 50,
+                is_ghi_danh=row['is_ghi_danh'],
+                is_registered=row['is_registered'],
+                has_registered_mon_hoc=row['has_registered_mon_hoc']
+            )
+
+        if not context.targets:
+            return context
+
+        # Statement 2 - LEFT JOIN so classes scheduled only in MongoDB still come back
+        registered_lop_ids = DangKyTkb.objects.using('neon').filter(
+            sinh_vien_id=sinh_vien_id,
+            lop_hoc_phan__hoc_phan__id_hoc_ky=hoc_ky_id
+        ).values('lop_hoc_phan_id')
+
+        lop_rows = LopHocPhan.objects.using('neon').filter(
+            Q(id__in=list(context.targets.keys())) |
+            Q(id__in=Subquery(registered_lop_ids))
+        ).annotate(
+            is_registered_lop=Exists(registered_lop_ids.filter(lop_hoc_phan_id=OuterRef('id')))
+        ).values(
+            'id', 'ma_lop', 'hoc_phan__ten_hoc_phan', 'hoc_phan__mon_hoc__ma_mon',
+            'ngay_bat_dau', 'ngay_ket_thuc', 'is_registered_lop',
+            'lichhocdinhky__thu', 'lichhocdinhky__tiet_bat_dau', 'lichhocdinhky__tiet_ket_thuc'
+        )
+
+        registered = {}
+        lop_keys = {}
+        for row in lop_rows:
+            lop_id = str(row['id'])
+            lop_keys[lop_id] = (row['hoc_phan__mon_hoc__ma_mon'], row['ma_lop'])
+            if row['is_registered_lop'] and lop_id not in registered:
+                registered[lop_id] = RegisteredLopDTO(
+                    lop_hoc_phan_id=lop_id,
+                    ma_lop=row['ma_lop'],
+                    ten_hoc_phan=row['hoc_phan__ten_hoc_phan']
+                )
+            if row['lichhocdinhky__thu'] is None:
+                continue
+            slot = LichHocSlotDTO(
+                thu=row['lichhocdinhky__thu'],
+                tiet_bat_dau=row['lichhocdinhky__tiet_bat_dau'],
+                tiet_ket_thuc=row['lichhocdinhky__tiet_ket_thuc'],
+                ngay_bat_dau=row['ngay_bat_dau'],
+                ngay_ket_thuc=row['ngay_ket_thuc']
+            )
+            if lop_id in context.targets:
+                context.targets[lop_id].lich_hocs.append(slot)
+            if lop_id in registered:
+                registered[lop_id].lich_hocs.append(slot)
+
+        # TLK schedules live only in MongoDB (thoi_khoa_bieu_mon_hoc)
+        for lop_id, slots in self._load_mongo_slots(hoc_ky_id, lop_keys).items():
+            for owner in (context.targets.get(lop_id), registered.get(lop_id)):
+                if owner is None:
+                    continue
+                known = {(s.thu, s.tiet_bat_dau, s.tiet_ket_thuc) for s in owner.lich_hocs}
+                owner.lich_hocs.extend(
+                    s for s in slots if (s.thu, s.tiet_bat_dau, s.tiet_ket_thuc) not in known
+                )
+
+        context.registered_lops = list(registered.values())
+        return context
+
+    def _load_mongo_slots(self, hoc_ky_id: str, lop_keys: dict) -> dict:
+        """Map lop_hoc_phan_id -> sessions from the MongoDB TKB, matched on (ma_mon, ten_lop)"""
+        if not lop_keys:
+            return {}
+
+        semester = (self.tkb_read_model or get_tkb_read_model()).get(hoc_ky_id)
+        slots = {}
+        for lop_id, (ma_mon, ma_lop) in lop_keys.items():
+            for lop in semester.get_sessions(ma_mon, ma_lop):
+                session = TKBSession.from_mongo(lop)
+                if session:
+                    slots.setdefault(lop_id, []).append(LichHocSlotDTO(
+                        thu=session.thu,
+                        tiet_bat_dau=session.tiet_bat_dau,
+                        tiet_ket_thuc=session.tiet_ket_thuc,
+                        ngay_bat_dau=session.ngay_bat_dau,
+                        ngay_ket_thuc=session.ngay_ket_thuc
+                    ))
+        return slots
+
 class HocPhiRepository(IHocPhiRepository):
     def get_hoc_phi_by_sinh_vien(self, sinh_vien_id: str, hoc_ky_id: str) -> Optional[HocPhi]:
         try:
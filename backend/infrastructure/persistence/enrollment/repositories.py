@@ -13,6 +13,7 @@ from infrastructure.persistence.models import (
     GhiDanhHocPhan,
     SinhVien
 )
+from infrastructure.persistence.config_cache import get_config_cache
 import uuid
 
 
@@ -44,12 +45,16 @@ def parse_datetime(dt_str: str) -> datetime:
     raise ValueError(f"Cannot parse datetime: {dt_str}")
 
 
+def load_current_hoc_ky() -> Optional[HocKy]:
+    return HocKy.objects.using('neon').filter(
+        trang_thai_hien_tai=True
+    ).select_related('id_nien_khoa').first()
+
+
 class HocKyRepository(IHocKyRepository):
     def get_current_hoc_ky(self) -> Optional[HocKy]:
         try:
-            return HocKy.objects.using('neon').filter(
-                trang_thai_hien_tai=True
-            ).first()
+            return get_config_cache().current_hoc_ky(load_current_hoc_ky)
         except Exception:
             return None
 
@@ -72,11 +77,15 @@ class HocKyRepository(IHocKyRepository):
 
 class KyPhaseRepository(IKyPhaseRepository):
     def get_current_phase(self, hoc_ky_id: str) -> Optional[KyPhase]:
+        """Enabled phase whose start_at/end_at window contains now"""
         try:
-            return KyPhase.objects.using('neon').filter(
-                hoc_ky_id=hoc_ky_id,
-                is_enabled=True
-            ).first()
+            return get_config_cache().current_phase(
+                str(hoc_ky_id),
+                lambda: list(KyPhase.objects.using('neon').filter(
+                    hoc_ky_id=hoc_ky_id,
+                    is_enabled=True
+                ).order_by('pk'))
+            )
         except Exception:
             return None
 
@@ -14,6 +14,8 @@ from infrastructure.persistence.models import (
     LopHocPhan,
 )
 
+UPSERT_BATCH_SIZE = 1000
+
 
 class GVGradeRepository(IGVGradeRepository):
     """
@@ -45,44 +47,36 @@ class GVGradeRepository(IGVGradeRepository):
     ) -> bool:
         """
         Insert or update grades for students
+        One INSERT ... ON CONFLICT (sinh_vien, mon_hoc, hoc_ky) DO UPDATE for the whole list
         """
         try:
-            # Get LopHocPhan to fetch related info
-            lhp = LopHocPhan.objects.using('neon').select_related(
-                'hoc_phan',
-                'hoc_phan__mon_hoc',
-                'hoc_phan__id_hoc_ky',
-            ).get(id=lhp_id)
+            lhp = LopHocPhan.objects.using('neon').filter(id=lhp_id).values(
+                'hoc_phan__mon_hoc_id', 'hoc_phan__id_hoc_ky_id'
+            ).first()
+            if lhp is None:
+                return False
             
-            mon_hoc_id = lhp.hoc_phan.mon_hoc_id
-            hoc_ky_id = lhp.hoc_phan.id_hoc_ky_id
+            rows = [
+                KetQuaHocPhan(
+                    id=uuid.uuid4(),
+                    sinh_vien_id=grade_data['sinh_vien_id'],
+                    mon_hoc_id=lhp['hoc_phan__mon_hoc_id'],
+                    hoc_ky_id=lhp['hoc_phan__id_hoc_ky_id'],
+                    lop_hoc_phan_id=lhp_id,
+                    diem_so=grade_data['diem_so'],
+                    trang_thai=self._trang_thai(grade_data['diem_so']),
+                )
+                for grade_data in grades
+            ]
             
             with transaction.atomic(using='neon'):
-                for grade_data in grades:
-                    sinh_vien_id = grade_data['sinh_vien_id']
-                    diem_so = grade_data['diem_so']
-                    
-                    # Determine status based on grade (>= 4.0 is passing)
-                    status = 'dat' if (diem_so is not None and diem_so >= 4.0) else 'khong_dat'
-                    
-                    # Upsert using get_or_create + update
-                    ket_qua, created = KetQuaHocPhan.objects.using('neon').get_or_create(
-                        sinh_vien_id=sinh_vien_id,
-                        mon_hoc_id=mon_hoc_id,
-                        hoc_ky_id=hoc_ky_id,
-                        defaults={
-                            'id': uuid.uuid4(),
-                            'lop_hoc_phan_id': lhp_id,
-                            'diem_so': diem_so,
-                            'trang_thai': status,
-                        }
-                    )
-                    
-                    if not created:
-                        # Update existing record
-                        ket_qua.diem_so = diem_so
-                        ket_qua.lop_hoc_phan_id = lhp_id
-                        ket_qua.save(using='neon')
+                KetQuaHocPhan.objects.using('neon').bulk_create(
+                    rows,
+                    batch_size=UPSERT_BATCH_SIZE,
+                    update_conflicts=True,
+                    unique_fields=['sinh_vien', 'mon_hoc', 'hoc_ky'],
+                    update_fields=['diem_so', 'lop_hoc_phan', 'trang_thai'],
+                )
             
             return True
             
@@ -92,6 +86,11 @@ class GVGradeRepository(IGVGradeRepository):
             traceback.print_exc()
             return False
     
+    @staticmethod
+    def _trang_thai(diem_so) -> str:
+        # >= 4.0 is passing
+        return 'dat' if (diem_so is not None and diem_so >= 4.0) else 'khong_dat'
+    
     def validate_students_in_lhp(
         self, 
         lhp_id: str, 
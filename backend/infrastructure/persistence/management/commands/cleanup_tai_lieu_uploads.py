@@ -0,0 +1,38 @@
+"""
+Abort multipart tài liệu uploads that were never completed, freeing their stored parts
+
+    python manage.py cleanup_tai_lieu_uploads
+    python manage.py cleanup_tai_lieu_uploads --older-than-hours 6 --dry-run
+
+Run it from cron; by default an upload is orphaned once its session (TAI_LIEU_UPLOAD_SESSION_HOURS) has expired.
+"""
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+
+from application.tai_lieu.use_cases import CleanupTaiLieuUploadsUseCase
+from infrastructure.persistence.s3_service import get_s3_service
+
+
+class Command(BaseCommand):
+    help = "Abort orphaned multipart tài liệu uploads"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-hours', type=float, help="Default: TAI_LIEU_UPLOAD_SESSION_HOURS")
+        parser.add_argument('--dry-run', action='store_true', help="Only count the orphaned uploads")
+
+    def handle(self, *args, **options):
+        s3_service = get_s3_service()
+        if not s3_service.is_available:
+            raise CommandError("Storage backend is not available")
+
+        hours = options['older_than_hours']
+        use_case = CleanupTaiLieuUploadsUseCase(s3_service)
+        result = use_case.execute(
+            older_than=timedelta(hours=hours) if hours is not None else None,
+            dry_run=options['dry_run']
+        )
+
+        for key in result.data['failed']:
+            self.stderr.write(f"  could not abort {key}")
+        self.stdout.write(f"{result.data['aborted']} aborted, {len(result.data['failed'])} failed "
+                          f"of {result.data['found']} orphaned uploads")
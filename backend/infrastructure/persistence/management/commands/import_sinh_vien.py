@@ -0,0 +1,49 @@
+"""
+Bulk-create sinh viên accounts from a .xlsx / .csv file (a new intake)
+
+    python manage.py import_sinh_vien k50.xlsx
+    python manage.py import_sinh_vien k50.csv --default-password Hcmue@2025 --workers 8 --errors errors.csv
+"""
+import csv
+from django.core.management.base import BaseCommand, CommandError
+
+from application.pdt.use_cases.student_import_use_cases import ImportSinhVienUseCase
+from infrastructure.imports import read_table, TableFormatError
+from infrastructure.persistence.pdt.student_import import StudentImportRepository
+from infrastructure.security.password_hashing import hash_passwords
+
+
+class Command(BaseCommand):
+    help = "Import sinh viên (tai_khoan, users, sinh_vien) from a spreadsheet"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help=".xlsx or .csv with a header row")
+        parser.add_argument('--default-password', help="Mật khẩu for rows that have none")
+        parser.add_argument('--workers', type=int, help="Password hashing processes; default: PASSWORD_HASH_WORKERS")
+        parser.add_argument('--chunk-size', type=int, default=1000, help="Students per insert transaction")
+        parser.add_argument('--errors', metavar='CSV', help="Write the failed rows to this CSV file")
+
+    def handle(self, *args, **options):
+        use_case = ImportSinhVienUseCase(
+            repository=StudentImportRepository(chunk_size=options['chunk_size']),
+            hasher=lambda passwords: hash_passwords(passwords, options['workers']),
+        )
+        try:
+            with open(options['path'], 'rb') as file:
+                result = use_case.execute(read_table(file, options['path']), options['default_password'])
+        except (OSError, TableFormatError) as e:
+            raise CommandError(str(e))
+        if not result.success:
+            raise CommandError(result.message)
+
+        failed = [r for r in result.data['results'] if r['status'] == 'failed']
+        for r in failed[:20]:
+            self.stderr.write(f"  dòng {r['row']} ({r['maSoSinhVien'] or '-'}): {r['error']}")
+        if options['errors'] and failed:
+            with open(options['errors'], 'w', newline='', encoding='utf-8-sig') as out:
+                writer = csv.DictWriter(out, fieldnames=['row', 'maSoSinhVien', 'error'], extrasaction='ignore')
+                writer.writeheader()
+                writer.writerows(failed)
+
+        summary = result.data['summary']
+        self.stdout.write(f"{summary['created']} created, {summary['failed']} failed of {summary['total']} rows")
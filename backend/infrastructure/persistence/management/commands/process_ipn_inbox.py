@@ -0,0 +1,40 @@
+"""
+Drain the payment IPN inbox (for IPN_INBOX_WORKER=external deployments)
+
+    python manage.py process_ipn_inbox            # poll forever
+    python manage.py process_ipn_inbox --once     # drain what is pending and exit
+    python manage.py process_ipn_inbox --once --window-hours 0   # including items older than the poll window
+"""
+import time
+from decouple import config
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from infrastructure.persistence.payment.ipn_inbox_worker import drain_ipn_inbox
+
+
+class Command(BaseCommand):
+    help = "Apply pending payment IPN callbacks from the inbox"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Drain pending items once and exit")
+        parser.add_argument('--batch-size', type=int,
+                            default=config('IPN_INBOX_BATCH_SIZE', default=100, cast=int))
+        parser.add_argument('--poll', type=float,
+                            default=config('IPN_INBOX_POLL_SECONDS', default=5.0, cast=float),
+                            help="Seconds between polls when running continuously")
+        parser.add_argument('--window-hours', type=float, default=None,
+                            help="Only items received this recently; 0 = all (default: IPN_INBOX_WINDOW_HOURS)")
+
+    def handle(self, *args, **options):
+        while True:
+            totals = drain_ipn_inbox(options['batch_size'], options['window_hours'])
+            if any(totals.values()):
+                self.stdout.write(
+                    f"processed={totals['processed']} rejected={totals['rejected']} "
+                    f"failed={totals['failed']} skipped={totals['skipped']}"
+                )
+            if options['once']:
+                return
+            connections.close_all()
+            time.sleep(options['poll'])
@@ -0,0 +1,43 @@
+"""
+Rebuild registration throughput buckets from chi_tiet_lich_su_dang_ky
+(seeds the shared MongoDB store, or repairs it after an outage)
+
+    python manage.py rebuild_registration_rollups                 # current học kỳ, last 24 hours
+    python manage.py rebuild_registration_rollups --hoc-ky <id> --hours 168
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from infrastructure.persistence.models import HocKy
+from infrastructure.persistence.pdt.registration_rollup import get_registration_rollup, bucket_start
+
+
+class Command(BaseCommand):
+    help = "Recompute đăng ký / hủy minute and hour buckets from the registration history"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hoc-ky', dest='hoc_ky_id', metavar='ID', help="Học kỳ to rebuild; default: current học kỳ")
+        parser.add_argument('--hours', type=float, default=24, help="How far back to rebuild")
+
+    def handle(self, *args, **options):
+        rollup = get_registration_rollup()
+        if rollup.reread:
+            self.stdout.write("Rollups are read straight from the history table (no MongoDB store); nothing to rebuild")
+            return
+
+        hoc_ky_id = options['hoc_ky_id']
+        if not hoc_ky_id:
+            current = HocKy.objects.using('neon').filter(trang_thai_hien_tai=True).values_list('id', flat=True).first()
+            if current is None:
+                raise CommandError("No current học kỳ; pass --hoc-ky")
+            hoc_ky_id = str(current)
+
+        until = timezone.now()
+        # Whole hours: the first hour bucket is replaced entirely, so it is re-counted from its start
+        since = datetime.fromtimestamp(bucket_start(until - timedelta(hours=options['hours']), 'hour'), dt_timezone.utc)
+        counts = rollup.rebuild(hoc_ky_id, since, until)
+        self.stdout.write(
+            f"HK {hoc_ky_id}: rebuilt {counts['minute']} minute and {counts['hour']} hour buckets "
+            f"since {since.isoformat()}"
+        )
@@ -0,0 +1,81 @@
+"""
+Reconcile PaymentTransactions against HocPhi (suitable for a nightly cron)
+
+    python manage.py reconcile_payments                       # current học kỳ, report only
+    python manage.py reconcile_payments --hoc-ky <id> --fix
+    python manage.py reconcile_payments --all --output mismatches.csv --json
+"""
+import csv
+import json
+from datetime import timedelta
+from decouple import config
+from django.core.management.base import BaseCommand, CommandError
+
+from infrastructure.persistence.models import HocKy
+from infrastructure.persistence.payment.reconciliation import PaymentReconciler, Mismatch
+
+
+class Command(BaseCommand):
+    help = "Detect (and optionally fix) payment status mismatches between PaymentTransactions and HocPhi"
+
+    def add_arguments(self, parser):
+        target = parser.add_mutually_exclusive_group()
+        target.add_argument('--hoc-ky', action='append', dest='hoc_ky_ids', metavar='ID',
+                            help="Học kỳ to check (repeatable); default: current học kỳ")
+        target.add_argument('--all', action='store_true', help="Check every học kỳ")
+        parser.add_argument('--fix', action='store_true',
+                            help="Mark paid HocPhi as da_thanh_toan and expire stale pending transactions")
+        parser.add_argument('--stale-minutes', type=int,
+                            default=config('PAYMENT_PENDING_STALE_MINUTES', default=60, cast=int))
+        parser.add_argument('--batch-size', type=int, default=1000, help="Rows per fix UPDATE")
+        parser.add_argument('--chunk-size', type=int, default=2000, help="Rows fetched per cursor round trip")
+        parser.add_argument('--output', metavar='CSV', help="Write every mismatch to this CSV file")
+        parser.add_argument('--json', action='store_true', help="Print the summary as JSON")
+
+    def handle(self, *args, **options):
+        hoc_ky_ids = self._hoc_ky_ids(options)
+        reconciler = PaymentReconciler(
+            stale_after=timedelta(minutes=options['stale_minutes']),
+            fix=options['fix'],
+            batch_size=options['batch_size'],
+            chunk_size=options['chunk_size'],
+        )
+
+        output = open(options['output'], 'w', newline='', encoding='utf-8') if options['output'] else None
+        writer = csv.writer(output) if output else None
+        if writer:
+            writer.writerow(['kind', 'hoc_ky_id', 'sinh_vien_id', 'hoc_phi_id', 'order_id', 'detail'])
+
+        def on_mismatch(m: Mismatch):
+            if writer:
+                writer.writerow([m.kind, m.hoc_ky_id, m.sinh_vien_id, m.hoc_phi_id or '', m.order_id or '', m.detail])
+
+        try:
+            reports = [reconciler.run(hoc_ky_id, on_mismatch).to_dict() for hoc_ky_id in hoc_ky_ids]
+        finally:
+            if output:
+                output.close()
+
+        if options['json']:
+            self.stdout.write(json.dumps(reports, indent=2))
+            return
+        for report in reports:
+            self.stdout.write(
+                f"HK {report['hocKyId']}: {report['transactionsScanned']} transactions, "
+                f"{report['hocPhiScanned']} hoc_phi"
+            )
+            for kind, count in report['mismatches'].items():
+                fixed = report['fixed'].get(kind)
+                suffix = f" (fixed {fixed})" if options['fix'] and fixed is not None else ""
+                self.stdout.write(f"  {kind:<24} {count}{suffix}")
+
+    def _hoc_ky_ids(self, options):
+        if options['hoc_ky_ids']:
+            return options['hoc_ky_ids']
+        queryset = HocKy.objects.using('neon')
+        if not options['all']:
+            queryset = queryset.filter(trang_thai_hien_tai=True)
+        ids = [str(hoc_ky_id) for hoc_ky_id in queryset.order_by('id').values_list('id', flat=True)]
+        if not ids:
+            raise CommandError("No current học kỳ; pass --hoc-ky or --all")
+        return ids
@@ -395,6 +395,7 @@ class MongoDBService:
             )
             
             logger.info(f"✅ TKB saved for {ma_hoc_phan} in HK {hoc_ky_id} (total {len(merged_lops)} sessions)")
+            self._on_tkb_changed(hoc_ky_id)
             return True
             
         except Exception as e:
@@ -435,12 +436,47 @@ class MongoDBService:
                     'updated_at': self._get_current_time()
                 })
             
+            self._on_tkb_changed(hoc_ky_id)
             return True
             
         except Exception as e:
             logger.error(f"Failed to add lop to TKB: {e}")
             return False
     
+    # ============ TKB VERSIONS ============
+    # Collection: tkb_versions - { _id: hoc_ky_id, version: int }
+    # Bumped on every TKB write so per-process read models can tell they are stale
+    
+    TKB_VERSION_COLLECTION = 'tkb_versions'
+    
+    def get_tkb_version(self, hoc_ky_id: str) -> int:
+        """Current TKB version of a học kỳ (0 if never written)"""
+        if not self.is_available:
+            return 0
+        
+        try:
+            doc = self.db[self.TKB_VERSION_COLLECTION].find_one({'_id': str(hoc_ky_id)})
+            return doc.get('version', 0) if doc else 0
+        except Exception as e:
+            logger.error(f"Failed to get TKB version: {e}")
+            return 0
+    
+    def bump_tkb_version(self, hoc_ky_id: str) -> None:
+        try:
+            self.db[self.TKB_VERSION_COLLECTION].update_one(
+                {'_id': str(hoc_ky_id)},
+                {'$inc': {'version': 1}, '$set': {'updated_at': self._get_current_time()}},
+                upsert=True
+            )
+        except Exception as e:
+            logger.error(f"Failed to bump TKB version: {e}")
+    
+    def _on_tkb_changed(self, hoc_ky_id: str) -> None:
+        """Invalidate the shared TKB read model (other workers see the new version)"""
+        from infrastructure.persistence.tkb_read_model import get_tkb_read_model
+        self.bump_tkb_version(hoc_ky_id)
+        get_tkb_read_model().invalidate(hoc_ky_id)
+    
     def get_tkb_for_lop(self, ma_hoc_phan: str, hoc_ky_id: str, ten_lop: str) -> Optional[Dict]:
         """
         Get TKB info for a specific class
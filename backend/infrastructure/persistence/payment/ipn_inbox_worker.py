@@ -0,0 +1,116 @@
+"""
+IPN Inbox Worker - Drains the payment IPN inbox off the request path
+The IPN view only enqueues and acknowledges; this worker applies pending
+items. IPN_INBOX_WORKER=thread runs it in every serving process, started
+with the app (woken on enqueue, with a periodic poll as a safety net);
+IPN_INBOX_WORKER=external leaves draining to `manage.py process_ipn_inbox`.
+"""
+from typing import Optional
+from decouple import config
+from django.db import connections
+import os
+import sys
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def drain_ipn_inbox(batch_size: int, window_hours: Optional[float] = None) -> dict:
+    """Process pending inbox items until a batch comes back empty; returns totals"""
+    from application.payment.ipn_inbox_use_cases import ProcessIPNInboxUseCase
+    from infrastructure.persistence.payment.repositories import (
+        PaymentIpnInboxRepository, PaymentRepository, HocPhiPaymentRepository
+    )
+
+    use_case = ProcessIPNInboxUseCase(
+        PaymentIpnInboxRepository(window_hours),
+        PaymentRepository(),
+        HocPhiPaymentRepository()
+    )
+    totals = {"processed": 0, "rejected": 0, "failed": 0, "skipped": 0}
+    while True:
+        counts = use_case.execute(batch_size).data
+        for key, value in counts.items():
+            totals[key] += value
+        # Stop on a short batch (drained) or any failure: failed items are retried
+        # on the next poll, so attempts are spread out instead of spent back to back
+        if sum(counts.values()) < batch_size or counts["failed"] or counts["processed"] + counts["rejected"] == 0:
+            return totals
+
+
+class IpnInboxWorker:
+    def __init__(self, poll_interval: float, batch_size: int):
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='ipn-inbox-worker', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def notify(self) -> None:
+        """Wake the worker after an enqueue (starting it on first use)"""
+        self.start()
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            try:
+                drain_ipn_inbox(self.batch_size)
+            except Exception as e:
+                logger.error(f"IPN inbox drain failed: {e}", exc_info=True)
+            finally:
+                connections.close_all()
+
+
+# Singleton instance
+_ipn_inbox_worker = None
+
+
+def get_ipn_inbox_worker() -> Optional[IpnInboxWorker]:
+    """Get the in-process worker, or None when IPN_INBOX_WORKER=external"""
+    global _ipn_inbox_worker
+    if config('IPN_INBOX_WORKER', default='thread') != 'thread':
+        return None
+    if _ipn_inbox_worker is None:
+        _ipn_inbox_worker = IpnInboxWorker(
+            poll_interval=config('IPN_INBOX_POLL_SECONDS', default=5.0, cast=float),
+            batch_size=config('IPN_INBOX_BATCH_SIZE', default=100, cast=int)
+        )
+    return _ipn_inbox_worker
+
+
+def _is_serving_process() -> bool:
+    # gunicorn / uwsgi workers, or the runserver process that handles requests
+    # (not its autoreloader parent); other management commands and tests don't drain
+    if 'gunicorn' in sys.modules or 'uwsgi' in sys.modules:
+        return True
+    return sys.argv[1:2] == ['runserver'] and (os.environ.get('RUN_MAIN') == 'true' or '--noreload' in sys.argv)
+
+
+def start_ipn_inbox_worker() -> None:
+    """Called from AppConfig.ready, so items are drained without waiting for the next IPN"""
+    if not _is_serving_process():
+        return
+    worker = get_ipn_inbox_worker()
+    if worker is not None:
+        worker.start()
+
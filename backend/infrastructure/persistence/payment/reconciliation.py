@@ -0,0 +1,199 @@
+"""
+Payment Reconciliation - PaymentTransactions vs HocPhi, one học kỳ at a time
+Both tables are streamed ordered by sinh_vien_id through server-side cursors
+and merge-joined in Python, so memory stays at one student's rows plus the
+pending fix batch regardless of how many transactions the học kỳ has.
+
+Mismatch kinds:
+    paid_not_marked         success transaction, HocPhi not da_thanh_toan   (fixable)
+    stale_pending           pending longer than the threshold                (fixable -> failed)
+    marked_without_payment  HocPhi da_thanh_toan, no success transaction     (report only)
+    success_without_hoc_phi success transaction, no HocPhi row               (report only)
+    amount_mismatch         paid amount below tong_hoc_phi                   (report only)
+"""
+from dataclasses import dataclass, field
+from datetime import timedelta
+from decimal import Decimal
+from itertools import groupby
+from typing import Optional, Dict, List, Any, Callable, Iterable, Iterator, Tuple
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.utils import timezone
+import logging
+
+from infrastructure.persistence.models import PaymentTransactions, HocPhi
+
+logger = logging.getLogger(__name__)
+
+FIXABLE = ('paid_not_marked', 'stale_pending')
+MISMATCH_KINDS = FIXABLE + ('marked_without_payment', 'success_without_hoc_phi', 'amount_mismatch')
+STALE_MESSAGE = "Hết hạn chờ thanh toán (đối soát)"
+
+
+@dataclass
+class Mismatch:
+    kind: str
+    hoc_ky_id: str
+    sinh_vien_id: str
+    hoc_phi_id: Optional[str] = None
+    order_id: Optional[str] = None
+    detail: str = ""
+
+
+@dataclass
+class ReconciliationReport:
+    hoc_ky_id: str
+    transactions_scanned: int = 0
+    hoc_phi_scanned: int = 0
+    mismatches: Dict[str, int] = field(default_factory=lambda: {kind: 0 for kind in MISMATCH_KINDS})
+    fixed: Dict[str, int] = field(default_factory=lambda: {kind: 0 for kind in FIXABLE})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "hocKyId": self.hoc_ky_id,
+            "transactionsScanned": self.transactions_scanned,
+            "hocPhiScanned": self.hoc_phi_scanned,
+            "mismatches": dict(self.mismatches),
+            "fixed": dict(self.fixed),
+        }
+
+
+def merge_by_student(transactions: Iterable[Dict[str, Any]], hoc_phis: Iterable[Dict[str, Any]],
+                     report: ReconciliationReport) -> Iterator[Tuple[Any, List[Dict[str, Any]], Optional[Dict[str, Any]]]]:
+    """
+    Merge-join two streams sorted by sinh_vien_id (at most one HocPhi per
+    student) into (sinh_vien_id, transactions, hoc_phi) per student
+    """
+    hoc_phis = iter(hoc_phis)
+    tx_groups = groupby(transactions, key=lambda row: row['sinh_vien_id'])
+    tx_key, tx_rows = next(tx_groups, (None, None))
+    hp = next(hoc_phis, None)
+
+    while tx_key is not None or hp is not None:
+        hp_key = hp['sinh_vien_id'] if hp is not None else None
+        if hp_key is None or (tx_key is not None and tx_key < hp_key):
+            rows = list(tx_rows)
+            report.transactions_scanned += len(rows)
+            yield tx_key, rows, None
+            tx_key, tx_rows = next(tx_groups, (None, None))
+        elif tx_key is None or hp_key < tx_key:
+            report.hoc_phi_scanned += 1
+            yield hp_key, [], hp
+            hp = next(hoc_phis, None)
+        else:
+            rows = list(tx_rows)
+            report.transactions_scanned += len(rows)
+            report.hoc_phi_scanned += 1
+            yield tx_key, rows, hp
+            tx_key, tx_rows = next(tx_groups, (None, None))
+            hp = next(hoc_phis, None)
+
+
+class PaymentReconciler:
+    def __init__(self, stale_after: timedelta = timedelta(hours=1), fix: bool = False,
+                 batch_size: int = 1000, chunk_size: int = 2000, using: str = 'neon'):
+        self.stale_after = stale_after
+        self.fix = fix
+        self.batch_size = batch_size
+        self.chunk_size = chunk_size
+        self.using = using
+
+    def run(self, hoc_ky_id: str, on_mismatch: Optional[Callable[[Mismatch], None]] = None) -> ReconciliationReport:
+        """
+        Scan one học kỳ. Runs in one transaction: named cursors stay valid behind
+        a transaction-mode pooler, and fixes for the học kỳ commit together.
+        """
+        report = ReconciliationReport(hoc_ky_id=str(hoc_ky_id))
+        stale_before = timezone.now() - self.stale_after
+        pending_fixes: Dict[str, List[Any]] = {kind: [] for kind in FIXABLE}
+
+        with transaction.atomic(using=self.using):
+            for sinh_vien_id, transactions, hoc_phi in self._merge(hoc_ky_id, report):
+                for mismatch in self._check(hoc_ky_id, sinh_vien_id, transactions, hoc_phi, stale_before):
+                    report.mismatches[mismatch.kind] += 1
+                    if on_mismatch:
+                        on_mismatch(mismatch)
+                    if self.fix and mismatch.kind in FIXABLE:
+                        key = mismatch.hoc_phi_id if mismatch.kind == 'paid_not_marked' else mismatch.order_id
+                        pending_fixes[mismatch.kind].append(key)
+                        if len(pending_fixes[mismatch.kind]) >= self.batch_size:
+                            self._flush(mismatch.kind, pending_fixes, report, stale_before)
+            for kind in FIXABLE:
+                self._flush(kind, pending_fixes, report, stale_before)
+
+        return report
+
+    def _merge(self, hoc_ky_id: str, report: ReconciliationReport) -> Iterator[Tuple[Any, List[Dict[str, Any]], Optional[Dict[str, Any]]]]:
+        """Yield (sinh_vien_id, transactions, hoc_phi) for every student present in either table"""
+        transactions = (
+            PaymentTransactions.objects.using(self.using)
+            .filter(hoc_ky_id=hoc_ky_id)
+            .order_by('sinh_vien_id', 'created_at')
+            .values('sinh_vien_id', 'order_id', 'status', 'amount', 'created_at')
+            .iterator(chunk_size=self.chunk_size)
+        )
+        hoc_phis = (
+            HocPhi.objects.using(self.using)
+            .filter(hoc_ky_id=hoc_ky_id)
+            .order_by('sinh_vien_id')
+            .values('id', 'sinh_vien_id', 'trang_thai_thanh_toan', 'tong_hoc_phi')
+            .iterator(chunk_size=self.chunk_size)
+        )
+
+        return merge_by_student(transactions, hoc_phis, report)
+
+    def _check(self, hoc_ky_id: str, sinh_vien_id: Any, transactions: List[Dict[str, Any]],
+               hoc_phi: Optional[Dict[str, Any]], stale_before) -> Iterator[Mismatch]:
+        hk, sv = str(hoc_ky_id), str(sinh_vien_id)
+        hoc_phi_id = str(hoc_phi['id']) if hoc_phi else None
+        successes = [tx for tx in transactions if tx['status'] == 'success']
+        paid = hoc_phi is not None and hoc_phi['trang_thai_thanh_toan'] == 'da_thanh_toan'
+
+        for tx in transactions:
+            if tx['status'] == 'pending' and tx['created_at'] is not None and tx['created_at'] < stale_before:
+                yield Mismatch('stale_pending', hk, sv, hoc_phi_id, tx['order_id'],
+                               f"pending since {tx['created_at'].isoformat()}")
+
+        if successes and hoc_phi is None:
+            yield Mismatch('success_without_hoc_phi', hk, sv, None, successes[0]['order_id'])
+        elif successes and not paid:
+            yield Mismatch('paid_not_marked', hk, sv, hoc_phi_id, successes[-1]['order_id'],
+                           f"trang_thai_thanh_toan={hoc_phi['trang_thai_thanh_toan']}")
+        elif paid and not successes:
+            yield Mismatch('marked_without_payment', hk, sv, hoc_phi_id)
+
+        if successes and hoc_phi is not None and hoc_phi['tong_hoc_phi'] is not None:
+            paid_amount = sum((tx['amount'] or Decimal(0) for tx in successes), Decimal(0))
+            if paid_amount < hoc_phi['tong_hoc_phi']:
+                yield Mismatch('amount_mismatch', hk, sv, hoc_phi_id, successes[-1]['order_id'],
+                               f"paid {paid_amount} < tong_hoc_phi {hoc_phi['tong_hoc_phi']}")
+
+    def _flush(self, kind: str, pending_fixes: Dict[str, List[Any]], report: ReconciliationReport, stale_before) -> None:
+        keys = pending_fixes[kind]
+        if not keys:
+            return
+        pending_fixes[kind] = []
+
+        if kind == 'paid_not_marked':
+            # Payment time = the latest success transaction; rows paid meanwhile are left alone
+            paid_at = (
+                PaymentTransactions.objects.using(self.using)
+                .filter(sinh_vien_id=OuterRef('sinh_vien_id'), hoc_ky_id=OuterRef('hoc_ky_id'), status='success')
+                .order_by('-updated_at')
+                .values('updated_at')[:1]
+            )
+            updated = (
+                HocPhi.objects.using(self.using)
+                .filter(id__in=keys)
+                .exclude(trang_thai_thanh_toan='da_thanh_toan')
+                .update(trang_thai_thanh_toan='da_thanh_toan', ngay_thanh_toan=Subquery(paid_at))
+            )
+        else:
+            # Only still-pending rows: a late IPN may have settled one since the scan
+            updated = (
+                PaymentTransactions.objects.using(self.using)
+                .filter(order_id__in=keys, status='pending', created_at__lt=stale_before)
+                .update(status='failed', message=STALE_MESSAGE, updated_at=timezone.now())
+            )
+        report.fixed[kind] += updated
+        logger.info(f"[RECONCILE] {kind}: fixed {updated}/{len(keys)}")
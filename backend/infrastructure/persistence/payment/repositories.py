@@ -2,9 +2,15 @@
 Payment Repository Implementation
 """
 import uuid
-from datetime import datetime
-from typing import Optional
-from infrastructure.persistence.models import PaymentTransactions, HocPhi
+from datetime import datetime, timedelta
+from typing import Optional, List, Dict, Any
+from decouple import config
+from django.db import transaction as db_transaction, IntegrityError
+from infrastructure.persistence.models import PaymentTransactions, HocPhi, PaymentIpnLogs
+from application.payment.interfaces import IpnInboxItemDTO
+
+# Namespace for inbox keys: uuid5(namespace, "provider|order_id|transaction_id")
+IPN_INBOX_NAMESPACE = uuid.UUID('6f1c2a8e-4b7d-5e90-a3c1-2d8f0e6b9a47')
 
 
 class PaymentRepository:
@@ -45,9 +51,11 @@ class PaymentRepository:
         except PaymentTransactions.DoesNotExist:
             return None
     
+    def lock_by_order_id(self, order_id: str) -> Optional[PaymentTransactions]:
+        return PaymentTransactions.objects.using('neon').select_for_update().filter(order_id=order_id).first()
+
     def save_ipn_log(self, transaction_id: str, payload: dict) -> None:
         """Save IPN log for debugging"""
-        from infrastructure.persistence.models import PaymentIpnLogs
         PaymentIpnLogs.objects.using('neon').create(
             id=uuid.uuid4(),
             transaction_id=transaction_id,
@@ -56,6 +64,98 @@ class PaymentRepository:
         )
 
 
+class PaymentIpnInboxRepository:
+    """
+    IPN inbox stored in payment_ipn_logs.
+    The row id is derived from (provider, order_id, transaction_id), so the
+    primary key rejects gateway retries; inbox state lives in the payload
+    envelope since the table schema is managed outside Django.
+
+    Polls only look at rows received in the last IPN_INBOX_WINDOW_HOURS, so the
+    scan stays small as the log grows; on the database side this is served by
+        CREATE INDEX payment_ipn_logs_pending_idx ON payment_ipn_logs (received_at)
+            WHERE payload->>'status' = 'pending';
+    Older items still pending can be drained with
+    `manage.py process_ipn_inbox --once --window-hours 0`.
+    """
+
+    def __init__(self, window_hours: Optional[float] = None):
+        self.window_hours = (window_hours if window_hours is not None
+                             else config('IPN_INBOX_WINDOW_HOURS', default=48, cast=float))
+
+    @staticmethod
+    def inbox_key(provider: str, order_id: str, transaction_id: str) -> uuid.UUID:
+        return uuid.uuid5(IPN_INBOX_NAMESPACE, f"{provider}|{order_id}|{transaction_id}")
+
+    def enqueue(self, provider: str, order_id: str, transaction_id: str, result_code: str,
+                payload: Dict[str, Any]) -> bool:
+        try:
+            with db_transaction.atomic(using='neon'):
+                PaymentIpnLogs.objects.using('neon').create(
+                    id=self.inbox_key(provider, order_id, transaction_id),
+                    received_at=datetime.now(),
+                    payload={
+                        "provider": provider,
+                        "orderId": order_id,
+                        "transactionId": transaction_id,
+                        "resultCode": result_code,
+                        "status": "pending",
+                        "attempts": 0,
+                        "error": None,
+                        "data": payload
+                    }
+                )
+            return True
+        except IntegrityError:
+            return False
+
+    def find_pending_ids(self, limit: int) -> List[str]:
+        pending = PaymentIpnLogs.objects.using('neon').filter(payload__status="pending")
+        if self.window_hours > 0:
+            pending = pending.filter(received_at__gte=datetime.now() - timedelta(hours=self.window_hours))
+        return [str(item_id) for item_id in pending.order_by('received_at').values_list('id', flat=True)[:limit]]
+
+    def lock_pending(self, item_id: str) -> Optional[IpnInboxItemDTO]:
+        log = PaymentIpnLogs.objects.using('neon').select_for_update(skip_locked=True).filter(id=item_id).first()
+        if log is None or not log.payload or log.payload.get("status") != "pending":
+            return None
+        return self._to_dto(log)
+
+    def mark(self, item_id: str, status: str, transaction_pk: Optional[str] = None,
+             error: Optional[str] = None) -> None:
+        log = PaymentIpnLogs.objects.using('neon').get(id=item_id)
+        log.payload = {**log.payload, "status": status, "error": error}
+        if transaction_pk:
+            log.transaction_id = transaction_pk
+        log.save(using='neon', update_fields=['payload', 'transaction'])
+
+    def record_failure(self, item_id: str, error: str, max_attempts: int) -> None:
+        with db_transaction.atomic(using='neon'):
+            log = PaymentIpnLogs.objects.using('neon').select_for_update().filter(id=item_id).first()
+            if log is None or not log.payload:
+                return
+            attempts = int(log.payload.get("attempts", 0)) + 1
+            log.payload = {
+                **log.payload,
+                "attempts": attempts,
+                "error": error,
+                "status": "failed" if attempts >= max_attempts else "pending"
+            }
+            log.save(using='neon', update_fields=['payload'])
+
+    def _to_dto(self, log: PaymentIpnLogs) -> IpnInboxItemDTO:
+        payload = log.payload
+        return IpnInboxItemDTO(
+            id=str(log.id),
+            provider=payload.get("provider", ""),
+            order_id=payload.get("orderId", ""),
+            transaction_id=payload.get("transactionId", ""),
+            result_code=str(payload.get("resultCode", "")),
+            status=payload.get("status", ""),
+            attempts=int(payload.get("attempts", 0))
+        )
+
+
 class HocPhiPaymentRepository:
     """
     Repository for updating học phí payment status
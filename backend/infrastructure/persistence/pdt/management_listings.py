@@ -0,0 +1,216 @@
+"""
+Management Listings - sinh viên / giảng viên / môn học lists for PDT internal management
+Rows are read as flat values() projections with every join in the one query
+(no per-row tai_khoan lookups) and paged by keyset: the opaque cursor holds the
+sort key of the last row, so page N costs the same as page 1.
+
+    sinh viên   ordered by ma_so_sinh_vien
+    giảng viên  ordered by (ho_ten, id)
+    môn học     ordered by ma_mon
+
+stream() walks the whole filtered list through a server-side cursor
+(.iterator(chunk_size)) inside a transaction, for NDJSON dumps.
+"""
+import base64
+import json
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Optional, List, Dict, Any, Iterator, Sequence
+from django.db import transaction
+from django.db.models import Q
+
+from infrastructure.persistence.models import SinhVien, GiangVien, MonHoc
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    raw = json.dumps([str(v) for v in values], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, size: int) -> List[str]:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise InvalidCursor("cursor không hợp lệ")
+    if not isinstance(values, list) or len(values) != size or not all(isinstance(v, str) for v in values):
+        raise InvalidCursor("cursor không hợp lệ")
+    return values
+
+
+@dataclass
+class ListingPage:
+    items: List[Dict[str, Any]]
+    next_cursor: Optional[str]
+    total: Optional[int]
+
+
+class _Listing(ABC):
+    model = None
+    fields: Sequence[str] = ()
+    # Unique sort key; every field must be in the projection
+    order: Sequence[str] = ()
+    # Filter name -> lookup
+    filters: Dict[str, str] = {}
+    search_fields: Sequence[str] = ()
+
+    def __init__(self, using: str = 'neon', chunk_size: int = 2000):
+        self.using = using
+        self.chunk_size = chunk_size
+
+    @abstractmethod
+    def to_item(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Shape one projected row for the API"""
+        pass
+
+    def _queryset(self, filters: Optional[Dict[str, Any]], search: Optional[str]):
+        queryset = self.model.objects.using(self.using)
+        lookups = {
+            lookup: filters[name]
+            for name, lookup in self.filters.items()
+            if filters and filters.get(name) not in (None, '')
+        }
+        if lookups:
+            queryset = queryset.filter(**lookups)
+        search = (search or '').strip()
+        if search:
+            condition = Q()
+            for field in self.search_fields:
+                condition |= Q(**{f'{field}__icontains': search})
+            queryset = queryset.filter(condition)
+        return queryset.values(*self.fields).order_by(*self.order)
+
+    def _after(self, values: Sequence[str]) -> Q:
+        # (a, b) > (x, y)  ==  a > x OR (a = x AND b > y)
+        condition = Q()
+        for i, field in enumerate(self.order):
+            term = Q(**{f'{field}__gt': values[i]})
+            for previous, value in zip(self.order[:i], values[:i]):
+                term &= Q(**{previous: value})
+            condition |= term
+        return condition
+
+    def page(self, filters=None, search=None, cursor: Optional[str] = None,
+             limit: int = DEFAULT_LIMIT) -> ListingPage:
+        """One keyset page; total is only counted for the first page"""
+        queryset = self._queryset(filters, search)
+        total = None
+        if cursor:
+            queryset = queryset.filter(self._after(decode_cursor(cursor, len(self.order))))
+        else:
+            total = queryset.count()
+
+        rows = list(queryset[:limit + 1])
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor([rows[-1][field] for field in self.order])
+        return ListingPage([self.to_item(row) for row in rows], next_cursor, total)
+
+    def offset_page(self, filters=None, search=None, page: int = 1, page_size: int = DEFAULT_LIMIT) -> ListingPage:
+        """page / pageSize paging kept for existing screens"""
+        queryset = self._queryset(filters, search)
+        total = queryset.count()
+        start = (max(page, 1) - 1) * page_size
+        rows = queryset[start:start + page_size]
+        return ListingPage([self.to_item(row) for row in rows], None, total)
+
+    def stream(self, filters=None, search=None) -> Iterator[Dict[str, Any]]:
+        with transaction.atomic(using=self.using):
+            for row in self._queryset(filters, search).iterator(chunk_size=self.chunk_size):
+                yield self.to_item(row)
+
+
+class SinhVienListing(_Listing):
+    model = SinhVien
+    fields = (
+        'id', 'ma_so_sinh_vien', 'id__ho_ten', 'id__email', 'lop', 'khoa_hoc', 'ngay_nhap_hoc',
+        'khoa__ten_khoa', 'nganh__ten_nganh', 'id__tai_khoan__trang_thai_hoat_dong',
+    )
+    order = ('ma_so_sinh_vien',)
+    filters = {'khoa_id': 'khoa_id', 'nganh_id': 'nganh_id', 'khoa_hoc': 'khoa_hoc', 'lop': 'lop'}
+    search_fields = ('ma_so_sinh_vien', 'id__ho_ten', 'id__email')
+
+    def to_item(self, row):
+        trang_thai = row['id__tai_khoan__trang_thai_hoat_dong']
+        return {
+            'id': str(row['id']),
+            'maSoSinhVien': row['ma_so_sinh_vien'],
+            'hoTen': row['id__ho_ten'],
+            'lop': row['lop'],
+            'tenKhoa': row['khoa__ten_khoa'] or "",
+            'tenNganh': row['nganh__ten_nganh'] or "",
+            'khoaHoc': row['khoa_hoc'],
+            'trangThaiHoatDong': trang_thai if trang_thai is not None else True,
+            'ngayNhapHoc': row['ngay_nhap_hoc'],
+            'email': row['id__email'],
+        }
+
+
+class GiangVienListing(_Listing):
+    model = GiangVien
+    fields = (
+        'id', 'id__ho_ten', 'id__ma_nhan_vien', 'id__tai_khoan_id', 'id__tai_khoan__ten_dang_nhap',
+        'khoa_id', 'khoa__ten_khoa', 'trinh_do', 'chuyen_mon', 'kinh_nghiem_giang_day',
+    )
+    # ho_ten is not unique, so the id breaks ties
+    order = ('id__ho_ten', 'id')
+    filters = {'khoa_id': 'khoa_id', 'trinh_do': 'trinh_do'}
+    search_fields = ('id__ho_ten', 'id__ma_nhan_vien', 'id__tai_khoan__ten_dang_nhap')
+
+    def to_item(self, row):
+        khoa_id = str(row['khoa_id']) if row['khoa_id'] else None
+        return {
+            'id': str(row['id']),
+            'khoa_id': khoa_id,
+            'trinh_do': row['trinh_do'],
+            'chuyen_mon': row['chuyen_mon'],
+            'kinh_nghiem_giang_day': row['kinh_nghiem_giang_day'],
+            'users': {
+                'id': str(row['id']),
+                'ho_ten': row['id__ho_ten'],
+                'ma_nhan_vien': row['id__ma_nhan_vien'],
+                'tai_khoan': {
+                    'ten_dang_nhap': row['id__tai_khoan__ten_dang_nhap'] or ""
+                } if row['id__tai_khoan_id'] else None
+            },
+            'khoa': {
+                'id': khoa_id,
+                'ten_khoa': row['khoa__ten_khoa']
+            } if khoa_id else None
+        }
+
+
+class MonHocListing(_Listing):
+    model = MonHoc
+    fields = (
+        'id', 'ma_mon', 'ten_mon', 'so_tin_chi', 'khoa_id', 'khoa__ten_khoa',
+        'loai_mon', 'la_mon_chung', 'thu_tu_hoc',
+    )
+    order = ('ma_mon',)
+    filters = {'khoa_id': 'khoa_id', 'loai_mon': 'loai_mon'}
+    search_fields = ('ma_mon', 'ten_mon')
+
+    def to_item(self, row):
+        khoa_id = str(row['khoa_id']) if row['khoa_id'] else None
+        return {
+            'id': str(row['id']),
+            'ma_mon': row['ma_mon'],
+            'ten_mon': row['ten_mon'],
+            'so_tin_chi': row['so_tin_chi'],
+            'khoa_id': khoa_id,
+            'loai_mon': row['loai_mon'],
+            'la_mon_chung': row['la_mon_chung'],
+            'thu_tu_hoc': row['thu_tu_hoc'],
+            'khoa': {
+                'id': khoa_id,
+                'ten_khoa': row['khoa__ten_khoa']
+            } if khoa_id else None,
+            'mon_hoc_nganh': []
+        }
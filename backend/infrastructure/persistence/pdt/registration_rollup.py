@@ -0,0 +1,317 @@
+"""
+Registration Rollup - Đăng ký / hủy counts per minute and per hour
+Committed registration events are folded into minute and hour buckets as
+they happen, so the PDT throughput charts never scan chi_tiet_lich_su_dang_ky.
+Each bucket holds the totals plus per-khoa (student's khoa) and per-lớp
+counters; chuyển lớp counts as hủy on the old class and đăng ký on the new
+one, like the history log.
+
+Stores (REGISTRATION_ROLLUP_BACKEND):
+- 'mongo' : MongoDB collection registration_rollups, $inc upserts shared by
+            all workers (default)
+- 'local' : nothing kept between requests; a per-process store would only see
+            its own worker's events, so every read folds its window straight
+            from the history table (also used when MongoDB is unavailable)
+
+The compactor rebuilds buckets from chi_tiet_lich_su_dang_ky (after a
+restart, or to repair a store). A cancelled registration row is deleted, so
+rebuilt buckets attribute cancellations to khoa but not to lớp.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+from functools import lru_cache
+from typing import Optional, Dict, Any, List, Iterator, Tuple, Iterable
+from decouple import config
+from django.db.models import Count
+from django.db.models.functions import TruncMinute, TruncHour
+from django.utils import timezone
+import time
+import logging
+
+from domain.course_registration.events import LopHocPhanDaDangKy, LopHocPhanDaHuy, LopHocPhanDaChuyen
+from infrastructure.persistence.models import ChiTietLichSuDangKy, SinhVien, Khoa, LopHocPhan
+
+logger = logging.getLogger(__name__)
+
+GRANULARITIES = {'minute': 60, 'hour': 3600}
+ACTIONS = ('dang_ky', 'huy_dang_ky')
+DIMENSIONS = ('khoa', 'lop')
+
+
+def bucket_start(at: datetime, granularity: str) -> int:
+    """Epoch second at which the bucket containing `at` starts"""
+    step = GRANULARITIES[granularity]
+    return int(at.timestamp()) // step * step
+
+
+def _empty_bucket() -> Dict[str, Any]:
+    return {'dang_ky': 0, 'huy_dang_ky': 0, 'khoa': {}, 'lop': {}}
+
+
+def _counts(bucket: Optional[Dict[str, Any]], khoa_id: Optional[str], lop_id: Optional[str]) -> Tuple[int, int]:
+    if bucket is None:
+        return 0, 0
+    scope = bucket
+    if lop_id:
+        scope = bucket.get('lop', {}).get(str(lop_id), {})
+    elif khoa_id:
+        scope = bucket.get('khoa', {}).get(str(khoa_id), {})
+    return scope.get('dang_ky', 0), scope.get('huy_dang_ky', 0)
+
+
+class MongoRollupStore:
+    """
+    One document per (học kỳ, granularity, bucket) with nested counters,
+    updated with $inc upserts. Minute documents expire via a TTL index.
+    """
+    COLLECTION = 'registration_rollups'
+
+    def __init__(self, db, minute_retention_hours: float = 24):
+        self.collection = db[self.COLLECTION]
+        self.minute_retention = timedelta(hours=minute_retention_hours)
+        self.collection.create_index([('hoc_ky_id', 1), ('g', 1), ('t', 1)], unique=True)
+        self.collection.create_index('expire_at', expireAfterSeconds=0)
+
+    def add(self, hoc_ky_id: str, at: datetime, action: str, khoa_id: Optional[str], lop_id: Optional[str],
+            count: int = 1) -> None:
+        from pymongo import UpdateOne
+
+        inc = {action: count}
+        if khoa_id:
+            inc[f'khoa.{khoa_id}.{action}'] = count
+        if lop_id:
+            inc[f'lop.{lop_id}.{action}'] = count
+        operations = []
+        for granularity in GRANULARITIES:
+            t = bucket_start(at, granularity)
+            on_insert = {'hoc_ky_id': str(hoc_ky_id), 'g': granularity, 't': t}
+            if granularity == 'minute':
+                on_insert['expire_at'] = datetime.fromtimestamp(t, dt_timezone.utc) + self.minute_retention
+            operations.append(UpdateOne(
+                {'_id': f'{hoc_ky_id}|{granularity}|{t}'},
+                {'$inc': inc, '$setOnInsert': on_insert},
+                upsert=True,
+            ))
+        self.collection.bulk_write(operations, ordered=False)
+
+    def buckets(self, hoc_ky_id: str, granularity: str, since: int, until: int) -> Dict[int, Dict[str, Any]]:
+        cursor = self.collection.find(
+            {'hoc_ky_id': str(hoc_ky_id), 'g': granularity, 't': {'$gte': since, '$lte': until}},
+            {'_id': 0, 't': 1, 'dang_ky': 1, 'huy_dang_ky': 1, 'khoa': 1, 'lop': 1},
+        )
+        return {doc.pop('t'): {**_empty_bucket(), **doc} for doc in cursor}
+
+    def replace(self, hoc_ky_id: str, granularity: str, since: int, until: int,
+                buckets: Dict[int, Dict[str, Any]]) -> None:
+        self.collection.delete_many({'hoc_ky_id': str(hoc_ky_id), 'g': granularity, 't': {'$gte': since, '$lte': until}})
+        documents = []
+        for t, bucket in buckets.items():
+            document = {'_id': f'{hoc_ky_id}|{granularity}|{t}', 'hoc_ky_id': str(hoc_ky_id), 'g': granularity, 't': t,
+                        **bucket}
+            if granularity == 'minute':
+                document['expire_at'] = datetime.fromtimestamp(t, dt_timezone.utc) + self.minute_retention
+            documents.append(document)
+        if documents:
+            self.collection.insert_many(documents, ordered=False)
+
+
+class RegistrationRollup:
+    def __init__(self, store=None, using: str = 'neon', reread: bool = False, khoa_cache_size: int = 10000):
+        """
+        store: shared bucket store (MongoRollupStore)
+        reread: no store; fold the requested window from the history table on
+        every read instead (events are then not folded at all)
+        """
+        self.store = store
+        self.using = using
+        self.reread = reread
+        self._khoa_of = lru_cache(maxsize=khoa_cache_size)(self._lookup_khoa)
+
+    # ---- event handlers ----
+
+    def on_dang_ky(self, event: LopHocPhanDaDangKy) -> None:
+        self.record(event.hoc_ky_id, event.sinh_vien_id, event.lop_hoc_phan_id, 'dang_ky')
+
+    def on_huy(self, event: LopHocPhanDaHuy) -> None:
+        self.record(event.hoc_ky_id, event.sinh_vien_id, event.lop_hoc_phan_id, 'huy_dang_ky')
+
+    def on_chuyen(self, event: LopHocPhanDaChuyen) -> None:
+        at = timezone.now()
+        self.record(event.hoc_ky_id, event.sinh_vien_id, event.lop_cu_id, 'huy_dang_ky', at)
+        self.record(event.hoc_ky_id, event.sinh_vien_id, event.lop_moi_id, 'dang_ky', at)
+
+    def record(self, hoc_ky_id: str, sinh_vien_id: str, lop_hoc_phan_id: Optional[str], action: str,
+               at: Optional[datetime] = None) -> None:
+        self.store.add(hoc_ky_id, at or timezone.now(), action, self._khoa_of(str(sinh_vien_id)), lop_hoc_phan_id)
+
+    def _lookup_khoa(self, sinh_vien_id: str) -> Optional[str]:
+        khoa_id = (
+            SinhVien.objects.using(self.using)
+            .filter(id=sinh_vien_id)
+            .values_list('khoa_id', flat=True)
+            .first()
+        )
+        return str(khoa_id) if khoa_id else None
+
+    # ---- reads ----
+
+    def series(self, hoc_ky_id: str, granularity: str, since: datetime, until: datetime,
+               khoa_id: Optional[str] = None, lop_hoc_phan_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """One point per bucket in [since, until], zero-filled"""
+        step = GRANULARITIES[granularity]
+        start, end = bucket_start(since, granularity), bucket_start(until, granularity)
+        buckets = self._buckets(hoc_ky_id, granularity, start, end)
+        points = []
+        for t in range(start, end + 1, step):
+            dang_ky, huy = _counts(buckets.get(t), khoa_id, lop_hoc_phan_id)
+            points.append({'t': t, 'dangKy': dang_ky, 'huyDangKy': huy})
+        return points
+
+    def breakdown(self, hoc_ky_id: str, dimension: str, granularity: str, since: datetime, until: datetime,
+                  khoa_id: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        """Totals per khoa or per lớp over the window, busiest first"""
+        totals: Dict[str, List[int]] = {}
+        start, end = bucket_start(since, granularity), bucket_start(until, granularity)
+        buckets = self._buckets(hoc_ky_id, granularity, start, end)
+        for bucket in buckets.values():
+            for dim_id, counters in bucket.get(dimension, {}).items():
+                total = totals.setdefault(dim_id, [0, 0])
+                total[0] += counters.get('dang_ky', 0)
+                total[1] += counters.get('huy_dang_ky', 0)
+
+        if dimension == 'khoa':
+            names = Khoa.objects.using(self.using).filter(id__in=list(totals)).values_list('id', 'ten_khoa')
+        else:
+            classes = LopHocPhan.objects.using(self.using).filter(id__in=list(totals))
+            if khoa_id:
+                classes = classes.filter(hoc_phan__mon_hoc__khoa_id=khoa_id)
+            names = classes.values_list('id', 'ma_lop')
+        names = {str(dim_id): name for dim_id, name in names}
+        if dimension == 'lop' and khoa_id:
+            totals = {dim_id: total for dim_id, total in totals.items() if dim_id in names}
+
+        rows = sorted(totals.items(), key=lambda item: -(item[1][0] + item[1][1]))[:limit]
+        return [
+            {'id': dim_id, 'ten': names.get(dim_id), 'dangKy': dang_ky, 'huyDangKy': huy}
+            for dim_id, (dang_ky, huy) in rows
+        ]
+
+    def feed(self, hoc_ky_id: str, khoa_id: Optional[str] = None, lop_hoc_phan_id: Optional[str] = None,
+             interval: float = 2.0, duration: float = 300.0, window_minutes: int = 30,
+             sleep=time.sleep, clock=time.monotonic) -> Iterator[Tuple[str, Any]]:
+        """
+        ('snapshot', points) for the last window_minutes, then every `interval`
+        ('update', points) with the minute buckets that changed or ('ping', None)
+        """
+        now = timezone.now()
+        points = self.series(hoc_ky_id, 'minute', now - timedelta(minutes=window_minutes), now,
+                             khoa_id, lop_hoc_phan_id)
+        last = {point['t']: point for point in points[-2:]}
+        yield 'snapshot', points
+
+        deadline = clock() + duration
+        while clock() < deadline:
+            sleep(interval)
+            now = timezone.now()
+            # The previous minute can still change while late events are folded in
+            recent = self.series(hoc_ky_id, 'minute', now - timedelta(minutes=1), now, khoa_id, lop_hoc_phan_id)
+            changed = [point for point in recent if last.get(point['t']) != point]
+            last = {point['t']: point for point in recent}
+            if changed:
+                yield 'update', changed
+            else:
+                yield 'ping', None
+
+    # ---- compactor ----
+
+    def _buckets(self, hoc_ky_id: str, granularity: str, start: int, end: int) -> Dict[int, Dict[str, Any]]:
+        if not self.reread:
+            return self.store.buckets(hoc_ky_id, granularity, start, end)
+        # Whole buckets [start, end], straight from the history table
+        return self._history_buckets(hoc_ky_id, granularity, *_bucket_bounds(start, end, granularity))
+
+    def rebuild(self, hoc_ky_id: str, since: datetime, until: datetime, chunk_size: int = 2000) -> Dict[str, int]:
+        """
+        Recompute every bucket in the hours touching [since, until] from
+        chi_tiet_lich_su_dang_ky; the range is widened to whole hours, since
+        replace() swaps whole buckets
+        """
+        start, end = bucket_start(since, 'hour'), bucket_start(until, 'hour')
+        result = {}
+        for granularity, step in GRANULARITIES.items():
+            last = end + GRANULARITIES['hour'] - step
+            buckets = self._history_buckets(hoc_ky_id, granularity, *_bucket_bounds(start, last, granularity),
+                                            chunk_size)
+            self.store.replace(hoc_ky_id, granularity, start, last, buckets)
+            result[granularity] = len(buckets)
+        return result
+
+    def _history_buckets(self, hoc_ky_id: str, granularity: str, since: datetime, until: datetime,
+                         chunk_size: int = 2000) -> Dict[int, Dict[str, Any]]:
+        trunc = TruncMinute if granularity == 'minute' else TruncHour
+        rows = (
+            ChiTietLichSuDangKy.objects.using(self.using)
+            .filter(lich_su_dang_ky__hoc_ky_id=hoc_ky_id, hanh_dong__in=ACTIONS,
+                    thoi_gian__gte=since, thoi_gian__lte=until)
+            .annotate(bucket=trunc('thoi_gian'))
+            .values('bucket', 'hanh_dong', 'lich_su_dang_ky__sinh_vien__khoa_id',
+                    'dang_ky_hoc_phan__lop_hoc_phan_id')
+            .annotate(n=Count('id'))
+            .order_by()
+            .iterator(chunk_size=chunk_size)
+        )
+        return self._fold(rows, granularity)
+
+    @staticmethod
+    def _fold(rows: Iterable[Dict[str, Any]], granularity: str) -> Dict[int, Dict[str, Any]]:
+        buckets: Dict[int, Dict[str, Any]] = {}
+        for row in rows:
+            bucket = buckets.setdefault(bucket_start(row['bucket'], granularity), _empty_bucket())
+            action, n = row['hanh_dong'], row['n']
+            bucket[action] += n
+            for dimension, dim_id in (('khoa', row['lich_su_dang_ky__sinh_vien__khoa_id']),
+                                      ('lop', row['dang_ky_hoc_phan__lop_hoc_phan_id'])):
+                if dim_id:
+                    counters = bucket[dimension].setdefault(str(dim_id), {'dang_ky': 0, 'huy_dang_ky': 0})
+                    counters[action] += n
+        return buckets
+
+
+def _bucket_bounds(start: int, end: int, granularity: str) -> Tuple[datetime, datetime]:
+    """First and last instant covered by the buckets starting at `start` .. `end`"""
+    until = datetime.fromtimestamp(end + GRANULARITIES[granularity], dt_timezone.utc) - timedelta(microseconds=1)
+    return datetime.fromtimestamp(start, dt_timezone.utc), until
+
+
+def register_registration_rollup(bus) -> None:
+    """Fold every committed đăng ký / hủy / chuyển lớp into the rollup"""
+    rollup = get_registration_rollup()
+    if rollup.reread:
+        # Reads come straight from the history table; nothing to fold
+        return
+    bus.subscribe(LopHocPhanDaDangKy, rollup.on_dang_ky)
+    bus.subscribe(LopHocPhanDaHuy, rollup.on_huy)
+    bus.subscribe(LopHocPhanDaChuyen, rollup.on_chuyen)
+
+
+def _create_rollup() -> RegistrationRollup:
+    retention = config('REGISTRATION_ROLLUP_MINUTE_RETENTION_HOURS', default=24, cast=float)
+    if config('REGISTRATION_ROLLUP_BACKEND', default='mongo') == 'mongo':
+        from infrastructure.persistence.mongodb_service import get_mongo_db
+        db = get_mongo_db()
+        if db is not None:
+            # Shared store: rebuilt with `python manage.py rebuild_registration_rollups`
+            return RegistrationRollup(MongoRollupStore(db, retention))
+        logger.warning("MongoDB not available, registration rollups read from the history table")
+    return RegistrationRollup(reread=True)
+
+
+# Singleton instance
+_registration_rollup = None
+
+
+def get_registration_rollup() -> RegistrationRollup:
+    """Get registration rollup singleton"""
+    global _registration_rollup
+    if _registration_rollup is None:
+        _registration_rollup = _create_rollup()
+    return _registration_rollup
@@ -0,0 +1,135 @@
+"""
+Report Cache - Short-lived cache of PDT dashboard figures
+Dashboards poll the same (report, học kỳ, khoa, ngành) combinations over and
+over during registration week. Entries live for REPORT_CACHE_SECONDS.
+
+Registration events mark a học kỳ dirty; entries computed before that are
+stale from then on. With REPORT_CACHE_SWR_SECONDS > 0 a stale entry (dirty,
+or expired less than that long ago) is still served while one background
+refresh recomputes it, so polling never waits on the database and at most
+one recompute per key is in flight. Without it, stale entries are
+recomputed inline, once per key (concurrent callers wait for that result).
+
+The cache is per process: other workers see a registration within the TTL.
+"""
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, Callable, Tuple
+from decouple import config
+from django.db import connections
+import threading
+import time
+import logging
+
+from domain.course_registration.events import LopHocPhanDaDangKy, LopHocPhanDaHuy, LopHocPhanDaChuyen
+
+logger = logging.getLogger(__name__)
+
+ReportKey = Tuple[str, str, str, str]
+
+
+@dataclass
+class _Entry:
+    value: Any
+    computed_at: float
+    expires_at: float
+
+
+class ReportCache:
+    def __init__(self, ttl: Optional[float] = None, stale_while_revalidate: Optional[float] = None):
+        self.ttl = ttl if ttl is not None else config('REPORT_CACHE_SECONDS', default=30, cast=float)
+        self.swr = (stale_while_revalidate if stale_while_revalidate is not None
+                    else config('REPORT_CACHE_SWR_SECONDS', default=0, cast=float))
+        self._lock = threading.Lock()
+        self._entries: Dict[ReportKey, _Entry] = {}
+        self._dirty_at: Dict[str, float] = {}
+        self._build_locks: Dict[ReportKey, threading.Lock] = {}
+        self._refreshing: set = set()
+
+    @staticmethod
+    def key(report: str, hoc_ky_id: str, khoa_id: Optional[str] = None, nganh_id: Optional[str] = None) -> ReportKey:
+        return (report, str(hoc_ky_id), str(khoa_id or ''), str(nganh_id or ''))
+
+    def get(self, key: ReportKey, loader: Callable[[], Any]) -> Any:
+        if self.ttl <= 0:
+            return loader()
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            dirty_at = self._dirty_at.get(key[1], 0.0)
+        if entry is not None:
+            stale = entry.computed_at < dirty_at or now >= entry.expires_at
+            if not stale:
+                return entry.value
+            if self.swr > 0 and now < entry.expires_at + self.swr:
+                self._refresh_in_background(key, loader)
+                return entry.value
+
+        return self._load(key, loader)
+
+    def invalidate(self, hoc_ky_id: Optional[str] = None) -> None:
+        """Mark one học kỳ's entries stale (or drop everything when no học kỳ is given)"""
+        with self._lock:
+            if hoc_ky_id is None:
+                self._entries.clear()
+                self._dirty_at.clear()
+            else:
+                self._dirty_at[str(hoc_ky_id)] = time.monotonic()
+
+    def on_registration_changed(self, event) -> None:
+        self.invalidate(event.hoc_ky_id)
+
+    def _load(self, key: ReportKey, loader: Callable[[], Any]) -> Any:
+        with self._lock:
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+        with build_lock:
+            # Another caller may have rebuilt it while we waited
+            with self._lock:
+                entry = self._entries.get(key)
+                dirty_at = self._dirty_at.get(key[1], 0.0)
+            if entry is not None and entry.computed_at >= dirty_at and time.monotonic() < entry.expires_at:
+                return entry.value
+
+            computed_at = time.monotonic()
+            # Stamped with the start time: an event during the load leaves it stale
+            value = loader()
+            with self._lock:
+                self._entries[key] = _Entry(value, computed_at, computed_at + self.ttl)
+            return value
+
+    def _refresh_in_background(self, key: ReportKey, loader: Callable[[], Any]) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self._load(key, loader)
+            except Exception as e:
+                logger.error(f"Background refresh of report {key} failed: {e}", exc_info=True)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+                connections.close_all()
+
+        threading.Thread(target=refresh, name='report-cache-refresh', daemon=True).start()
+
+
+def register_report_cache_invalidation(bus) -> None:
+    """Mark a học kỳ's reports stale whenever a registration in it changes"""
+    cache = get_report_cache()
+    for event_type in (LopHocPhanDaDangKy, LopHocPhanDaHuy, LopHocPhanDaChuyen):
+        bus.subscribe(event_type, cache.on_registration_changed)
+
+
+# Singleton instance
+_report_cache = None
+
+
+def get_report_cache() -> ReportCache:
+    """Get report cache singleton"""
+    global _report_cache
+    if _report_cache is None:
+        _report_cache = ReportCache()
+    return _report_cache
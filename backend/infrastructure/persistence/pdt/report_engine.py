@@ -0,0 +1,82 @@
+"""
+Report Engine - PDT dashboard figures with conditional aggregation
+The overview takes two statements: one pass over lop_hoc_phan LEFT JOIN
+dang_ky_hoc_phan for class / registration / student counts, and one over
+hoc_phi for expected and collected tuition. The khoa and ngành breakdowns
+share a single grouped scan of dang_ky_hoc_phan.
+"""
+from decimal import Decimal
+from typing import Optional, Dict, Any, List
+from django.db.models import Count, Sum, Q
+
+from infrastructure.persistence.models import LopHocPhan, HocPhi, DangKyHocPhan
+
+
+class ReportEngine:
+    def __init__(self, using: str = 'neon'):
+        self.using = using
+
+    def overview(self, hoc_ky_id: str, khoa_id: Optional[str] = None, nganh_id: Optional[str] = None) -> Dict[str, Any]:
+        # Classes are scoped by the môn học's khoa, registrations by the student's khoa / ngành
+        lop_filter = Q()
+        dk_filter = Q(dangkyhocphan__isnull=False)
+        hp_filter = Q(hoc_ky_id=hoc_ky_id)
+        if khoa_id:
+            lop_filter &= Q(hoc_phan__mon_hoc__khoa_id=khoa_id)
+            dk_filter &= Q(dangkyhocphan__sinh_vien__khoa_id=khoa_id)
+            hp_filter &= Q(sinh_vien__khoa_id=khoa_id)
+        if nganh_id:
+            dk_filter &= Q(dangkyhocphan__sinh_vien__nganh_id=nganh_id)
+            hp_filter &= Q(sinh_vien__nganh_id=nganh_id)
+
+        counts = (
+            LopHocPhan.objects.using(self.using)
+            .filter(hoc_phan__id_hoc_ky_id=hoc_ky_id)
+            .aggregate(
+                so_lop_hoc_phan=Count('id', distinct=True, filter=lop_filter),
+                so_dang_ky=Count('dangkyhocphan__id', filter=dk_filter),
+                sv_unique=Count('dangkyhocphan__sinh_vien_id', distinct=True, filter=dk_filter),
+            )
+        )
+
+        tai_chinh = (
+            HocPhi.objects.using(self.using)
+            .filter(hp_filter)
+            .aggregate(
+                ky_vong=Sum('tong_hoc_phi'),
+                thuc_thu=Sum('tong_hoc_phi', filter=Q(trang_thai_thanh_toan='da_thanh_toan')),
+            )
+        )
+
+        return {
+            'svUnique': counts['sv_unique'],
+            'soDangKy': counts['so_dang_ky'],
+            'soLopHocPhan': counts['so_lop_hoc_phan'],
+            'taiChinh': {
+                'thuc_thu': float(tai_chinh['thuc_thu'] or Decimal(0)),
+                'ky_vong': float(tai_chinh['ky_vong'] or Decimal(0)),
+            },
+        }
+
+    def registrations_by_nganh(self, hoc_ky_id: str) -> List[Dict[str, Any]]:
+        """Registration counts per (khoa, ngành) of the student; the khoa view sums these rows"""
+        return list(
+            DangKyHocPhan.objects.using(self.using)
+            .filter(lop_hoc_phan__hoc_phan__id_hoc_ky_id=hoc_ky_id)
+            .values('sinh_vien__khoa_id', 'sinh_vien__khoa__ten_khoa',
+                    'sinh_vien__nganh_id', 'sinh_vien__nganh__ten_nganh')
+            .annotate(so_dang_ky=Count('id'))
+            .order_by()
+        )
+
+    def classes_by_giang_vien(self, hoc_ky_id: str, khoa_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        filters = Q(hoc_phan__id_hoc_ky_id=hoc_ky_id)
+        if khoa_id:
+            filters &= Q(giang_vien__khoa_id=khoa_id)
+        return list(
+            LopHocPhan.objects.using(self.using)
+            .filter(filters)
+            .values('giang_vien__id__ho_ten')
+            .annotate(so_lop=Count('id'))
+            .order_by('-so_lop')
+        )
@@ -0,0 +1,111 @@
+"""
+Report Export - Row sources for the PDT export files
+Each dataset is a lazily evaluated row generator: rows are read through a
+server-side cursor (.iterator(chunk_size)) inside a transaction, so a
+semester's registrations are never materialised in memory and the cursor
+survives a transaction-mode pooler.
+
+    sinh_vien  one row per registration (student, class, môn học)
+    lop        one row per lớp học phần with its registration count
+    khoa       per khoa: students, registrations and credits
+"""
+from dataclasses import dataclass
+from typing import Optional, List, Any, Callable, Iterator, Sequence
+from django.db import transaction
+from django.db.models import Count, Sum, F
+
+from infrastructure.persistence.models import DangKyHocPhan, LopHocPhan, HocKy
+
+EXPORT_KINDS = ('sinh_vien', 'lop', 'khoa')
+
+
+@dataclass
+class ExportDataset:
+    loai: str
+    title: str
+    headers: List[str]
+    column_widths: List[float]
+    rows: Callable[[], Iterator[Sequence[Any]]]
+
+
+class ReportExportSource:
+    def __init__(self, using: str = 'neon', chunk_size: int = 2000):
+        self.using = using
+        self.chunk_size = chunk_size
+
+    def hoc_ky_label(self, hoc_ky_id: str) -> Optional[str]:
+        hoc_ky = (
+            HocKy.objects.using(self.using)
+            .filter(id=hoc_ky_id)
+            .values('ten_hoc_ky', 'id_nien_khoa__ten_nien_khoa')
+            .first()
+        )
+        if hoc_ky is None:
+            return None
+        return f"{hoc_ky['ten_hoc_ky']} {hoc_ky['id_nien_khoa__ten_nien_khoa'] or ''}".strip()
+
+    def dataset(self, loai: str, hoc_ky_id: str, label: str, khoa_id: Optional[str] = None) -> ExportDataset:
+        if loai == 'sinh_vien':
+            return ExportDataset(
+                loai, f"Danh sách đăng ký học phần - {label}",
+                ['MSSV', 'Họ tên', 'Khoa', 'Ngành', 'Mã lớp', 'Mã môn', 'Tên môn', 'Số TC', 'Ngày đăng ký', 'Trạng thái'],
+                [12, 24, 22, 22, 12, 10, 30, 6, 16, 12],
+                lambda: self._registrations(hoc_ky_id, khoa_id),
+            )
+        if loai == 'lop':
+            return ExportDataset(
+                loai, f"Lớp học phần - {label}",
+                ['Mã lớp', 'Mã môn', 'Tên môn', 'Số TC', 'Khoa', 'Giảng viên', 'Sĩ số tối đa', 'Số đăng ký'],
+                [12, 10, 32, 6, 24, 24, 10, 10],
+                lambda: self._classes(hoc_ky_id, khoa_id),
+            )
+        if loai == 'khoa':
+            return ExportDataset(
+                loai, f"Đăng ký theo khoa - {label}",
+                ['Mã khoa', 'Tên khoa', 'Số sinh viên', 'Số đăng ký', 'Tổng tín chỉ'],
+                [10, 34, 12, 12, 12],
+                lambda: self._khoa_totals(hoc_ky_id, khoa_id),
+            )
+        raise ValueError(f"Unknown export kind: {loai}")
+
+    def _stream(self, queryset, columns: Sequence[str]) -> Iterator[Sequence[Any]]:
+        with transaction.atomic(using=self.using):
+            for row in queryset.values_list(*columns).iterator(chunk_size=self.chunk_size):
+                yield row
+
+    def _registrations(self, hoc_ky_id: str, khoa_id: Optional[str]) -> Iterator[Sequence[Any]]:
+        queryset = DangKyHocPhan.objects.using(self.using).filter(lop_hoc_phan__hoc_phan__id_hoc_ky_id=hoc_ky_id)
+        if khoa_id:
+            queryset = queryset.filter(sinh_vien__khoa_id=khoa_id)
+        return self._stream(
+            queryset.order_by('sinh_vien__ma_so_sinh_vien', 'lop_hoc_phan__ma_lop'),
+            ('sinh_vien__ma_so_sinh_vien', 'sinh_vien__id__ho_ten', 'sinh_vien__khoa__ten_khoa',
+             'sinh_vien__nganh__ten_nganh', 'lop_hoc_phan__ma_lop', 'lop_hoc_phan__hoc_phan__mon_hoc__ma_mon',
+             'lop_hoc_phan__hoc_phan__mon_hoc__ten_mon', 'lop_hoc_phan__hoc_phan__mon_hoc__so_tin_chi',
+             'ngay_dang_ky', 'trang_thai'),
+        )
+
+    def _classes(self, hoc_ky_id: str, khoa_id: Optional[str]) -> Iterator[Sequence[Any]]:
+        queryset = LopHocPhan.objects.using(self.using).filter(hoc_phan__id_hoc_ky_id=hoc_ky_id)
+        if khoa_id:
+            queryset = queryset.filter(hoc_phan__mon_hoc__khoa_id=khoa_id)
+        return self._stream(
+            queryset.annotate(so_dang_ky=Count('dangkyhocphan')).order_by('hoc_phan__mon_hoc__ma_mon', 'ma_lop'),
+            ('ma_lop', 'hoc_phan__mon_hoc__ma_mon', 'hoc_phan__mon_hoc__ten_mon', 'hoc_phan__mon_hoc__so_tin_chi',
+             'hoc_phan__mon_hoc__khoa__ten_khoa', 'giang_vien__id__ho_ten', 'so_luong_toi_da', 'so_dang_ky'),
+        )
+
+    def _khoa_totals(self, hoc_ky_id: str, khoa_id: Optional[str]) -> Iterator[Sequence[Any]]:
+        queryset = DangKyHocPhan.objects.using(self.using).filter(lop_hoc_phan__hoc_phan__id_hoc_ky_id=hoc_ky_id)
+        if khoa_id:
+            queryset = queryset.filter(sinh_vien__khoa_id=khoa_id)
+        return self._stream(
+            queryset.values('sinh_vien__khoa__ma_khoa', 'sinh_vien__khoa__ten_khoa')
+            .annotate(
+                so_sinh_vien=Count('sinh_vien_id', distinct=True),
+                so_dang_ky=Count('id'),
+                tong_tin_chi=Sum(F('lop_hoc_phan__hoc_phan__mon_hoc__so_tin_chi')),
+            )
+            .order_by('sinh_vien__khoa__ma_khoa'),
+            ('sinh_vien__khoa__ma_khoa', 'sinh_vien__khoa__ten_khoa', 'so_sinh_vien', 'so_dang_ky', 'tong_tin_chi'),
+        )
@@ -1,6 +1,7 @@
-from typing import List, Any, Optional
+from typing import List, Any, Optional, Callable
 from application.pdt.interfaces.repositories import IDeXuatHocPhanRepository, IPhongHocRepository, IChinhSachHocPhiRepository
 from infrastructure.persistence.models import DeXuatHocPhan, Phong, ChinhSachTinChi
+from infrastructure.persistence.pdt.tuition_calculator import BulkTuitionCalculator
 import logging
 
 logger = logging.getLogger(__name__)
@@ -197,124 +198,13 @@ class ChinhSachHocPhiRepository(IChinhSachHocPhiRepository):
             logger.error(f"Failed to delete chinh_sach {id}: {e}")
             return False
 
-    def calculate_tuition_bulk(self, hoc_ky_id: str) -> int:
+    def calculate_tuition_bulk(self, hoc_ky_id: str, on_progress: Optional[Callable[[int, int], None]] = None) -> int:
+        """
+        Set-based: one policy load, one credit aggregate, then chunked bulk
+        upserts of HocPhi / ChiTietHocPhi (see BulkTuitionCalculator).
+        """
         try:
-            from infrastructure.persistence.models import DangKyHocPhan, HocPhi, SinhVien, MonHoc, LopHocPhan, HocPhan, ChiTietHocPhi
-            from django.db.models import Sum, F
-            import uuid
-            from django.utils import timezone
-
-            # 1. Get all students who have registered courses in this semester
-            # Join: DangKyHocPhan -> LopHocPhan -> HocPhan -> HocKy
-            
-            # Get list of student IDs (use lowercase 'da_dang_ky')
-            student_ids = DangKyHocPhan.objects.using('neon').filter(
-                lop_hoc_phan__hoc_phan__id_hoc_ky_id=hoc_ky_id,
-                trang_thai='da_dang_ky'  # lowercase to match DB values
-            ).values_list('sinh_vien_id', flat=True).distinct()
-            logger.info(f"Calculating tuition for {len(student_ids)} students in hoc_ky_id={hoc_ky_id}")
-            count = 0
-            for sv_id in student_ids:
-                # 2. Get all registered courses for this student in this semester
-                dang_ky_list = DangKyHocPhan.objects.using('neon').filter(
-                    sinh_vien_id=sv_id,
-                    lop_hoc_phan__hoc_phan__id_hoc_ky_id=hoc_ky_id,
-                    trang_thai='da_dang_ky'  # lowercase to match DB values
-                ).select_related('lop_hoc_phan__hoc_phan__mon_hoc')
-                
-                if not dang_ky_list:
-                    continue
-                    
-                # Calculate total credits
-                total_credits = sum(dk.lop_hoc_phan.hoc_phan.mon_hoc.so_tin_chi for dk in dang_ky_list)
-                
-                if total_credits == 0:
-                    continue
-
-                # 3. Find applicable policy
-                # Get Student info to know Nganh/Khoa
-                sv = SinhVien.objects.using('neon').get(id=sv_id)
-                
-                # Try to find policy for Nganh
-                policy = ChinhSachTinChi.objects.using('neon').filter(
-                    hoc_ky_id=hoc_ky_id,
-                    nganh_id=sv.nganh_id
-                ).first()
-                
-                if not policy:
-                    # Try Khoa
-                    policy = ChinhSachTinChi.objects.using('neon').filter(
-                        hoc_ky_id=hoc_ky_id,
-                        khoa_id=sv.khoa_id,
-                        nganh_id__isnull=True
-                    ).first()
-                    
-                if not policy:
-                    # Try General (Khoa is null, Nganh is null)
-                    policy = ChinhSachTinChi.objects.using('neon').filter(
-                        hoc_ky_id=hoc_ky_id,
-                        khoa_id__isnull=True,
-                        nganh_id__isnull=True
-                    ).first()
-                    
-                if not policy:
-                    # No policy found, skip or log
-                    continue
-                    
-                # 4. Calculate Total Fee
-                total_fee = total_credits * policy.phi_moi_tin_chi
-                
-                # 5. Update or Create HocPhi
-                # Check if record exists first
-                existing = HocPhi.objects.using('neon').filter(
-                    sinh_vien_id=sv_id,
-                    hoc_ky_id=hoc_ky_id
-                ).first()
-                
-                if existing:
-                    hoc_phi = existing
-                    hoc_phi.tong_hoc_phi = total_fee
-                    hoc_phi.chinh_sach = policy
-                    hoc_phi.ngay_tinh_toan = timezone.now()
-                    hoc_phi.save(using='neon')
-                    # Delete old chi tiet to recreate
-                    ChiTietHocPhi.objects.using('neon').filter(hoc_phi_id=hoc_phi.id).delete()
-                else:
-                    # Create new with UUID
-                    hoc_phi = HocPhi.objects.using('neon').create(
-                        id=uuid.uuid4(),
-                        sinh_vien_id=sv_id,
-                        hoc_ky_id=hoc_ky_id,
-                        tong_hoc_phi=total_fee,
-                        chinh_sach=policy,
-                        ngay_tinh_toan=timezone.now(),
-                        trang_thai_thanh_toan='chua_thanh_toan'  # lowercase to match DB constraint
-                    )
-                
-                # 6. Create ChiTietHocPhi for each registered course
-                for dk in dang_ky_list:
-                    lop_hoc_phan = dk.lop_hoc_phan
-                    mon_hoc = lop_hoc_phan.hoc_phan.mon_hoc
-                    so_tin_chi = mon_hoc.so_tin_chi
-                    phi_tin_chi = float(policy.phi_moi_tin_chi)
-                    thanh_tien = so_tin_chi * phi_tin_chi
-                    
-                    ChiTietHocPhi.objects.using('neon').get_or_create(
-                        hoc_phi_id=hoc_phi.id,
-                        lop_hoc_phan_id=lop_hoc_phan.id,
-                        defaults={
-                            'id': uuid.uuid4(),
-                            'so_tin_chi': so_tin_chi,
-                            'phi_tin_chi': phi_tin_chi,
-                            'thanh_tien': thanh_tien
-                        }
-                    )
-                
-                count += 1
-                
-            return count
+            return BulkTuitionCalculator().run(hoc_ky_id, on_progress=on_progress)
         except Exception as e:
-            print(f"Error calculating tuition: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.error(f"Error calculating tuition: {e}", exc_info=True)
             return 0
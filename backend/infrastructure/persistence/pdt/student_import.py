@@ -0,0 +1,94 @@
+"""
+Student Import - set-based lookups and chunked inserts for bulk sinh viên imports
+Uniqueness of a whole batch is checked with one IN query per column, and
+accounts are written with bulk_create (tai_khoan -> users -> sinh_vien), one
+transaction per chunk so a bad chunk does not undo the rest of the intake.
+"""
+import uuid
+from dataclasses import dataclass
+from datetime import date
+from typing import Optional, List, Dict, Set, Iterable, Tuple
+from django.db import transaction
+from django.utils import timezone
+
+from infrastructure.persistence.models import TaiKhoan, Users, SinhVien, Khoa, NganhHoc
+
+IN_QUERY_SIZE = 1000
+
+
+@dataclass
+class NewStudent:
+    row: int
+    ma_so_sinh_vien: str
+    ho_ten: str
+    ten_dang_nhap: str
+    mat_khau: str
+    khoa_id: str
+    email: str
+    nganh_id: Optional[str] = None
+    lop: Optional[str] = None
+    khoa_hoc: Optional[str] = None
+    ngay_nhap_hoc: Optional[date] = None
+
+
+class StudentImportRepository:
+    def __init__(self, using: str = 'neon', chunk_size: int = 1000):
+        self.using = using
+        self.chunk_size = chunk_size
+
+    def khoa_lookup(self) -> Dict[str, str]:
+        """id or ma_khoa (upper-cased) -> khoa id"""
+        lookup = {}
+        for khoa_id, ma_khoa in Khoa.objects.using(self.using).values_list('id', 'ma_khoa'):
+            lookup[str(khoa_id)] = str(khoa_id)
+            lookup[ma_khoa.upper()] = str(khoa_id)
+        return lookup
+
+    def nganh_lookup(self) -> Dict[str, Tuple[str, str]]:
+        """id or ma_nganh (upper-cased) -> (nganh id, khoa id)"""
+        lookup = {}
+        for nganh_id, ma_nganh, khoa_id in NganhHoc.objects.using(self.using).values_list('id', 'ma_nganh', 'khoa_id'):
+            lookup[str(nganh_id)] = lookup[ma_nganh.upper()] = (str(nganh_id), str(khoa_id))
+        return lookup
+
+    def _taken(self, queryset, field: str, values: Iterable[str]) -> Set[str]:
+        values = list(values)
+        taken = set()
+        for start in range(0, len(values), IN_QUERY_SIZE):
+            taken.update(
+                queryset.filter(**{f'{field}__in': values[start:start + IN_QUERY_SIZE]}).values_list(field, flat=True)
+            )
+        return taken
+
+    def taken_usernames(self, values: Iterable[str]) -> Set[str]:
+        return self._taken(TaiKhoan.objects.using(self.using), 'ten_dang_nhap', values)
+
+    def taken_mssv(self, values: Iterable[str]) -> Set[str]:
+        return self._taken(SinhVien.objects.using(self.using), 'ma_so_sinh_vien', values)
+
+    def taken_emails(self, values: Iterable[str]) -> Set[str]:
+        return self._taken(Users.objects.using(self.using), 'email', values)
+
+    def insert(self, students: List[NewStudent]) -> None:
+        now = timezone.now()
+        tai_khoans, users, sinh_viens = [], [], []
+        for student in students:
+            tai_khoan = TaiKhoan(
+                id=uuid.uuid4(), ten_dang_nhap=student.ten_dang_nhap, mat_khau=student.mat_khau,
+                loai_tai_khoan='sinh_vien', trang_thai_hoat_dong=True, ngay_tao=now, updated_at=now
+            )
+            user = Users(
+                id=uuid.uuid4(), ma_nhan_vien=student.ma_so_sinh_vien, ho_ten=student.ho_ten,
+                email=student.email, tai_khoan=tai_khoan, created_at=now, updated_at=now
+            )
+            tai_khoans.append(tai_khoan)
+            users.append(user)
+            sinh_viens.append(SinhVien(
+                id=user, ma_so_sinh_vien=student.ma_so_sinh_vien, lop=student.lop, khoa_id=student.khoa_id,
+                nganh_id=student.nganh_id, khoa_hoc=student.khoa_hoc, ngay_nhap_hoc=student.ngay_nhap_hoc
+            ))
+
+        with transaction.atomic(using=self.using):
+            TaiKhoan.objects.using(self.using).bulk_create(tai_khoans, batch_size=self.chunk_size)
+            Users.objects.using(self.using).bulk_create(users, batch_size=self.chunk_size)
+            SinhVien.objects.using(self.using).bulk_create(sinh_viens, batch_size=self.chunk_size)
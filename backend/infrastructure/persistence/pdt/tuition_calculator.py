@@ -0,0 +1,218 @@
+"""
+Bulk Tuition Calculator - Set-based học phí computation for a whole học kỳ
+Policies are resolved once into an in-memory (nganh, khoa) index, credits are
+summed with one aggregate query, and HocPhi / ChiTietHocPhi are written with
+bulk upserts per chunk of students. Chunks can run on a small worker pool.
+
+Policy priority per student (same as before): ngành > khoa > toàn trường.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Optional, Dict, List, Callable, Iterable, Tuple, Any
+from decouple import config
+from django.db import connections, transaction
+from django.db.models import Sum, Exists, OuterRef
+from django.utils import timezone
+import threading
+import uuid
+import logging
+
+from infrastructure.persistence.models import ChinhSachTinChi, DangKyHocPhan, HocPhi, ChiTietHocPhi
+
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Callable[[int, int], None]
+
+
+@dataclass(frozen=True)
+class TuitionPolicy:
+    id: Any
+    phi_moi_tin_chi: Decimal
+
+
+@dataclass
+class TuitionLine:
+    sinh_vien_id: Any
+    tong_tin_chi: int
+    policy: TuitionPolicy
+
+
+class TuitionPolicyIndex:
+    """ChinhSachTinChi of one học kỳ keyed by ngành / khoa / toàn trường"""
+
+    def __init__(self, rows: Iterable[Tuple[Any, Any, Any, Decimal]]):
+        self._by_nganh: Dict[str, TuitionPolicy] = {}
+        self._by_khoa: Dict[str, TuitionPolicy] = {}
+        self._general: Optional[TuitionPolicy] = None
+
+        # Rows come ordered by id; the first match wins, like `.first()` did
+        for id, khoa_id, nganh_id, phi in rows:
+            policy = TuitionPolicy(id=id, phi_moi_tin_chi=phi)
+            if nganh_id is not None:
+                self._by_nganh.setdefault(str(nganh_id), policy)
+            elif khoa_id is not None:
+                self._by_khoa.setdefault(str(khoa_id), policy)
+            elif self._general is None:
+                self._general = policy
+
+    @classmethod
+    def load(cls, hoc_ky_id: str, using: str = 'neon') -> 'TuitionPolicyIndex':
+        return cls(
+            ChinhSachTinChi.objects.using(using)
+            .filter(hoc_ky_id=hoc_ky_id)
+            .order_by('id')
+            .values_list('id', 'khoa_id', 'nganh_id', 'phi_moi_tin_chi')
+        )
+
+    def resolve(self, nganh_id: Any, khoa_id: Any) -> Optional[TuitionPolicy]:
+        if nganh_id is not None and str(nganh_id) in self._by_nganh:
+            return self._by_nganh[str(nganh_id)]
+        if khoa_id is not None and str(khoa_id) in self._by_khoa:
+            return self._by_khoa[str(khoa_id)]
+        return self._general
+
+
+class _Progress:
+    def __init__(self, total: int, callback: Optional[ProgressCallback]):
+        self.total = total
+        self.done = 0
+        self._callback = callback
+        self._lock = threading.Lock()
+
+    def advance(self, n: int) -> None:
+        with self._lock:
+            self.done += n
+            done = self.done
+        logger.info(f"Tuition bulk: {done}/{self.total} students written")
+        if self._callback:
+            self._callback(done, self.total)
+
+
+class BulkTuitionCalculator:
+    """Compute and persist học phí for every student registered in a học kỳ"""
+
+    def __init__(self, chunk_size: Optional[int] = None, workers: Optional[int] = None, using: str = 'neon'):
+        self.chunk_size = chunk_size or config('TUITION_BULK_CHUNK_SIZE', default=1000, cast=int)
+        self.workers = workers or config('TUITION_BULK_WORKERS', default=1, cast=int)
+        self.using = using
+
+    def _registrations(self, hoc_ky_id: str):
+        return DangKyHocPhan.objects.using(self.using).filter(
+            lop_hoc_phan__hoc_phan__id_hoc_ky_id=hoc_ky_id,
+            trang_thai='da_dang_ky'
+        )
+
+    def plan(self, hoc_ky_id: str) -> List[TuitionLine]:
+        """One aggregate query: total credits per student, matched to a policy"""
+        index = TuitionPolicyIndex.load(hoc_ky_id, self.using)
+        totals = (
+            self._registrations(hoc_ky_id)
+            .values('sinh_vien_id', 'sinh_vien__nganh_id', 'sinh_vien__khoa_id')
+            .annotate(tong_tin_chi=Sum('lop_hoc_phan__hoc_phan__mon_hoc__so_tin_chi'))
+            .order_by('sinh_vien_id')
+        )
+
+        lines = []
+        for row in totals:
+            if not row['tong_tin_chi']:
+                continue
+            policy = index.resolve(row['sinh_vien__nganh_id'], row['sinh_vien__khoa_id'])
+            if policy is None:
+                continue
+            lines.append(TuitionLine(row['sinh_vien_id'], row['tong_tin_chi'], policy))
+        return lines
+
+    def run(self, hoc_ky_id: str, on_progress: Optional[ProgressCallback] = None) -> int:
+        """Returns the number of students whose học phí was written"""
+        lines = self.plan(hoc_ky_id)
+        chunks = [lines[i:i + self.chunk_size] for i in range(0, len(lines), self.chunk_size)]
+        progress = _Progress(len(lines), on_progress)
+        logger.info(
+            f"Calculating tuition for {len(lines)} students in hoc_ky_id={hoc_ky_id} "
+            f"({len(chunks)} chunks, {self.workers} workers)"
+        )
+
+        if self.workers <= 1 or len(chunks) <= 1:
+            for chunk in chunks:
+                self._write_chunk(hoc_ky_id, chunk)
+                progress.advance(len(chunk))
+        else:
+            def _task(chunk: List[TuitionLine]) -> None:
+                try:
+                    self._write_chunk(hoc_ky_id, chunk)
+                    progress.advance(len(chunk))
+                finally:
+                    # Each pool thread owns its own connection
+                    connections[self.using].close()
+
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                for future in [pool.submit(_task, chunk) for chunk in chunks]:
+                    future.result()
+
+        return len(lines)
+
+    def _write_chunk(self, hoc_ky_id: str, chunk: List[TuitionLine]) -> None:
+        now = timezone.now()
+        sinh_vien_ids = [line.sinh_vien_id for line in chunk]
+        policy_by_sv = {line.sinh_vien_id: line.policy for line in chunk}
+
+        with transaction.atomic(using=self.using):
+            # 1. HocPhi upsert; payment status of existing rows is left alone
+            HocPhi.objects.using(self.using).bulk_create(
+                [
+                    HocPhi(
+                        id=uuid.uuid4(),
+                        sinh_vien_id=line.sinh_vien_id,
+                        hoc_ky_id=hoc_ky_id,
+                        tong_hoc_phi=line.tong_tin_chi * line.policy.phi_moi_tin_chi,
+                        chinh_sach_id=line.policy.id,
+                        ngay_tinh_toan=now,
+                        trang_thai_thanh_toan='chua_thanh_toan'
+                    )
+                    for line in chunk
+                ],
+                update_conflicts=True,
+                unique_fields=['sinh_vien', 'hoc_ky'],
+                update_fields=['tong_hoc_phi', 'chinh_sach', 'ngay_tinh_toan'],
+            )
+            hoc_phi_ids = dict(
+                HocPhi.objects.using(self.using)
+                .filter(hoc_ky_id=hoc_ky_id, sinh_vien_id__in=sinh_vien_ids)
+                .values_list('sinh_vien_id', 'id')
+            )
+
+            # 2. ChiTietHocPhi upsert, one line per registered class
+            registrations = (
+                self._registrations(hoc_ky_id)
+                .filter(sinh_vien_id__in=sinh_vien_ids)
+                .values_list('sinh_vien_id', 'lop_hoc_phan_id', 'lop_hoc_phan__hoc_phan__mon_hoc__so_tin_chi')
+            )
+            chi_tiets: Dict[Tuple[Any, Any], ChiTietHocPhi] = {}
+            for sinh_vien_id, lop_hoc_phan_id, so_tin_chi in registrations:
+                phi = policy_by_sv[sinh_vien_id].phi_moi_tin_chi
+                chi_tiets[(sinh_vien_id, lop_hoc_phan_id)] = ChiTietHocPhi(
+                    id=uuid.uuid4(),
+                    hoc_phi_id=hoc_phi_ids[sinh_vien_id],
+                    lop_hoc_phan_id=lop_hoc_phan_id,
+                    so_tin_chi=so_tin_chi,
+                    phi_tin_chi=phi,
+                    thanh_tien=so_tin_chi * phi
+                )
+            ChiTietHocPhi.objects.using(self.using).bulk_create(
+                list(chi_tiets.values()),
+                update_conflicts=True,
+                unique_fields=['hoc_phi', 'lop_hoc_phan'],
+                update_fields=['so_tin_chi', 'phi_tin_chi', 'thanh_tien'],
+            )
+
+            # 3. Drop lines of classes the student is no longer registered in
+            ChiTietHocPhi.objects.using(self.using).filter(
+                hoc_phi_id__in=list(hoc_phi_ids.values())
+            ).exclude(
+                Exists(DangKyHocPhan.objects.using(self.using).filter(
+                    sinh_vien_id=OuterRef('hoc_phi__sinh_vien_id'),
+                    lop_hoc_phan_id=OuterRef('lop_hoc_phan_id'),
+                    trang_thai='da_dang_ky'
+                ))
+            ).delete()
@@ -0,0 +1,137 @@
+"""
+Tuition Projector - Keeps HocPhi current as registrations change
+Each registration event is applied as a delta for one student: insert or
+delete the affected ChiTietHocPhi rows and adjust tong_hoc_phi by their
+thanh_tien. The whole-semester BulkTuitionCalculator remains as the
+reconciliation pass (e.g. after a policy change or a failed handler).
+"""
+from decimal import Decimal
+from typing import Optional, Iterable, Any
+from decouple import config
+from django.db import transaction
+from django.db.models import F, Q, Value, DecimalField
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+import uuid
+import logging
+
+from domain.course_registration.events import LopHocPhanDaDangKy, LopHocPhanDaHuy, LopHocPhanDaChuyen
+from infrastructure.persistence.models import ChinhSachTinChi, SinhVien, LopHocPhan, HocPhi, ChiTietHocPhi
+from infrastructure.persistence.pdt.tuition_calculator import TuitionPolicyIndex, TuitionPolicy
+
+logger = logging.getLogger(__name__)
+
+
+class TuitionProjector:
+    def __init__(self, using: str = 'neon'):
+        self.using = using
+
+    def on_dang_ky(self, event: LopHocPhanDaDangKy) -> None:
+        self.apply(event.sinh_vien_id, event.hoc_ky_id, added=[event.lop_hoc_phan_id])
+
+    def on_huy(self, event: LopHocPhanDaHuy) -> None:
+        self.apply(event.sinh_vien_id, event.hoc_ky_id, removed=[event.lop_hoc_phan_id])
+
+    def on_chuyen(self, event: LopHocPhanDaChuyen) -> None:
+        self.apply(event.sinh_vien_id, event.hoc_ky_id, added=[event.lop_moi_id], removed=[event.lop_cu_id])
+
+    def resolve_policy(self, sinh_vien_id: str, hoc_ky_id: str) -> Optional[TuitionPolicy]:
+        """Same ngành > khoa > toàn trường rule as the bulk pass, for one student"""
+        sv = SinhVien.objects.using(self.using).filter(id=sinh_vien_id).values('nganh_id', 'khoa_id').first()
+        if not sv:
+            return None
+        candidates = Q(nganh__isnull=True, khoa__isnull=True)
+        if sv['khoa_id'] is not None:
+            candidates |= Q(nganh__isnull=True, khoa_id=sv['khoa_id'])
+        if sv['nganh_id'] is not None:
+            candidates |= Q(nganh_id=sv['nganh_id'])
+        index = TuitionPolicyIndex(
+            ChinhSachTinChi.objects.using(self.using)
+            .filter(candidates, hoc_ky_id=hoc_ky_id)
+            .order_by('id')
+            .values_list('id', 'khoa_id', 'nganh_id', 'phi_moi_tin_chi')
+        )
+        return index.resolve(sv['nganh_id'], sv['khoa_id'])
+
+    def apply(self, sinh_vien_id: str, hoc_ky_id: str, added: Iterable[Any] = (), removed: Iterable[Any] = ()) -> None:
+        added, removed = [str(x) for x in added], [str(x) for x in removed]
+        policy = self.resolve_policy(sinh_vien_id, hoc_ky_id) if added else None
+        if added and policy is None:
+            logger.info(f"No tuition policy for SV {sinh_vien_id} in HK {hoc_ky_id}; skipping added classes")
+            added = []
+        if not added and not removed:
+            return
+
+        with transaction.atomic(using=self.using):
+            hoc_phi = self._lock_hoc_phi(sinh_vien_id, hoc_ky_id, policy, create=bool(added))
+            if hoc_phi is None:
+                return
+            delta = Decimal(0)
+
+            if removed:
+                lines = ChiTietHocPhi.objects.using(self.using).filter(hoc_phi_id=hoc_phi.id, lop_hoc_phan_id__in=removed)
+                delta -= sum((thanh_tien for thanh_tien in lines.values_list('thanh_tien', flat=True)), Decimal(0))
+                lines.delete()
+
+            if added:
+                existing = set(
+                    str(lop_id) for lop_id in ChiTietHocPhi.objects.using(self.using)
+                    .filter(hoc_phi_id=hoc_phi.id, lop_hoc_phan_id__in=added)
+                    .values_list('lop_hoc_phan_id', flat=True)
+                )
+                credits = LopHocPhan.objects.using(self.using).filter(
+                    id__in=[lop_id for lop_id in added if lop_id not in existing]
+                ).values_list('id', 'hoc_phan__mon_hoc__so_tin_chi')
+                new_lines = [
+                    ChiTietHocPhi(
+                        id=uuid.uuid4(),
+                        hoc_phi_id=hoc_phi.id,
+                        lop_hoc_phan_id=lop_id,
+                        so_tin_chi=so_tin_chi,
+                        phi_tin_chi=policy.phi_moi_tin_chi,
+                        thanh_tien=so_tin_chi * policy.phi_moi_tin_chi
+                    )
+                    for lop_id, so_tin_chi in credits
+                ]
+                ChiTietHocPhi.objects.using(self.using).bulk_create(new_lines)
+                delta += sum((line.thanh_tien for line in new_lines), Decimal(0))
+
+            updates = {'ngay_tinh_toan': timezone.now()}
+            if delta:
+                updates['tong_hoc_phi'] = Coalesce(
+                    F('tong_hoc_phi'), Value(Decimal(0)), output_field=DecimalField()
+                ) + delta
+            if policy is not None:
+                updates['chinh_sach_id'] = policy.id
+            HocPhi.objects.using(self.using).filter(id=hoc_phi.id).update(**updates)
+
+    def _lock_hoc_phi(self, sinh_vien_id: str, hoc_ky_id: str, policy: Optional[TuitionPolicy], create: bool) -> Optional[HocPhi]:
+        """Row-lock the student's HocPhi (creating an empty one if needed) so deltas apply one at a time"""
+        queryset = HocPhi.objects.using(self.using).select_for_update().filter(
+            sinh_vien_id=sinh_vien_id, hoc_ky_id=hoc_ky_id
+        )
+        hoc_phi = queryset.first()
+        if hoc_phi is None and create:
+            HocPhi.objects.using(self.using).bulk_create([
+                HocPhi(
+                    id=uuid.uuid4(),
+                    sinh_vien_id=sinh_vien_id,
+                    hoc_ky_id=hoc_ky_id,
+                    tong_hoc_phi=Decimal(0),
+                    chinh_sach_id=policy.id if policy else None,
+                    ngay_tinh_toan=timezone.now(),
+                    trang_thai_thanh_toan='chua_thanh_toan'
+                )
+            ], ignore_conflicts=True)
+            hoc_phi = queryset.first()
+        return hoc_phi
+
+
+def register_tuition_projector(bus) -> None:
+    """Subscribe the projector unless TUITION_PROJECTION_ENABLED is off"""
+    if not config('TUITION_PROJECTION_ENABLED', default=True, cast=bool):
+        return
+    projector = TuitionProjector()
+    bus.subscribe(LopHocPhanDaDangKy, projector.on_dang_ky)
+    bus.subscribe(LopHocPhanDaHuy, projector.on_huy)
+    bus.subscribe(LopHocPhanDaChuyen, projector.on_chuyen)
@@ -1,59 +1,68 @@
 """
 AWS S3 Service - Upload, download, and manage files in S3
 Used for tài liệu học tập storage
+
+The objects live in whichever infrastructure.storage backend STORAGE_BACKEND
+selects (S3, local filesystem or in-memory); this class keeps the key layout
+and turns backend errors into None / False results.
 """
-from typing import Optional, Dict, Any, BinaryIO
-from decouple import config
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, BinaryIO, Iterable, List
+import hashlib
 import logging
+import tempfile
 import uuid
 from datetime import datetime
 
+from infrastructure.storage import (
+    IStorageBackend, PartInfo, MultipartUpload, StreamedObject, STREAM_CHUNK_SIZE, get_storage_backend,
+)
+
 logger = logging.getLogger(__name__)
 
-# Lazy-load boto3
-_s3_client = None
+CONTENT_KEY_PREFIX = 'tai-lieu/sha256/'
+# Non-seekable uploads are kept in memory up to this size while hashing, then on disk
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
 
 
-def get_s3_client():
-    """Get S3 client (singleton pattern)"""
-    global _s3_client
-    
-    if _s3_client is None:
-        try:
-            import boto3
-            from botocore.config import Config
-            
-            aws_access_key = config('AWS_ACCESS_KEY_ID', default=None)
-            aws_secret_key = config('AWS_SECRET_ACCESS_KEY', default=None)
-            aws_region = config('AWS_REGION', default='ap-southeast-2')
-            
-            if not aws_access_key or not aws_secret_key:
-                logger.warning("AWS credentials not configured, S3 features disabled")
-                return None
-            
-            _s3_client = boto3.client(
-                's3',
-                aws_access_key_id=aws_access_key,
-                aws_secret_access_key=aws_secret_key,
-                region_name=aws_region,
-                config=Config(
-                    signature_version='s3v4',
-                    connect_timeout=5,
-                    read_timeout=10,
-                )
-            )
-            
-            logger.info("✅ S3 client initialized successfully")
-            
-        except ImportError:
-            logger.error("❌ boto3 not installed. Run: pip install boto3")
-            return None
-        except Exception as e:
-            logger.error(f"❌ S3 client initialization failed: {e}")
-            _s3_client = None
-            return None
-    
-    return _s3_client
+def content_key(sha256: str) -> str:
+    """Key of the shared blob holding content with this SHA-256"""
+    return f"{CONTENT_KEY_PREFIX}{sha256}"
+
+
+def is_content_key(s3_key: str) -> bool:
+    return s3_key.startswith(CONTENT_KEY_PREFIX)
+
+
+@dataclass
+class HashedContent:
+    """
+    An upload read once for its SHA-256. `source` can be replayed from `start`
+    (for another put) until the object is closed; a spooled copy is closed with it.
+    """
+    source: BinaryIO
+    sha256: str
+    size: int
+    start: int = 0
+    spooled: bool = False
+
+    @property
+    def key(self) -> str:
+        return content_key(self.sha256)
+
+    def rewind(self) -> BinaryIO:
+        self.source.seek(self.start)
+        return self.source
+
+    def close(self) -> None:
+        if self.spooled:
+            self.source.close()
+
+    def __enter__(self) -> 'HashedContent':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
 
 
 class S3Service:
@@ -62,19 +71,17 @@ class S3Service:
     
     Structure:
     - tai-lieu/{lop_hoc_phan_id}/{filename}
+    - tai-lieu/sha256/{digest}  (content-addressed, shared by identical uploads)
     - temp/{uuid}  (temporary uploads)
     """
     
-    def __init__(self):
-        self.client = get_s3_client()
-        self.bucket_name = config('AWS_S3_BUCKET_NAME', default='hcmue-tailieu-hoctap-20251029')
-        self.base_url = config('AWS_S3_BASE_URL', default=f'https://{self.bucket_name}.s3.ap-southeast-2.amazonaws.com')
-        self.region = config('AWS_REGION', default='ap-southeast-2')
+    def __init__(self, backend: Optional[IStorageBackend] = None):
+        self.backend = backend or get_storage_backend()
     
     @property
     def is_available(self) -> bool:
         """Check if S3 is available"""
-        return self.client is not None
+        return self.backend.is_available
     
     # ============ UPLOAD OPERATIONS ============
     
@@ -104,32 +111,12 @@ class S3Service:
             return None
         
         try:
-            # Generate unique key
-            ext = filename.split('.')[-1] if '.' in filename else ''
-            unique_id = str(uuid.uuid4())[:8]
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            s3_key = self._new_key(filename, lop_hoc_phan_id)
             
-            # Clean filename
-            safe_filename = self._sanitize_filename(filename)
-            
-            # S3 key path
-            s3_key = f"tai-lieu/{lop_hoc_phan_id}/{timestamp}_{unique_id}_{safe_filename}"
-            
-            # Metadata
-            extra_args = {
-                'ContentType': content_type,
-                'Metadata': metadata or {}
-            }
+            # Upload (streamed from file_obj)
+            self.backend.put(s3_key, file_obj, content_type, metadata)
             
-            # Upload
-            self.client.upload_fileobj(
-                file_obj,
-                self.bucket_name,
-                s3_key,
-                ExtraArgs=extra_args
-            )
-            
-            url = f"{self.base_url}/{s3_key}"
+            url = self.backend.public_url(s3_key)
             
             logger.info(f"✅ File uploaded: {s3_key}")
             
@@ -155,33 +142,220 @@ class S3Service:
         from io import BytesIO
         file_obj = BytesIO(data)
         return self.upload_file(file_obj, filename, lop_hoc_phan_id, content_type)
+
+    def upload_content(
+        self,
+        file_obj: BinaryIO,
+        content_type: str = 'application/octet-stream'
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Upload a file under its content address (tai-lieu/sha256/{digest})
+
+        The SHA-256 is computed incrementally in one read of file_obj (input that
+        cannot seek is spooled to a temporary file on the way); the upload itself is
+        skipped when a blob with that digest is already stored. Blobs are shared, so
+        they must only be deleted once no TaiLieu references them.
+
+        Returns:
+            Dict with 'key', 'sha256', 'size' and 'created' (False for an existing blob) or None
+        """
+        if not self.is_available:
+            logger.error("S3 not available")
+            return None
+
+        content = self.hash_content(file_obj)
+        if content is None:
+            return None
+        with content:
+            return self.put_content(content, content_type)
+
+    def hash_content(self, file_obj: BinaryIO) -> Optional[HashedContent]:
+        """
+        SHA-256 and size of file_obj from its current position, read in chunks
+
+        The result keeps file_obj (rewound to where it was) or, when it cannot seek,
+        a spooled copy of it, so the same bytes can be put again with put_content.
+        """
+        seekable = getattr(file_obj, 'seekable', lambda: False)()
+        source = file_obj if seekable else tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+        try:
+            start = file_obj.tell() if seekable else 0
+            digest = hashlib.sha256()
+            size = 0
+            while True:
+                chunk = file_obj.read(STREAM_CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                size += len(chunk)
+                if not seekable:
+                    source.write(chunk)
+
+            content = HashedContent(source, digest.hexdigest(), size, start, spooled=not seekable)
+            content.rewind()
+            return content
+
+        except Exception as e:
+            logger.error(f"❌ Failed to read upload: {e}")
+            if not seekable:
+                source.close()
+            return None
+
+    def put_content(
+        self,
+        content: HashedContent,
+        content_type: str = 'application/octet-stream'
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Store hashed content under content.key unless that blob already exists
+
+        Returns:
+            Dict with 'key', 'sha256', 'size' and 'created' (False for an existing blob) or None
+        """
+        if not self.is_available:
+            logger.error("S3 not available")
+            return None
+
+        try:
+            created = not self.exists(content.key)
+            if created:
+                self.backend.put(content.key, content.rewind(), content_type)
+                logger.info(f"✅ File uploaded: {content.key}")
+
+            return {
+                'key': content.key,
+                'sha256': content.sha256,
+                'size': content.size,
+                'created': created,
+            }
+
+        except Exception as e:
+            logger.error(f"❌ S3 upload failed: {e}")
+            return None
+
+    def exists(self, s3_key: str) -> bool:
+        """Whether the object exists (a failed check counts as missing)"""
+        try:
+            self.backend.head(s3_key)
+            return True
+        except Exception:
+            return False
+
+    # ============ MULTIPART UPLOAD OPERATIONS ============
+    
+    def create_upload(
+        self,
+        filename: str,
+        lop_hoc_phan_id: str,
+        content_type: str = 'application/octet-stream'
+    ) -> Optional[Dict[str, str]]:
+        """
+        Start a multipart upload; parts are sent with upload_part
+        
+        Returns:
+            Dict with 'key' and 'upload_id' or None on failure
+        """
+        if not self.is_available:
+            return None
+        
+        try:
+            s3_key = self._new_key(filename, lop_hoc_phan_id)
+            upload_id = self.backend.create_multipart(s3_key, content_type)
+            return {'key': s3_key, 'upload_id': upload_id}
+            
+        except Exception as e:
+            logger.error(f"Failed to start multipart upload: {e}")
+            return None
+    
+    def upload_part(self, s3_key: str, upload_id: str, part_number: int, file_obj: BinaryIO, size: int) -> Optional[str]:
+        """Upload (or re-upload) one part; returns its ETag or None"""
+        if not self.is_available:
+            return None
+        
+        try:
+            return self.backend.upload_part(s3_key, upload_id, part_number, file_obj, size)
+            
+        except Exception as e:
+            logger.error(f"Failed to upload part {part_number} of {s3_key}: {e}")
+            return None
+    
+    def list_parts(self, s3_key: str, upload_id: str) -> Optional[List[PartInfo]]:
+        """Parts received so far, or None if the upload does not exist"""
+        if not self.is_available:
+            return None
+        
+        try:
+            return self.backend.list_parts(s3_key, upload_id)
+            
+        except Exception as e:
+            logger.error(f"Failed to list parts of {s3_key}: {e}")
+            return None
+    
+    def complete_upload(self, s3_key: str, upload_id: str, parts: List[PartInfo]) -> bool:
+        """Join the parts into the final object"""
+        if not self.is_available:
+            return False
+        
+        try:
+            self.backend.complete_multipart(s3_key, upload_id, parts)
+            logger.info(f"✅ File uploaded: {s3_key} ({len(parts)} parts)")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to complete multipart upload: {e}")
+            return False
+    
+    def abort_upload(self, s3_key: str, upload_id: str) -> bool:
+        """Abort a multipart upload and free its parts"""
+        if not self.is_available:
+            return False
+        
+        try:
+            self.backend.abort_multipart(s3_key, upload_id)
+            return True
+            
+        except Exception as e:
+            logger.error(f"Failed to abort multipart upload: {e}")
+            return False
+    
+    def list_uploads(self, prefix: str = 'tai-lieu/') -> List[MultipartUpload]:
+        """Multipart uploads under prefix that were never completed or aborted"""
+        if not self.is_available:
+            return []
+        
+        try:
+            return self.backend.list_multipart_uploads(prefix)
+            
+        except Exception as e:
+            logger.error(f"Failed to list multipart uploads: {e}")
+            return []
     
     # ============ DOWNLOAD OPERATIONS ============
     
-    def get_file_url(self, s3_key: str, expires_in: int = 3600) -> Optional[str]:
+    def get_file_url(
+        self,
+        s3_key: str,
+        expires_in: int = 3600,
+        content_disposition: Optional[str] = None,
+        content_type: Optional[str] = None
+    ) -> Optional[str]:
         """
         Generate a presigned URL for downloading
         
         Args:
             s3_key: S3 object key
             expires_in: URL expiration in seconds (default 1 hour)
+            content_disposition: Content-Disposition S3 should answer with
+            content_type: Content-Type S3 should answer with
         
         Returns:
-            Presigned URL or None
+            Presigned URL, or None (also when the backend cannot presign)
         """
         if not self.is_available:
             return None
         
         try:
-            url = self.client.generate_presigned_url(
-                'get_object',
-                Params={
-                    'Bucket': self.bucket_name,
-                    'Key': s3_key
-                },
-                ExpiresIn=expires_in
-            )
-            return url
+            return self.backend.presigned_url(s3_key, expires_in, content_disposition, content_type)
             
         except Exception as e:
             logger.error(f"Failed to generate presigned URL: {e}")
@@ -189,7 +363,7 @@ class S3Service:
     
     def get_public_url(self, s3_key: str) -> str:
         """Get public URL (if bucket allows public access)"""
-        return f"{self.base_url}/{s3_key}"
+        return self.backend.public_url(s3_key)
     
     def download_file(self, s3_key: str) -> Optional[bytes]:
         """Download file content"""
@@ -197,21 +371,61 @@ class S3Service:
             return None
         
         try:
-            from io import BytesIO
-            
-            buffer = BytesIO()
-            self.client.download_fileobj(
-                self.bucket_name,
-                s3_key,
-                buffer
-            )
-            buffer.seek(0)
-            return buffer.read()
+            return b''.join(self.backend.open(s3_key))
             
         except Exception as e:
             logger.error(f"Failed to download file: {e}")
             return None
     
+    def head_file(self, s3_key: str) -> Optional[Dict[str, Any]]:
+        """
+        Size, ETag and Last-Modified of an object, without its body
+        
+        Returns:
+            Dict with 'size', 'etag', 'last_modified', 'content_type' or None
+        """
+        if not self.is_available:
+            return None
+        
+        try:
+            info = self.backend.head(s3_key)
+            return {
+                'size': info.size,
+                'etag': info.etag,
+                'last_modified': info.last_modified,
+                'content_type': info.content_type,
+            }
+            
+        except Exception as e:
+            logger.error(f"Failed to read file metadata: {e}")
+            return None
+    
+    def open_file(
+        self,
+        s3_key: str,
+        start: Optional[int] = None,
+        end: Optional[int] = None,
+        chunk_size: int = STREAM_CHUNK_SIZE
+    ) -> Optional[StreamedObject]:
+        """
+        Open an object (or the inclusive byte range start..end) for chunked reading
+        
+        The request is made here, so a missing object is reported before any
+        response has started; the body is read chunk by chunk as it is iterated.
+        
+        Returns:
+            StreamedObject (iterable of bytes, closeable) or None
+        """
+        if not self.is_available:
+            return None
+        
+        try:
+            return self.backend.open(s3_key, start, end, chunk_size)
+            
+        except Exception as e:
+            logger.error(f"Failed to open file: {e}")
+            return None
+    
     # ============ DELETE OPERATIONS ============
     
     def delete_file(self, s3_key: str) -> bool:
@@ -220,10 +434,7 @@ class S3Service:
             return False
         
         try:
-            self.client.delete_object(
-                Bucket=self.bucket_name,
-                Key=s3_key
-            )
+            self.backend.delete(s3_key)
             logger.info(f"✅ File deleted: {s3_key}")
             return True
             
@@ -231,18 +442,14 @@ class S3Service:
             logger.error(f"Failed to delete file: {e}")
             return False
     
-    def delete_files(self, s3_keys: list) -> bool:
-        """Delete multiple files"""
+    def delete_files(self, s3_keys: Iterable[str]) -> bool:
+        """Delete multiple files (batched by the backend)"""
         if not self.is_available:
             return False
         
         try:
-            objects = [{'Key': key} for key in s3_keys]
-            
-            self.client.delete_objects(
-                Bucket=self.bucket_name,
-                Delete={'Objects': objects}
-            )
+            s3_keys = list(s3_keys)
+            self.backend.delete_many(s3_keys)
             
             logger.info(f"✅ Deleted {len(s3_keys)} files")
             return True
@@ -259,22 +466,15 @@ class S3Service:
             return []
         
         try:
-            response = self.client.list_objects_v2(
-                Bucket=self.bucket_name,
-                Prefix=prefix,
-                MaxKeys=max_keys
-            )
-            
-            files = []
-            for obj in response.get('Contents', []):
-                files.append({
-                    'key': obj['Key'],
-                    'size': obj['Size'],
-                    'last_modified': obj['LastModified'].isoformat(),
-                    'url': self.get_public_url(obj['Key'])
-                })
-            
-            return files
+            return [
+                {
+                    'key': obj.key,
+                    'size': obj.size,
+                    'last_modified': obj.last_modified.isoformat() if obj.last_modified else None,
+                    'url': self.get_public_url(obj.key)
+                }
+                for obj in self.backend.list(prefix, max_keys)
+            ]
             
         except Exception as e:
             logger.error(f"Failed to list files: {e}")
@@ -287,6 +487,12 @@ class S3Service:
     
     # ============ UTILITY METHODS ============
     
+    def _new_key(self, filename: str, lop_hoc_phan_id: str) -> str:
+        """tai-lieu/{lop_hoc_phan_id}/{timestamp}_{unique id}_{filename}"""
+        unique_id = str(uuid.uuid4())[:8]
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        return f"tai-lieu/{lop_hoc_phan_id}/{timestamp}_{unique_id}_{self._sanitize_filename(filename)}"
+    
     def _sanitize_filename(self, filename: str) -> str:
         """Sanitize filename for S3"""
         import re
@@ -309,13 +515,7 @@ class S3Service:
             }
         
         try:
-            # Try to list bucket
-            self.client.head_bucket(Bucket=self.bucket_name)
-            return {
-                'status': 'healthy',
-                'bucket': self.bucket_name,
-                'region': self.region
-            }
+            return self.backend.health_check()
         except Exception as e:
             return {
                 'status': 'error',
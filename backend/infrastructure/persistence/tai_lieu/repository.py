@@ -3,10 +3,13 @@ Infrastructure Layer - TaiLieu Repository Implementation
 
 Implements ITaiLieuRepository using Django ORM.
 """
+from contextlib import contextmanager
 from typing import List, Optional
 from datetime import datetime
 import uuid
 
+from django.db import connections, transaction
+
 from application.tai_lieu.interfaces.repositories import (
     ITaiLieuRepository,
     TaiLieuDTO,
@@ -113,6 +116,20 @@ class TaiLieuRepository(ITaiLieuRepository):
         except TaiLieu.DoesNotExist:
             return None
     
+    def count_by_file_path(self, file_path: str) -> int:
+        """Count TaiLieu referencing a stored file"""
+        return TaiLieu.objects.using('neon').filter(file_path=file_path).count()
+    
+    @contextmanager
+    def file_lock(self, file_path: str):
+        """Transaction holding an advisory lock on file_path until it ends"""
+        with transaction.atomic(using='neon'):
+            connection = connections['neon']
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT pg_advisory_xact_lock(hashtextextended(%s, 0))", [file_path])
+            yield
+    
     def get_lop_hoc_phan_owner(self, lop_hoc_phan_id: str) -> Optional[str]:
         """Get the GiangVien user_id who owns this LopHocPhan"""
         try:
@@ -0,0 +1,173 @@
+"""
+TKB Read Model - Shared per-học kỳ view of the MongoDB TKB
+Replaces the per-request `ma_hoc_phan -> ten_lop -> lop` maps built by each use case
+
+Each worker keeps one indexed snapshot per học kỳ. Snapshots are tagged with
+the học kỳ version from MongoDB (tkb_versions), which every TKB write bumps,
+so a worker rebuilds only after the schedule actually changed.
+"""
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, List, Tuple
+from decouple import config
+import threading
+import time
+import logging
+
+from infrastructure.persistence.mongodb_service import get_mongodb_service
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class TKBEntry:
+    """One weekly session together with the class it belongs to"""
+    ma_mon: str
+    ten_lop: str
+    session: Dict[str, Any]  # raw snake_case danhSachLop item
+
+
+@dataclass(frozen=True)
+class GVTKBEntry:
+    """A session of a class taught by a giảng viên"""
+    lop_hoc_phan_id: str
+    ma_lop: str
+    ma_mon: str
+    ten_mon: str
+    session: Dict[str, Any]
+
+
+class TKBSemester:
+    """Immutable, indexed snapshot of one học kỳ's TKB documents"""
+
+    def __init__(self, hoc_ky_id: str, version: int, docs: List[Dict]):
+        self.hoc_ky_id = hoc_ky_id
+        self.version = version
+        self._by_lop: Dict[Tuple[str, str], List[Dict]] = {}
+        self._by_phong: Dict[str, List[TKBEntry]] = {}
+        self._by_mon: Dict[str, List[TKBEntry]] = {}
+
+        for doc in docs:
+            ma_mon = doc.get('ma_hoc_phan')
+            for lop in doc.get('danhSachLop', []):
+                ten_lop = lop.get('ten_lop')
+                if not ma_mon or not ten_lop:
+                    continue
+                entry = TKBEntry(ma_mon, ten_lop, lop)
+                self._by_lop.setdefault((ma_mon, ten_lop), []).append(lop)
+                self._by_mon.setdefault(ma_mon, []).append(entry)
+                phong_hoc_id = lop.get('phong_hoc_id')
+                if phong_hoc_id:
+                    self._by_phong.setdefault(str(phong_hoc_id), []).append(entry)
+
+    def __len__(self) -> int:
+        """Number of môn học with a schedule"""
+        return len(self._by_mon)
+
+    def get_sessions(self, ma_mon: str, ten_lop: str) -> List[Dict]:
+        """All weekly sessions of a class (a class can meet on several days)"""
+        return self._by_lop.get((ma_mon, ten_lop), [])
+
+    def by_mon(self, ma_mon: str) -> List[TKBEntry]:
+        return self._by_mon.get(ma_mon, [])
+
+    def by_phong(self, phong_hoc_id: str) -> List[TKBEntry]:
+        return self._by_phong.get(str(phong_hoc_id), [])
+
+    def phong_ids(self) -> List[str]:
+        """Every room used by the học kỳ's schedule"""
+        return list(self._by_phong)
+
+
+class TKBReadModel:
+    """
+    Process-wide cache of TKBSemester snapshots.
+
+    The MongoDB version is checked at most once per `check_interval` seconds
+    per học kỳ; writes made through MongoDBService drop the local snapshot
+    immediately and bump the version for the other workers.
+    """
+
+    def __init__(self, mongo_service=None, check_interval: Optional[float] = None):
+        self._mongo_service = mongo_service
+        self.check_interval = check_interval if check_interval is not None else config(
+            'TKB_READ_MODEL_CHECK_SECONDS', default=5, cast=float
+        )
+        self._lock = threading.Lock()
+        self._semesters: Dict[str, Tuple[TKBSemester, float]] = {}
+
+    @property
+    def mongo_service(self):
+        return self._mongo_service or get_mongodb_service()
+
+    def get(self, hoc_ky_id: str) -> TKBSemester:
+        hoc_ky_id = str(hoc_ky_id)
+        with self._lock:
+            cached = self._semesters.get(hoc_ky_id)
+
+        if not self.mongo_service.is_available:
+            logger.warning("MongoDB not available, TKB will be empty")
+            return TKBSemester(hoc_ky_id, 0, [])
+
+        now = time.monotonic()
+        if cached and now - cached[1] < self.check_interval:
+            return cached[0]
+
+        # Read the version before the documents: a write in between only
+        # makes the next check rebuild again, never serves stale data as new
+        version = self.mongo_service.get_tkb_version(hoc_ky_id)
+        if cached and cached[0].version == version:
+            semester = cached[0]
+        else:
+            docs = self.mongo_service.get_tkb_by_hoc_ky(hoc_ky_id, transform_to_camel=False)
+            semester = TKBSemester(hoc_ky_id, version, docs)
+            logger.debug(f"Built TKB read model for HK {hoc_ky_id} v{version} ({len(semester)} môn học)")
+
+        with self._lock:
+            self._semesters[hoc_ky_id] = (semester, now)
+        return semester
+
+    def invalidate(self, hoc_ky_id: Optional[str] = None) -> None:
+        with self._lock:
+            if hoc_ky_id is None:
+                self._semesters.clear()
+            else:
+                self._semesters.pop(str(hoc_ky_id), None)
+
+    def by_giang_vien(self, giang_vien_id: str, hoc_ky_id: str) -> List[GVTKBEntry]:
+        """
+        Sessions of every class a giảng viên teaches in the học kỳ.
+        Class assignment lives in PostgreSQL, so it is read fresh (one query)
+        and joined to the cached (ma_mon, ten_lop) index.
+        """
+        from infrastructure.persistence.models import LopHocPhan
+
+        lops = LopHocPhan.objects.using('neon').filter(
+            giang_vien_id=giang_vien_id,
+            hoc_phan__id_hoc_ky=hoc_ky_id
+        ).values('id', 'ma_lop', 'hoc_phan__mon_hoc__ma_mon', 'hoc_phan__mon_hoc__ten_mon')
+
+        semester = self.get(hoc_ky_id)
+        entries = []
+        for lop in lops:
+            ma_mon = lop['hoc_phan__mon_hoc__ma_mon']
+            for session in semester.get_sessions(ma_mon, lop['ma_lop']):
+                entries.append(GVTKBEntry(
+                    lop_hoc_phan_id=str(lop['id']),
+                    ma_lop=lop['ma_lop'],
+                    ma_mon=ma_mon,
+                    ten_mon=lop['hoc_phan__mon_hoc__ten_mon'],
+                    session=session
+                ))
+        return entries
+
+
+# Singleton instance
+_tkb_read_model = None
+
+
+def get_tkb_read_model() -> TKBReadModel:
+    """Get TKB read model singleton"""
+    global _tkb_read_model
+    if _tkb_read_model is None:
+        _tkb_read_model = TKBReadModel()
+    return _tkb_read_model
@@ -30,6 +30,7 @@ from infrastructure.persistence.models import (
     DeXuatHocPhan,
 )
 from infrastructure.persistence.mongodb_service import MongoDBService
+from infrastructure.persistence.catalog_snapshot import get_catalog_snapshot_store
 
 
 class TLKRepository(ITLKRepository):
@@ -410,6 +411,10 @@ class TLKThoiKhoaBieuRepository:
                 logging.error(f"Error creating lop: {e}")
                 continue
         
+        if created_count > 0:
+            # New classes: other workers see the TKB version bump below
+            get_catalog_snapshot_store().invalidate(hoc_ky_id)
+        
         # Save TKB to MongoDB (PRIMARY storage for schedules)
         # ALWAYS save MongoDB even if LopHocPhan already exists (we're adding schedules)
         if processed_count > 0:
@@ -1,19 +1,69 @@
+import uuid
+from decouple import config
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
 from rest_framework_simplejwt.settings import api_settings
 from infrastructure.persistence.models import Users
+from infrastructure.security.user_cache import get_user_cache
 from django.utils.translation import gettext_lazy as _
 
+
+def load_user(user_id):
+    """Load the Users row (with its tai_khoan); a missing row or a deactivated account fails authentication"""
+    try:
+        user = Users.objects.using('neon').select_related('tai_khoan').get(id=user_id)
+    except Users.DoesNotExist:
+        raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+    if user.tai_khoan is not None and user.tai_khoan.trang_thai_hoat_dong is False:
+        raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+    return user
+
+
 class UserWrapper:
     """
     Wrapper for Users model to provide Django Auth compatibility
     without modifying the auto-generated model.
+
+    Built either from a loaded row, or from token claims only: then `id`,
+    `pk` and `role` come from the token and the row is loaded on first
+    access to any other attribute.
     """
-    def __init__(self, user):
+    def __init__(self, user=None, user_id=None, role=None, loader=None):
         self._user = user
+        self._user_id = user.id if user is not None else user_id
+        self._role = role
+        self._loader = loader
+
+    @classmethod
+    def from_claims(cls, user_id, role=None, loader=None):
+        return cls(user_id=user_id, role=role, loader=loader)
+
+    def _get_user(self):
+        if self._user is None:
+            self._user = self._loader(self._user_id)
+        return self._user
 
     def __getattr__(self, name):
-        return getattr(self._user, name)
+        # Only reached for attributes not found on the wrapper itself
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self._get_user(), name)
+
+    @property
+    def id(self):
+        return self._user_id
+
+    @property
+    def role(self):
+        if self._role is None:
+            tai_khoan = self._get_user().tai_khoan
+            self._role = tai_khoan.loai_tai_khoan if tai_khoan else None
+        return self._role
+
+    @property
+    def is_loaded(self):
+        return self._user is not None
 
     @property
     def is_authenticated(self):
@@ -26,15 +76,31 @@ class UserWrapper:
     @property
     def is_active(self):
         return True
-        
+
     @property
     def pk(self):
-        return self._user.id
-        
+        return self._user_id
+
     def __str__(self):
-        return str(self._user.id)
+        return str(self._user_id)
 
 class CustomJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication backed by the neon Users table.
+
+    JWT_STATELESS_PRINCIPAL=True builds the user from the `user_id`/`role`
+    claims without a query; JWT_USER_CACHE_SECONDS>0 caches loaded rows.
+    Stateless mode does not re-check the account on every request: a
+    deactivated account is rejected only when its row is (re)loaded, i.e.
+    when a view reads a non-claim attribute.
+    """
+    stateless = config('JWT_STATELESS_PRINCIPAL', default=False, cast=bool)
+    role_claim = 'role'
+
+    @property
+    def user_cache(self):
+        return get_user_cache()
+
     def get_user(self, validated_token):
         """
         Attempts to find and return a user using the given validated token.
@@ -44,10 +110,25 @@ class CustomJWTAuthentication(JWTAuthentication):
         except KeyError:
             raise InvalidToken(_("Token contained no recognizable user identification"))
 
+        if not self.stateless:
+            # Wrap the user to provide auth properties
+            return UserWrapper(self._load_user(user_id))
+
         try:
-            user = Users.objects.using('neon').get(id=user_id)
-        except Users.DoesNotExist:
-            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+            user_id = uuid.UUID(str(user_id))
+        except ValueError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        # Reuse a fresh cached row so non-claim attributes need no query
+        cached = self.user_cache.peek(user_id)
+        if cached is not None:
+            return UserWrapper(cached, role=validated_token.get(self.role_claim))
+
+        return UserWrapper.from_claims(
+            user_id,
+            role=validated_token.get(self.role_claim),
+            loader=self._load_user
+        )
 
-        # Wrap the user to provide auth properties
-        return UserWrapper(user)
+    def _load_user(self, user_id):
+        return self.user_cache.get(user_id, load_user)
@@ -0,0 +1,38 @@
+"""
+Parallel password hashing for bulk account imports
+PBKDF2 holds the GIL, so a batch is hashed across a process pool; each
+password still gets its own salt. Small batches (or workers=1) hash inline.
+Workers are spawned, not forked: imports run from job-runner threads of a
+multi-threaded gunicorn worker, where a forked child can inherit a held lock.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence
+
+from decouple import config
+from django.contrib.auth.hashers import make_password
+
+# Below this, starting the pool costs more than it saves
+MIN_PARALLEL_BATCH = 32
+
+
+def _init_worker():
+    # Spawned workers start without Django configured
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'DKHPHCMUE.settings')
+        django.setup()
+
+
+def hash_passwords(passwords: Sequence[str], workers: Optional[int] = None) -> List[str]:
+    workers = workers or config('PASSWORD_HASH_WORKERS', default=os.cpu_count() or 1, cast=int)
+    if workers <= 1 or len(passwords) < MIN_PARALLEL_BATCH:
+        return [make_password(password) for password in passwords]
+
+    chunksize = max(1, len(passwords) // (workers * 4))
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, mp_context=multiprocessing.get_context('spawn')
+    ) as pool:
+        return list(pool.map(make_password, passwords, chunksize=chunksize))
@@ -0,0 +1,70 @@
+"""
+User Cache - Short-lived, per-process cache of authenticated user rows
+Lets CustomJWTAuthentication skip the Users lookup on every request
+
+Disabled unless JWT_USER_CACHE_SECONDS > 0. Entries expire after the TTL;
+account changes that must take effect immediately (e.g. deactivation) call
+`invalidate(user_id)` so the next request reloads the row.
+"""
+from typing import Optional, Dict, Any, Callable, Tuple
+from decouple import config
+import threading
+import time
+
+
+class UserCache:
+    """TTL cache of Users rows (with tai_khoan) keyed by user id"""
+
+    def __init__(self, ttl: Optional[float] = None):
+        self.ttl = ttl if ttl is not None else config('JWT_USER_CACHE_SECONDS', default=0, cast=float)
+        self._lock = threading.Lock()
+        self._users: Dict[str, Tuple[Any, float]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def peek(self, user_id: str) -> Optional[Any]:
+        """Cached row if still fresh, without loading"""
+        if not self.enabled:
+            return None
+        user_id = str(user_id)
+        with self._lock:
+            cached = self._users.get(user_id)
+            if cached is None:
+                return None
+            if time.monotonic() >= cached[1]:
+                self._users.pop(user_id, None)
+                return None
+            return cached[0]
+
+    def get(self, user_id: str, loader: Callable[[str], Any]) -> Any:
+        """Cached row, or `loader(user_id)` stored for `ttl` seconds"""
+        user = self.peek(user_id)
+        if user is not None:
+            return user
+
+        user = loader(user_id)
+        if self.enabled and user is not None:
+            with self._lock:
+                self._users[str(user_id)] = (user, time.monotonic() + self.ttl)
+        return user
+
+    def invalidate(self, user_id: Optional[str] = None) -> None:
+        with self._lock:
+            if user_id is None:
+                self._users.clear()
+            else:
+                self._users.pop(str(user_id), None)
+
+
+# Singleton instance
+_user_cache = None
+
+
+def get_user_cache() -> UserCache:
+    """Get user cache singleton"""
+    global _user_cache
+    if _user_cache is None:
+        _user_cache = UserCache()
+    return _user_cache
@@ -0,0 +1,193 @@
+"""
+Object Storage Backend Interfaces and Factory
+
+S3Service delegates to one of these backends, chosen with STORAGE_BACKEND:
+- s3      AWS S3 (default)
+- local   a directory on the app node (STORAGE_LOCAL_ROOT), served with sendfile when possible
+- memory  a per-process dict, for tests and offline benchmarks
+"""
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional
+
+from decouple import config
+
+STREAM_CHUNK_SIZE = config('TAI_LIEU_STREAM_CHUNK_SIZE', default=256 * 1024, cast=int)
+# Multipart transfers: S3 needs at least 5 MB for every part but the last
+MULTIPART_PART_SIZE = config('STORAGE_MULTIPART_PART_SIZE', default=8 * 1024 * 1024, cast=int)
+MULTIPART_CONCURRENCY = config('STORAGE_MULTIPART_CONCURRENCY', default=4, cast=int)
+
+
+@dataclass
+class ObjectInfo:
+    key: str
+    size: int
+    etag: Optional[str] = None
+    last_modified: Optional[datetime] = None
+    content_type: Optional[str] = None
+
+
+@dataclass
+class PartInfo:
+    part_number: int
+    size: int
+    etag: str
+
+
+@dataclass
+class MultipartUpload:
+    key: str
+    upload_id: str
+    initiated: datetime
+
+
+class StreamedObject:
+    """
+    Object body read lazily in chunks
+    StreamingHttpResponse closes it when the response ends, also on a dropped connection
+
+    file is set when the body is a local file positioned at its start, so a
+    whole-file response can hand it to the server's sendfile instead
+    """
+
+    def __init__(self, body, content_length: int, chunk_size: int = STREAM_CHUNK_SIZE, file=None):
+        self.body = body
+        self.content_length = content_length
+        self.chunk_size = chunk_size
+        self.file = file
+
+    def __iter__(self) -> Iterator[bytes]:
+        try:
+            while True:
+                chunk = self.body.read(self.chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        self.body.close()
+
+
+class IStorageBackend(ABC):
+    """
+    Interface for object storage
+    Methods raise on failure (a missing key included); S3Service logs and degrades
+    """
+
+    @property
+    def is_available(self) -> bool:
+        return True
+
+    @abstractmethod
+    def put(self, key: str, file_obj: BinaryIO, content_type: str, metadata: Optional[Dict[str, str]] = None) -> None:
+        """Store file_obj under key, reading it in chunks"""
+        pass
+
+    @abstractmethod
+    def head(self, key: str) -> ObjectInfo:
+        pass
+
+    @abstractmethod
+    def open(self, key: str, start: Optional[int] = None, end: Optional[int] = None,
+             chunk_size: int = STREAM_CHUNK_SIZE) -> StreamedObject:
+        """Open the object, or the inclusive byte range start..end, for chunked reading"""
+        pass
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        pass
+
+    @abstractmethod
+    def delete_many(self, keys: Iterable[str]) -> None:
+        pass
+
+    @abstractmethod
+    def list(self, prefix: str, max_keys: int = 100) -> List[ObjectInfo]:
+        """Objects whose key starts with prefix, in key order"""
+        pass
+
+    # Multipart uploads: parts may arrive in any order, from several requests,
+    # and be re-sent; complete_multipart joins them in part number order.
+    
+    @abstractmethod
+    def create_multipart(self, key: str, content_type: str, metadata: Optional[Dict[str, str]] = None) -> str:
+        """Start a multipart upload to key; returns its upload id"""
+        pass
+
+    @abstractmethod
+    def upload_part(self, key: str, upload_id: str, part_number: int, file_obj: BinaryIO, size: int) -> str:
+        """Store (or replace) one part; returns its ETag"""
+        pass
+
+    @abstractmethod
+    def list_parts(self, key: str, upload_id: str) -> List[PartInfo]:
+        pass
+
+    @abstractmethod
+    def complete_multipart(self, key: str, upload_id: str, parts: List[PartInfo]) -> None:
+        pass
+
+    @abstractmethod
+    def abort_multipart(self, key: str, upload_id: str) -> None:
+        """Discard the upload and every stored part"""
+        pass
+
+    @abstractmethod
+    def list_multipart_uploads(self, prefix: str) -> List[MultipartUpload]:
+        """Uploads under prefix that were neither completed nor aborted"""
+        pass
+
+    def presigned_url(self, key: str, expires_in: int, content_disposition: Optional[str] = None,
+                      content_type: Optional[str] = None) -> Optional[str]:
+        """A URL the client can download from directly; None when the backend has none"""
+        return None
+
+    def public_url(self, key: str) -> str:
+        return ''
+
+    @abstractmethod
+    def health_check(self) -> Dict[str, str]:
+        pass
+
+
+class StorageBackendFactory:
+    """
+    Factory to create storage backends
+    """
+
+    @staticmethod
+    def create(name: str) -> IStorageBackend:
+        if name == "s3":
+            from .s3_backend import S3StorageBackend
+            return S3StorageBackend()
+        elif name == "local":
+            from django.conf import settings
+            from .local_backend import LocalStorageBackend
+            return LocalStorageBackend(config('STORAGE_LOCAL_ROOT', default='') or str(settings.BASE_DIR / 'storage'))
+        elif name == "memory":
+            from .memory_backend import InMemoryStorageBackend
+            return InMemoryStorageBackend()
+        else:
+            raise ValueError(f"Unknown storage backend: {name}")
+
+
+# Singleton instance
+_storage_backend = None
+
+
+def get_storage_backend() -> IStorageBackend:
+    """Get the storage backend selected by STORAGE_BACKEND"""
+    global _storage_backend
+    if _storage_backend is None:
+        _storage_backend = StorageBackendFactory.create(config('STORAGE_BACKEND', default='s3'))
+    return _storage_backend
+
+
+__all__ = [
+    'ObjectInfo', 'PartInfo', 'MultipartUpload', 'StreamedObject', 'IStorageBackend',
+    'StorageBackendFactory', 'get_storage_backend',
+    'STREAM_CHUNK_SIZE', 'MULTIPART_PART_SIZE', 'MULTIPART_CONCURRENCY',
+]
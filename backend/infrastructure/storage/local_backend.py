@@ -0,0 +1,227 @@
+"""
+Local filesystem storage backend
+Objects are plain files under a root directory, so the web server can sendfile them
+"""
+import json
+import mimetypes
+import os
+import re
+import shutil
+import tempfile
+import uuid
+from datetime import datetime, timezone
+from typing import BinaryIO, Dict, Iterable, List, Optional
+
+from . import IStorageBackend, ObjectInfo, PartInfo, MultipartUpload, StreamedObject, STREAM_CHUNK_SIZE
+
+# In-progress writes; never listed
+TEMP_PREFIX = '.tmp-'
+# Multipart sessions: <root>/.multipart/<upload id>/{meta.json, 00001, 00002, ...}
+MULTIPART_DIR = '.multipart'
+UPLOAD_ID = re.compile(r'[0-9a-f]{32}')
+
+
+class _RangeReader:
+    """Reads at most length bytes of an open file"""
+
+    def __init__(self, file, length: int):
+        self.file = file
+        self.remaining = length
+
+    def read(self, size: int) -> bytes:
+        if self.remaining <= 0:
+            return b''
+        data = self.file.read(min(size, self.remaining))
+        self.remaining -= len(data)
+        return data
+
+    def close(self) -> None:
+        self.file.close()
+
+
+def _append(source, out, size: int) -> None:
+    """Copy size bytes in the kernel where supported (copy_file_range), else through a buffer"""
+    if hasattr(os, 'copy_file_range'):
+        out.flush()
+        try:
+            while size > 0:
+                copied = os.copy_file_range(source.fileno(), out.fileno(), size)
+                if copied == 0:
+                    break
+                size -= copied
+            return
+        except OSError:
+            if size == 0:
+                return
+        # Not supported here (e.g. across filesystems): finish the copy in user space
+        source.seek(-size, os.SEEK_END)
+    shutil.copyfileobj(source, out, STREAM_CHUNK_SIZE)
+
+
+class LocalStorageBackend(IStorageBackend):
+    """Objects stored as files under root, key '/' separators mapping to directories"""
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+
+    def _path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, key))
+        if (not key or key.startswith('/') or any(part.startswith('.') for part in key.split('/'))
+                or os.path.commonpath([self.root, path]) != self.root or path == self.root):
+            # Dot names are reserved for temp files and multipart sessions
+            raise ValueError(f"Invalid storage key: {key}")
+        return path
+
+    @staticmethod
+    def _write(path: str, file_obj: BinaryIO) -> None:
+        """Write next to the target and rename, so readers never see a partial file"""
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(prefix=TEMP_PREFIX, dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                shutil.copyfileobj(file_obj, out, STREAM_CHUNK_SIZE)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def put(self, key: str, file_obj: BinaryIO, content_type: str, metadata: Optional[Dict[str, str]] = None) -> None:
+        self._write(self._path(key), file_obj)
+
+    @staticmethod
+    def _etag(stat: os.stat_result) -> str:
+        return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+    def _info(self, key: str, stat: os.stat_result) -> ObjectInfo:
+        return ObjectInfo(
+            key=key,
+            size=stat.st_size,
+            etag=self._etag(stat),
+            last_modified=datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc),
+            content_type=mimetypes.guess_type(key)[0],
+        )
+
+    def head(self, key: str) -> ObjectInfo:
+        return self._info(key, os.stat(self._path(key)))
+
+    def open(self, key: str, start: Optional[int] = None, end: Optional[int] = None,
+             chunk_size: int = STREAM_CHUNK_SIZE) -> StreamedObject:
+        file = open(self._path(key), 'rb')
+        size = os.fstat(file.fileno()).st_size
+        if start is None:
+            return StreamedObject(file, size, chunk_size, file=file)
+        end = size - 1 if end is None else min(end, size - 1)
+        file.seek(start)
+        return StreamedObject(_RangeReader(file, end - start + 1), end - start + 1, chunk_size)
+
+    def delete(self, key: str) -> None:
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            # Same as S3: deleting a missing key succeeds
+            pass
+
+    def delete_many(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self.delete(key)
+
+    def list(self, prefix: str, max_keys: int = 100) -> List[ObjectInfo]:
+        # Walk only the deepest directory the prefix names
+        directory = os.path.join(self.root, os.path.dirname(prefix))
+        keys = []
+        for current, dirs, files in os.walk(directory):
+            dirs[:] = sorted(name for name in dirs if not name.startswith('.'))
+            for name in files:
+                if name.startswith(TEMP_PREFIX):
+                    continue
+                key = os.path.relpath(os.path.join(current, name), self.root).replace(os.sep, '/')
+                if key.startswith(prefix):
+                    keys.append(key)
+        objects = []
+        for key in sorted(keys)[:max_keys]:
+            try:
+                objects.append(self._info(key, os.stat(self._path(key))))
+            except FileNotFoundError:
+                pass
+        return objects
+
+    def _session(self, key: str, upload_id: str) -> str:
+        if not UPLOAD_ID.fullmatch(upload_id):
+            raise ValueError(f"Invalid upload id: {upload_id}")
+        directory = os.path.join(self.root, MULTIPART_DIR, upload_id)
+        with open(os.path.join(directory, 'meta.json')) as meta:
+            if json.load(meta)['key'] != key:
+                raise ValueError(f"Upload {upload_id} is not for {key}")
+        return directory
+
+    def create_multipart(self, key: str, content_type: str, metadata: Optional[Dict[str, str]] = None) -> str:
+        self._path(key)
+        upload_id = uuid.uuid4().hex
+        directory = os.path.join(self.root, MULTIPART_DIR, upload_id)
+        os.makedirs(directory)
+        with open(os.path.join(directory, 'meta.json'), 'w') as meta:
+            json.dump({
+                'key': key,
+                'content_type': content_type,
+                'initiated': datetime.now(timezone.utc).isoformat(),
+            }, meta)
+        return upload_id
+
+    def upload_part(self, key: str, upload_id: str, part_number: int, file_obj: BinaryIO, size: int) -> str:
+        path = os.path.join(self._session(key, upload_id), f"{part_number:05d}")
+        self._write(path, file_obj)
+        return self._etag(os.stat(path))
+
+    def list_parts(self, key: str, upload_id: str) -> List[PartInfo]:
+        directory = self._session(key, upload_id)
+        parts = []
+        for name in sorted(os.listdir(directory)):
+            if name.isdigit():
+                stat = os.stat(os.path.join(directory, name))
+                parts.append(PartInfo(part_number=int(name), size=stat.st_size, etag=self._etag(stat)))
+        return parts
+
+    def complete_multipart(self, key: str, upload_id: str, parts: List[PartInfo]) -> None:
+        directory = self._session(key, upload_id)
+        stored = {part.part_number: part for part in self.list_parts(key, upload_id)}
+        for part in parts:
+            if part.part_number not in stored or stored[part.part_number].etag != part.etag:
+                raise ValueError(f"Part {part.part_number} is missing or was replaced")
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(prefix=TEMP_PREFIX, dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                for part in sorted(parts, key=lambda part: part.part_number):
+                    with open(os.path.join(directory, f"{part.part_number:05d}"), 'rb') as data:
+                        _append(data, out, part.size)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        shutil.rmtree(directory, ignore_errors=True)
+
+    def abort_multipart(self, key: str, upload_id: str) -> None:
+        shutil.rmtree(self._session(key, upload_id), ignore_errors=True)
+
+    def list_multipart_uploads(self, prefix: str) -> List[MultipartUpload]:
+        sessions = os.path.join(self.root, MULTIPART_DIR)
+        uploads = []
+        for upload_id in sorted(os.listdir(sessions)) if os.path.isdir(sessions) else []:
+            try:
+                with open(os.path.join(sessions, upload_id, 'meta.json')) as meta:
+                    info = json.load(meta)
+            except (OSError, ValueError):
+                continue
+            if info['key'].startswith(prefix):
+                uploads.append(MultipartUpload(
+                    key=info['key'], upload_id=upload_id, initiated=datetime.fromisoformat(info['initiated'])
+                ))
+        return uploads
+
+    def health_check(self) -> Dict[str, str]:
+        os.makedirs(self.root, exist_ok=True)
+        if not os.access(self.root, os.W_OK):
+            raise PermissionError(f"{self.root} is not writable")
+        return {'status': 'healthy', 'root': self.root}
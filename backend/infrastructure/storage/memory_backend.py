@@ -0,0 +1,150 @@
+"""
+In-memory storage backend
+Per-process and lost on restart: for tests, local development and offline benchmarks
+"""
+import hashlib
+import io
+import threading
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import BinaryIO, Dict, Iterable, List, Optional, Tuple
+
+from . import IStorageBackend, ObjectInfo, PartInfo, MultipartUpload, StreamedObject, STREAM_CHUNK_SIZE
+
+
+def _read(file_obj: BinaryIO) -> Tuple[bytes, str]:
+    """Body and quoted MD5 ETag, read in chunks"""
+    buffer = io.BytesIO()
+    digest = hashlib.md5()
+    while True:
+        chunk = file_obj.read(STREAM_CHUNK_SIZE)
+        if not chunk:
+            break
+        buffer.write(chunk)
+        digest.update(chunk)
+    return buffer.getvalue(), f'"{digest.hexdigest()}"'
+
+
+@dataclass
+class _Blob:
+    data: bytes
+    info: ObjectInfo
+    metadata: Dict[str, str]
+
+
+@dataclass
+class _Upload:
+    key: str
+    content_type: str
+    metadata: Dict[str, str]
+    initiated: datetime
+    parts: Dict[int, Tuple[bytes, str]] = field(default_factory=dict)
+
+
+class InMemoryStorageBackend(IStorageBackend):
+    """Objects held in a dict guarded by a lock"""
+
+    def __init__(self):
+        self._objects: Dict[str, _Blob] = {}
+        self._uploads: Dict[str, _Upload] = {}
+        self._lock = threading.Lock()
+
+    def put(self, key: str, file_obj: BinaryIO, content_type: str, metadata: Optional[Dict[str, str]] = None) -> None:
+        data, etag = _read(file_obj)
+        self._store(key, data, etag, content_type, metadata)
+
+    def _store(self, key: str, data: bytes, etag: str, content_type: str, metadata: Optional[Dict[str, str]]) -> None:
+        info = ObjectInfo(
+            key=key,
+            size=len(data),
+            etag=etag,
+            last_modified=datetime.now(timezone.utc),
+            content_type=content_type,
+        )
+        with self._lock:
+            self._objects[key] = _Blob(data, info, dict(metadata or {}))
+
+    def _get(self, key: str) -> _Blob:
+        with self._lock:
+            blob = self._objects.get(key)
+        if blob is None:
+            raise KeyError(f"No such key: {key}")
+        return blob
+
+    def head(self, key: str) -> ObjectInfo:
+        return self._get(key).info
+
+    def open(self, key: str, start: Optional[int] = None, end: Optional[int] = None,
+             chunk_size: int = STREAM_CHUNK_SIZE) -> StreamedObject:
+        data = self._get(key).data
+        if start is not None:
+            data = data[start:None if end is None else end + 1]
+        return StreamedObject(io.BytesIO(data), len(data), chunk_size)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._objects.pop(key, None)
+
+    def delete_many(self, keys: Iterable[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._objects.pop(key, None)
+
+    def list(self, prefix: str, max_keys: int = 100) -> List[ObjectInfo]:
+        with self._lock:
+            keys = sorted(key for key in self._objects if key.startswith(prefix))[:max_keys]
+            return [self._objects[key].info for key in keys]
+
+    def _upload(self, key: str, upload_id: str) -> _Upload:
+        with self._lock:
+            upload = self._uploads.get(upload_id)
+        if upload is None or upload.key != key:
+            raise KeyError(f"No such upload: {upload_id}")
+        return upload
+
+    def create_multipart(self, key: str, content_type: str, metadata: Optional[Dict[str, str]] = None) -> str:
+        upload_id = uuid.uuid4().hex
+        with self._lock:
+            self._uploads[upload_id] = _Upload(key, content_type, dict(metadata or {}), datetime.now(timezone.utc))
+        return upload_id
+
+    def upload_part(self, key: str, upload_id: str, part_number: int, file_obj: BinaryIO, size: int) -> str:
+        upload = self._upload(key, upload_id)
+        data, etag = _read(file_obj)
+        with self._lock:
+            upload.parts[part_number] = (data, etag)
+        return etag
+
+    def list_parts(self, key: str, upload_id: str) -> List[PartInfo]:
+        upload = self._upload(key, upload_id)
+        with self._lock:
+            return [PartInfo(number, len(data), etag) for number, (data, etag) in sorted(upload.parts.items())]
+
+    def complete_multipart(self, key: str, upload_id: str, parts: List[PartInfo]) -> None:
+        upload = self._upload(key, upload_id)
+        with self._lock:
+            for part in parts:
+                if upload.parts.get(part.part_number, (None, None))[1] != part.etag:
+                    raise ValueError(f"Part {part.part_number} is missing or was replaced")
+            data = b''.join(upload.parts[part.part_number][0] for part in sorted(parts, key=lambda p: p.part_number))
+            del self._uploads[upload_id]
+        etag = hashlib.md5(b''.join(bytes.fromhex(part.etag.strip('"')) for part in parts)).hexdigest()
+        self._store(key, data, f'"{etag}-{len(parts)}"', upload.content_type, upload.metadata)
+
+    def abort_multipart(self, key: str, upload_id: str) -> None:
+        self._upload(key, upload_id)
+        with self._lock:
+            self._uploads.pop(upload_id, None)
+
+    def list_multipart_uploads(self, prefix: str) -> List[MultipartUpload]:
+        with self._lock:
+            return [
+                MultipartUpload(key=upload.key, upload_id=upload_id, initiated=upload.initiated)
+                for upload_id, upload in sorted(self._uploads.items(), key=lambda item: item[1].initiated)
+                if upload.key.startswith(prefix)
+            ]
+
+    def health_check(self) -> Dict[str, str]:
+        with self._lock:
+            return {'status': 'healthy', 'objects': str(len(self._objects))}
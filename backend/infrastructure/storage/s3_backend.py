@@ -0,0 +1,221 @@
+"""
+AWS S3 storage backend
+"""
+from typing import BinaryIO, Dict, Iterable, List, Optional
+from decouple import config
+import logging
+
+from . import (
+    IStorageBackend, ObjectInfo, PartInfo, MultipartUpload, StreamedObject,
+    STREAM_CHUNK_SIZE, MULTIPART_PART_SIZE, MULTIPART_CONCURRENCY,
+)
+
+logger = logging.getLogger(__name__)
+
+# DeleteObjects accepts at most 1000 keys per request
+DELETE_BATCH_SIZE = 1000
+
+# Lazy-load boto3
+_s3_client = None
+
+
+def get_s3_client():
+    """Get S3 client (singleton pattern)"""
+    global _s3_client
+
+    if _s3_client is None:
+        try:
+            import boto3
+            from botocore.config import Config
+
+            aws_access_key = config('AWS_ACCESS_KEY_ID', default=None)
+            aws_secret_key = config('AWS_SECRET_ACCESS_KEY', default=None)
+            aws_region = config('AWS_REGION', default='ap-southeast-2')
+
+            if not aws_access_key or not aws_secret_key:
+                logger.warning("AWS credentials not configured, S3 features disabled")
+                return None
+
+            _s3_client = boto3.client(
+                's3',
+                aws_access_key_id=aws_access_key,
+                aws_secret_access_key=aws_secret_key,
+                region_name=aws_region,
+                config=Config(
+                    signature_version='s3v4',
+                    connect_timeout=5,
+                    read_timeout=10,
+                )
+            )
+
+            logger.info("✅ S3 client initialized successfully")
+
+        except ImportError:
+            logger.error("❌ boto3 not installed. Run: pip install boto3")
+            return None
+        except Exception as e:
+            logger.error(f"❌ S3 client initialization failed: {e}")
+            _s3_client = None
+            return None
+
+    return _s3_client
+
+
+class S3StorageBackend(IStorageBackend):
+    """Objects in one S3 bucket"""
+
+    def __init__(self, client=None, bucket_name: Optional[str] = None):
+        self.client = client if client is not None else get_s3_client()
+        self.bucket_name = bucket_name or config('AWS_S3_BUCKET_NAME', default='hcmue-tailieu-hoctap-20251029')
+        self.base_url = config('AWS_S3_BASE_URL', default=f'https://{self.bucket_name}.s3.ap-southeast-2.amazonaws.com')
+        self.region = config('AWS_REGION', default='ap-southeast-2')
+        self._transfer_config = None
+
+    @property
+    def is_available(self) -> bool:
+        return self.client is not None
+
+    @property
+    def transfer_config(self):
+        """Part size and parallel part uploads for upload_fileobj"""
+        if self._transfer_config is None:
+            from boto3.s3.transfer import TransferConfig
+            self._transfer_config = TransferConfig(
+                multipart_threshold=MULTIPART_PART_SIZE,
+                multipart_chunksize=MULTIPART_PART_SIZE,
+                max_concurrency=MULTIPART_CONCURRENCY,
+                io_chunksize=STREAM_CHUNK_SIZE,
+            )
+        return self._transfer_config
+
+    def put(self, key: str, file_obj: BinaryIO, content_type: str, metadata: Optional[Dict[str, str]] = None) -> None:
+        # Above the part size this is a multipart upload, MULTIPART_CONCURRENCY parts at a time
+        self.client.upload_fileobj(
+            file_obj,
+            self.bucket_name,
+            key,
+            ExtraArgs={'ContentType': content_type, 'Metadata': metadata or {}},
+            Config=self.transfer_config
+        )
+
+    def head(self, key: str) -> ObjectInfo:
+        response = self.client.head_object(Bucket=self.bucket_name, Key=key)
+        return ObjectInfo(
+            key=key,
+            size=response['ContentLength'],
+            etag=response.get('ETag'),
+            last_modified=response.get('LastModified'),
+            content_type=response.get('ContentType'),
+        )
+
+    def open(self, key: str, start: Optional[int] = None, end: Optional[int] = None,
+             chunk_size: int = STREAM_CHUNK_SIZE) -> StreamedObject:
+        params = {'Bucket': self.bucket_name, 'Key': key}
+        if start is not None:
+            params['Range'] = f"bytes={start}-{'' if end is None else end}"
+        response = self.client.get_object(**params)
+        return StreamedObject(response['Body'], response['ContentLength'], chunk_size)
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket_name, Key=key)
+
+    def delete_many(self, keys: Iterable[str]) -> None:
+        keys = list(keys)
+        for start in range(0, len(keys), DELETE_BATCH_SIZE):
+            response = self.client.delete_objects(
+                Bucket=self.bucket_name,
+                Delete={'Objects': [{'Key': key} for key in keys[start:start + DELETE_BATCH_SIZE]], 'Quiet': True}
+            )
+            errors = response.get('Errors') if isinstance(response, dict) else None
+            if errors:
+                raise IOError(f"Failed to delete {len(errors)} objects, e.g. {errors[0].get('Key')}")
+
+    def list(self, prefix: str, max_keys: int = 100) -> List[ObjectInfo]:
+        objects = []
+        params = {'Bucket': self.bucket_name, 'Prefix': prefix}
+        while len(objects) < max_keys:
+            response = self.client.list_objects_v2(MaxKeys=min(max_keys - len(objects), 1000), **params)
+            objects.extend(
+                ObjectInfo(key=obj['Key'], size=obj['Size'], etag=obj.get('ETag'), last_modified=obj['LastModified'])
+                for obj in response.get('Contents', [])
+            )
+            if not response.get('IsTruncated'):
+                break
+            params['ContinuationToken'] = response['NextContinuationToken']
+        return objects
+
+    def create_multipart(self, key: str, content_type: str, metadata: Optional[Dict[str, str]] = None) -> str:
+        response = self.client.create_multipart_upload(
+            Bucket=self.bucket_name, Key=key, ContentType=content_type, Metadata=metadata or {}
+        )
+        return response['UploadId']
+
+    def upload_part(self, key: str, upload_id: str, part_number: int, file_obj: BinaryIO, size: int) -> str:
+        # Parts are bounded by the part size; bytes let botocore checksum and retry the body
+        response = self.client.upload_part(
+            Bucket=self.bucket_name, Key=key, UploadId=upload_id,
+            PartNumber=part_number, Body=file_obj.read(size), ContentLength=size
+        )
+        return response['ETag']
+
+    def list_parts(self, key: str, upload_id: str) -> List[PartInfo]:
+        parts = []
+        params = {'Bucket': self.bucket_name, 'Key': key, 'UploadId': upload_id}
+        while True:
+            response = self.client.list_parts(**params)
+            parts.extend(
+                PartInfo(part_number=part['PartNumber'], size=part['Size'], etag=part['ETag'])
+                for part in response.get('Parts', [])
+            )
+            if not response.get('IsTruncated'):
+                return parts
+            params['PartNumberMarker'] = response['NextPartNumberMarker']
+
+    def complete_multipart(self, key: str, upload_id: str, parts: List[PartInfo]) -> None:
+        self.client.complete_multipart_upload(
+            Bucket=self.bucket_name, Key=key, UploadId=upload_id,
+            MultipartUpload={'Parts': [
+                {'PartNumber': part.part_number, 'ETag': part.etag}
+                for part in sorted(parts, key=lambda part: part.part_number)
+            ]}
+        )
+
+    def abort_multipart(self, key: str, upload_id: str) -> None:
+        self.client.abort_multipart_upload(Bucket=self.bucket_name, Key=key, UploadId=upload_id)
+
+    def list_multipart_uploads(self, prefix: str) -> List[MultipartUpload]:
+        uploads = []
+        params = {'Bucket': self.bucket_name, 'Prefix': prefix}
+        while True:
+            response = self.client.list_multipart_uploads(**params)
+            uploads.extend(
+                MultipartUpload(key=upload['Key'], upload_id=upload['UploadId'], initiated=upload['Initiated'])
+                for upload in response.get('Uploads', [])
+            )
+            if not response.get('IsTruncated'):
+                return uploads
+            params['KeyMarker'] = response['NextKeyMarker']
+            params['UploadIdMarker'] = response['NextUploadIdMarker']
+
+    def presigned_url(self, key: str, expires_in: int, content_disposition: Optional[str] = None,
+                      content_type: Optional[str] = None) -> Optional[str]:
+        params = {
+            'Bucket': self.bucket_name,
+            'Key': key
+        }
+        if content_disposition:
+            params['ResponseContentDisposition'] = content_disposition
+        if content_type:
+            params['ResponseContentType'] = content_type
+        return self.client.generate_presigned_url('get_object', Params=params, ExpiresIn=expires_in)
+
+    def public_url(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+    def health_check(self) -> Dict[str, str]:
+        self.client.head_bucket(Bucket=self.bucket_name)
+        return {
+            'status': 'healthy',
+            'bucket': self.bucket_name,
+            'region': self.region
+        }
@@ -0,0 +1,128 @@
+"""
+Presentation Layer - Tài liệu file responses
+
+Streams a stored file in chunks with Range / If-None-Match support,
+or redirects to a presigned URL so the bytes never pass through Django
+"""
+from typing import Optional, Tuple
+
+from decouple import config
+from django.http import FileResponse, HttpResponse, HttpResponseRedirect, StreamingHttpResponse
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+from rest_framework.response import Response
+
+
+def use_redirect(request) -> bool:
+    """TAI_LIEU_DOWNLOAD_MODE=stream|redirect, overridable per request with ?redirect=1|0"""
+    value = request.query_params.get('redirect')
+    if value is None:
+        return config('TAI_LIEU_DOWNLOAD_MODE', default='stream') == 'redirect'
+    return value.lower() in ('1', 'true', 'yes')
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Inclusive (start, end) of a single "bytes=" range, None to send the whole file
+    Raises ValueError when the range cannot be satisfied
+    """
+    if not header or not header.startswith('bytes=') or ',' in header:
+        # Missing, another unit or multipart ranges: answer with the full body
+        return None
+    first, sep, last = header[len('bytes='):].strip().partition('-')
+    if not sep or not (first or last) or not all(part.isdigit() for part in (first, last) if part):
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0 or size == 0:
+            raise ValueError(header)
+        return max(size - length, 0), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise ValueError(header)
+    return start, min(int(last), size - 1) if last else size - 1
+
+
+def _etag_matches(header: str, etag: Optional[str]) -> bool:
+    if not etag:
+        return False
+    if header.strip() == '*':
+        return True
+    weakless = etag[2:] if etag.startswith('W/') else etag
+    return any(
+        (tag[2:] if tag.startswith('W/') else tag) == weakless
+        for tag in (t.strip() for t in header.split(','))
+    )
+
+
+def _if_range_matches(request, file) -> bool:
+    header = request.headers.get('If-Range')
+    if not header:
+        return True
+    if header.startswith('"') or header.startswith('W/'):
+        # Only a strong ETag may validate a range
+        return bool(file.etag) and header == file.etag and not header.startswith('W/')
+    since = parse_http_date_safe(header)
+    return bool(file.last_modified) and since is not None and int(file.last_modified.timestamp()) <= since
+
+
+def tai_lieu_response(request, result, s3_service):
+    """
+    Build the response for a Download(SV)TaiLieuUseCase result
+    """
+    if not result.success:
+        return Response(result.to_dict(), status=result.status_code or 400)
+
+    file = result.data
+    if file.url:
+        response = HttpResponseRedirect(file.url)
+        response['Cache-Control'] = 'no-store'
+        return response
+
+    validators = {}
+    if file.etag:
+        validators['ETag'] = file.etag
+    if file.last_modified:
+        validators['Last-Modified'] = http_date(file.last_modified.timestamp())
+
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match and _etag_matches(if_none_match, file.etag):
+        response = HttpResponse(status=304)
+        for name, value in validators.items():
+            response[name] = value
+        return response
+
+    byte_range = None
+    if request.headers.get('Range') and _if_range_matches(request, file):
+        try:
+            byte_range = parse_range(request.headers['Range'], file.size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f"bytes */{file.size}"
+            return response
+
+    start, end = byte_range or (None, None)
+    body = s3_service.open_file(file.key, start, end)
+    if body is None:
+        return Response(
+            {"isSuccess": False, "message": "Không thể tải file từ S3", "errorCode": "S3_DOWNLOAD_FAILED"},
+            status=502
+        )
+
+    if body.file is not None and not byte_range:
+        # Whole local file: the WSGI server may sendfile it
+        response = FileResponse(body.file, content_type=file.content_type)
+    else:
+        response = StreamingHttpResponse(body, content_type=file.content_type, status=206 if byte_range else 200)
+    response['Content-Length'] = str(body.content_length)
+    if byte_range:
+        response['Content-Range'] = f"bytes {start}-{end}/{file.size}"
+    response['Accept-Ranges'] = 'bytes'
+    response['Content-Disposition'] = content_disposition_header(True, file.filename)
+    response['Cache-Control'] = 'private, no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    for name, value in validators.items():
+        response[name] = value
+    return response
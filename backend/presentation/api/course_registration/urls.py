@@ -7,6 +7,7 @@ from .views import (
     GetDanhSachLopHocPhanView, 
     GetDanhSachLopDaDangKyView,
     DangKyLopHocPhanView,
+    DangKyGioHangView,
     HuyDangKyLopHocPhanView,
     DangKyLopHocPhanView,
     HuyDangKyLopHocPhanView,
@@ -25,6 +26,7 @@ urlpatterns = [
     path('lop-hoc-phan', GetDanhSachLopHocPhanView.as_view(), name='lop-hoc-phan'),
     path('lop-da-dang-ky', GetDanhSachLopDaDangKyView.as_view(), name='lop-da-dang-ky'),
     path('dang-ky-hoc-phan', DangKyLopHocPhanView.as_view(), name='dang-ky-hoc-phan'),
+    path('dang-ky-hoc-phan/batch', DangKyGioHangView.as_view(), name='dang-ky-hoc-phan-batch'),
     path('huy-dang-ky-hoc-phan', HuyDangKyLopHocPhanView.as_view(), name='huy-dang-ky-hoc-phan'),
     path('chuyen-lop-hoc-phan', ChuyenLopHocPhanView.as_view(), name='chuyen-lop-hoc-phan'),
     path('lop-hoc-phan/mon-hoc', GetLopChuaDangKyByMonHocView.as_view(), name='lop-chua-dang-ky-by-mon-hoc'),
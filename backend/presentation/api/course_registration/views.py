@@ -10,6 +10,7 @@ from application.course_registration.use_cases.check_phase_dang_ky_use_case impo
 from application.course_registration.use_cases.get_danh_sach_lop_hoc_phan_use_case import GetDanhSachLopHocPhanUseCase
 from application.course_registration.use_cases.get_danh_sach_lop_da_dang_ky_use_case import GetDanhSachLopDaDangKyUseCase
 from application.course_registration.use_cases.dang_ky_hoc_phan_use_case import DangKyHocPhanUseCase
+from application.course_registration.use_cases.dang_ky_lop_hoc_phan_use_case import DangKyLopHocPhanUseCase
 from application.course_registration.use_cases.huy_dang_ky_hoc_phan_use_case import HuyDangKyHocPhanUseCase
 from application.course_registration.use_cases.chuyen_lop_hoc_phan_use_case import ChuyenLopHocPhanUseCase
 from application.course_registration.use_cases.chuyen_lop_hoc_phan_use_case import ChuyenLopHocPhanUseCase
@@ -22,7 +23,8 @@ from infrastructure.persistence.course_registration.repositories import (
     LopHocPhanRepository, 
     DangKyHocPhanRepository,
     DangKyTKBRepository,
-    LichSuDangKyRepository
+    LichSuDangKyRepository,
+    RegistrationContextRepository
 )
 
 class CheckPhaseDangKyView(APIView):
@@ -124,11 +126,11 @@ class DangKyLopHocPhanView(APIView):
             }, status=400)
             
         use_case = DangKyHocPhanUseCase(
+            RegistrationContextRepository(),
             LopHocPhanRepository(),
             DangKyHocPhanRepository(),
             DangKyTKBRepository(),
             LichSuDangKyRepository(),
-            KyPhaseRepository(),
             SinhVienRepository()
         )
         
@@ -136,6 +138,42 @@ class DangKyLopHocPhanView(APIView):
         
         return Response(result.to_dict(), status=result.status_code or 200)
 
+class DangKyGioHangView(APIView):
+    """
+    POST /api/sv/dang-ky-hoc-phan/batch
+    
+    Register several course classes at once
+    Body: {"lopHocPhanIds": ["uuid", ...], "hocKyId": "uuid"}
+    Returns one result per class in data.results
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request):
+        lop_hoc_phan_ids = request.data.get('lopHocPhanIds') or request.data.get('lop_hoc_phan_ids')
+        hoc_ky_id = request.data.get('hocKyId') or request.data.get('hoc_ky_id')
+        
+        if not lop_hoc_phan_ids or not hoc_ky_id:
+            return Response({
+                "success": False,
+                "message": "Thiếu thông tin đăng ký (lopHocPhanIds, hocKyId)",
+                "errorCode": "MISSING_PARAM"
+            }, status=400)
+            
+        use_case = DangKyLopHocPhanUseCase(
+            RegistrationContextRepository(),
+            LopHocPhanRepository(),
+            DangKyHocPhanRepository(),
+            DangKyTKBRepository(),
+            LichSuDangKyRepository()
+        )
+        
+        result = use_case.execute_batch(
+            {'lopHocPhanIds': lop_hoc_phan_ids, 'hocKyId': hoc_ky_id},
+            str(request.user.id)
+        )
+        
+        return Response(result.to_dict(), status=result.status_code or 200)
+
 class HuyDangKyLopHocPhanView(APIView):
     """
     POST /api/sv/huy-dang-ky-hoc-phan
@@ -199,7 +237,8 @@ class ChuyenLopHocPhanView(APIView):
             DangKyTKBRepository(),
             LichSuDangKyRepository(),
             KyPhaseRepository(),
-            SinhVienRepository()
+            SinhVienRepository(),
+            registration_context_repo=RegistrationContextRepository()
         )
         
         # hoc_ky_id is optional - use case will get hoc_ky_hien_hanh if not provided
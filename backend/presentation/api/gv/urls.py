@@ -7,9 +7,14 @@ from .views import (
     GVLopHocPhanDetailView,
     GVLopHocPhanStudentsView,
     GVLopHocPhanGradesView,
+    GVLopHocPhanGradesImportView,
     GVTKBWeeklyView,
     GVTaiLieuListView,
     GVTaiLieuUploadView,
+    GVTaiLieuMultipartUploadView,
+    GVTaiLieuMultipartUploadDetailView,
+    GVTaiLieuMultipartUploadPartView,
+    GVTaiLieuMultipartUploadCompleteView,
     GVTaiLieuDetailView,
     GVTaiLieuDownloadView,
 )
@@ -20,10 +25,15 @@ urlpatterns = [
     path('lop-hoc-phan/<str:lhp_id>', GVLopHocPhanDetailView.as_view(), name='gv-lhp-detail'),
     path('lop-hoc-phan/<str:lhp_id>/sinh-vien', GVLopHocPhanStudentsView.as_view(), name='gv-lhp-students'),
     path('lop-hoc-phan/<str:lhp_id>/diem', GVLopHocPhanGradesView.as_view(), name='gv-lhp-grades'),
+    path('lop-hoc-phan/<str:lhp_id>/diem/import', GVLopHocPhanGradesImportView.as_view(), name='gv-lhp-grades-import'),
     
     # TaiLieu (Documents)
     path('lop-hoc-phan/<str:lhp_id>/tai-lieu', GVTaiLieuListView.as_view(), name='gv-tailieu-list'),
     path('lop-hoc-phan/<str:lhp_id>/tai-lieu/upload', GVTaiLieuUploadView.as_view(), name='gv-tailieu-upload'),
+    path('lop-hoc-phan/<str:lhp_id>/tai-lieu/uploads', GVTaiLieuMultipartUploadView.as_view(), name='gv-tailieu-uploads'),
+    path('lop-hoc-phan/<str:lhp_id>/tai-lieu/uploads/<str:upload_id>', GVTaiLieuMultipartUploadDetailView.as_view(), name='gv-tailieu-upload-detail'),
+    path('lop-hoc-phan/<str:lhp_id>/tai-lieu/uploads/<str:upload_id>/parts/<int:part_number>', GVTaiLieuMultipartUploadPartView.as_view(), name='gv-tailieu-upload-part'),
+    path('lop-hoc-phan/<str:lhp_id>/tai-lieu/uploads/<str:upload_id>/complete', GVTaiLieuMultipartUploadCompleteView.as_view(), name='gv-tailieu-upload-complete'),
     path('lop-hoc-phan/<str:lhp_id>/tai-lieu/<str:doc_id>', GVTaiLieuDetailView.as_view(), name='gv-tailieu-detail'),
     path('lop-hoc-phan/<str:lhp_id>/tai-lieu/<str:doc_id>/download', GVTaiLieuDownloadView.as_view(), name='gv-tailieu-download'),
     
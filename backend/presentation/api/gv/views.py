@@ -5,7 +5,6 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.parsers import MultiPartParser, FormParser
-from django.http import HttpResponse
 from datetime import datetime
 
 from application.gv.use_cases import (
@@ -14,6 +13,7 @@ from application.gv.use_cases import (
     GetGVStudentsOfLHPUseCase,
     GetGVGradesUseCase,
     UpsertGVGradesUseCase,
+    ImportGVGradesUseCase,
     GetGVTKBWeeklyUseCase,
 )
 from application.tai_lieu.use_cases import (
@@ -22,12 +22,19 @@ from application.tai_lieu.use_cases import (
     DeleteTaiLieuUseCase,
     UpdateTaiLieuUseCase,
     DownloadTaiLieuUseCase,
+    InitiateTaiLieuUploadUseCase,
+    UploadTaiLieuPartUseCase,
+    GetTaiLieuUploadUseCase,
+    CompleteTaiLieuUploadUseCase,
+    AbortTaiLieuUploadUseCase,
 )
 from infrastructure.persistence.gv.gv_lop_hoc_phan_repository import GVLopHocPhanRepository
 from infrastructure.persistence.gv.gv_grade_repository import GVGradeRepository
 from infrastructure.persistence.gv.gv_tkb_repository import GVTKBRepository
 from infrastructure.persistence.tai_lieu.repository import TaiLieuRepository
 from infrastructure.persistence.s3_service import get_s3_service
+from presentation.api.common.downloads import tai_lieu_response, use_redirect
+from infrastructure.imports import read_table, TableFormatError
 
 
 class GVLopHocPhanListView(APIView):
@@ -118,6 +125,32 @@ class GVLopHocPhanGradesView(APIView):
         return Response(result.to_dict(), status=result.status_code or 200)
 
 
+class GVLopHocPhanGradesImportView(APIView):
+    """
+    Import a grade sheet (.xlsx / .csv with MSSV and Điểm columns) for a LopHocPhan
+    POST /api/gv/lop-hoc-phan/<id>/diem/import  (multipart: file)
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request, lhp_id):
+        user_id = str(request.user.id)
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({"isSuccess": False, "message": "Thiếu file bảng điểm"}, status=400)
+        try:
+            rows = read_table(upload, upload.name)
+        except TableFormatError as e:
+            return Response({"isSuccess": False, "message": str(e), "errorCode": "INVALID_FILE"}, status=400)
+        
+        lhp_repo = GVLopHocPhanRepository()
+        grade_repo = GVGradeRepository()
+        use_case = ImportGVGradesUseCase(lhp_repo, grade_repo)
+        
+        result = use_case.execute(lhp_id, user_id, rows)
+        
+        return Response(result.to_dict(), status=result.status_code or 200)
+
+
 class GVTKBWeeklyView(APIView):
     """
     Get weekly timetable for GV
@@ -226,6 +259,110 @@ class GVTaiLieuUploadView(APIView):
         return Response(result.to_dict(), status=status_code)
 
 
+class GVTaiLieuMultipartUploadView(APIView):
+    """
+    Start a multipart (resumable) upload for large TaiLieu
+    POST /api/gv/lop-hoc-phan/<id>/tai-lieu/uploads
+    Body: { filename, contentType, size, tenTaiLieu? }
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request, lhp_id):
+        user_id = str(request.user.id)
+        filename = request.data.get('filename')
+        try:
+            file_size = int(request.data.get('size'))
+        except (TypeError, ValueError):
+            file_size = None
+        
+        if not filename or file_size is None:
+            return Response({
+                'isSuccess': False,
+                'message': 'Thiếu filename hoặc size',
+                'data': None
+            }, status=400)
+        
+        repo = TaiLieuRepository()
+        s3_service = get_s3_service()
+        use_case = InitiateTaiLieuUploadUseCase(repo, s3_service)
+        
+        result = use_case.execute(
+            lhp_id=lhp_id,
+            gv_user_id=user_id,
+            filename=filename,
+            content_type=request.data.get('contentType') or 'application/octet-stream',
+            file_size=file_size,
+            ten_tai_lieu=request.data.get('tenTaiLieu')
+        )
+        
+        status_code = 201 if result.success else (result.status_code or 400)
+        return Response(result.to_dict(), status=status_code)
+
+
+class GVTaiLieuMultipartUploadDetailView(APIView):
+    """
+    Resume or cancel a multipart upload
+    GET /api/gv/lop-hoc-phan/<id>/tai-lieu/uploads/<upload_id>     (parts received so far)
+    DELETE /api/gv/lop-hoc-phan/<id>/tai-lieu/uploads/<upload_id>  (abort)
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request, lhp_id, upload_id):
+        use_case = GetTaiLieuUploadUseCase(get_s3_service())
+        result = use_case.execute(lhp_id, str(request.user.id), upload_id)
+        return Response(result.to_dict(), status=result.status_code or 200)
+    
+    def delete(self, request, lhp_id, upload_id):
+        use_case = AbortTaiLieuUploadUseCase(get_s3_service())
+        result = use_case.execute(lhp_id, str(request.user.id), upload_id)
+        return Response(result.to_dict(), status=result.status_code or 200)
+
+
+class GVTaiLieuMultipartUploadPartView(APIView):
+    """
+    Upload one part (raw bytes, Content-Length = the part size)
+    PUT /api/gv/lop-hoc-phan/<id>/tai-lieu/uploads/<upload_id>/parts/<n>
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def put(self, request, lhp_id, upload_id, part_number):
+        try:
+            size = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            size = 0
+        
+        use_case = UploadTaiLieuPartUseCase(get_s3_service())
+        
+        # The body is read straight from the request stream, never parsed or spooled
+        result = use_case.execute(
+            lhp_id=lhp_id,
+            gv_user_id=str(request.user.id),
+            upload_id=upload_id,
+            part_number=part_number,
+            file_obj=request.stream,
+            size=size
+        )
+        
+        return Response(result.to_dict(), status=result.status_code or 200)
+
+
+class GVTaiLieuMultipartUploadCompleteView(APIView):
+    """
+    Finish a multipart upload and create the TaiLieu
+    POST /api/gv/lop-hoc-phan/<id>/tai-lieu/uploads/<upload_id>/complete
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def post(self, request, lhp_id, upload_id):
+        repo = TaiLieuRepository()
+        use_case = CompleteTaiLieuUploadUseCase(repo, get_s3_service())
+        
+        result = use_case.execute(lhp_id, str(request.user.id), upload_id)
+        
+        status_code = 201 if result.success else (result.status_code or 400)
+        return Response(result.to_dict(), status=status_code)
+
+
 class GVTaiLieuDetailView(APIView):
     """
     Delete or Update TaiLieu
@@ -266,7 +403,8 @@ class GVTaiLieuDetailView(APIView):
 
 class GVTaiLieuDownloadView(APIView):
     """
-    Download TaiLieu (stream file from S3)
+    Download TaiLieu (stream file from S3, or redirect to a presigned URL)
+    Supports Range, If-Range and If-None-Match; ?redirect=1 forces the redirect
     GET /api/gv/lop-hoc-phan/<lhp_id>/tai-lieu/<doc_id>/download
     """
     permission_classes = [IsAuthenticated]
@@ -278,20 +416,5 @@ class GVTaiLieuDownloadView(APIView):
         s3_service = get_s3_service()
         use_case = DownloadTaiLieuUseCase(repo, s3_service)
         
-        result = use_case.execute(lhp_id, doc_id, user_id)
-        
-        if not result.success:
-            return Response(result.to_dict(), status=result.status_code or 400)
-        
-        # Stream file to response
-        file_data = result.data
-        response = HttpResponse(
-            file_data['content'],
-            content_type=file_data['content_type']
-        )
-        
-        # Set filename for download
-        filename = file_data['filename']
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        
-        return response
+        result = use_case.execute(lhp_id, doc_id, user_id, presign=use_redirect(request))
+        return tai_lieu_response(request, result, s3_service)
@@ -7,8 +7,9 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 
 from application.payment.create_payment_use_case import CreatePaymentUseCase
 from application.payment.get_payment_status_use_case import GetPaymentStatusUseCase
-from application.payment.process_ipn_use_case import ProcessIPNUseCase
-from infrastructure.persistence.payment.repositories import PaymentRepository, HocPhiPaymentRepository
+from application.payment.ipn_inbox_use_cases import AcceptIPNUseCase
+from infrastructure.persistence.payment.repositories import PaymentRepository, PaymentIpnInboxRepository
+from infrastructure.persistence.payment.ipn_inbox_worker import get_ipn_inbox_worker
 from infrastructure.persistence.course_registration.repositories import HocPhiRepository
 
 
@@ -79,6 +80,10 @@ class PaymentIPNView(APIView):
     POST /api/payment/ipn
     
     Unified IPN handler for all payment providers
+    
+    Verified callbacks are stored in the IPN inbox and acknowledged right
+    away; the inbox worker applies them. Gateway retries are deduplicated
+    by the inbox.
     """
     permission_classes = [AllowAny]  # IPN callbacks don't have auth
     
@@ -96,13 +101,19 @@ class PaymentIPNView(APIView):
         
         print(f"[IPN] Received from {provider}: {data}")
         
-        use_case = ProcessIPNUseCase(
-            PaymentRepository(),
-            HocPhiPaymentRepository()
-        )
+        use_case = AcceptIPNUseCase(PaymentIpnInboxRepository())
         
         result = use_case.execute(provider, dict(data))
         
+        if not result.success and result.error_code == "INTERNAL_ERROR":
+            # Not stored: let the gateway retry instead of acknowledging
+            return Response(result.to_dict(), status=500)
+        
+        if result.success and not result.data["duplicate"]:
+            worker = get_ipn_inbox_worker()
+            if worker is not None:
+                worker.notify()
+        
         # Return appropriate response based on provider
         if provider == "momo":
             return Response({"resultCode": 0, "message": "OK"})
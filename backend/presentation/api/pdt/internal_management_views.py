@@ -1,6 +1,10 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+import json
 from application.pdt.use_cases.internal_management_use_cases import (
     GetDanhSachSinhVienUseCase, DeleteSinhVienUseCase, CreateSinhVienUseCase,
     UpdateSinhVienUseCase,
@@ -8,22 +12,64 @@ from application.pdt.use_cases.internal_management_use_cases import (
     GetDanhSachGiangVienUseCase, DeleteGiangVienUseCase, CreateGiangVienUseCase,
     UpdateGiangVienUseCase
 )
+from application.pdt.use_cases.student_import_use_cases import ImportSinhVienUseCase, GetImportSinhVienJobUseCase
+from infrastructure.imports import read_table, TableFormatError
+
+class NdjsonRenderer(BaseRenderer):
+    """Accept: application/x-ndjson (or ?format=ndjson) selects the streamed dump; errors go out as JSON"""
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data).encode('utf-8')
+
+def _ndjson_lines(items, batch=500):
+    lines = []
+    for item in items:
+        lines.append(json.dumps(item, cls=DjangoJSONEncoder, ensure_ascii=False))
+        if len(lines) == batch:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+def _list_response(request, use_case):
+    """
+    ?cursor=&limit=   keyset page, follow nextCursor (limit <= 1000)
+    ?page=&pageSize=  offset page, as before
+    ?q=               search; the listing's own filters (khoa_id, ...) by name
+    """
+    params = request.query_params
+    search = params.get('q')
+    filters = {name: params.get(name) for name in use_case.listing.filters}
+
+    if request.accepted_renderer.format == 'ndjson':
+        result = use_case.stream(search, filters)
+        response = StreamingHttpResponse(_ndjson_lines(result.data), content_type='application/x-ndjson; charset=utf-8')
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    try:
+        page = int(params.get('page', 1))
+        page_size = int(params.get('pageSize', 10000))
+    except ValueError:
+        return Response({"isSuccess": False, "message": "page / pageSize phải là số"}, status=400)
+    result = use_case.execute(page, page_size, params.get('cursor'), params.get('limit'), search, filters)
+    return Response(result.to_dict(), status=result.status_code or 200)
 
 class SinhVienView(APIView):
     """
-    GET /api/pdt/sinh-vien
+    GET /api/pdt/sinh-vien?cursor=&limit=&q=&khoa_id=&nganh_id=&khoa_hoc=&lop=
+    GET /api/pdt/sinh-vien?format=ndjson - stream every matching student
     POST /api/pdt/sinh-vien
     PUT /api/pdt/sinh-vien/<id>
     DELETE /api/pdt/sinh-vien/<id>
     """
     permission_classes = [IsAuthenticated]
+    renderer_classes = [JSONRenderer, NdjsonRenderer]
 
     def get(self, request):
-        page = int(request.query_params.get('page', 1))
-        page_size = int(request.query_params.get('pageSize', 10000))
-        use_case = GetDanhSachSinhVienUseCase()
-        result = use_case.execute(page, page_size)
-        return Response(result.to_dict(), status=result.status_code or 200)
+        return _list_response(request, GetDanhSachSinhVienUseCase())
     
     def post(self, request):
         use_case = CreateSinhVienUseCase()
@@ -40,13 +86,49 @@ class SinhVienView(APIView):
         result = use_case.execute(id)
         return Response(result.to_dict(), status=result.status_code or 200)
 
+class SinhVienImportView(APIView):
+    """
+    POST /api/pdt/sinh-vien/import/excel
+    multipart: file (.xlsx / .csv), matKhauMacDinh? (for rows without a mật khẩu)
+    Returns a summary and one result per row; files over STUDENT_IMPORT_SYNC_MAX_ROWS
+    get 202 and a job to poll instead (very large files: manage.py import_sinh_vien)
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({"isSuccess": False, "message": "Thiếu file import"}, status=400)
+        try:
+            rows = read_table(upload, upload.name)
+        except TableFormatError as e:
+            return Response({"isSuccess": False, "message": str(e), "errorCode": "INVALID_FILE"}, status=400)
+
+        use_case = ImportSinhVienUseCase()
+        result = use_case.execute(rows, default_password=request.data.get('matKhauMacDinh'),
+                                  requested_by=request.user.id)
+        return Response(result.to_dict(), status=result.status_code or 200)
+
+class SinhVienImportJobView(APIView):
+    """
+    GET /api/pdt/sinh-vien/import/jobs/<job_id>
+    Job status; once done, also the summary and per-row results
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, job_id):
+        use_case = GetImportSinhVienJobUseCase()
+        result = use_case.execute(job_id, request.user.id)
+        return Response(result.to_dict(), status=result.status_code or 200)
+
 class MonHocView(APIView):
     """
-    GET /api/pdt/mon-hoc - List all
+    GET /api/pdt/mon-hoc - List (cursor / limit / q / khoa_id / loai_mon, or ?format=ndjson)
     GET /api/pdt/mon-hoc/<id> - Get detail
     DELETE /api/pdt/mon-hoc/<id>
     """
     permission_classes = [IsAuthenticated]
+    renderer_classes = [JSONRenderer, NdjsonRenderer]
 
     def get(self, request, id=None):
         if id:
@@ -55,12 +137,7 @@ class MonHocView(APIView):
             result = use_case.execute_single(id)
             return Response(result.to_dict(), status=result.status_code or 200)
         else:
-            # Get list
-            page = int(request.query_params.get('page', 1))
-            page_size = int(request.query_params.get('pageSize', 10000))
-            use_case = GetDanhSachMonHocUseCase()
-            result = use_case.execute(page, page_size)
-            return Response(result.to_dict(), status=result.status_code or 200)
+            return _list_response(request, GetDanhSachMonHocUseCase())
 
     def delete(self, request, id):
         use_case = DeleteMonHocUseCase()
@@ -69,13 +146,14 @@ class MonHocView(APIView):
 
 class GiangVienView(APIView):
     """
-    GET /api/pdt/giang-vien - List all
+    GET /api/pdt/giang-vien - List (cursor / limit / q / khoa_id / trinh_do, or ?format=ndjson)
     GET /api/pdt/giang-vien/<id> - Get detail
     POST /api/pdt/giang-vien - Create new
     PUT /api/pdt/giang-vien/<id> - Update info (and password if provided)
     DELETE /api/pdt/giang-vien/<id>
     """
     permission_classes = [IsAuthenticated]
+    renderer_classes = [JSONRenderer, NdjsonRenderer]
 
     def get(self, request, id=None):
         if id:
@@ -84,12 +162,7 @@ class GiangVienView(APIView):
             result = use_case.execute_single(id)
             return Response(result.to_dict(), status=result.status_code or 200)
         else:
-            # Get list
-            page = int(request.query_params.get('page', 1))
-            page_size = int(request.query_params.get('pageSize', 10000))
-            use_case = GetDanhSachGiangVienUseCase()
-            result = use_case.execute(page, page_size)
-            return Response(result.to_dict(), status=result.status_code or 200)
+            return _list_response(request, GetDanhSachGiangVienUseCase())
     
     def post(self, request):
         use_case = CreateGiangVienUseCase()
@@ -1,7 +1,9 @@
 from django.urls import path
 from .report_views import (
     OverviewStatsView, KhoaStatsView, NganhStatsView, 
-    GiangVienStatsView, ExportExcelView, ExportPDFView
+    GiangVienStatsView, ExportExcelView, ExportPDFView,
+    ExportJobStatusView, ExportJobDownloadView,
+    RegistrationThroughputView, RegistrationThroughputStreamView
 )
 
 urlpatterns = [
@@ -9,6 +11,10 @@ urlpatterns = [
     path('dk-theo-khoa', KhoaStatsView.as_view(), name='report-khoa'),
     path('dk-theo-nganh', NganhStatsView.as_view(), name='report-nganh'),
     path('tai-giang-vien', GiangVienStatsView.as_view(), name='report-giang-vien'),
+    path('dang-ky-theo-thoi-gian', RegistrationThroughputView.as_view(), name='report-dang-ky-theo-thoi-gian'),
+    path('dang-ky-theo-thoi-gian/stream', RegistrationThroughputStreamView.as_view(), name='report-dang-ky-stream'),
     path('export/excel', ExportExcelView.as_view(), name='report-export-excel'),
     path('export/pdf', ExportPDFView.as_view(), name='report-export-pdf'),
+    path('export/jobs/<str:job_id>', ExportJobStatusView.as_view(), name='report-export-job'),
+    path('export/jobs/<str:job_id>/download', ExportJobDownloadView.as_view(), name='report-export-job-download'),
 ]
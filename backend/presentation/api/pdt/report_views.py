@@ -1,11 +1,19 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import BaseRenderer, JSONRenderer
 from application.pdt.use_cases.report_use_cases import (
     GetOverviewStatsUseCase, GetKhoaStatsUseCase, 
     GetNganhStatsUseCase, GetGiangVienStatsUseCase
 )
-from django.http import HttpResponse
+from application.pdt.use_cases.report_export_use_cases import (
+    ExportReportUseCase, GetExportJobUseCase, DownloadExportJobUseCase
+)
+from application.pdt.use_cases.registration_rollup_use_cases import (
+    GetRegistrationThroughputUseCase, StreamRegistrationThroughputUseCase
+)
+from django.http import StreamingHttpResponse, FileResponse
+import json
 
 class OverviewStatsView(APIView):
     """
@@ -75,29 +83,162 @@ class GiangVienStatsView(APIView):
         result = use_case.execute(hoc_ky_id, khoa_id)
         return Response(result.to_dict(), status=result.status_code or 200)
 
+def _export_response(result):
+    if not result.success:
+        return Response(result.to_dict(), status=result.status_code or 400)
+    if result.status_code == 202:
+        return Response(result.to_dict(), status=202)
+
+    export = result.data
+    response = StreamingHttpResponse(export.chunks, content_type=export.content_type)
+    response['Content-Disposition'] = f'attachment; filename="{export.filename}"'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def _is_true(value):
+    return str(value).lower() in ('1', 'true', 'yes')
+
+
 class ExportExcelView(APIView):
     """
-    GET /api/pdt/bao-cao/export/excel
+    GET /api/pdt/bao-cao/export/excel?hoc_ky_id=&loai=sinh_vien|lop|khoa&khoa_id=&async=1
+    Streams the workbook; with async=1 returns 202 and a job to poll instead
     """
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        # Placeholder for Excel export
-        # In a real implementation, this would generate an .xlsx file
-        response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-        response['Content-Disposition'] = 'attachment; filename="report.xlsx"'
-        # Write dummy content or implement actual export logic
-        return response
+        hoc_ky_id = request.query_params.get('hoc_ky_id')
+        if not hoc_ky_id:
+            return Response({"isSuccess": False, "message": "hoc_ky_id is required"}, status=400)
+
+        use_case = ExportReportUseCase()
+        result = use_case.execute(
+            hoc_ky_id, 'xlsx',
+            loai=request.query_params.get('loai'),
+            khoa_id=request.query_params.get('khoa_id'),
+            run_async=_is_true(request.query_params.get('async')),
+            requested_by=request.user.id,
+        )
+        return _export_response(result)
 
 class ExportPDFView(APIView):
     """
     POST /api/pdt/bao-cao/export/pdf
+    Body: { hoc_ky_id, loai?, khoa_id?, async? } - same behaviour as the Excel export
     """
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
-        # Placeholder for PDF export
-        # In a real implementation, this would take chart images and generate a PDF
-        response = HttpResponse(content_type='application/pdf')
-        response['Content-Disposition'] = 'attachment; filename="report.pdf"'
+        hoc_ky_id = request.data.get('hoc_ky_id')
+        if not hoc_ky_id:
+            return Response({"isSuccess": False, "message": "hoc_ky_id is required"}, status=400)
+
+        use_case = ExportReportUseCase()
+        result = use_case.execute(
+            hoc_ky_id, 'pdf',
+            loai=request.data.get('loai'),
+            khoa_id=request.data.get('khoa_id'),
+            run_async=_is_true(request.data.get('async')),
+            requested_by=request.user.id,
+        )
+        return _export_response(result)
+
+class ExportJobStatusView(APIView):
+    """
+    GET /api/pdt/bao-cao/export/jobs/<job_id>
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, job_id):
+        use_case = GetExportJobUseCase()
+        result = use_case.execute(job_id, request.user.id)
+        return Response(result.to_dict(), status=result.status_code or 200)
+
+class ExportJobDownloadView(APIView):
+    """
+    GET /api/pdt/bao-cao/export/jobs/<job_id>/download
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, job_id):
+        use_case = DownloadExportJobUseCase()
+        result = use_case.execute(job_id, request.user.id)
+        if not result.success:
+            return Response(result.to_dict(), status=result.status_code or 400)
+
+        download = result.data
+        return FileResponse(open(download.path, 'rb'), as_attachment=True,
+                            filename=download.filename, content_type=download.content_type)
+
+class RegistrationThroughputView(APIView):
+    """
+    GET /api/pdt/bao-cao/dang-ky-theo-thoi-gian
+    ?hoc_ky_id=&granularity=minute|hour&from=&to=&khoa_id=&lop_hoc_phan_id=&group_by=khoa|lop
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        hoc_ky_id = request.query_params.get('hoc_ky_id')
+        if not hoc_ky_id:
+            return Response({"isSuccess": False, "message": "hoc_ky_id is required"}, status=400)
+
+        use_case = GetRegistrationThroughputUseCase()
+        result = use_case.execute(
+            hoc_ky_id,
+            granularity=request.query_params.get('granularity'),
+            since=request.query_params.get('from'),
+            until=request.query_params.get('to'),
+            khoa_id=request.query_params.get('khoa_id'),
+            lop_hoc_phan_id=request.query_params.get('lop_hoc_phan_id'),
+            group_by=request.query_params.get('group_by'),
+        )
+        return Response(result.to_dict(), status=result.status_code or 200)
+
+class EventStreamRenderer(BaseRenderer):
+    """Lets EventSource clients (Accept: text/event-stream) through negotiation; errors go out as JSON"""
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data).encode('utf-8')
+
+def _server_sent_events(events):
+    # The feed ends after REGISTRATION_FEED_MAX_SECONDS; EventSource reconnects after `retry`
+    yield 'retry: 3000\n\n'
+    for kind, points in events:
+        if kind == 'ping':
+            yield ': ping\n\n'
+        else:
+            yield f"event: {kind}\ndata: {json.dumps(points)}\n\n"
+
+class RegistrationThroughputStreamView(APIView):
+    """
+    GET /api/pdt/bao-cao/dang-ky-theo-thoi-gian/stream?hoc_ky_id=&khoa_id=&lop_hoc_phan_id=
+    Server-sent events: `snapshot` (last 30 minutes), then `update` with changed minutes
+
+    Each open stream holds a worker, so it is served only with REGISTRATION_FEED_ENABLED=True,
+    which requires gevent workers (gunicorn -k gevent) or an ASGI server; otherwise 503
+    FEED_DISABLED and clients poll GET /api/pdt/bao-cao/dang-ky-theo-thoi-gian.
+    """
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [JSONRenderer, EventStreamRenderer]
+
+    def get(self, request):
+        hoc_ky_id = request.query_params.get('hoc_ky_id')
+        if not hoc_ky_id:
+            return Response({"isSuccess": False, "message": "hoc_ky_id is required"}, status=400)
+
+        use_case = StreamRegistrationThroughputUseCase()
+        result = use_case.execute(
+            hoc_ky_id,
+            khoa_id=request.query_params.get('khoa_id'),
+            lop_hoc_phan_id=request.query_params.get('lop_hoc_phan_id'),
+        )
+        if not result.success:
+            return Response(result.to_dict(), status=result.status_code or 400)
+
+        response = StreamingHttpResponse(_server_sent_events(result.data), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
         return response
@@ -9,7 +9,7 @@ from .room_views import (
     AvailableRoomView, RoomByKhoaView, AssignRoomView, UnassignRoomView
 )
 from .tuition_views import TuitionPolicyView, CalculateTuitionView
-from .internal_management_views import SinhVienView, MonHocView, GiangVienView
+from .internal_management_views import SinhVienView, SinhVienImportView, SinhVienImportJobView, MonHocView, GiangVienView
 from .demo_views import TogglePhaseView, ResetDemoDataView
 
 urlpatterns = [
@@ -33,6 +33,8 @@ urlpatterns = [
     
     # Internal Management (CRUD)
     path('sinh-vien', SinhVienView.as_view(), name='manage-sinh-vien'),
+    path('sinh-vien/import/excel', SinhVienImportView.as_view(), name='import-sinh-vien'),
+    path('sinh-vien/import/jobs/<str:job_id>', SinhVienImportJobView.as_view(), name='import-sinh-vien-job'),
     path('sinh-vien/<str:id>', SinhVienView.as_view(), name='delete-sinh-vien'),
     path('mon-hoc', MonHocView.as_view(), name='manage-mon-hoc'),
     path('mon-hoc/<str:id>', MonHocView.as_view(), name='delete-mon-hoc'),
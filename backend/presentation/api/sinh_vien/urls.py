@@ -6,6 +6,7 @@ from .views import (
     SinhVienProfileView,
     SVTaiLieuListView,
     SVTaiLieuDownloadView,
+    SVTaiLieuBundleDownloadView,
 )
 
 urlpatterns = [
@@ -13,5 +14,6 @@ urlpatterns = [
     
     # TaiLieu (Documents)
     path('lop-hoc-phan/<str:lhp_id>/tai-lieu', SVTaiLieuListView.as_view(), name='sv-tailieu-list'),
+    path('lop-hoc-phan/<str:lhp_id>/tai-lieu/download-all', SVTaiLieuBundleDownloadView.as_view(), name='sv-tailieu-download-all'),
     path('lop-hoc-phan/<str:lhp_id>/tai-lieu/<str:doc_id>/download', SVTaiLieuDownloadView.as_view(), name='sv-tailieu-download'),
 ]
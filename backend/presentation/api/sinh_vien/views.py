@@ -5,16 +5,19 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
-from django.http import HttpResponse
+from django.http import StreamingHttpResponse
+from django.utils.http import content_disposition_header
 
 from application.sinh_vien.use_cases import GetSinhVienInfoUseCase
 from application.tai_lieu.use_cases import (
     GetSVTaiLieuUseCase,
     DownloadSVTaiLieuUseCase,
+    DownloadSVTaiLieuBundleUseCase,
 )
 from infrastructure.persistence.sinh_vien import SinhVienRepository
 from infrastructure.persistence.tai_lieu.repository import TaiLieuRepository
 from infrastructure.persistence.s3_service import get_s3_service
+from presentation.api.common.downloads import tai_lieu_response, use_redirect
 
 
 class SinhVienProfileView(APIView):
@@ -64,7 +67,8 @@ class SVTaiLieuListView(APIView):
 
 class SVTaiLieuDownloadView(APIView):
     """
-    Download TaiLieu (stream file from S3)
+    Download TaiLieu (stream file from S3, or redirect to a presigned URL)
+    Supports Range, If-Range and If-None-Match; ?redirect=1 forces the redirect
     GET /api/sv/lop-hoc-phan/<lhp_id>/tai-lieu/<doc_id>/download
     """
     permission_classes = [IsAuthenticated]
@@ -76,20 +80,30 @@ class SVTaiLieuDownloadView(APIView):
         s3_service = get_s3_service()
         use_case = DownloadSVTaiLieuUseCase(repo, s3_service)
         
-        result = use_case.execute(lhp_id, doc_id, user_id)
+        result = use_case.execute(lhp_id, doc_id, user_id, presign=use_redirect(request))
+        return tai_lieu_response(request, result, s3_service)
+
+
+class SVTaiLieuBundleDownloadView(APIView):
+    """
+    Download all TaiLieu of a LopHocPhan as one ZIP, streamed as it is built
+    GET /api/sv/lop-hoc-phan/<lhp_id>/tai-lieu/download-all
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request, lhp_id):
+        user_id = str(request.user.id)
+        
+        repo = TaiLieuRepository()
+        use_case = DownloadSVTaiLieuBundleUseCase(repo, get_s3_service())
         
+        result = use_case.execute(lhp_id, user_id)
         if not result.success:
             return Response(result.to_dict(), status=result.status_code or 400)
         
-        # Stream file to response
-        file_data = result.data
-        response = HttpResponse(
-            file_data['content'],
-            content_type=file_data['content_type']
-        )
-        
-        # Set filename for download
-        filename = file_data['filename']
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        
+        bundle = result.data
+        response = StreamingHttpResponse(bundle.chunks, content_type='application/zip')
+        response['Content-Disposition'] = content_disposition_header(True, bundle.filename)
+        response['Cache-Control'] = 'private, no-store'
+        response['X-Accel-Buffering'] = 'no'
         return response
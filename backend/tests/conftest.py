@@ -71,6 +71,31 @@ def pytest_runtest_setup(item):
     pass  # Remove noisy debug output
 
 
+@pytest.fixture(autouse=True)
+def reset_shared_caches():
+    """Each test seeds its own học kỳ / phases / classes, so nothing may survive between tests"""
+    from infrastructure.persistence.config_cache import get_config_cache
+    from infrastructure.persistence.catalog_snapshot import get_catalog_snapshot_store
+    from infrastructure.persistence.pdt.report_cache import get_report_cache
+    get_config_cache().invalidate()
+    get_catalog_snapshot_store().invalidate()
+    get_report_cache().invalidate()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def isolated_event_bus(request):
+    """Unit tests mock the repositories, so projections must not react to their events"""
+    from infrastructure.events import event_bus, EventBus
+    if '/unit/' not in str(request.node.fspath):
+        yield
+        return
+    previous = event_bus._event_bus
+    event_bus._event_bus = EventBus()
+    yield
+    event_bus._event_bus = previous
+
+
 @pytest.fixture
 def api_client():
     from rest_framework.test import APIClient
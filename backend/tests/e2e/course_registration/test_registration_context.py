@@ -0,0 +1,270 @@
+"""
+E2E Tests for the registration context query
+Asserts the number of round-trips a single registration makes to Neon.
+"""
+import pytest
+import uuid
+from django.utils import timezone
+
+
+@pytest.mark.e2e
+@pytest.mark.django_db(databases=['default', 'neon'], transaction=True)
+class TestRegistrationContextQueryCount:
+    """Query count budget for DangKyLopHocPhanUseCase"""
+
+    @pytest.fixture
+    def registration_data(self, setup_base_data, create_sv_user, create_lop_hoc_phan, create_ky_phase):
+        from infrastructure.persistence.models import (
+            GhiDanhHocPhan, LichHocDinhKy, DangKyHocPhan, DangKyTkb
+        )
+
+        sv = create_sv_user()
+        create_ky_phase('dang_ky_hoc_phan', True)
+
+        # Student already holds three classes, each with a weekly session
+        for thu in (2, 3, 4):
+            held = create_lop_hoc_phan()
+            LichHocDinhKy.objects.using('neon').create(
+                id=uuid.uuid4(), lop_hoc_phan=held, thu=thu, tiet_bat_dau=1, tiet_ket_thuc=3
+            )
+            dang_ky = DangKyHocPhan.objects.using('neon').create(
+                id=uuid.uuid4(), sinh_vien_id=sv.id, lop_hoc_phan=held,
+                ngay_dang_ky=timezone.now(), trang_thai='da_dang_ky'
+            )
+            DangKyTkb.objects.using('neon').create(
+                id=uuid.uuid4(), dang_ky=dang_ky, sinh_vien_id=sv.id, lop_hoc_phan=held
+            )
+
+        lop = create_lop_hoc_phan()
+        LichHocDinhKy.objects.using('neon').create(
+            id=uuid.uuid4(), lop_hoc_phan=lop, thu=5, tiet_bat_dau=1, tiet_ket_thuc=3
+        )
+        GhiDanhHocPhan.objects.using('neon').create(
+            id=uuid.uuid4(), sinh_vien_id=sv.id, hoc_phan=lop.hoc_phan, trang_thai='da_ghi_danh'
+        )
+
+        return {'sv': sv, 'lop': lop, 'hoc_ky': setup_base_data['hoc_ky']}
+
+    def _use_case(self):
+        from application.course_registration.use_cases import DangKyLopHocPhanUseCase
+        from infrastructure.persistence.course_registration.repositories import (
+            RegistrationContextRepository, LopHocPhanRepository, DangKyHocPhanRepository,
+            DangKyTKBRepository, LichSuDangKyRepository
+        )
+        return DangKyLopHocPhanUseCase(
+            RegistrationContextRepository(),
+            LopHocPhanRepository(),
+            DangKyHocPhanRepository(),
+            DangKyTKBRepository(),
+            LichSuDangKyRepository()
+        )
+
+    def test_context_load_is_two_statements(self, registration_data, django_assert_num_queries):
+        """
+        Given: A student holding several classes
+        When: The registration context is loaded
+        Then: Exactly two queries hit Neon, regardless of how many classes are held
+        """
+        from infrastructure.persistence.course_registration.repositories import RegistrationContextRepository
+
+        sv = registration_data['sv']
+        lop = registration_data['lop']
+
+        with django_assert_num_queries(2, using='neon'):
+            context = RegistrationContextRepository().load(
+                str(sv.id), str(registration_data['hoc_ky'].id), [str(lop.id)]
+            )
+
+        target = context.targets[str(lop.id)]
+        assert context.phase == 'dang_ky_hoc_phan'
+        assert target.is_ghi_danh is True
+        assert target.is_registered is False
+        assert len(context.registered_lops) == 3
+
+    def test_registration_query_budget(self, registration_data, django_assert_max_num_queries):
+        """
+        Given: A valid registration
+        When: DangKyLopHocPhanUseCase.execute runs
+        Then: 2 pre-check queries plus the write path, independent of held classes
+        """
+        sv = registration_data['sv']
+        lop = registration_data['lop']
+
+        # 2 context + seat claim + dang_ky + lich_su get_or_create
+        # (select, savepoint, insert, release on first use) + chi_tiet + tkb
+        with django_assert_max_num_queries(10, using='neon'):
+            result = self._use_case().execute(
+                {'lopHocPhanId': str(lop.id), 'hocKyId': str(registration_data['hoc_ky'].id)},
+                str(sv.id)
+            )
+
+        assert result.success is True, result.message
+
+    def test_dang_ky_hoc_phan_endpoint_pre_checks(self, registration_data, api_client):
+        """
+        Given: A valid registration through POST /api/sv/dang-ky-hoc-phan (DangKyHocPhanUseCase)
+        When: The request runs
+        Then: Only the student lookup and the 2 context statements run before the seat claim
+        """
+        from django.db import connections
+        from django.test.utils import CaptureQueriesContext
+
+        sv = registration_data['sv']
+        lop = registration_data['lop']
+        api_client.force_authenticate(user=sv)
+
+        with CaptureQueriesContext(connections['neon']) as queries:
+            response = api_client.post('/api/sv/dang-ky-hoc-phan', {
+                'lopHocPhanId': str(lop.id),
+                'hocKyId': str(registration_data['hoc_ky'].id)
+            }, format='json')
+
+        assert response.status_code == 200, response.data
+        statements = [q['sql'].lstrip().upper() for q in queries.captured_queries]
+        seat_claim = next(i for i, sql in enumerate(statements) if sql.startswith('UPDATE "LOP_HOC_PHAN"'))
+        pre_checks = [sql for sql in statements[:seat_claim] if sql.startswith('SELECT')]
+        # sinh_vien + 2 context statements, however many classes are held
+        assert len(pre_checks) == 3
+
+    def test_batch_query_budget_is_independent_of_cart_size(
+        self, registration_data, create_lop_hoc_phan, django_assert_max_num_queries
+    ):
+        """
+        Given: A cart of several valid classes
+        When: DangKyLopHocPhanUseCase.execute_batch runs
+        Then: The whole cart costs the same fixed query budget as one class
+        """
+        from infrastructure.persistence.models import (
+            GhiDanhHocPhan, LichHocDinhKy, DangKyHocPhan, ChiTietLichSuDangKy
+        )
+
+        sv = registration_data['sv']
+        cart = [registration_data['lop']]
+        for thu in (6, 7):
+            lop = create_lop_hoc_phan()
+            LichHocDinhKy.objects.using('neon').create(
+                id=uuid.uuid4(), lop_hoc_phan=lop, thu=thu, tiet_bat_dau=1, tiet_ket_thuc=3
+            )
+            GhiDanhHocPhan.objects.using('neon').create(
+                id=uuid.uuid4(), sinh_vien_id=sv.id, hoc_phan=lop.hoc_phan, trang_thai='da_ghi_danh'
+            )
+            cart.append(lop)
+
+        # 2 context + locked read + seat UPDATE + bulk dang_ky
+        # + lich_su get_or_create (up to 4) + bulk chi_tiet + bulk tkb
+        with django_assert_max_num_queries(11, using='neon'):
+            result = self._use_case().execute_batch(
+                {'lopHocPhanIds': [str(lop.id) for lop in cart], 'hocKyId': str(registration_data['hoc_ky'].id)},
+                str(sv.id)
+            )
+
+        assert result.success is True, result.message
+        assert result.data['soLuongThanhCong'] == len(cart)
+        assert DangKyHocPhan.objects.using('neon').filter(sinh_vien_id=sv.id, trang_thai='da_dang_ky').count() == 3 + len(cart)
+        assert ChiTietLichSuDangKy.objects.using('neon').filter(hanh_dong='dang_ky').count() == len(cart)
+
+
+@pytest.mark.e2e
+@pytest.mark.django_db(databases=['default', 'neon'], transaction=True)
+class TestMongoOnlyScheduleConflicts:
+    """DangKyHocPhanUseCase / ChuyenLopHocPhanUseCase see sessions that exist only in the MongoDB TKB"""
+
+    @pytest.fixture
+    def data(self, setup_base_data, create_sv_user, create_lop_hoc_phan, create_ky_phase):
+        from infrastructure.persistence.models import DangKyHocPhan, DangKyTkb
+
+        sv = create_sv_user()
+        create_ky_phase('dang_ky_hoc_phan', True)
+
+        def register(lop):
+            dang_ky = DangKyHocPhan.objects.using('neon').create(
+                id=uuid.uuid4(), sinh_vien_id=sv.id, lop_hoc_phan=lop,
+                ngay_dang_ky=timezone.now(), trang_thai='da_dang_ky'
+            )
+            DangKyTkb.objects.using('neon').create(
+                id=uuid.uuid4(), dang_ky=dang_ky, sinh_vien_id=sv.id, lop_hoc_phan=lop
+            )
+            return lop
+
+        return {'sv': sv, 'hoc_ky': setup_base_data['hoc_ky'], 'register': register}
+
+    def _context_repo(self, hoc_ky, *sessions):
+        """RegistrationContextRepository over a TKB read model holding `sessions` as (lop, thu, tiet_bat_dau, tiet_ket_thuc)"""
+        from unittest.mock import Mock
+        from infrastructure.persistence.course_registration.repositories import RegistrationContextRepository
+        from infrastructure.persistence.tkb_read_model import TKBSemester
+
+        docs = [
+            {
+                'ma_hoc_phan': lop.hoc_phan.mon_hoc.ma_mon,
+                'hoc_ky_id': str(hoc_ky.id),
+                'danhSachLop': [{'ten_lop': lop.ma_lop, 'thu_trong_tuan': thu, 'tiet_bat_dau': a, 'tiet_ket_thuc': b}]
+            }
+            for lop, thu, a, b in sessions
+        ]
+        tkb_read_model = Mock()
+        tkb_read_model.get.return_value = TKBSemester(str(hoc_ky.id), 1, docs)
+        return RegistrationContextRepository(tkb_read_model=tkb_read_model)
+
+    def _repos(self):
+        from infrastructure.persistence.course_registration.repositories import (
+            LopHocPhanRepository, DangKyHocPhanRepository, DangKyTKBRepository, LichSuDangKyRepository
+        )
+        from infrastructure.persistence.sinh_vien.sinh_vien_repository import SinhVienRepository
+        return [
+            LopHocPhanRepository(), DangKyHocPhanRepository(), DangKyTKBRepository(),
+            LichSuDangKyRepository(), SinhVienRepository()
+        ]
+
+    def test_register_conflicts_with_held_class_scheduled_only_in_mongo(self, data, create_lop_hoc_phan):
+        from application.course_registration.use_cases.dang_ky_hoc_phan_use_case import DangKyHocPhanUseCase
+        from infrastructure.persistence.models import LichHocDinhKy
+
+        held = data['register'](create_lop_hoc_phan())
+        lop = create_lop_hoc_phan()
+        LichHocDinhKy.objects.using('neon').create(
+            id=uuid.uuid4(), lop_hoc_phan=lop, thu=3, tiet_bat_dau=1, tiet_ket_thuc=3
+        )
+
+        use_case = DangKyHocPhanUseCase(self._context_repo(data['hoc_ky'], (held, 3, 2, 4)), *self._repos())
+        result = use_case.execute(str(data['sv'].id), str(lop.id), str(data['hoc_ky'].id))
+
+        assert result.error_code == "TIME_CONFLICT"
+        assert held.ma_lop in result.message
+
+    def test_register_target_scheduled_only_in_mongo(self, data, create_lop_hoc_phan):
+        from application.course_registration.use_cases.dang_ky_hoc_phan_use_case import DangKyHocPhanUseCase
+        from infrastructure.persistence.models import LichHocDinhKy
+
+        held = data['register'](create_lop_hoc_phan())
+        LichHocDinhKy.objects.using('neon').create(
+            id=uuid.uuid4(), lop_hoc_phan=held, thu=6, tiet_bat_dau=7, tiet_ket_thuc=9
+        )
+        lop = create_lop_hoc_phan()
+
+        use_case = DangKyHocPhanUseCase(self._context_repo(data['hoc_ky'], (lop, 6, 9, 10)), *self._repos())
+        result = use_case.execute(str(data['sv'].id), str(lop.id), str(data['hoc_ky'].id))
+
+        assert result.error_code == "TIME_CONFLICT"
+        assert held.ma_lop in result.message
+
+    def test_transfer_to_class_scheduled_only_in_mongo(self, data, create_lop_hoc_phan):
+        from application.course_registration.use_cases import ChuyenLopHocPhanUseCase
+
+        lop_cu = data['register'](create_lop_hoc_phan())
+        other = data['register'](create_lop_hoc_phan())
+        lop_moi = create_lop_hoc_phan(hoc_phan=lop_cu.hoc_phan)
+
+        from infrastructure.persistence.enrollment.repositories import KyPhaseRepository
+
+        lop_hoc_phan_repo, dang_ky_hp_repo, dang_ky_tkb_repo, lich_su_repo, sinh_vien_repo = self._repos()
+        use_case = ChuyenLopHocPhanUseCase(
+            lop_hoc_phan_repo, dang_ky_hp_repo, dang_ky_tkb_repo, lich_su_repo, KyPhaseRepository(), sinh_vien_repo,
+            registration_context_repo=self._context_repo(
+                data['hoc_ky'], (lop_cu, 2, 1, 3), (other, 4, 1, 3), (lop_moi, 4, 3, 5)
+            )
+        )
+        result = use_case.execute(str(data['sv'].id), str(lop_cu.id), str(lop_moi.id), str(data['hoc_ky'].id))
+
+        assert result.error_code == "TIME_CONFLICT"
+        assert other.ma_lop in result.message
@@ -0,0 +1,84 @@
+"""
+Concurrency Tests for Seat Reservation
+Hammers one LopHocPhan with many threads and checks that the conditional
+UPDATE in LopHocPhanRepository.try_reserve_slot never oversubscribes it.
+
+Requires a local PostgreSQL test database (row locks are what make the
+claim atomic; SQLite serializes the whole database and proves nothing).
+"""
+import pytest
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.db import connections
+
+
+THREADS = 64
+CAPACITY = 10
+
+
+def _require_postgres():
+    if connections['neon'].vendor != 'postgresql':
+        pytest.skip("Seat reservation concurrency test needs PostgreSQL")
+
+
+@pytest.mark.e2e
+@pytest.mark.django_db(databases=['default', 'neon'], transaction=True)
+class TestSeatReservationConcurrency:
+    """Concurrent claims against a single popular class"""
+
+    def _hammer(self, lop_hoc_phan_id: str, attempts: int) -> list:
+        from infrastructure.persistence.course_registration.repositories import LopHocPhanRepository
+
+        barrier = threading.Barrier(attempts)
+
+        def claim(_):
+            try:
+                # Line every worker up so the UPDATEs really do race
+                barrier.wait()
+                return LopHocPhanRepository().try_reserve_slot(lop_hoc_phan_id)
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=attempts) as pool:
+            return list(pool.map(claim, range(attempts)))
+
+    def test_claims_never_exceed_capacity(self, create_lop_hoc_phan):
+        """
+        Given: A class with CAPACITY free seats
+        When: THREADS workers claim a seat at the same instant
+        Then: Exactly CAPACITY claims win and so_luong_hien_tai == CAPACITY
+        """
+        _require_postgres()
+        from infrastructure.persistence.models import LopHocPhan
+
+        lop = create_lop_hoc_phan()
+        LopHocPhan.objects.using('neon').filter(id=lop.id).update(
+            so_luong_toi_da=CAPACITY, so_luong_hien_tai=0
+        )
+
+        results = self._hammer(str(lop.id), THREADS)
+
+        assert results.count(True) == CAPACITY
+        assert results.count(False) == THREADS - CAPACITY
+        lop.refresh_from_db(using='neon')
+        assert lop.so_luong_hien_tai == CAPACITY
+
+    def test_claim_on_full_class_is_rejected(self, create_lop_hoc_phan):
+        """
+        Given: A class that is already full
+        When: Many workers try to claim a seat
+        Then: Every claim loses and the counter is untouched
+        """
+        _require_postgres()
+        from infrastructure.persistence.models import LopHocPhan
+
+        lop = create_lop_hoc_phan()
+        LopHocPhan.objects.using('neon').filter(id=lop.id).update(
+            so_luong_toi_da=CAPACITY, so_luong_hien_tai=CAPACITY
+        )
+
+        results = self._hammer(str(lop.id), THREADS)
+
+        assert not any(results)
+        lop.refresh_from_db(using='neon')
+        assert lop.so_luong_hien_tai == CAPACITY
@@ -0,0 +1,128 @@
+"""
+E2E Tests for the PDT report overview
+ReportEngine.overview (two conditional-aggregate statements) against the
+per-figure queries it replaced, on seeded data with and without filters.
+"""
+import pytest
+import uuid
+from decimal import Decimal
+from django.db.models import Sum
+from django.utils import timezone
+
+
+def _per_query_overview(hoc_ky_id, khoa_id=None, nganh_id=None):
+    """One query per figure, as the overview was computed before ReportEngine"""
+    from infrastructure.persistence.models import DangKyHocPhan, LopHocPhan, HocPhi
+
+    dang_ky = DangKyHocPhan.objects.using('neon').filter(lop_hoc_phan__hoc_phan__id_hoc_ky_id=hoc_ky_id)
+    lop = LopHocPhan.objects.using('neon').filter(hoc_phan__id_hoc_ky_id=hoc_ky_id)
+    hoc_phi = HocPhi.objects.using('neon').filter(hoc_ky_id=hoc_ky_id)
+    if khoa_id:
+        dang_ky = dang_ky.filter(sinh_vien__khoa_id=khoa_id)
+        lop = lop.filter(hoc_phan__mon_hoc__khoa_id=khoa_id)
+        hoc_phi = hoc_phi.filter(sinh_vien__khoa_id=khoa_id)
+    if nganh_id:
+        dang_ky = dang_ky.filter(sinh_vien__nganh_id=nganh_id)
+        hoc_phi = hoc_phi.filter(sinh_vien__nganh_id=nganh_id)
+
+    ky_vong = hoc_phi.aggregate(total=Sum('tong_hoc_phi'))['total'] or 0
+    thuc_thu = hoc_phi.filter(trang_thai_thanh_toan='da_thanh_toan').aggregate(total=Sum('tong_hoc_phi'))['total'] or 0
+    return {
+        'svUnique': dang_ky.values('sinh_vien').distinct().count(),
+        'soDangKy': dang_ky.count(),
+        'soLopHocPhan': lop.count(),
+        'taiChinh': {'thuc_thu': float(thuc_thu), 'ky_vong': float(ky_vong)},
+    }
+
+
+@pytest.mark.e2e
+@pytest.mark.django_db(databases=['default', 'neon'], transaction=True)
+class TestReportEngineOverview:
+    """ReportEngine.overview figures, filters and statement count"""
+
+    @pytest.fixture
+    def report_data(self, setup_base_data, create_hoc_phan, create_lop_hoc_phan):
+        from infrastructure.persistence.models import (
+            Khoa, NganhHoc, HocKy, MonHoc, TaiKhoan, Users, SinhVien, DangKyHocPhan, HocPhi
+        )
+
+        khoa_a, nganh_a1 = setup_base_data['khoa'], setup_base_data['nganh']
+        hoc_ky = setup_base_data['hoc_ky']
+        nganh_a2 = NganhHoc.objects.using('neon').create(
+            id=uuid.uuid4(), ma_nganh="SPTIN_TEST", ten_nganh="Sư phạm Tin học Test", khoa=khoa_a
+        )
+        khoa_b = Khoa.objects.using('neon').create(id=uuid.uuid4(), ma_khoa="TOAN_TEST", ten_khoa="Toán Test")
+        nganh_b1 = NganhHoc.objects.using('neon').create(
+            id=uuid.uuid4(), ma_nganh="SPTOAN_TEST", ten_nganh="Sư phạm Toán Test", khoa=khoa_b
+        )
+        other_hoc_ky = HocKy.objects.using('neon').create(
+            id=uuid.uuid4(), ten_hoc_ky="Học kỳ khác Test", ma_hoc_ky="HK_OTHER_TEST",
+            id_nien_khoa=hoc_ky.id_nien_khoa, trang_thai_hien_tai=False
+        )
+
+        def student(khoa, nganh):
+            unique_id = uuid.uuid4().hex[:8]
+            tai_khoan = TaiKhoan.objects.using('neon').create(
+                id=uuid.uuid4(), ten_dang_nhap=f"sv_report_{unique_id}", mat_khau="-",
+                loai_tai_khoan="sinh_vien", trang_thai_hoat_dong=True
+            )
+            user = Users.objects.using('neon').create(
+                id=uuid.uuid4(), ho_ten=f"SV {unique_id}", email=f"sv_{unique_id}@test.com", tai_khoan=tai_khoan
+            )
+            return SinhVien.objects.using('neon').create(
+                id=user, ma_so_sinh_vien=f"SV{unique_id}", khoa=khoa, nganh=nganh
+            )
+
+        # Two classes of a khoa A môn học, one of a khoa B môn học
+        lop_1 = create_lop_hoc_phan()
+        lop_2 = create_lop_hoc_phan()
+        mon_b = MonHoc.objects.using('neon').create(
+            id=uuid.uuid4(), ma_mon="MH_TOAN_TEST", ten_mon="Giải tích Test", so_tin_chi=3, khoa=khoa_b
+        )
+        lop_3 = create_lop_hoc_phan(hoc_phan=create_hoc_phan(mon_hoc=mon_b))
+
+        sv_a1, sv_a2, sv_b1 = student(khoa_a, nganh_a1), student(khoa_a, nganh_a2), student(khoa_b, nganh_b1)
+        for sv, lop in ((sv_a1, lop_1), (sv_a1, lop_3), (sv_a2, lop_1), (sv_a2, lop_2), (sv_b1, lop_3)):
+            DangKyHocPhan.objects.using('neon').create(
+                id=uuid.uuid4(), sinh_vien=sv, lop_hoc_phan=lop, ngay_dang_ky=timezone.now(), trang_thai='da_dang_ky'
+            )
+        for sv, hk, tong, trang_thai in (
+            (sv_a1, hoc_ky, '1000000', 'da_thanh_toan'),
+            (sv_a2, hoc_ky, '2000000', 'chua_thanh_toan'),
+            (sv_b1, hoc_ky, '3000000', 'da_thanh_toan'),
+            (sv_a1, other_hoc_ky, '9000000', 'da_thanh_toan'),
+        ):
+            HocPhi.objects.using('neon').create(
+                id=uuid.uuid4(), sinh_vien=sv, hoc_ky=hk, tong_hoc_phi=Decimal(tong), trang_thai_thanh_toan=trang_thai
+            )
+
+        return {
+            'hoc_ky_id': str(hoc_ky.id),
+            'khoa_a': str(khoa_a.id), 'khoa_b': str(khoa_b.id), 'nganh_a1': str(nganh_a1.id),
+        }
+
+    @pytest.mark.parametrize("filters, expected", [
+        ({}, (3, 5, 3, 6000000.0, 4000000.0)),
+        ({'khoa_id': 'khoa_a'}, (2, 4, 2, 3000000.0, 1000000.0)),
+        ({'khoa_id': 'khoa_a', 'nganh_id': 'nganh_a1'}, (1, 2, 2, 1000000.0, 1000000.0)),
+        ({'khoa_id': 'khoa_b'}, (1, 1, 1, 3000000.0, 3000000.0)),
+    ])
+    def test_overview_matches_per_query_figures(self, report_data, filters, expected, django_assert_num_queries):
+        """
+        Given: Registrations and học phí across two khoa, three ngành and another học kỳ
+        When: ReportEngine.overview runs with the given khoa / ngành filter
+        Then: Every figure equals the per-query result, in two statements
+        """
+        from infrastructure.persistence.pdt.report_engine import ReportEngine
+
+        hoc_ky_id = report_data['hoc_ky_id']
+        filters = {name: report_data[key] for name, key in filters.items()}
+
+        with django_assert_num_queries(2, using='neon'):
+            overview = ReportEngine().overview(hoc_ky_id, **filters)
+
+        assert overview == _per_query_overview(hoc_ky_id, **filters)
+        assert (
+            overview['svUnique'], overview['soDangKy'], overview['soLopHocPhan'],
+            overview['taiChinh']['ky_vong'], overview['taiChinh']['thuc_thu'],
+        ) == expected
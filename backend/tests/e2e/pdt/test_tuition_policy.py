@@ -132,3 +132,50 @@ class TestCalculateTuition:
         assert response.status_code == status.HTTP_200_OK
         data = response.json()
         assert data['isSuccess'] is True
+
+    def test_recalculation_updates_totals_and_drops_stale_lines(self, setup_base_data, create_sv_user,
+                                                                create_mon_hoc, create_hoc_phan, create_lop_hoc_phan):
+        """
+        Test Case: Bulk tuition is recalculated after a registration is removed
+
+        Given: A student registered in a 3-credit and a 2-credit class, tuition calculated once
+        When: The 2-credit registration is removed and calculate_tuition_bulk runs again
+        Then: HocPhi is updated in place (payment status kept) and the stale ChiTietHocPhi line is deleted
+        """
+        from django.utils import timezone
+        from infrastructure.persistence.models import ChinhSachTinChi, DangKyHocPhan, HocPhi, ChiTietHocPhi
+        from infrastructure.persistence.pdt.repositories import ChinhSachHocPhiRepository
+
+        hoc_ky = setup_base_data['hoc_ky']
+        ChinhSachTinChi.objects.using('neon').create(
+            id=uuid.uuid4(),
+            hoc_ky=hoc_ky,
+            khoa=setup_base_data['khoa'],
+            phi_moi_tin_chi=Decimal('500000'),
+            ngay_hieu_luc=date.today()
+        )
+        sv = create_sv_user()
+        lop_3tc = create_lop_hoc_phan(hoc_phan=create_hoc_phan(mon_hoc=create_mon_hoc(so_tin_chi=3)))
+        lop_2tc = create_lop_hoc_phan(hoc_phan=create_hoc_phan(mon_hoc=create_mon_hoc(so_tin_chi=2)))
+        for lop in (lop_3tc, lop_2tc):
+            DangKyHocPhan.objects.using('neon').create(
+                id=uuid.uuid4(), sinh_vien_id=sv.id, lop_hoc_phan=lop,
+                ngay_dang_ky=timezone.now(), trang_thai='da_dang_ky'
+            )
+        repository = ChinhSachHocPhiRepository()
+
+        assert repository.calculate_tuition_bulk(str(hoc_ky.id)) == 1
+        hoc_phi = HocPhi.objects.using('neon').get(sinh_vien_id=sv.id, hoc_ky=hoc_ky)
+        assert hoc_phi.tong_hoc_phi == Decimal('2500000')
+        assert ChiTietHocPhi.objects.using('neon').filter(hoc_phi=hoc_phi).count() == 2
+        HocPhi.objects.using('neon').filter(id=hoc_phi.id).update(trang_thai_thanh_toan='da_thanh_toan')
+
+        DangKyHocPhan.objects.using('neon').filter(sinh_vien_id=sv.id, lop_hoc_phan=lop_2tc).delete()
+        assert repository.calculate_tuition_bulk(str(hoc_ky.id)) == 1
+
+        recalculated = HocPhi.objects.using('neon').get(sinh_vien_id=sv.id, hoc_ky=hoc_ky)
+        assert recalculated.id == hoc_phi.id
+        assert recalculated.tong_hoc_phi == Decimal('1500000')
+        assert recalculated.trang_thai_thanh_toan == 'da_thanh_toan'
+        lines = ChiTietHocPhi.objects.using('neon').filter(hoc_phi=hoc_phi)
+        assert [(line.lop_hoc_phan_id, line.thanh_tien) for line in lines] == [(lop_3tc.id, Decimal('1500000'))]
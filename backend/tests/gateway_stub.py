@@ -0,0 +1,155 @@
+"""
+Local stub for the MoMo / ZaloPay create-payment APIs
+Answers like the sandboxes do, counts TCP connections (to check keep-alive
+pooling) and can be scripted to fail or stall the next requests.
+
+Usage in tests:
+    with GatewayStubServer() as stub:
+        os.environ["MOMO_ENDPOINT"] = stub.url
+        stub.fail_next(2, status=503)
+        ...
+
+Standalone (point MOMO_ENDPOINT / ZALOPAY_ENDPOINT at it for local runs):
+    python -m tests.gateway_stub --port 8765
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Dict, Any, Optional
+import argparse
+import json
+import threading
+import time
+
+
+class _Fault:
+    def __init__(self, status: Optional[int] = None, delay: float = 0.0, drop: bool = False):
+        self.status = status
+        self.delay = delay
+        self.drop = drop
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def setup(self):
+        super().setup()
+        self.server.stub._on_connection()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        stub = self.server.stub
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        stub._record(self.path, body)
+
+        fault = stub._next_fault()
+        if fault is not None:
+            if fault.delay:
+                time.sleep(fault.delay)
+            if fault.drop:
+                self.close_connection = True
+                self.connection.close()
+                return
+            if fault.status is not None:
+                self._send(fault.status, {"message": "stub fault"})
+                return
+
+        if self.path == "/v2/gateway/api/create":
+            self._send(200, {
+                "partnerCode": body.get("partnerCode"),
+                "orderId": body.get("orderId"),
+                "requestId": body.get("requestId"),
+                "amount": body.get("amount"),
+                "resultCode": 0,
+                "message": "Thành công.",
+                "payUrl": f"https://stub.local/pay/{body.get('orderId')}",
+            })
+        elif self.path == "/v2/create":
+            self._send(200, {
+                "return_code": 1,
+                "return_message": "Giao dịch thành công",
+                "order_url": f"https://stub.local/zalopay/{body.get('app_trans_id')}",
+            })
+        else:
+            self._send(404, {"message": "not found"})
+
+    def _send(self, status: int, payload: Dict[str, Any]):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class GatewayStubServer:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._faults: List[_Fault] = []
+        self.connections = 0
+        self.requests: List[Dict[str, Any]] = []
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "GatewayStubServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "GatewayStubServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def fail_next(self, count: int = 1, status: int = 503) -> None:
+        """Answer the next `count` requests with `status`"""
+        with self._lock:
+            self._faults.extend(_Fault(status=status) for _ in range(count))
+
+    def stall_next(self, count: int = 1, seconds: float = 1.0) -> None:
+        """Delay the next `count` responses (to trigger read timeouts)"""
+        with self._lock:
+            self._faults.extend(_Fault(delay=seconds) for _ in range(count))
+
+    def drop_next(self, count: int = 1) -> None:
+        """Close the connection without answering the next `count` requests"""
+        with self._lock:
+            self._faults.extend(_Fault(drop=True) for _ in range(count))
+
+    def _next_fault(self) -> Optional[_Fault]:
+        with self._lock:
+            return self._faults.pop(0) if self._faults else None
+
+    def _on_connection(self) -> None:
+        with self._lock:
+            self.connections += 1
+
+    def _record(self, path: str, body: Dict[str, Any]) -> None:
+        with self._lock:
+            self.requests.append({"path": path, "body": body})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local MoMo / ZaloPay create-payment stub")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    stub = GatewayStubServer(args.host, args.port)
+    print(f"Gateway stub listening on {stub.url}")
+    try:
+        stub._server.serve_forever()
+    except KeyboardInterrupt:
+        stub.stop()
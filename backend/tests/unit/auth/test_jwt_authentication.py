@@ -0,0 +1,192 @@
+"""
+Tests for CustomJWTAuthentication: stateless claim principal and user cache
+"""
+import uuid
+import pytest
+from unittest.mock import MagicMock, patch
+
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from infrastructure.security.authentication import CustomJWTAuthentication
+from infrastructure.security.user_cache import UserCache
+
+
+USER_ID = uuid.UUID("11111111-1111-1111-1111-111111111111")
+
+
+@pytest.fixture
+def user_row():
+    user = MagicMock()
+    user.id = USER_ID
+    user.ho_ten = "Nguyen Van A"
+    user.tai_khoan.loai_tai_khoan = "sinh_vien"
+    user.tai_khoan.trang_thai_hoat_dong = True
+    return user
+
+
+@pytest.fixture
+def cache():
+    return UserCache(ttl=60)
+
+
+def make_auth(stateless, cache):
+    auth = CustomJWTAuthentication()
+    auth.stateless = stateless
+    with patch.object(CustomJWTAuthentication, 'user_cache', cache):
+        yield auth
+
+
+@pytest.fixture
+def stateless_auth(cache):
+    yield from make_auth(True, cache)
+
+
+@pytest.fixture
+def eager_auth(cache):
+    yield from make_auth(False, cache)
+
+
+TOKEN = {'user_id': str(USER_ID), 'role': 'sinh_vien'}
+
+
+class TestStatelessPrincipal:
+    def test_claims_need_no_query(self, stateless_auth):
+        with patch('infrastructure.security.authentication.load_user') as load_user:
+            user = stateless_auth.get_user(TOKEN)
+
+            assert user.id == USER_ID
+            assert user.pk == USER_ID
+            assert str(user) == str(USER_ID)
+            assert user.role == 'sinh_vien'
+            assert user.is_authenticated
+            load_user.assert_not_called()
+
+    def test_non_claim_attribute_loads_row_once(self, stateless_auth, user_row):
+        with patch('infrastructure.security.authentication.load_user', return_value=user_row) as load_user:
+            user = stateless_auth.get_user(TOKEN)
+
+            assert user.ho_ten == "Nguyen Van A"
+            assert user.ho_ten == "Nguyen Van A"
+            assert user.is_loaded
+            load_user.assert_called_once_with(USER_ID)
+
+    def test_cached_row_is_reused(self, stateless_auth, cache, user_row):
+        with patch('infrastructure.security.authentication.load_user', return_value=user_row) as load_user:
+            stateless_auth.get_user(TOKEN).ho_ten
+            user = stateless_auth.get_user(TOKEN)
+
+            assert user.is_loaded
+            assert user.ho_ten == "Nguyen Van A"
+            load_user.assert_called_once()
+
+    def test_invalid_user_id_claim(self, stateless_auth):
+        with pytest.raises(InvalidToken):
+            stateless_auth.get_user({'user_id': 'not-a-uuid'})
+
+    def test_missing_user_id_claim(self, stateless_auth):
+        with pytest.raises(InvalidToken):
+            stateless_auth.get_user({'role': 'sinh_vien'})
+
+
+class TestEagerPrincipal:
+    def test_row_loaded_through_cache(self, eager_auth, user_row):
+        with patch('infrastructure.security.authentication.load_user', return_value=user_row) as load_user:
+            first = eager_auth.get_user(TOKEN)
+            second = eager_auth.get_user(TOKEN)
+
+            assert first.id == second.id == USER_ID
+            assert second.role == 'sinh_vien'
+            load_user.assert_called_once()
+
+    def test_invalidation_reloads_deactivated_account(self, eager_auth, cache, user_row):
+        inactive = AuthenticationFailed("User is inactive", code="user_inactive")
+        with patch('infrastructure.security.authentication.load_user', side_effect=[user_row, inactive]):
+            eager_auth.get_user(TOKEN)
+            cache.invalidate(USER_ID)
+
+            with pytest.raises(AuthenticationFailed):
+                eager_auth.get_user(TOKEN)
+
+
+class TestDefaultPrincipal:
+    """JWT_STATELESS_PRINCIPAL off and no user cache: one query per request"""
+
+    @pytest.fixture
+    def default_auth(self):
+        yield from make_auth(False, UserCache(ttl=0))
+
+    @patch('infrastructure.security.authentication.Users')
+    def test_active_account_loaded_with_tai_khoan(self, mock_users, default_auth, user_row):
+        query = mock_users.objects.using.return_value
+        query.select_related.return_value.get.return_value = user_row
+
+        user = default_auth.get_user(TOKEN)
+
+        assert user.is_loaded
+        assert user.role == 'sinh_vien'
+        mock_users.objects.using.assert_called_once_with('neon')
+        query.select_related.assert_called_once_with('tai_khoan')
+
+    @patch('infrastructure.security.authentication.Users')
+    def test_inactive_account_rejected(self, mock_users, default_auth, user_row):
+        user_row.tai_khoan.trang_thai_hoat_dong = False
+        mock_users.objects.using.return_value.select_related.return_value.get.return_value = user_row
+
+        with pytest.raises(AuthenticationFailed, match="User is inactive"):
+            default_auth.get_user(TOKEN)
+
+    @patch('infrastructure.security.authentication.Users')
+    def test_missing_user_rejected(self, mock_users, default_auth):
+        mock_users.DoesNotExist = type('DoesNotExist', (Exception,), {})
+        mock_users.objects.using.return_value.select_related.return_value.get.side_effect = mock_users.DoesNotExist
+
+        with pytest.raises(AuthenticationFailed):
+            default_auth.get_user(TOKEN)
+
+
+class TestLoadUser:
+    @patch('infrastructure.security.authentication.Users')
+    def test_inactive_account_rejected(self, mock_users, user_row):
+        from infrastructure.security.authentication import load_user
+        user_row.tai_khoan.trang_thai_hoat_dong = False
+        mock_users.objects.using.return_value.select_related.return_value.get.return_value = user_row
+
+        with pytest.raises(AuthenticationFailed):
+            load_user(USER_ID)
+
+
+class TestUserCache:
+    def test_disabled_cache_always_loads(self, user_row):
+        cache = UserCache(ttl=0)
+        loader = MagicMock(return_value=user_row)
+
+        cache.get(USER_ID, loader)
+        cache.get(USER_ID, loader)
+
+        assert loader.call_count == 2
+        assert cache.peek(USER_ID) is None
+
+    def test_entry_expires(self, user_row):
+        cache = UserCache(ttl=60)
+        loader = MagicMock(return_value=user_row)
+
+        with patch('infrastructure.security.user_cache.time.monotonic', side_effect=[0, 30, 61, 61]):
+            cache.get(USER_ID, loader)   # miss + store
+            cache.get(USER_ID, loader)   # hit at t=30
+            cache.get(USER_ID, loader)   # expired at t=61
+
+        assert loader.call_count == 2
+
+
+class TestUpdateSinhVienInvalidatesCache:
+    @patch('application.pdt.use_cases.internal_management_use_cases.get_user_cache')
+    @patch('application.pdt.use_cases.internal_management_use_cases.SinhVien')
+    def test_deactivation_drops_cached_row(self, mock_sinh_vien, mock_get_cache):
+        from application.pdt.use_cases.internal_management_use_cases import UpdateSinhVienUseCase
+        sv = MagicMock()
+        mock_sinh_vien.objects.using.return_value.select_related.return_value.filter.return_value.first.return_value = sv
+
+        result = UpdateSinhVienUseCase().execute(str(USER_ID), {'trangThaiHoatDong': False})
+
+        assert result.success
+        assert sv.id.tai_khoan.trang_thai_hoat_dong is False
+        mock_get_cache.return_value.invalidate.assert_called_once_with(str(USER_ID))
@@ -0,0 +1,117 @@
+"""
+Tests for ConfigCache: current học kỳ / phase caching and invalidation
+"""
+import pytest
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest.mock import MagicMock, patch
+
+from infrastructure.persistence.config_cache import (
+    ConfigCache, LocalConfigBackend, is_phase_open
+)
+
+
+NOW = datetime(2025, 9, 10, 8, 0, tzinfo=dt_timezone.utc)
+
+
+def make_phase(phase, start_days, end_days):
+    return MagicMock(phase=phase, start_at=NOW + timedelta(days=start_days), end_at=NOW + timedelta(days=end_days))
+
+
+@pytest.fixture
+def cache():
+    return ConfigCache(backend=LocalConfigBackend(), ttl=60)
+
+
+class TestCurrentPhase:
+    def test_phases_loaded_once(self, cache):
+        loader = MagicMock(return_value=[make_phase('dang_ky_hoc_phan', -1, 30)])
+
+        first = cache.current_phase('hk-1', loader, now=NOW)
+        second = cache.current_phase('hk-1', loader, now=NOW)
+
+        assert first.phase == second.phase == 'dang_ky_hoc_phan'
+        loader.assert_called_once()
+
+    def test_window_checked_without_reload(self, cache):
+        loader = MagicMock(return_value=[make_phase('dang_ky_hoc_phan', -1, 1)])
+
+        assert cache.current_phase('hk-1', loader, now=NOW) is not None
+        assert cache.current_phase('hk-1', loader, now=NOW + timedelta(days=2)) is None
+        assert cache.current_phase('hk-1', loader, now=NOW - timedelta(days=2)) is None
+        loader.assert_called_once()
+
+    def test_first_open_phase_wins(self, cache):
+        loader = MagicMock(return_value=[
+            make_phase('ghi_danh', -10, -5),
+            make_phase('dang_ky_hoc_phan', -1, 5),
+        ])
+
+        assert cache.current_phase('hk-1', loader, now=NOW).phase == 'dang_ky_hoc_phan'
+
+    def test_no_phase_is_cached_too(self, cache):
+        loader = MagicMock(return_value=[])
+
+        assert cache.current_phase('hk-1', loader, now=NOW) is None
+        assert cache.current_phase('hk-1', loader, now=NOW) is None
+        loader.assert_called_once()
+
+    def test_naive_window_treated_as_utc(self):
+        phase = MagicMock(start_at=datetime(2025, 9, 1), end_at=datetime(2025, 9, 30))
+
+        assert is_phase_open(phase, NOW)
+        assert not is_phase_open(phase, NOW + timedelta(days=30))
+
+
+class TestInvalidation:
+    def test_invalidate_single_hoc_ky(self, cache):
+        loader_1 = MagicMock(return_value=[])
+        loader_2 = MagicMock(return_value=[])
+        cache.enabled_phases('hk-1', loader_1)
+        cache.enabled_phases('hk-2', loader_2)
+
+        cache.invalidate('hk-1')
+        cache.enabled_phases('hk-1', loader_1)
+        cache.enabled_phases('hk-2', loader_2)
+
+        assert loader_1.call_count == 2
+        assert loader_2.call_count == 1
+
+    def test_invalidate_current_hoc_ky(self, cache):
+        loader = MagicMock(return_value=MagicMock(id='hk-1'))
+        cache.current_hoc_ky(loader)
+
+        cache.invalidate(current_hoc_ky=True)
+        cache.current_hoc_ky(loader)
+
+        assert loader.call_count == 2
+
+    def test_disabled_cache_always_loads(self):
+        cache = ConfigCache(backend=LocalConfigBackend(), ttl=0)
+        loader = MagicMock(return_value=None)
+
+        cache.current_hoc_ky(loader)
+        cache.current_hoc_ky(loader)
+
+        assert loader.call_count == 2
+
+
+class TestUseCasesInvalidate:
+    @patch('application.pdt.use_cases.set_hoc_ky_hien_hanh_use_case.get_config_cache')
+    def test_set_hoc_ky_hien_hanh(self, mock_get_cache):
+        from application.pdt.use_cases.set_hoc_ky_hien_hanh_use_case import SetHocKyHienHanhUseCase
+        repo = MagicMock()
+
+        result = SetHocKyHienHanhUseCase(repo).execute('hk-1')
+
+        assert result.success
+        mock_get_cache.return_value.invalidate.assert_called_once_with(current_hoc_ky=True)
+
+    @patch('application.pdt.use_cases.toggle_phase_use_case.get_config_cache')
+    @patch('application.pdt.use_cases.toggle_phase_use_case.KyPhase')
+    def test_toggle_phase(self, mock_ky_phase, mock_get_cache):
+        from application.pdt.use_cases.toggle_phase_use_case import TogglePhaseUseCase
+
+        result = TogglePhaseUseCase().execute('hk-1', 'dang_ky_hoc_phan')
+
+        assert result.success
+        mock_get_cache.return_value.invalidate.assert_called_once_with('hk-1')
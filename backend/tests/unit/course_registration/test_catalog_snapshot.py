@@ -0,0 +1,123 @@
+import pytest
+from unittest.mock import Mock, MagicMock, patch
+from application.course_registration.use_cases.get_danh_sach_lop_hoc_phan_use_case import GetDanhSachLopHocPhanUseCase
+from application.course_registration.interfaces import (
+    ILopHocPhanRepository, IDangKyHocPhanRepository, LopHocPhanSeatDTO
+)
+from infrastructure.persistence.catalog_snapshot import CatalogSnapshotStore
+from infrastructure.persistence.tkb_read_model import TKBSemester
+
+
+def make_lhp(id, ma_lop, ma_mon, loai_mon="chuyen_nganh", so_luong_hien_tai=0):
+    lhp = MagicMock()
+    lhp.id = id
+    lhp.ma_lop = ma_lop
+    lhp.so_luong_hien_tai = so_luong_hien_tai
+    lhp.so_luong_toi_da = 50
+    lhp.hoc_phan.mon_hoc.id = f"mh-{ma_mon}"
+    lhp.hoc_phan.mon_hoc.ma_mon = ma_mon
+    lhp.hoc_phan.mon_hoc.ten_mon = f"Mon {ma_mon}"
+    lhp.hoc_phan.mon_hoc.so_tin_chi = 3
+    lhp.hoc_phan.mon_hoc.la_mon_chung = False
+    lhp.hoc_phan.mon_hoc.loai_mon = loai_mon
+    lhp.lichhocdinhky_set.all.return_value = []
+    return lhp
+
+
+class TestCatalogSnapshotStore:
+    def test_built_once_per_version(self):
+        store = CatalogSnapshotStore(ttl=60)
+        builder = Mock(side_effect=[["v1"], ["v2"]])
+
+        assert store.get("hk-1", 1, builder) == ["v1"]
+        assert store.get("hk-1", 1, builder) == ["v1"]
+        assert store.get("hk-1", 2, builder) == ["v2"]
+        assert builder.call_count == 2
+
+    def test_invalidate_and_expiry(self):
+        store = CatalogSnapshotStore(ttl=60)
+        builder = Mock(return_value=["catalog"])
+
+        store.get("hk-1", 1, builder)
+        store.invalidate("hk-1")
+        store.get("hk-1", 1, builder)
+        assert builder.call_count == 2
+
+        with patch('infrastructure.persistence.catalog_snapshot.time.monotonic', return_value=10 ** 9):
+            store.get("hk-1", 1, builder)
+        assert builder.call_count == 3
+
+    def test_disabled_store_always_builds(self):
+        store = CatalogSnapshotStore(ttl=0)
+        builder = Mock(return_value=[])
+
+        store.get("hk-1", 1, builder)
+        store.get("hk-1", 1, builder)
+
+        assert builder.call_count == 2
+
+
+class TestGetDanhSachLopHocPhanSnapshot:
+    @pytest.fixture
+    def mock_lhp_repo(self):
+        repo = Mock(spec=ILopHocPhanRepository)
+        repo.find_all_by_hoc_ky.return_value = [
+            make_lhp("lhp-1", "L01", "M01"),
+            make_lhp("lhp-2", "L02", "M01"),
+            make_lhp("lhp-3", "L03", "M02", loai_mon="tu_chon"),
+        ]
+        repo.find_seat_counts_by_hoc_ky.return_value = {
+            "lhp-1": LopHocPhanSeatDTO(so_luong_hien_tai=42, so_luong_toi_da=50),
+            "lhp-3": LopHocPhanSeatDTO(so_luong_hien_tai=7, so_luong_toi_da=40),
+        }
+        return repo
+
+    @pytest.fixture
+    def mock_dkhp_repo(self):
+        return Mock(spec=IDangKyHocPhanRepository)
+
+    @pytest.fixture
+    def use_case_factory(self, mock_lhp_repo, mock_dkhp_repo):
+        store = CatalogSnapshotStore(ttl=60)
+        tkb_read_model = Mock()
+        tkb_read_model.get.return_value = TKBSemester("hk-1", 1, [])
+
+        def _create():
+            use_case = GetDanhSachLopHocPhanUseCase(mock_lhp_repo, mock_dkhp_repo, catalog_store=store)
+            use_case.tkb_read_model = tkb_read_model
+            return use_case
+        _create.tkb_read_model = tkb_read_model
+        return _create
+
+    def test_seats_overlaid_and_registered_filtered(self, use_case_factory, mock_dkhp_repo):
+        mock_dkhp_repo.find_registered_class_ids.return_value = ["lhp-2"]
+
+        result = use_case_factory().execute("sv-1", "hk-1")
+
+        assert result.success is True
+        bat_buoc = result.data["batBuoc"]
+        assert [lop["id"] for lop in bat_buoc[0]["danhSachLop"]] == ["lhp-1"]
+        assert bat_buoc[0]["danhSachLop"][0]["soLuongHienTai"] == 42
+        tu_chon_lop = result.data["tuChon"][0]["danhSachLop"][0]
+        assert (tu_chon_lop["soLuongHienTai"], tu_chon_lop["soLuongToiDa"]) == (7, 40)
+
+    def test_catalog_shared_between_students(self, use_case_factory, mock_lhp_repo, mock_dkhp_repo):
+        mock_dkhp_repo.find_registered_class_ids.side_effect = [["lhp-1", "lhp-2"], []]
+
+        first = use_case_factory().execute("sv-1", "hk-1")
+        second = use_case_factory().execute("sv-2", "hk-1")
+
+        # Fully registered môn học is dropped for sv-1 only; the snapshot itself is untouched
+        assert first.data["batBuoc"] == []
+        assert len(second.data["batBuoc"][0]["danhSachLop"]) == 2
+        mock_lhp_repo.find_all_by_hoc_ky.assert_called_once_with("hk-1")
+        assert mock_lhp_repo.find_seat_counts_by_hoc_ky.call_count == 2
+
+    def test_tkb_version_change_rebuilds(self, use_case_factory, mock_lhp_repo, mock_dkhp_repo):
+        mock_dkhp_repo.find_registered_class_ids.return_value = []
+
+        use_case_factory().execute("sv-1", "hk-1")
+        use_case_factory.tkb_read_model.get.return_value = TKBSemester("hk-1", 2, [])
+        use_case_factory().execute("sv-1", "hk-1")
+
+        assert mock_lhp_repo.find_all_by_hoc_ky.call_count == 2
@@ -15,7 +15,12 @@ from application.course_registration.interfaces import (
     ILopHocPhanRepository,
     IDangKyHocPhanRepository,
     IDangKyTKBRepository,
-    ILichSuDangKyRepository
+    ILichSuDangKyRepository,
+    IRegistrationContextRepository,
+    LichHocSlotDTO,
+    RegisteredLopDTO,
+    RegistrationContextDTO,
+    RegistrationTargetDTO
 )
 from infrastructure.persistence.enrollment.repositories import KyPhaseRepository
 from infrastructure.persistence.sinh_vien.sinh_vien_repository import SinhVienRepository
@@ -23,6 +28,26 @@ from infrastructure.persistence.models import LopHocPhan, DangKyHocPhan, DangKyT
 
 from unittest.mock import patch
 
+
+def make_context(target_slots=(), registered_lops=()):
+    """Context for lhp-new, as RegistrationContextRepository returns it (PostgreSQL + MongoDB sessions)"""
+    return RegistrationContextDTO(
+        phase='dang_ky_hoc_phan',
+        targets={'lhp-new': RegistrationTargetDTO(
+            lop_hoc_phan_id='lhp-new', ma_lop='LHP-NEW', hoc_phan_id='hp-1', ten_hoc_phan='Lap trinh Python',
+            mon_hoc_id='mon-1', so_luong_hien_tai=10, so_luong_toi_da=50, is_ghi_danh=True,
+            is_registered=False, has_registered_mon_hoc=True,
+            lich_hocs=[LichHocSlotDTO(thu=thu, tiet_bat_dau=a, tiet_ket_thuc=b) for thu, a, b in target_slots]
+        )},
+        registered_lops=[
+            RegisteredLopDTO(
+                lop_hoc_phan_id=lop_id, ma_lop=ma_lop, ten_hoc_phan=ma_lop,
+                lich_hocs=[LichHocSlotDTO(thu=thu, tiet_bat_dau=a, tiet_ket_thuc=b) for thu, a, b in slots]
+            )
+            for lop_id, ma_lop, slots in registered_lops
+        ]
+    )
+
 # @pytest.mark.django_db(databases=['neon']) # Removed DB dependency
 class TestChuyenLopHocPhanUseCase:
     @pytest.fixture(autouse=True)
@@ -32,7 +57,9 @@ class TestChuyenLopHocPhanUseCase:
 
     @pytest.fixture
     def mock_lhp_repo(self):
-        return Mock(spec=ILopHocPhanRepository)
+        repo = Mock(spec=ILopHocPhanRepository)
+        repo.try_reserve_slot.return_value = True
+        return repo
 
     @pytest.fixture
     def mock_dkhp_repo(self):
@@ -55,14 +82,21 @@ class TestChuyenLopHocPhanUseCase:
         return Mock(spec=SinhVienRepository)
 
     @pytest.fixture
-    def use_case(self, mock_lhp_repo, mock_dkhp_repo, mock_tkb_repo, mock_lich_su_repo, mock_ky_phase_repo, mock_sinh_vien_repo):
+    def mock_context_repo(self):
+        repo = Mock(spec=IRegistrationContextRepository)
+        repo.load.return_value = make_context()
+        return repo
+
+    @pytest.fixture
+    def use_case(self, mock_lhp_repo, mock_dkhp_repo, mock_tkb_repo, mock_lich_su_repo, mock_ky_phase_repo, mock_sinh_vien_repo, mock_context_repo):
         return ChuyenLopHocPhanUseCase(
             mock_lhp_repo,
             mock_dkhp_repo,
             mock_tkb_repo,
             mock_lich_su_repo,
             mock_ky_phase_repo,
-            mock_sinh_vien_repo
+            mock_sinh_vien_repo,
+            registration_context_repo=mock_context_repo
         )
 
     def test_execute_success(self, use_case, mock_sinh_vien_repo, mock_ky_phase_repo, mock_dkhp_repo, mock_lhp_repo, mock_tkb_repo):
@@ -98,8 +132,8 @@ class TestChuyenLopHocPhanUseCase:
         # Assert
         assert result.success is True
         mock_dkhp_repo.update_status.assert_called_with("dk-old", "da_huy")
-        mock_lhp_repo.update_so_luong.assert_any_call(lop_cu_id, -1)
-        mock_lhp_repo.update_so_luong.assert_any_call(lop_moi_id, 1)
+        mock_lhp_repo.try_reserve_slot.assert_called_once_with(lop_moi_id)
+        mock_lhp_repo.update_so_luong.assert_called_once_with(lop_cu_id, -1)
         mock_dkhp_repo.create.assert_called()
 
     def test_execute_fail_subject_mismatch(self, use_case, mock_sinh_vien_repo, mock_ky_phase_repo, mock_dkhp_repo, mock_lhp_repo):
@@ -124,3 +158,73 @@ class TestChuyenLopHocPhanUseCase:
         
         assert result.success is False
         assert result.error_code == "SUBJECT_MISMATCH"
+
+    def _transfer_setup(self, mock_sinh_vien_repo, mock_ky_phase_repo, mock_dkhp_repo, mock_lhp_repo):
+        mock_sinh_vien_repo.get_by_id.return_value = MagicMock()
+        mock_ky_phase_repo.get_current_phase.return_value = MagicMock(phase="dang_ky_hoc_phan")
+
+        dang_ky_cu = MagicMock(spec=DangKyHocPhan)
+        dang_ky_cu.id = "dk-old"
+        dang_ky_cu.trang_thai = "da_dang_ky"
+        mock_dkhp_repo.find_by_sinh_vien_and_lop_hoc_phan.return_value = dang_ky_cu
+
+        # Neither class has lich_hoc_dinh_ky rows: TLK scheduled them in MongoDB only
+        lop = MagicMock(spec=LopHocPhan)
+        lop.so_luong_hien_tai = 10
+        lop.so_luong_toi_da = 50
+        lop.hoc_phan.mon_hoc_id = "mon-1"
+        lop.lichhocdinhky_set.all.return_value = []
+        mock_lhp_repo.find_by_id.return_value = lop
+        mock_dkhp_repo.create.return_value = MagicMock(id="dk-new")
+
+    def test_execute_fail_time_conflict_with_mongo_only_class(self, use_case, mock_sinh_vien_repo, mock_ky_phase_repo, mock_dkhp_repo, mock_lhp_repo, mock_context_repo):
+        """
+        Given: The new class and another held class are scheduled only in the MongoDB TKB and overlap
+        When: The student transfers
+        Then: TIME_CONFLICT, and nothing is written
+        """
+        self._transfer_setup(mock_sinh_vien_repo, mock_ky_phase_repo, mock_dkhp_repo, mock_lhp_repo)
+        mock_context_repo.load.return_value = make_context(
+            target_slots=[(3, 4, 6)],
+            registered_lops=[("lhp-old", "LHP-OLD", [(5, 1, 3)]), ("lhp-other", "LHP-OTHER", [(3, 6, 8)])]
+        )
+
+        result = use_case.execute("sv-1", "lhp-old", "lhp-new", "hk-1")
+
+        assert result.success is False
+        assert result.error_code == "TIME_CONFLICT"
+        assert "LHP-OTHER" in result.message
+        mock_context_repo.load.assert_called_once_with("sv-1", "hk-1", ["lhp-new"])
+        mock_dkhp_repo.create.assert_not_called()
+
+    def test_execute_ignores_overlap_with_old_class(self, use_case, mock_sinh_vien_repo, mock_ky_phase_repo, mock_dkhp_repo, mock_lhp_repo, mock_context_repo):
+        """The class being left may overlap the new one"""
+        self._transfer_setup(mock_sinh_vien_repo, mock_ky_phase_repo, mock_dkhp_repo, mock_lhp_repo)
+        mock_context_repo.load.return_value = make_context(
+            target_slots=[(3, 4, 6)],
+            registered_lops=[("lhp-old", "LHP-OLD", [(3, 4, 6)])]
+        )
+
+        result = use_case.execute("sv-1", "lhp-old", "lhp-new", "hk-1")
+
+        assert result.success is True
+
+    def test_execute_fail_seat_claim_lost(self, use_case, mock_sinh_vien_repo, mock_ky_phase_repo, mock_dkhp_repo, mock_lhp_repo, mock_tkb_repo, mock_lich_su_repo):
+        """
+        Given: The pre-check sees a free seat but a concurrent request takes the last one
+        When: The student transfers
+        Then: NEW_CLASS_FULL, and the old registration is left untouched
+        """
+        self._transfer_setup(mock_sinh_vien_repo, mock_ky_phase_repo, mock_dkhp_repo, mock_lhp_repo)
+        mock_lhp_repo.try_reserve_slot.return_value = False
+
+        result = use_case.execute("sv-1", "lhp-old", "lhp-new", "hk-1")
+
+        assert result.success is False
+        assert result.error_code == "NEW_CLASS_FULL"
+        mock_lhp_repo.try_reserve_slot.assert_called_once_with("lhp-new")
+        mock_tkb_repo.delete_by_dang_ky_id.assert_not_called()
+        mock_dkhp_repo.update_status.assert_not_called()
+        mock_lhp_repo.update_so_luong.assert_not_called()
+        mock_dkhp_repo.create.assert_not_called()
+        mock_lich_su_repo.upsert_and_log.assert_not_called()
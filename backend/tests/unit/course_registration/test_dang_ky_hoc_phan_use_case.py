@@ -1,4 +1,3 @@
-
 import pytest
 from unittest.mock import Mock, MagicMock
 from application.course_registration.use_cases.dang_ky_hoc_phan_use_case import DangKyHocPhanUseCase
@@ -6,14 +5,36 @@ from application.course_registration.interfaces import (
     ILopHocPhanRepository,
     IDangKyHocPhanRepository,
     IDangKyTKBRepository,
-    ILichSuDangKyRepository
+    ILichSuDangKyRepository,
+    IRegistrationContextRepository,
+    LichHocSlotDTO,
+    RegisteredLopDTO,
+    RegistrationContextDTO,
+    RegistrationTargetDTO
 )
-from infrastructure.persistence.enrollment.repositories import KyPhaseRepository
 from infrastructure.persistence.sinh_vien.sinh_vien_repository import SinhVienRepository
-from infrastructure.persistence.models import LopHocPhan, DangKyHocPhan, DangKyTkb, LichHocDinhKy
 
 from unittest.mock import patch
 
+
+def make_target(lop_hoc_phan_id='lhp-1', **overrides):
+    data = dict(
+        lop_hoc_phan_id=lop_hoc_phan_id,
+        ma_lop='LHP01',
+        hoc_phan_id='hp-1',
+        ten_hoc_phan='Lap trinh Python',
+        mon_hoc_id='mon-1',
+        so_luong_hien_tai=10,
+        so_luong_toi_da=50,
+        is_ghi_danh=True,
+        is_registered=False,
+        has_registered_mon_hoc=False,
+        lich_hocs=[]
+    )
+    data.update(overrides)
+    return RegistrationTargetDTO(**data)
+
+
 # @pytest.mark.django_db(databases=['neon'])
 class TestDangKyHocPhanUseCase:
     @pytest.fixture(autouse=True)
@@ -21,6 +42,12 @@ class TestDangKyHocPhanUseCase:
         with patch('django.db.transaction.atomic'):
             yield
 
+    @pytest.fixture
+    def mock_context_repo(self):
+        repo = Mock(spec=IRegistrationContextRepository)
+        repo.load.return_value = RegistrationContextDTO(phase='dang_ky_hoc_phan', targets={'lhp-1': make_target()})
+        return repo
+
     @pytest.fixture
     def mock_lhp_repo(self):
         return Mock(spec=ILopHocPhanRepository)
@@ -37,119 +64,144 @@ class TestDangKyHocPhanUseCase:
     def mock_lich_su_repo(self):
         return Mock(spec=ILichSuDangKyRepository)
 
-    @pytest.fixture
-    def mock_ky_phase_repo(self):
-        return Mock(spec=KyPhaseRepository)
-
     @pytest.fixture
     def mock_sinh_vien_repo(self):
-        return Mock(spec=SinhVienRepository)
+        repo = Mock(spec=SinhVienRepository)
+        repo.get_by_id.return_value = MagicMock()
+        return repo
 
     @pytest.fixture
-    def use_case(self, mock_lhp_repo, mock_dkhp_repo, mock_tkb_repo, mock_lich_su_repo, mock_ky_phase_repo, mock_sinh_vien_repo):
+    def use_case(self, mock_context_repo, mock_lhp_repo, mock_dkhp_repo, mock_tkb_repo, mock_lich_su_repo, mock_sinh_vien_repo):
         return DangKyHocPhanUseCase(
+            mock_context_repo,
             mock_lhp_repo,
             mock_dkhp_repo,
             mock_tkb_repo,
             mock_lich_su_repo,
-            mock_ky_phase_repo,
             mock_sinh_vien_repo
         )
 
-    def test_execute_success(self, use_case, mock_sinh_vien_repo, mock_ky_phase_repo, mock_lhp_repo, mock_dkhp_repo, mock_tkb_repo):
+    def _set_context(self, mock_context_repo, target=None, registered_lops=(), phase='dang_ky_hoc_phan'):
+        mock_context_repo.load.return_value = RegistrationContextDTO(
+            phase=phase,
+            targets={target.lop_hoc_phan_id: target} if target else {},
+            registered_lops=list(registered_lops)
+        )
+
+    def test_execute_success(self, use_case, mock_context_repo, mock_lhp_repo, mock_dkhp_repo, mock_tkb_repo):
         # Arrange
         sinh_vien_id = "sv-1"
         lop_hoc_phan_id = "lhp-1"
         hoc_ky_id = "hk-1"
         
-        mock_sinh_vien_repo.get_by_id.return_value = MagicMock()
-        
-        phase = MagicMock()
-        phase.phase = "dang_ky_hoc_phan"
-        mock_ky_phase_repo.get_current_phase.return_value = phase
-        
-        lhp = MagicMock(spec=LopHocPhan)
-        lhp.so_luong_hien_tai = 10
-        lhp.so_luong_toi_da = 50
-        lhp.hoc_phan.mon_hoc_id = "mon-1"
-        lhp.lichhocdinhky_set.all.return_value = []
-        mock_lhp_repo.find_by_id.return_value = lhp
-        
-        mock_dkhp_repo.has_registered_mon_hoc_in_hoc_ky.return_value = False
-        mock_tkb_repo.find_registered_lop_hoc_phans_by_hoc_ky.return_value = []
-        
         mock_dkhp_repo.create.return_value = MagicMock(id="dk-1")
+        mock_lhp_repo.try_reserve_slot.return_value = True
         
         # Act
         result = use_case.execute(sinh_vien_id, lop_hoc_phan_id, hoc_ky_id)
         
         # Assert
         assert result.success is True
+        mock_context_repo.load.assert_called_once_with(sinh_vien_id, hoc_ky_id, [lop_hoc_phan_id])
+        # No per-check repository lookups before the transaction
+        mock_lhp_repo.find_by_id.assert_not_called()
+        mock_dkhp_repo.has_registered_mon_hoc_in_hoc_ky.assert_not_called()
+        mock_tkb_repo.find_registered_lop_hoc_phans_by_hoc_ky.assert_not_called()
         mock_dkhp_repo.create.assert_called_once()
         mock_tkb_repo.create.assert_called_once()
-        mock_lhp_repo.update_so_luong.assert_called_with(lop_hoc_phan_id, 1)
+        mock_lhp_repo.try_reserve_slot.assert_called_once_with(lop_hoc_phan_id)
+        mock_lhp_repo.update_so_luong.assert_not_called()
 
-    def test_execute_fail_invalid_phase(self, use_case, mock_sinh_vien_repo, mock_ky_phase_repo):
-        mock_sinh_vien_repo.get_by_id.return_value = MagicMock()
-        mock_ky_phase_repo.get_current_phase.return_value = MagicMock(phase="wrong_phase")
+    def test_execute_fail_slot_claim_lost(self, use_case, mock_context_repo, mock_lhp_repo, mock_dkhp_repo, mock_tkb_repo, mock_lich_su_repo):
+        # Pre-check sees a free seat but a concurrent request wins the conditional UPDATE
+        self._set_context(mock_context_repo, make_target(so_luong_hien_tai=49))
+        mock_lhp_repo.try_reserve_slot.return_value = False
         
         result = use_case.execute("sv-1", "lhp-1", "hk-1")
         
         assert result.success is False
-        assert result.error_code == "INVALID_PHASE"
+        assert result.error_code == "CLASS_FULL"
+        mock_dkhp_repo.create.assert_not_called()
+        mock_tkb_repo.create.assert_not_called()
+        mock_lich_su_repo.upsert_and_log.assert_not_called()
 
-    def test_execute_fail_class_full(self, use_case, mock_sinh_vien_repo, mock_ky_phase_repo, mock_lhp_repo):
-        mock_sinh_vien_repo.get_by_id.return_value = MagicMock()
-        mock_ky_phase_repo.get_current_phase.return_value = MagicMock(phase="dang_ky_hoc_phan")
-        
-        lhp = MagicMock(spec=LopHocPhan)
-        lhp.so_luong_hien_tai = 50
-        lhp.so_luong_toi_da = 50
-        mock_lhp_repo.find_by_id.return_value = lhp
+    def test_execute_fail_student_not_found(self, use_case, mock_sinh_vien_repo, mock_context_repo):
+        mock_sinh_vien_repo.get_by_id.return_value = None
+
+        result = use_case.execute("sv-1", "lhp-1", "hk-1")
+
+        assert result.error_code == "STUDENT_NOT_FOUND"
+        mock_context_repo.load.assert_not_called()
+
+    def test_execute_fail_invalid_phase(self, use_case, mock_context_repo):
+        self._set_context(mock_context_repo, make_target(), phase='wrong_phase')
         
         result = use_case.execute("sv-1", "lhp-1", "hk-1")
         
         assert result.success is False
-        assert result.error_code == "CLASS_FULL"
+        assert result.error_code == "INVALID_PHASE"
 
-    def test_execute_fail_time_conflict(self, use_case, mock_sinh_vien_repo, mock_ky_phase_repo, mock_lhp_repo, mock_dkhp_repo, mock_tkb_repo):
-        # Arrange
-        mock_sinh_vien_repo.get_by_id.return_value = MagicMock()
-        mock_ky_phase_repo.get_current_phase.return_value = MagicMock(phase="dang_ky_hoc_phan")
-        
-        # New class: Mon 2, Tiet 1-3
-        new_lhp = MagicMock(spec=LopHocPhan)
-        new_lhp.so_luong_hien_tai = 0
-        new_lhp.so_luong_toi_da = 50
-        new_lhp.hoc_phan.mon_hoc_id = "mon-new"
-        
-        new_schedule = MagicMock(spec=LichHocDinhKy)
-        new_schedule.thu = 2
-        new_schedule.tiet_bat_dau = 1
-        new_schedule.tiet_ket_thuc = 3
-        new_lhp.lichhocdinhky_set.all.return_value = [new_schedule]
-        
-        mock_lhp_repo.find_by_id.return_value = new_lhp
-        mock_dkhp_repo.has_registered_mon_hoc_in_hoc_ky.return_value = False
-        
-        # Existing registration: Mon 2, Tiet 2-4 (Overlap at 2,3)
-        existing_reg = MagicMock(spec=DangKyTkb)
-        existing_lhp = MagicMock(spec=LopHocPhan)
-        existing_lhp.ma_lop = "LHP-EXIST"
-        
-        existing_schedule = MagicMock(spec=LichHocDinhKy)
-        existing_schedule.thu = 2
-        existing_schedule.tiet_bat_dau = 2
-        existing_schedule.tiet_ket_thuc = 4
-        
-        existing_lhp.lichhocdinhky_set.all.return_value = [existing_schedule]
-        existing_reg.lop_hoc_phan = existing_lhp
+    def test_execute_fail_class_not_found(self, use_case, mock_context_repo):
+        self._set_context(mock_context_repo)
+
+        result = use_case.execute("sv-1", "lhp-1", "hk-1")
+
+        assert result.error_code == "CLASS_NOT_FOUND"
+
+    def test_execute_fail_class_full(self, use_case, mock_context_repo, mock_lhp_repo):
+        self._set_context(mock_context_repo, make_target(so_luong_hien_tai=50))
         
-        mock_tkb_repo.find_registered_lop_hoc_phans_by_hoc_ky.return_value = [existing_reg]
+        result = use_case.execute("sv-1", "lhp-1", "hk-1")
         
+        assert result.success is False
+        assert result.error_code == "CLASS_FULL"
+        mock_lhp_repo.try_reserve_slot.assert_not_called()
+
+    def test_execute_fail_subject_already_registered(self, use_case, mock_context_repo):
+        self._set_context(mock_context_repo, make_target(has_registered_mon_hoc=True))
+
+        result = use_case.execute("sv-1", "lhp-1", "hk-1")
+
+        assert result.error_code == "SUBJECT_ALREADY_REGISTERED"
+
+    def test_execute_fail_time_conflict(self, use_case, mock_context_repo, mock_lhp_repo):
+        # New class: Mon 2, Tiet 1-3 / Existing registration: Mon 2, Tiet 2-4 (Overlap at 2,3)
+        self._set_context(
+            mock_context_repo,
+            make_target('lhp-new', lich_hocs=[LichHocSlotDTO(thu=2, tiet_bat_dau=1, tiet_ket_thuc=3)]),
+            [RegisteredLopDTO(
+                lop_hoc_phan_id='lhp-exist', ma_lop='LHP-EXIST', ten_hoc_phan='Co so du lieu',
+                lich_hocs=[LichHocSlotDTO(thu=2, tiet_bat_dau=2, tiet_ket_thuc=4)]
+            )]
+        )
+
         # Act
         result = use_case.execute("sv-1", "lhp-new", "hk-1")
-        
+
         # Assert
         assert result.success is False
         assert result.error_code == "TIME_CONFLICT"
+        assert "LHP-EXIST" in result.message
+        mock_lhp_repo.try_reserve_slot.assert_not_called()
+
+    def test_execute_fail_time_conflict_with_mongo_only_class(self, use_case, mock_context_repo, mock_lhp_repo):
+        """
+        Given: Neither the target nor the held class has lich_hoc_dinh_ky rows (TLK scheduled both in MongoDB)
+        When: The student registers
+        Then: The clash is still found from the merged context sessions
+        """
+        self._set_context(
+            mock_context_repo,
+            make_target('lhp-new', lich_hocs=[LichHocSlotDTO(thu=4, tiet_bat_dau=7, tiet_ket_thuc=9)]),
+            [RegisteredLopDTO(
+                lop_hoc_phan_id='lhp-mongo', ma_lop='LHP-MONGO', ten_hoc_phan='Toan roi rac',
+                lich_hocs=[LichHocSlotDTO(thu=4, tiet_bat_dau=9, tiet_ket_thuc=10)]
+            )]
+        )
+
+        result = use_case.execute("sv-1", "lhp-new", "hk-1")
+
+        assert result.success is False
+        assert result.error_code == "TIME_CONFLICT"
+        assert "LHP-MONGO" in result.message
+        mock_lhp_repo.find_by_id.assert_not_called()
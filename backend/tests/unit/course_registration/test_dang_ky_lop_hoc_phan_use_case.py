@@ -0,0 +1,296 @@
+import pytest
+from unittest.mock import Mock, MagicMock, patch
+from application.course_registration.use_cases.dang_ky_lop_hoc_phan_use_case import DangKyLopHocPhanUseCase
+from application.course_registration.interfaces import (
+    ILopHocPhanRepository,
+    IDangKyHocPhanRepository,
+    IDangKyTKBRepository,
+    ILichSuDangKyRepository,
+    IRegistrationContextRepository,
+    LichHocSlotDTO,
+    RegisteredLopDTO,
+    RegistrationContextDTO,
+    RegistrationTargetDTO
+)
+from domain.course_registration import LopHocPhanDaDangKy
+
+
+def make_target(**overrides):
+    data = dict(
+        lop_hoc_phan_id='lhp-1',
+        ma_lop='LHP01',
+        hoc_phan_id='hp-1',
+        ten_hoc_phan='Lap trinh Python',
+        mon_hoc_id='mon-1',
+        so_luong_hien_tai=10,
+        so_luong_toi_da=50,
+        is_ghi_danh=True,
+        is_registered=False,
+        has_registered_mon_hoc=False,
+        lich_hocs=[LichHocSlotDTO(thu=2, tiet_bat_dau=1, tiet_ket_thuc=3)]
+    )
+    data.update(overrides)
+    return RegistrationTargetDTO(**data)
+
+
+class TestDangKyLopHocPhanUseCase:
+    @pytest.fixture(autouse=True)
+    def mock_transaction(self):
+        with patch('django.db.transaction.atomic'):
+            yield
+
+    @pytest.fixture
+    def repos(self):
+        repos = {
+            'registration_context_repo': Mock(spec=IRegistrationContextRepository),
+            'lop_hoc_phan_repo': Mock(spec=ILopHocPhanRepository),
+            'dang_ky_hp_repo': Mock(spec=IDangKyHocPhanRepository),
+            'dang_ky_tkb_repo': Mock(spec=IDangKyTKBRepository),
+            'lich_su_repo': Mock(spec=ILichSuDangKyRepository),
+        }
+        repos['registration_context_repo'].load.return_value = RegistrationContextDTO(
+            phase='dang_ky_hoc_phan',
+            targets={'lhp-1': make_target()}
+        )
+        repos['dang_ky_hp_repo'].create.return_value = MagicMock(id="dk-1")
+        repos['lop_hoc_phan_repo'].try_reserve_slot.return_value = True
+        return repos
+
+    @pytest.fixture
+    def use_case(self, repos):
+        return DangKyLopHocPhanUseCase(**repos)
+
+    def _set_context(self, repos, **kwargs):
+        repos['registration_context_repo'].load.return_value = RegistrationContextDTO(**kwargs)
+
+    def test_execute_success_uses_single_context_load(self, use_case, repos):
+        result = use_case.execute({'lopHocPhanId': 'lhp-1', 'hocKyId': 'hk-1'}, 'sv-1')
+
+        assert result.success is True
+        repos['registration_context_repo'].load.assert_called_once_with('sv-1', 'hk-1', ['lhp-1'])
+        # No per-check repository lookups before the transaction
+        repos['lop_hoc_phan_repo'].find_by_id.assert_not_called()
+        repos['dang_ky_hp_repo'].has_registered_mon_hoc_in_hoc_ky.assert_not_called()
+        repos['dang_ky_hp_repo'].is_student_registered.assert_not_called()
+        repos['dang_ky_tkb_repo'].find_registered_lop_hoc_phans_by_hoc_ky.assert_not_called()
+        repos['lop_hoc_phan_repo'].try_reserve_slot.assert_called_once_with('lhp-1')
+        repos['dang_ky_hp_repo'].create.assert_called_once()
+        repos['dang_ky_tkb_repo'].create.assert_called_once()
+
+    def test_execute_missing_input(self, use_case, repos):
+        result = use_case.execute({'lopHocPhanId': 'lhp-1'}, 'sv-1')
+
+        assert result.success is False
+        assert result.error_code == "INVALID_INPUT"
+        repos['registration_context_repo'].load.assert_not_called()
+
+    def test_execute_phase_not_open(self, use_case, repos):
+        self._set_context(repos, phase='ghi_danh', targets={'lhp-1': make_target()})
+
+        result = use_case.execute({'lopHocPhanId': 'lhp-1', 'hocKyId': 'hk-1'}, 'sv-1')
+
+        assert result.error_code == "PHASE_NOT_OPEN"
+
+    def test_execute_lhp_not_found(self, use_case, repos):
+        self._set_context(repos, phase='dang_ky_hoc_phan', targets={})
+
+        result = use_case.execute({'lopHocPhanId': 'lhp-1', 'hocKyId': 'hk-1'}, 'sv-1')
+
+        assert result.error_code == "LHP_NOT_FOUND"
+
+    @pytest.mark.parametrize("overrides, error_code", [
+        ({'is_ghi_danh': False}, "NOT_GHI_DANH"),
+        ({'has_registered_mon_hoc': True}, "ALREADY_REGISTERED_MON_HOC"),
+        ({'so_luong_hien_tai': 50}, "LHP_FULL"),
+        ({'is_registered': True}, "ALREADY_REGISTERED"),
+    ])
+    def test_execute_in_memory_checks(self, use_case, repos, overrides, error_code):
+        self._set_context(repos, phase='dang_ky_hoc_phan', targets={'lhp-1': make_target(**overrides)})
+
+        result = use_case.execute({'lopHocPhanId': 'lhp-1', 'hocKyId': 'hk-1'}, 'sv-1')
+
+        assert result.success is False
+        assert result.error_code == error_code
+        repos['lop_hoc_phan_repo'].try_reserve_slot.assert_not_called()
+
+    def test_execute_tkb_conflict(self, use_case, repos):
+        existing = RegisteredLopDTO(
+            lop_hoc_phan_id='lhp-old',
+            ma_lop='LHP-EXIST',
+            ten_hoc_phan='Co so du lieu',
+            lich_hocs=[LichHocSlotDTO(thu=2, tiet_bat_dau=3, tiet_ket_thuc=5)]
+        )
+        self._set_context(repos, phase='dang_ky_hoc_phan', targets={'lhp-1': make_target()}, registered_lops=[existing])
+
+        result = use_case.execute({'lopHocPhanId': 'lhp-1', 'hocKyId': 'hk-1'}, 'sv-1')
+
+        assert result.success is False
+        assert result.error_code == "TKB_CONFLICT"
+        assert "LHP-EXIST" in result.message
+
+    def test_execute_claim_lost_short_circuits_before_inserts(self, use_case, repos):
+        # Stale read says there is room, the conditional UPDATE says otherwise
+        repos['lop_hoc_phan_repo'].try_reserve_slot.return_value = False
+
+        result = use_case.execute({'lopHocPhanId': 'lhp-1', 'hocKyId': 'hk-1'}, 'sv-1')
+
+        assert result.success is False
+        assert result.error_code == "LHP_FULL"
+        repos['dang_ky_hp_repo'].create.assert_not_called()
+        repos['dang_ky_tkb_repo'].create.assert_not_called()
+        repos['lich_su_repo'].upsert_and_log.assert_not_called()
+
+
+class TestDangKyLopHocPhanBatch:
+    @pytest.fixture(autouse=True)
+    def mock_transaction(self):
+        with patch('django.db.transaction.atomic'):
+            yield
+
+    @pytest.fixture
+    def repos(self):
+        repos = {
+            'registration_context_repo': Mock(spec=IRegistrationContextRepository),
+            'lop_hoc_phan_repo': Mock(spec=ILopHocPhanRepository),
+            'dang_ky_hp_repo': Mock(spec=IDangKyHocPhanRepository),
+            'dang_ky_tkb_repo': Mock(spec=IDangKyTKBRepository),
+            'lich_su_repo': Mock(spec=ILichSuDangKyRepository),
+        }
+        repos['lop_hoc_phan_repo'].try_reserve_slots.side_effect = lambda ids: list(ids)
+        repos['dang_ky_hp_repo'].bulk_create.side_effect = lambda rows: [
+            MagicMock(id=f"dk-{row['lop_hoc_phan_id']}") for row in rows
+        ]
+        return repos
+
+    @pytest.fixture
+    def use_case(self, repos):
+        return DangKyLopHocPhanUseCase(**repos)
+
+    def _set_targets(self, repos, *targets, registered_lops=None):
+        repos['registration_context_repo'].load.return_value = RegistrationContextDTO(
+            phase='dang_ky_hoc_phan',
+            targets={t.lop_hoc_phan_id: t for t in targets},
+            registered_lops=registered_lops or []
+        )
+
+    def _execute(self, use_case, ids):
+        return use_case.execute_batch({'lopHocPhanIds': ids, 'hocKyId': 'hk-1'}, 'sv-1')
+
+    def test_batch_success_uses_bulk_writes(self, use_case, repos):
+        self._set_targets(
+            repos,
+            make_target(lop_hoc_phan_id='lhp-1', mon_hoc_id='mon-1'),
+            make_target(lop_hoc_phan_id='lhp-2', mon_hoc_id='mon-2',
+                        lich_hocs=[LichHocSlotDTO(thu=3, tiet_bat_dau=1, tiet_ket_thuc=3)])
+        )
+
+        result = self._execute(use_case, ['lhp-1', 'lhp-2', 'lhp-1'])
+
+        assert result.success is True
+        assert result.data['soLuongThanhCong'] == 2
+        assert [item['lopHocPhanId'] for item in result.data['results']] == ['lhp-1', 'lhp-2']
+        repos['registration_context_repo'].load.assert_called_once_with('sv-1', 'hk-1', ['lhp-1', 'lhp-2'])
+        repos['lop_hoc_phan_repo'].try_reserve_slots.assert_called_once_with(['lhp-1', 'lhp-2'])
+        repos['dang_ky_hp_repo'].bulk_create.assert_called_once()
+        repos['dang_ky_tkb_repo'].bulk_create.assert_called_once()
+        repos['lich_su_repo'].bulk_log.assert_called_once_with('sv-1', 'hk-1', ['dk-lhp-1', 'dk-lhp-2'], 'dang_ky')
+        repos['dang_ky_hp_repo'].create.assert_not_called()
+
+    def test_batch_checks_cart_items_against_each_other(self, use_case, repos):
+        self._set_targets(
+            repos,
+            make_target(lop_hoc_phan_id='lhp-1', mon_hoc_id='mon-1'),
+            # Same weekday and overlapping tiet as lhp-1
+            make_target(lop_hoc_phan_id='lhp-2', ma_lop='LHP02', mon_hoc_id='mon-2',
+                        lich_hocs=[LichHocSlotDTO(thu=2, tiet_bat_dau=3, tiet_ket_thuc=4)]),
+            # Another class of the same mon as lhp-1
+            make_target(lop_hoc_phan_id='lhp-3', mon_hoc_id='mon-1',
+                        lich_hocs=[LichHocSlotDTO(thu=6, tiet_bat_dau=1, tiet_ket_thuc=3)])
+        )
+
+        result = self._execute(use_case, ['lhp-1', 'lhp-2', 'lhp-3'])
+
+        codes = [item['errorCode'] for item in result.data['results']]
+        assert codes == [None, 'TKB_CONFLICT', 'ALREADY_REGISTERED_MON_HOC']
+        repos['lop_hoc_phan_repo'].try_reserve_slots.assert_called_once_with(['lhp-1'])
+
+    def test_batch_reports_per_item_failures(self, use_case, repos):
+        existing = RegisteredLopDTO(
+            lop_hoc_phan_id='lhp-old',
+            ma_lop='LHP-EXIST',
+            ten_hoc_phan='Co so du lieu',
+            lich_hocs=[LichHocSlotDTO(thu=5, tiet_bat_dau=1, tiet_ket_thuc=2)]
+        )
+        self._set_targets(
+            repos,
+            make_target(lop_hoc_phan_id='lhp-1', mon_hoc_id='mon-1'),
+            make_target(lop_hoc_phan_id='lhp-2', mon_hoc_id='mon-2', is_ghi_danh=False),
+            make_target(lop_hoc_phan_id='lhp-3', mon_hoc_id='mon-3',
+                        lich_hocs=[LichHocSlotDTO(thu=5, tiet_bat_dau=2, tiet_ket_thuc=3)]),
+            registered_lops=[existing]
+        )
+
+        result = self._execute(use_case, ['lhp-1', 'lhp-2', 'lhp-3', 'lhp-missing'])
+
+        codes = [item['errorCode'] for item in result.data['results']]
+        assert codes == [None, 'NOT_GHI_DANH', 'TKB_CONFLICT', 'LHP_NOT_FOUND']
+        assert result.data['soLuongThatBai'] == 3
+
+    def test_batch_lost_claims_are_not_inserted(self, use_case, repos):
+        self._set_targets(
+            repos,
+            make_target(lop_hoc_phan_id='lhp-1', mon_hoc_id='mon-1'),
+            make_target(lop_hoc_phan_id='lhp-2', mon_hoc_id='mon-2', lich_hocs=[])
+        )
+        repos['lop_hoc_phan_repo'].try_reserve_slots.side_effect = None
+        repos['lop_hoc_phan_repo'].try_reserve_slots.return_value = ['lhp-2']
+
+        result = self._execute(use_case, ['lhp-1', 'lhp-2'])
+
+        assert [item['errorCode'] for item in result.data['results']] == ['LHP_FULL', None]
+        inserted = repos['dang_ky_hp_repo'].bulk_create.call_args[0][0]
+        assert [row['lop_hoc_phan_id'] for row in inserted] == ['lhp-2']
+
+    def test_batch_publishes_event_per_claimed_class(self, repos):
+        event_bus = Mock()
+        use_case = DangKyLopHocPhanUseCase(**repos, event_bus=event_bus)
+        self._set_targets(
+            repos,
+            make_target(lop_hoc_phan_id='lhp-1', mon_hoc_id='mon-1'),
+            make_target(lop_hoc_phan_id='lhp-2', mon_hoc_id='mon-2', lich_hocs=[])
+        )
+        repos['lop_hoc_phan_repo'].try_reserve_slots.side_effect = None
+        repos['lop_hoc_phan_repo'].try_reserve_slots.return_value = ['lhp-2']
+
+        self._execute(use_case, ['lhp-1', 'lhp-2'])
+
+        event_bus.publish.assert_called_once_with(LopHocPhanDaDangKy('sv-1', 'hk-1', 'lhp-2'))
+
+    def test_batch_nothing_claimed_skips_inserts(self, use_case, repos):
+        self._set_targets(repos, make_target(lop_hoc_phan_id='lhp-1'))
+        repos['lop_hoc_phan_repo'].try_reserve_slots.side_effect = None
+        repos['lop_hoc_phan_repo'].try_reserve_slots.return_value = []
+
+        result = self._execute(use_case, ['lhp-1'])
+
+        assert result.data['soLuongThanhCong'] == 0
+        repos['dang_ky_hp_repo'].bulk_create.assert_not_called()
+        repos['lich_su_repo'].bulk_log.assert_not_called()
+
+    def test_batch_phase_not_open(self, use_case, repos):
+        repos['registration_context_repo'].load.return_value = RegistrationContextDTO(
+            phase='ghi_danh', targets={'lhp-1': make_target()}
+        )
+
+        result = self._execute(use_case, ['lhp-1'])
+
+        assert result.success is False
+        assert result.error_code == "PHASE_NOT_OPEN"
+        repos['lop_hoc_phan_repo'].try_reserve_slots.assert_not_called()
+
+    @pytest.mark.parametrize("ids", [[], 'lhp-1', [f'lhp-{i}' for i in range(21)]])
+    def test_batch_invalid_input(self, use_case, repos, ids):
+        result = self._execute(use_case, ids)
+
+        assert result.error_code == "INVALID_INPUT"
+        repos['registration_context_repo'].load.assert_not_called()
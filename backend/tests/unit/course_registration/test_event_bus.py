@@ -0,0 +1,66 @@
+import threading
+from unittest.mock import Mock, patch
+from domain.course_registration import LopHocPhanDaDangKy, LopHocPhanDaHuy
+from infrastructure.events import EventBus
+
+
+class TestEventBus:
+    def test_dispatch_by_event_type(self):
+        bus = EventBus()
+        on_dang_ky, on_huy = Mock(), Mock()
+        bus.subscribe(LopHocPhanDaDangKy, on_dang_ky)
+        bus.subscribe(LopHocPhanDaHuy, on_huy)
+        event = LopHocPhanDaDangKy("sv-1", "hk-1", "lhp-1")
+
+        bus.dispatch(event)
+
+        on_dang_ky.assert_called_once_with(event)
+        on_huy.assert_not_called()
+
+    def test_failing_handler_does_not_stop_others(self):
+        bus = EventBus()
+        second = Mock()
+        bus.subscribe(LopHocPhanDaHuy, Mock(side_effect=RuntimeError("db down")))
+        bus.subscribe(LopHocPhanDaHuy, second)
+
+        bus.dispatch(LopHocPhanDaHuy("sv-1", "hk-1", "lhp-1"))
+
+        second.assert_called_once()
+
+    def test_publish_waits_for_commit(self):
+        bus = EventBus()
+        handler = Mock()
+        bus.subscribe(LopHocPhanDaDangKy, handler)
+
+        with patch('infrastructure.events.event_bus.transaction.on_commit') as on_commit:
+            bus.publish(LopHocPhanDaDangKy("sv-1", "hk-1", "lhp-1"))
+            handler.assert_not_called()
+
+        callback = on_commit.call_args[0][0]
+        assert on_commit.call_args[1] == {'using': 'neon'}
+        callback()
+        bus.flush()
+        handler.assert_called_once()
+
+    def test_committed_events_are_dispatched_in_order_off_the_request_thread(self):
+        bus = EventBus(queue_size=2)
+        seen = []
+        bus.subscribe(LopHocPhanDaDangKy, lambda event: seen.append((event.lop_hoc_phan_id, threading.current_thread().name)))
+
+        with patch('infrastructure.events.event_bus.transaction.on_commit', side_effect=lambda callback, using: callback()):
+            for n in range(5):
+                bus.publish(LopHocPhanDaDangKy("sv-1", "hk-1", f"lhp-{n}"))
+        bus.flush()
+
+        assert [lop for lop, _ in seen] == [f"lhp-{n}" for n in range(5)]
+        assert {thread for _, thread in seen} == {'event-bus'}
+
+    def test_queue_size_zero_dispatches_inline(self):
+        bus = EventBus(queue_size=0)
+        handler = Mock()
+        bus.subscribe(LopHocPhanDaHuy, handler)
+
+        with patch('infrastructure.events.event_bus.transaction.on_commit', side_effect=lambda callback, using: callback()):
+            bus.publish(LopHocPhanDaHuy("sv-1", "hk-1", "lhp-1"))
+
+        handler.assert_called_once()
@@ -0,0 +1,103 @@
+import pytest
+from datetime import date
+from unittest.mock import MagicMock
+from domain.course_registration import TKBSession, TKBOccupancy
+from domain.course_registration.tkb_occupancy import slot_mask, TIET_PER_DAY
+
+
+class TestSlotMask:
+    def test_mask_is_contiguous_run_on_day(self):
+        # T2 is day index 1, tiet 1-3
+        assert slot_mask(2, 1, 3) == 0b111 << TIET_PER_DAY
+
+    def test_thu_8_is_sunday(self):
+        assert slot_mask(8, 1, 1) == slot_mask(1, 1, 1) == 1
+
+    @pytest.mark.parametrize("thu, start, end", [(0, 1, 2), (9, 1, 2), (2, 0, 2), (2, 1, TIET_PER_DAY + 1)])
+    def test_invalid_slot_rejected(self, thu, start, end):
+        with pytest.raises(ValueError):
+            slot_mask(thu, start, end)
+        assert TKBSession.create(thu, start, end) is None
+
+
+class TestTKBSession:
+    def test_from_mongo_snake_case(self):
+        session = TKBSession.from_mongo({
+            'ten_lop': 'LHP01', 'thu_trong_tuan': 3, 'tiet_bat_dau': 4, 'tiet_ket_thuc': 6,
+            'ngay_bat_dau': '2025-09-01T00:00:00.000Z', 'ngay_ket_thuc': '2025-12-31'
+        })
+
+        assert (session.thu, session.tiet_bat_dau, session.tiet_ket_thuc) == (3, 4, 6)
+        assert session.ngay_bat_dau == date(2025, 9, 1)
+        assert session.ngay_ket_thuc == date(2025, 12, 31)
+
+    def test_from_mongo_camel_case(self):
+        session = TKBSession.from_mongo({'thuTrongTuan': 5, 'tietBatDau': 1, 'tietKetThuc': 2})
+
+        assert (session.thu, session.tiet_bat_dau, session.tiet_ket_thuc) == (5, 1, 2)
+        assert session.ngay_bat_dau is None
+
+    def test_from_mongo_incomplete_entry(self):
+        assert TKBSession.from_mongo({'ten_lop': 'LHP01', 'thu_trong_tuan': 3}) is None
+
+    def test_from_lich_hoc_ignores_non_date_bounds(self):
+        lich = MagicMock(thu=2, tiet_bat_dau=1, tiet_ket_thuc=3)
+
+        session = TKBSession.from_lich_hoc(lich, MagicMock(), None)
+
+        assert session == TKBSession(2, 1, 3)
+
+
+class TestTKBOccupancy:
+    @pytest.fixture
+    def occupancy(self):
+        occupancy = TKBOccupancy()
+        occupancy.add([TKBSession(2, 1, 3), TKBSession(4, 7, 9)], 'lhp-a', 'LHP-A', 'Co so du lieu')
+        return occupancy
+
+    @pytest.mark.parametrize("session", [
+        TKBSession(2, 3, 5),    # shares tiet 3 (inclusive ranges)
+        TKBSession(2, 2, 2),
+        TKBSession(4, 1, 12),
+    ])
+    def test_conflict_detected(self, occupancy, session):
+        conflict = occupancy.find_conflict([session])
+
+        assert conflict.lop_hoc_phan_id == 'lhp-a'
+        assert conflict.ma_lop == 'LHP-A'
+
+    @pytest.mark.parametrize("session", [
+        TKBSession(2, 4, 6),
+        TKBSession(3, 1, 3),    # same tiet, different day
+        TKBSession(1, 1, 16),
+    ])
+    def test_no_conflict(self, occupancy, session):
+        assert occupancy.find_conflict([session]) is None
+
+    def test_disjoint_date_ranges_do_not_conflict(self):
+        occupancy = TKBOccupancy()
+        occupancy.add([TKBSession(2, 1, 3, date(2025, 9, 1), date(2025, 10, 15))], 'lhp-a', 'LHP-A')
+
+        later = TKBSession(2, 1, 3, date(2025, 10, 16), date(2025, 12, 31))
+        overlapping = TKBSession(2, 1, 3, date(2025, 10, 15), None)
+
+        assert occupancy.find_conflict([later]) is None
+        assert occupancy.find_conflict([overlapping]).ma_lop == 'LHP-A'
+
+    def test_excluded_class_is_skipped(self, occupancy):
+        occupancy.add([TKBSession(2, 3, 4)], 'lhp-b', 'LHP-B')
+
+        conflict = occupancy.find_conflict([TKBSession(2, 3, 3)], exclude_lop_hoc_phan_id='lhp-a')
+
+        assert conflict.ma_lop == 'LHP-B'
+        assert occupancy.find_conflict([TKBSession(2, 1, 2)], exclude_lop_hoc_phan_id='lhp-a') is None
+
+    def test_dict_round_trip(self, occupancy):
+        occupancy.add([TKBSession(6, 1, 2, date(2025, 9, 1), date(2025, 12, 1))], 'lhp-b', 'LHP-B')
+
+        restored = TKBOccupancy.from_dict(occupancy.to_dict())
+
+        assert restored.mask == occupancy.mask
+        assert restored.to_dict() == occupancy.to_dict()
+        assert restored.find_conflict([TKBSession(6, 2, 3, date(2025, 11, 1))]).ma_lop == 'LHP-B'
+        assert TKBOccupancy.cache_key('sv-1', 'hk-1') == 'tkb_occupancy:sv-1:hk-1'
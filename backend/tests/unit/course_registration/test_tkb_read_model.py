@@ -0,0 +1,104 @@
+import pytest
+from unittest.mock import Mock
+from infrastructure.persistence.mongodb_service import MongoDBService
+from infrastructure.persistence.tkb_read_model import TKBReadModel, TKBSemester
+
+
+DOCS = [
+    {
+        'ma_hoc_phan': 'COMP101',
+        'hoc_ky_id': 'hk-1',
+        'danhSachLop': [
+            {'ten_lop': 'COMP101_1', 'thu_trong_tuan': 2, 'tiet_bat_dau': 1, 'tiet_ket_thuc': 3, 'phong_hoc_id': 'p-1'},
+            {'ten_lop': 'COMP101_1', 'thu_trong_tuan': 5, 'tiet_bat_dau': 4, 'tiet_ket_thuc': 6, 'phong_hoc_id': 'p-2'},
+            {'ten_lop': 'COMP101_2', 'thu_trong_tuan': 3, 'tiet_bat_dau': 1, 'tiet_ket_thuc': 3, 'phong_hoc_id': 'p-1'},
+        ]
+    },
+    {
+        'ma_hoc_phan': 'MATH201',
+        'hoc_ky_id': 'hk-1',
+        'danhSachLop': [
+            {'ten_lop': 'MATH201_1', 'thu_trong_tuan': 4, 'tiet_bat_dau': 7, 'tiet_ket_thuc': 9},
+            {'thu_trong_tuan': 4, 'tiet_bat_dau': 7, 'tiet_ket_thuc': 9},  # no ten_lop: ignored
+        ]
+    },
+]
+
+
+class TestTKBSemester:
+    @pytest.fixture
+    def semester(self):
+        return TKBSemester('hk-1', 1, DOCS)
+
+    def test_sessions_by_class_keep_every_day(self, semester):
+        sessions = semester.get_sessions('COMP101', 'COMP101_1')
+
+        assert [s['thu_trong_tuan'] for s in sessions] == [2, 5]
+        assert semester.get_sessions('COMP101', 'missing') == []
+        assert len(semester) == 2
+
+    def test_room_index(self, semester):
+        entries = semester.by_phong('p-1')
+
+        assert [(e.ma_mon, e.ten_lop) for e in entries] == [('COMP101', 'COMP101_1'), ('COMP101', 'COMP101_2')]
+        assert semester.by_phong('p-unknown') == []
+
+    def test_mon_index(self, semester):
+        assert [e.ten_lop for e in semester.by_mon('MATH201')] == ['MATH201_1']
+
+
+class TestTKBReadModel:
+    @pytest.fixture
+    def mongo(self):
+        mongo = Mock(spec=MongoDBService)
+        mongo.is_available = True
+        mongo.get_tkb_version.return_value = 1
+        mongo.get_tkb_by_hoc_ky.return_value = DOCS
+        return mongo
+
+    def test_snapshot_reused_while_version_unchanged(self, mongo):
+        read_model = TKBReadModel(mongo, check_interval=0)
+
+        first = read_model.get('hk-1')
+        second = read_model.get('hk-1')
+
+        assert first is second
+        mongo.get_tkb_by_hoc_ky.assert_called_once_with('hk-1', transform_to_camel=False)
+        assert mongo.get_tkb_version.call_count == 2
+
+    def test_version_bump_rebuilds(self, mongo):
+        read_model = TKBReadModel(mongo, check_interval=0)
+        first = read_model.get('hk-1')
+
+        mongo.get_tkb_version.return_value = 2
+        second = read_model.get('hk-1')
+
+        assert second is not first
+        assert second.version == 2
+        assert mongo.get_tkb_by_hoc_ky.call_count == 2
+
+    def test_check_interval_skips_version_reads(self, mongo):
+        read_model = TKBReadModel(mongo, check_interval=60)
+
+        read_model.get('hk-1')
+        read_model.get('hk-1')
+
+        mongo.get_tkb_version.assert_called_once()
+
+    def test_invalidate_forces_rebuild(self, mongo):
+        read_model = TKBReadModel(mongo, check_interval=60)
+        read_model.get('hk-1')
+
+        read_model.invalidate('hk-1')
+        read_model.get('hk-1')
+
+        assert mongo.get_tkb_by_hoc_ky.call_count == 2
+
+    def test_mongo_unavailable_returns_empty_snapshot(self, mongo):
+        mongo.is_available = False
+        read_model = TKBReadModel(mongo, check_interval=0)
+
+        semester = read_model.get('hk-1')
+
+        assert len(semester) == 0
+        mongo.get_tkb_by_hoc_ky.assert_not_called()
@@ -239,3 +239,109 @@ class TestUpsertGVGradesUseCase:
         
         # Assert
         assert result.success is True
+
+    def test_execute_fail_when_student_listed_twice(self, use_case, mock_lhp_repo, mock_grade_repo):
+        """
+        Given: The same student appears twice in the list
+        When: UpsertGVGradesUseCase.execute() is called
+        Then: Return ServiceResult.fail before touching the repository
+        """
+        # Arrange
+        grades_input = [
+            {"sinh_vien_id": "sv-001", "diem_so": 8.5},
+            {"sinh_vien_id": "sv-001", "diem_so": 9.0},
+        ]
+        mock_lhp_repo.verify_gv_owns_lhp.return_value = True
+        
+        # Act
+        result = use_case.execute("lhp-001", "gv-user-123", grades_input)
+        
+        # Assert
+        assert result.success is False
+        assert result.status_code == 400
+        mock_grade_repo.upsert_grades.assert_not_called()
+
+
+class TestImportGVGradesUseCase:
+    """Tests for ImportGVGradesUseCase"""
+    
+    @pytest.fixture
+    def mock_lhp_repo(self):
+        """Mock LHP repository with two registered students"""
+        from application.gv.interfaces import GVStudentDTO
+        repo = Mock(spec=IGVLopHocPhanRepository)
+        repo.verify_gv_owns_lhp.return_value = True
+        repo.get_students_of_lhp.return_value = [
+            GVStudentDTO(id="sv-001", mssv="4501", ho_ten="A", lop=None, email="a@x"),
+            GVStudentDTO(id="sv-002", mssv="4502", ho_ten="B", lop=None, email="b@x"),
+            GVStudentDTO(id="sv-003", mssv="4503", ho_ten="C", lop=None, email="c@x"),
+        ]
+        return repo
+    
+    @pytest.fixture
+    def mock_grade_repo(self):
+        """Mock grade repository for testing"""
+        repo = Mock(spec=IGVGradeRepository)
+        repo.upsert_grades.return_value = True
+        return repo
+    
+    @pytest.fixture
+    def use_case(self, mock_lhp_repo, mock_grade_repo):
+        """UseCase instance with mocked dependencies"""
+        from application.gv.use_cases import ImportGVGradesUseCase
+        return ImportGVGradesUseCase(mock_lhp_repo, mock_grade_repo)
+    
+    def test_execute_upserts_valid_rows_and_reports_the_rest(self, use_case, mock_grade_repo):
+        """
+        Given: A grade sheet with valid, blank, unknown and malformed rows
+        When: ImportGVGradesUseCase.execute() is called
+        Then: Valid rows are upserted in one call and every row gets a status
+        """
+        # Arrange
+        rows = [
+            (2, {"mssv": "4501", "diem": "8,5"}),
+            (3, {"mssv": "4502", "diem": ""}),
+            (4, {"mssv": "9999", "diem": "5"}),
+            (5, {"masosinhvien": "4503", "diemso": "10.5"}),
+            (6, {"mssv": "4501", "diem": "7"}),
+        ]
+        
+        # Act
+        result = use_case.execute("lhp-001", "gv-user-123", rows)
+        
+        # Assert
+        assert result.success is True
+        assert result.data["summary"] == {"total": 5, "updated": 1, "skipped": 1, "failed": 3}
+        assert [r["status"] for r in result.data["results"]] == ["updated", "skipped", "failed", "failed", "failed"]
+        mock_grade_repo.upsert_grades.assert_called_once_with("lhp-001", [{"sinh_vien_id": "sv-001", "diem_so": 8.5}])
+    
+    def test_execute_forbidden_when_gv_not_assigned(self, use_case, mock_lhp_repo, mock_grade_repo):
+        """
+        Given: GV is NOT assigned to the LopHocPhan
+        When: ImportGVGradesUseCase.execute() is called
+        Then: Return ServiceResult.forbidden
+        """
+        # Arrange
+        mock_lhp_repo.verify_gv_owns_lhp.return_value = False
+        
+        # Act
+        result = use_case.execute("lhp-001", "gv-other", [(2, {"mssv": "4501", "diem": "8"})])
+        
+        # Assert
+        assert result.status_code == 403
+        mock_grade_repo.upsert_grades.assert_not_called()
+    
+    def test_execute_fail_when_upsert_fails(self, use_case, mock_grade_repo):
+        """
+        Given: The repository cannot write the grades
+        When: ImportGVGradesUseCase.execute() is called
+        Then: Return ServiceResult.fail
+        """
+        # Arrange
+        mock_grade_repo.upsert_grades.return_value = False
+        
+        # Act
+        result = use_case.execute("lhp-001", "gv-user-123", [(2, {"mssv": "4501", "diem": "8"})])
+        
+        # Assert
+        assert result.success is False
@@ -0,0 +1,156 @@
+"""
+Unit Tests for the pooled gateway transport (against a local stub server)
+"""
+import pytest
+from unittest.mock import patch
+
+from infrastructure.gateways import CreatePaymentRequest
+from infrastructure.gateways.momo_gateway import MoMoGateway
+from infrastructure.gateways.transport import GatewayTransport, GatewayTransportError, LatencyHistogram
+from tests.gateway_stub import GatewayStubServer
+
+
+@pytest.fixture
+def stub():
+    with GatewayStubServer() as server:
+        yield server
+
+
+@pytest.fixture
+def transport():
+    transport = GatewayTransport(connect_timeout=1.0, read_timeout=0.5, max_attempts=3,
+                                 backoff_base=0.01, backoff_cap=0.02)
+    yield transport
+    transport.close()
+
+
+class TestGatewayTransport:
+
+    def test_reuses_connection_across_requests(self, stub, transport):
+        for _ in range(5):
+            data = transport.post_json("momo", f"{stub.url}/v2/gateway/api/create", {"orderId": "O1"})
+            assert data["resultCode"] == 0
+
+        assert stub.connections == 1
+        assert transport.metrics()["momo"]["outcomes"] == {"ok": 5}
+
+    def test_retries_idempotent_call_on_503(self, stub, transport):
+        stub.fail_next(2, status=503)
+
+        data = transport.post_json("momo", f"{stub.url}/v2/gateway/api/create", {"orderId": "O1"}, idempotent=True)
+
+        assert data["resultCode"] == 0
+        assert len(stub.requests) == 3
+        assert transport.metrics()["momo"]["outcomes"] == {"http_503": 2, "ok": 1}
+
+    def test_does_not_retry_non_idempotent_call(self, stub, transport):
+        stub.fail_next(1, status=503)
+
+        with pytest.raises(GatewayTransportError) as exc:
+            transport.post_json("momo", f"{stub.url}/v2/gateway/api/create", {"orderId": "O1"})
+
+        assert exc.value.attempts == 1
+        assert exc.value.status_code == 503
+        assert len(stub.requests) == 1
+
+    def test_dropped_connection_retried_when_idempotent(self, stub, transport):
+        stub.drop_next(1)
+
+        data = transport.post_json("momo", f"{stub.url}/v2/gateway/api/create", {"orderId": "O1"}, idempotent=True)
+
+        assert data["resultCode"] == 0
+        assert transport.metrics()["momo"]["outcomes"] == {"connection_error": 1, "ok": 1}
+
+    def test_gives_up_after_max_attempts(self, stub, transport):
+        stub.fail_next(5, status=502)
+
+        with pytest.raises(GatewayTransportError) as exc:
+            transport.post_json("zalopay", f"{stub.url}/v2/create", {}, idempotent=True)
+
+        assert exc.value.attempts == 3
+        assert len(stub.requests) == 3
+
+    def test_read_timeout_is_bounded(self, stub, transport):
+        stub.stall_next(1, seconds=1.5)
+
+        with pytest.raises(GatewayTransportError):
+            transport.post_json("momo", f"{stub.url}/v2/gateway/api/create", {"orderId": "O1"})
+
+        assert transport.metrics()["momo"]["outcomes"] == {"read_timeout": 1}
+
+    def test_connection_refused_is_retried_even_if_not_idempotent(self, transport):
+        with patch("time.sleep"):
+            with pytest.raises(GatewayTransportError) as exc:
+                transport.post_json("momo", "http://127.0.0.1:9/v2/gateway/api/create", {})
+
+        assert exc.value.attempts == 3
+
+    def test_backoff_is_jittered_and_capped(self, transport):
+        delays = [transport._backoff(attempt) for attempt in range(1, 10) for _ in range(20)]
+
+        assert all(0 <= d <= transport.backoff_cap for d in delays)
+        assert len(set(delays)) > 1
+
+    def test_metrics_summary_logged_once_per_interval(self, stub, caplog):
+        transport = GatewayTransport(read_timeout=0.5, metrics_log_interval=0.2)
+        transport._metrics_logged_at -= 1
+        try:
+            with caplog.at_level("INFO", logger="infrastructure.gateways.transport"):
+                for _ in range(3):
+                    transport.post_json("momo", f"{stub.url}/v2/gateway/api/create", {"orderId": "O1"})
+        finally:
+            transport.close()
+
+        summaries = [r.getMessage() for r in caplog.records if "gateway calls=" in r.getMessage()]
+        assert len(summaries) == 1
+        assert summaries[0].startswith("[momo] gateway calls=1 ")
+        assert "outcomes={'ok': 1}" in summaries[0]
+
+
+class TestLatencyHistogram:
+
+    def test_buckets_and_quantiles(self):
+        histogram = LatencyHistogram()
+        for latency in (10, 20, 30, 80, 400):
+            histogram.observe(latency, "ok")
+
+        snapshot = histogram.snapshot()
+        assert snapshot["count"] == 5
+        assert snapshot["buckets"]["le_25"] == 2
+        assert snapshot["buckets"]["le_500"] == 1
+        assert snapshot["p50_ms"] == 50.0
+        assert snapshot["p95_ms"] == 500.0
+
+
+class TestMoMoGatewayOverTransport:
+
+    def test_create_payment_through_stub(self, stub, transport, monkeypatch):
+        monkeypatch.setenv("MOMO_ENDPOINT", stub.url)
+        gateway = MoMoGateway(transport)
+
+        response = gateway.create_payment(CreatePaymentRequest(
+            amount=1500000,
+            order_info="Thanh toan hoc phi",
+            redirect_url="http://localhost/payment/result",
+            ipn_url="http://localhost:8000/api/payment/ipn",
+            metadata={"sinhVienId": "sv-00001"}
+        ))
+
+        assert response.pay_url == f"https://stub.local/pay/{response.order_id}"
+        assert stub.requests[0]["body"]["amount"] == 1500000
+
+    def test_create_payment_is_not_resent_after_a_read_timeout(self, stub, transport, monkeypatch):
+        monkeypatch.setenv("MOMO_ENDPOINT", stub.url)
+        stub.stall_next(1, seconds=1.0)
+
+        with pytest.raises(GatewayTransportError):
+            MoMoGateway(transport).create_payment(CreatePaymentRequest(
+                amount=1500000,
+                order_info="Thanh toan hoc phi",
+                redirect_url="http://localhost/payment/result",
+                ipn_url="http://localhost:8000/api/payment/ipn",
+                metadata={"sinhVienId": "sv-00001"}
+            ))
+
+        # MoMo may have accepted the order; a second create would only get "duplicate orderId"
+        assert len(stub.requests) == 1
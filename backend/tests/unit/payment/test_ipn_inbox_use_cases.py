@@ -0,0 +1,196 @@
+"""
+Unit Tests for IPN Inbox Use Cases
+Tests: AcceptIPN, ProcessIPNInbox, starting the in-process inbox worker
+"""
+import pytest
+from unittest.mock import Mock, MagicMock, patch
+import os
+import sys
+import django
+from django.conf import settings
+
+if not settings.configured:
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'DKHPHCMUE.settings')
+    django.setup()
+
+from application.payment.interfaces import IpnInboxItemDTO
+from application.payment.ipn_inbox_use_cases import AcceptIPNUseCase, ProcessIPNInboxUseCase
+from infrastructure.persistence.payment import ipn_inbox_worker
+
+
+@pytest.fixture
+def mock_inbox_repo():
+    repo = Mock()
+    repo.enqueue.return_value = True
+    return repo
+
+
+@pytest.fixture
+def mock_payment_repo():
+    return Mock()
+
+
+@pytest.fixture
+def mock_hoc_phi_repo():
+    repo = Mock()
+    repo.update_payment_status.return_value = True
+    return repo
+
+
+@pytest.fixture
+def mock_transaction():
+    tx = Mock()
+    tx.id = "tx-pk-001"
+    tx.order_id = "ORDER123456"
+    tx.status = "pending"
+    tx.sinh_vien_id = "sv-001"
+    tx.hoc_ky_id = "hk-001"
+    return tx
+
+
+def _pending_item(result_code="0"):
+    return IpnInboxItemDTO(
+        id="item-001", provider="momo", order_id="ORDER123456",
+        transaction_id="TX123456", result_code=result_code, status="pending"
+    )
+
+
+def _verify_result(is_valid=True):
+    result = MagicMock()
+    result.is_valid = is_valid
+    result.order_id = "ORDER123456"
+    result.transaction_id = "TX123456"
+    result.result_code = "0"
+    return result
+
+
+class TestAcceptIPNUseCase:
+
+    def test_accept_enqueues_verified_callback(self, mock_inbox_repo):
+        with patch("infrastructure.gateways.PaymentGatewayFactory") as mock_factory:
+            mock_factory.create.return_value.verify_ipn.return_value = _verify_result()
+            result = AcceptIPNUseCase(mock_inbox_repo).execute("momo", {"orderId": "ORDER123456"})
+
+        assert result.success is True
+        assert result.data["duplicate"] is False
+        mock_inbox_repo.enqueue.assert_called_once_with(
+            "momo", "ORDER123456", "TX123456", "0", {"orderId": "ORDER123456"}
+        )
+
+    def test_accept_reports_duplicate(self, mock_inbox_repo):
+        mock_inbox_repo.enqueue.return_value = False
+        with patch("infrastructure.gateways.PaymentGatewayFactory") as mock_factory:
+            mock_factory.create.return_value.verify_ipn.return_value = _verify_result()
+            result = AcceptIPNUseCase(mock_inbox_repo).execute("momo", {})
+
+        assert result.success is True
+        assert result.data["duplicate"] is True
+
+    def test_accept_invalid_signature_not_enqueued(self, mock_inbox_repo):
+        with patch("infrastructure.gateways.PaymentGatewayFactory") as mock_factory:
+            mock_factory.create.return_value.verify_ipn.return_value = _verify_result(is_valid=False)
+            result = AcceptIPNUseCase(mock_inbox_repo).execute("momo", {})
+
+        assert result.success is False
+        assert result.error_code == "INVALID_SIGNATURE"
+        mock_inbox_repo.enqueue.assert_not_called()
+
+
+class TestProcessIPNInboxUseCase:
+
+    def test_process_applies_pending_item(self, mock_inbox_repo, mock_payment_repo, mock_hoc_phi_repo, mock_transaction):
+        mock_inbox_repo.find_pending_ids.return_value = ["item-001"]
+        mock_inbox_repo.lock_pending.return_value = _pending_item()
+        mock_payment_repo.lock_by_order_id.return_value = mock_transaction
+
+        with patch('django.db.transaction.atomic'):
+            use_case = ProcessIPNInboxUseCase(mock_inbox_repo, mock_payment_repo, mock_hoc_phi_repo)
+            result = use_case.execute()
+
+        assert result.data["processed"] == 1
+        mock_payment_repo.update_status.assert_called_with("ORDER123456", "success")
+        mock_hoc_phi_repo.update_payment_status.assert_called_with("sv-001", "hk-001", "da_thanh_toan")
+        mock_inbox_repo.mark.assert_called_with("item-001", "processed", transaction_pk="tx-pk-001")
+
+    def test_process_replay_after_success_is_noop(self, mock_inbox_repo, mock_payment_repo, mock_hoc_phi_repo, mock_transaction):
+        mock_transaction.status = "success"
+        mock_inbox_repo.find_pending_ids.return_value = ["item-001"]
+        mock_inbox_repo.lock_pending.return_value = _pending_item(result_code="1006")
+        mock_payment_repo.lock_by_order_id.return_value = mock_transaction
+
+        with patch('django.db.transaction.atomic'):
+            use_case = ProcessIPNInboxUseCase(mock_inbox_repo, mock_payment_repo, mock_hoc_phi_repo)
+            result = use_case.execute()
+
+        assert result.data["processed"] == 1
+        mock_payment_repo.update_status.assert_not_called()
+        mock_hoc_phi_repo.update_payment_status.assert_not_called()
+
+    def test_process_skips_item_taken_by_other_worker(self, mock_inbox_repo, mock_payment_repo, mock_hoc_phi_repo):
+        mock_inbox_repo.find_pending_ids.return_value = ["item-001"]
+        mock_inbox_repo.lock_pending.return_value = None
+
+        with patch('django.db.transaction.atomic'):
+            use_case = ProcessIPNInboxUseCase(mock_inbox_repo, mock_payment_repo, mock_hoc_phi_repo)
+            result = use_case.execute()
+
+        assert result.data["skipped"] == 1
+        mock_payment_repo.lock_by_order_id.assert_not_called()
+
+    def test_process_rejects_unknown_order(self, mock_inbox_repo, mock_payment_repo, mock_hoc_phi_repo):
+        mock_inbox_repo.find_pending_ids.return_value = ["item-001"]
+        mock_inbox_repo.lock_pending.return_value = _pending_item()
+        mock_payment_repo.lock_by_order_id.return_value = None
+
+        with patch('django.db.transaction.atomic'):
+            use_case = ProcessIPNInboxUseCase(mock_inbox_repo, mock_payment_repo, mock_hoc_phi_repo)
+            result = use_case.execute()
+
+        assert result.data["rejected"] == 1
+        mock_inbox_repo.mark.assert_called_with("item-001", "rejected", error="TRANSACTION_NOT_FOUND")
+
+    def test_process_records_failure(self, mock_inbox_repo, mock_payment_repo, mock_hoc_phi_repo, mock_transaction):
+        mock_inbox_repo.find_pending_ids.return_value = ["item-001"]
+        mock_inbox_repo.lock_pending.return_value = _pending_item()
+        mock_payment_repo.lock_by_order_id.return_value = mock_transaction
+        mock_payment_repo.update_status.side_effect = Exception("db down")
+
+        with patch('django.db.transaction.atomic'):
+            use_case = ProcessIPNInboxUseCase(mock_inbox_repo, mock_payment_repo, mock_hoc_phi_repo)
+            result = use_case.execute()
+
+        assert result.data["failed"] == 1
+        mock_inbox_repo.record_failure.assert_called_once_with("item-001", "db down", use_case.max_attempts)
+
+
+class TestStartIpnInboxWorker:
+    @pytest.mark.parametrize("argv, modules, run_main, started", [
+        (["manage.py", "runserver"], {}, "true", True),
+        (["manage.py", "runserver"], {}, None, False),
+        (["gunicorn"], {"gunicorn": Mock()}, None, True),
+        (["manage.py", "process_ipn_inbox"], {}, None, False),
+        (["pytest"], {}, None, False),
+    ])
+    def test_started_with_serving_processes_only(self, argv, modules, run_main, started, monkeypatch):
+        worker = Mock()
+        monkeypatch.setattr(sys, 'argv', argv)
+        monkeypatch.delitem(sys.modules, 'gunicorn', raising=False)
+        monkeypatch.delitem(sys.modules, 'uwsgi', raising=False)
+        for name, module in modules.items():
+            monkeypatch.setitem(sys.modules, name, module)
+        if run_main:
+            monkeypatch.setenv('RUN_MAIN', run_main)
+        else:
+            monkeypatch.delenv('RUN_MAIN', raising=False)
+
+        with patch.object(ipn_inbox_worker, 'get_ipn_inbox_worker', return_value=worker):
+            ipn_inbox_worker.start_ipn_inbox_worker()
+
+        assert worker.start.called is started
+
+    def test_external_mode_starts_nothing(self, monkeypatch):
+        monkeypatch.setattr(sys, 'argv', ["manage.py", "runserver", "--noreload"])
+        with patch.object(ipn_inbox_worker, 'config', return_value='external'):
+            assert ipn_inbox_worker.get_ipn_inbox_worker() is None
+            ipn_inbox_worker.start_ipn_inbox_worker()
+
@@ -0,0 +1,72 @@
+"""
+Unit Tests for payment reconciliation (merge-join and mismatch rules)
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from infrastructure.persistence.payment.reconciliation import (
+    PaymentReconciler, ReconciliationReport, merge_by_student
+)
+
+NOW = datetime(2025, 3, 1, 12, 0, tzinfo=dt_timezone.utc)
+
+
+def _tx(sv, status="success", amount=1000, created=NOW, order=None):
+    return {"sinh_vien_id": sv, "order_id": order or f"{sv}-{status}", "status": status,
+            "amount": Decimal(amount), "created_at": created}
+
+
+def _hp(sv, trang_thai="chua_thanh_toan", tong=1000):
+    return {"id": f"hp-{sv}", "sinh_vien_id": sv, "trang_thai_thanh_toan": trang_thai, "tong_hoc_phi": Decimal(tong)}
+
+
+def _kinds(transactions, hoc_phi, stale_before=NOW - timedelta(hours=1)):
+    reconciler = PaymentReconciler()
+    return [m.kind for m in reconciler._check("hk", "sv", transactions, hoc_phi, stale_before)]
+
+
+class TestMergeByStudent:
+
+    def test_groups_both_streams_per_student(self):
+        report = ReconciliationReport(hoc_ky_id="hk")
+        transactions = [_tx("a", order="a1"), _tx("a", "failed", order="a2"), _tx("c")]
+        hoc_phis = [_hp("a"), _hp("b"), _hp("d")]
+
+        merged = [(sv, [t["order_id"] for t in txs], hp and hp["id"])
+                  for sv, txs, hp in merge_by_student(iter(transactions), iter(hoc_phis), report)]
+
+        assert merged == [
+            ("a", ["a1", "a2"], "hp-a"),
+            ("b", [], "hp-b"),
+            ("c", ["c-success"], None),
+            ("d", [], "hp-d"),
+        ]
+        assert report.transactions_scanned == 3
+        assert report.hoc_phi_scanned == 3
+
+    def test_empty_streams(self):
+        report = ReconciliationReport(hoc_ky_id="hk")
+        assert list(merge_by_student([], [], report)) == []
+
+
+class TestMismatchRules:
+
+    def test_consistent_payment(self):
+        assert _kinds([_tx("sv")], _hp("sv", "da_thanh_toan")) == []
+
+    def test_success_not_marked(self):
+        assert _kinds([_tx("sv")], _hp("sv")) == ["paid_not_marked"]
+
+    def test_marked_without_success(self):
+        assert _kinds([_tx("sv", "failed")], _hp("sv", "da_thanh_toan")) == ["marked_without_payment"]
+
+    def test_success_without_hoc_phi(self):
+        assert _kinds([_tx("sv")], None) == ["success_without_hoc_phi"]
+
+    def test_stale_pending_only_after_threshold(self):
+        old = _tx("sv", "pending", created=NOW - timedelta(hours=3), order="old")
+        fresh = _tx("sv", "pending", created=NOW, order="fresh")
+        assert _kinds([old, fresh], _hp("sv")) == ["stale_pending"]
+
+    def test_underpaid(self):
+        assert _kinds([_tx("sv", amount=400)], _hp("sv", "da_thanh_toan")) == ["amount_mismatch"]
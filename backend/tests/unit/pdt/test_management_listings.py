@@ -0,0 +1,70 @@
+from unittest.mock import Mock
+
+import pytest
+
+from infrastructure.persistence.pdt.management_listings import (
+    ListingPage, GiangVienListing, SinhVienListing, InvalidCursor, encode_cursor, decode_cursor, MAX_LIMIT
+)
+from application.pdt.use_cases.internal_management_use_cases import GetDanhSachSinhVienUseCase
+
+
+class TestCursor:
+    def test_round_trip(self):
+        cursor = encode_cursor(["Trần Thị Đào", "7f1c"])
+
+        assert decode_cursor(cursor, 2) == ["Trần Thị Đào", "7f1c"]
+
+    @pytest.mark.parametrize('cursor', ["not base64!", encode_cursor(["a"]), encode_cursor(["a", "b", "c"])])
+    def test_rejects_tampered_cursor(self, cursor):
+        with pytest.raises(InvalidCursor):
+            decode_cursor(cursor, 2)
+
+    def test_composite_key_seeks_past_ties(self):
+        condition = GiangVienListing(using='default')._after(["Nguyen A", "id-9"])
+
+        assert condition.connector == 'OR'
+        assert ('id__ho_ten__gt', "Nguyen A") in condition.children
+        assert any(('id__ho_ten', "Nguyen A") in term.children and ('id__gt', "id-9") in term.children
+                   for term in condition.children if hasattr(term, 'children'))
+
+
+class TestSinhVienListingItem:
+    def test_flat_row_keeps_the_listing_shape(self):
+        item = SinhVienListing(using='default').to_item({
+            'id': 'u-1', 'ma_so_sinh_vien': 'S1', 'id__ho_ten': 'A', 'id__email': 'a@x', 'lop': None,
+            'khoa_hoc': 'K45', 'ngay_nhap_hoc': None, 'khoa__ten_khoa': 'CNTT', 'nganh__ten_nganh': None,
+            'id__tai_khoan__trang_thai_hoat_dong': None,
+        })
+
+        assert item['tenNganh'] == "" and item['trangThaiHoatDong'] is True
+        assert item['maSoSinhVien'] == 'S1' and item['tenKhoa'] == 'CNTT'
+
+
+class TestGetDanhSachSinhVienUseCase:
+    def test_keyset_page(self):
+        listing = Mock()
+        listing.page.return_value = ListingPage([{'maSoSinhVien': 'S1'}], 'next', 40)
+
+        result = GetDanhSachSinhVienUseCase(listing).execute(cursor=None, limit='5000', search='ng', filters={'khoa_id': 'k1'})
+
+        assert result.success
+        assert result.data == {'items': [{'maSoSinhVien': 'S1'}], 'total': 40, 'pageSize': MAX_LIMIT, 'nextCursor': 'next'}
+        listing.page.assert_called_once_with({'khoa_id': 'k1'}, 'ng', None, MAX_LIMIT)
+        listing.offset_page.assert_not_called()
+
+    def test_page_and_page_size_still_work(self):
+        listing = Mock()
+        listing.offset_page.return_value = ListingPage([], None, 0)
+
+        result = GetDanhSachSinhVienUseCase(listing).execute(2, 50)
+
+        assert result.data == {'items': [], 'total': 0, 'page': 2, 'pageSize': 50}
+        listing.offset_page.assert_called_once_with(None, None, 2, 50)
+
+    def test_bad_cursor_is_a_400(self):
+        listing = Mock()
+        listing.page.side_effect = InvalidCursor("cursor không hợp lệ")
+
+        result = GetDanhSachSinhVienUseCase(listing).execute(cursor='x')
+
+        assert result.status_code == 400 and result.error_code == 'INVALID_CURSOR'
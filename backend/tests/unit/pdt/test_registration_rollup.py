@@ -0,0 +1,198 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest.mock import Mock, MagicMock, patch
+
+from domain.course_registration.events import LopHocPhanDaDangKy, LopHocPhanDaHuy, LopHocPhanDaChuyen
+from infrastructure.persistence.pdt.registration_rollup import (
+    RegistrationRollup, MongoRollupStore, GRANULARITIES, bucket_start, register_registration_rollup, _create_rollup
+)
+from application.pdt.use_cases.registration_rollup_use_cases import (
+    GetRegistrationThroughputUseCase, StreamRegistrationThroughputUseCase
+)
+
+T0 = datetime(2025, 8, 1, 7, 30, 10, tzinfo=dt_timezone.utc)
+
+
+class _MemoryStore:
+    """Same add / buckets / replace contract as MongoRollupStore, in a dict"""
+
+    def __init__(self):
+        self.saved = {}
+
+    def add(self, hoc_ky_id, at, action, khoa_id, lop_id, count=1):
+        for granularity in GRANULARITIES:
+            bucket = self.saved.setdefault((hoc_ky_id, granularity, bucket_start(at, granularity)),
+                                           {'dang_ky': 0, 'huy_dang_ky': 0, 'khoa': {}, 'lop': {}})
+            bucket[action] += count
+            for dimension, dim_id in (('khoa', khoa_id), ('lop', lop_id)):
+                if dim_id:
+                    counters = bucket[dimension].setdefault(dim_id, {'dang_ky': 0, 'huy_dang_ky': 0})
+                    counters[action] += count
+
+    def buckets(self, hoc_ky_id, granularity, since, until):
+        return {t: bucket for (hk, g, t), bucket in self.saved.items()
+                if hk == hoc_ky_id and g == granularity and since <= t <= until}
+
+    def replace(self, hoc_ky_id, granularity, since, until, buckets):
+        for t in list(self.buckets(hoc_ky_id, granularity, since, until)):
+            del self.saved[(hoc_ky_id, granularity, t)]
+        for t, bucket in buckets.items():
+            self.saved[(hoc_ky_id, granularity, t)] = bucket
+
+
+def _rollup(store=None):
+    rollup = RegistrationRollup(store or _MemoryStore())
+    rollup._khoa_of = lambda sinh_vien_id: f"khoa-{sinh_vien_id[-1]}"
+    return rollup
+
+
+class TestRegistrationRollup:
+    def test_events_fold_into_minute_and_hour_buckets(self):
+        rollup = _rollup()
+        with patch('infrastructure.persistence.pdt.registration_rollup.timezone.now', return_value=T0):
+            rollup.on_dang_ky(LopHocPhanDaDangKy("sv-1", "hk-1", "lop-a"))
+            rollup.on_dang_ky(LopHocPhanDaDangKy("sv-2", "hk-1", "lop-a"))
+            rollup.on_huy(LopHocPhanDaHuy("sv-1", "hk-1", "lop-a"))
+        rollup.record("hk-1", "sv-1", "lop-b", 'dang_ky', T0 + timedelta(minutes=2))
+
+        minutes = rollup.series("hk-1", 'minute', T0, T0 + timedelta(minutes=2))
+        assert [(p['dangKy'], p['huyDangKy']) for p in minutes] == [(2, 1), (0, 0), (1, 0)]
+        assert minutes[0]['t'] == bucket_start(T0, 'minute')
+
+        hours = rollup.series("hk-1", 'hour', T0, T0)
+        assert (hours[0]['dangKy'], hours[0]['huyDangKy']) == (3, 1)
+
+    def test_series_by_khoa_and_lop(self):
+        rollup = _rollup()
+        rollup.record("hk-1", "sv-1", "lop-a", 'dang_ky', T0)
+        rollup.record("hk-1", "sv-2", "lop-b", 'dang_ky', T0)
+        rollup.record("hk-2", "sv-1", "lop-a", 'dang_ky', T0)
+
+        assert rollup.series("hk-1", 'minute', T0, T0, khoa_id="khoa-1")[0]['dangKy'] == 1
+        assert rollup.series("hk-1", 'minute', T0, T0, lop_hoc_phan_id="lop-b")[0]['dangKy'] == 1
+        assert rollup.series("hk-1", 'minute', T0, T0)[0]['dangKy'] == 2
+
+    def test_chuyen_lop_is_cancel_plus_registration(self):
+        rollup = _rollup()
+        with patch('infrastructure.persistence.pdt.registration_rollup.timezone.now', return_value=T0):
+            rollup.on_chuyen(LopHocPhanDaChuyen("sv-1", "hk-1", "lop-a", "lop-b"))
+
+        assert rollup.series("hk-1", 'minute', T0, T0, lop_hoc_phan_id="lop-a")[0]['huyDangKy'] == 1
+        assert rollup.series("hk-1", 'minute', T0, T0, lop_hoc_phan_id="lop-b")[0]['dangKy'] == 1
+
+    def test_rebuild_folds_history_rows(self):
+        rows = [
+            {'bucket': T0, 'hanh_dong': 'dang_ky', 'lich_su_dang_ky__sinh_vien__khoa_id': 'k1',
+             'dang_ky_hoc_phan__lop_hoc_phan_id': 'lop-a', 'n': 4},
+            # Cancelled registration rows are gone: no lớp
+            {'bucket': T0, 'hanh_dong': 'huy_dang_ky', 'lich_su_dang_ky__sinh_vien__khoa_id': 'k1',
+             'dang_ky_hoc_phan__lop_hoc_phan_id': None, 'n': 1},
+        ]
+
+        buckets = RegistrationRollup._fold(rows, 'minute')
+
+        bucket = buckets[bucket_start(T0, 'minute')]
+        assert (bucket['dang_ky'], bucket['huy_dang_ky']) == (4, 1)
+        assert bucket['khoa']['k1'] == {'dang_ky': 4, 'huy_dang_ky': 1}
+        assert bucket['lop'] == {'lop-a': {'dang_ky': 4, 'huy_dang_ky': 0}}
+
+    def test_rebuild_from_mid_hour_recounts_whole_buckets(self):
+        hour = datetime.fromtimestamp(bucket_start(T0, 'hour'), dt_timezone.utc)
+        history = [hour + timedelta(minutes=6 * n) for n in range(10)]
+        rollup = _rollup()
+        for at in history:
+            rollup.record("hk-1", "sv-1", "lop-a", 'dang_ky', at)
+
+        def history_buckets(hoc_ky_id, granularity, since, until, chunk_size=2000):
+            rows = [{'bucket': at, 'hanh_dong': 'dang_ky', 'lich_su_dang_ky__sinh_vien__khoa_id': 'khoa-1',
+                     'dang_ky_hoc_phan__lop_hoc_phan_id': 'lop-a', 'n': 1} for at in history if since <= at <= until]
+            return RegistrationRollup._fold(rows, granularity)
+
+        rollup._history_buckets = history_buckets
+        rollup.rebuild("hk-1", hour + timedelta(minutes=30), hour + timedelta(minutes=50))
+
+        assert rollup.series("hk-1", 'hour', hour, hour)[0]['dangKy'] == 10
+        minutes = rollup.series("hk-1", 'minute', hour, hour + timedelta(minutes=59))
+        assert sum(point['dangKy'] for point in minutes) == 10
+
+    def test_feed_sends_snapshot_then_changes(self):
+        rollup = _rollup()
+        clock = iter([0, 0, 1, 3])
+        sleeps = []
+
+        def sleep(_):
+            sleeps.append(1)
+            if len(sleeps) == 1:
+                rollup.record("hk-1", "sv-1", "lop-a", 'dang_ky')
+
+        events = list(rollup.feed("hk-1", interval=1, duration=2.5, sleep=sleep, clock=lambda: next(clock)))
+
+        assert [kind for kind, _ in events] == ['snapshot', 'update', 'ping']
+        assert events[1][1][-1]['dangKy'] == 1
+
+    def test_reread_folds_whole_buckets_from_history(self):
+        rollup = RegistrationRollup(reread=True)
+        start = bucket_start(T0, 'minute')
+        rollup._history_buckets = Mock(return_value={start: {'dang_ky': 3, 'huy_dang_ky': 1, 'khoa': {}, 'lop': {}}})
+
+        points = rollup.series("hk-1", 'minute', T0, T0 + timedelta(minutes=1))
+
+        assert [(p['dangKy'], p['huyDangKy']) for p in points] == [(3, 1), (0, 0)]
+        hoc_ky_id, granularity, since, until = rollup._history_buckets.call_args.args
+        assert (hoc_ky_id, granularity) == ("hk-1", 'minute')
+        assert since == datetime.fromtimestamp(start, dt_timezone.utc)
+        assert until == datetime.fromtimestamp(start + 120, dt_timezone.utc) - timedelta(microseconds=1)
+
+    def test_store_defaults_to_mongo_and_local_rereads(self):
+        defaults = patch('infrastructure.persistence.pdt.registration_rollup.config',
+                         side_effect=lambda key, default=None, cast=None: default)
+        with defaults, patch('infrastructure.persistence.mongodb_service.get_mongo_db', return_value=MagicMock()):
+            assert isinstance(_create_rollup().store, MongoRollupStore)
+        with defaults, patch('infrastructure.persistence.mongodb_service.get_mongo_db', return_value=None):
+            rollup = _create_rollup()
+        assert rollup.reread is True
+
+        bus = Mock()
+        with patch('infrastructure.persistence.pdt.registration_rollup.get_registration_rollup', return_value=rollup):
+            register_registration_rollup(bus)
+        bus.subscribe.assert_not_called()
+
+
+class TestGetRegistrationThroughputUseCase:
+    def test_points_are_iso_and_totalled(self):
+        rollup = Mock()
+        rollup.series.return_value = [
+            {'t': 1754033400, 'dangKy': 2, 'huyDangKy': 1},
+            {'t': 1754033460, 'dangKy': 3, 'huyDangKy': 0},
+        ]
+
+        result = GetRegistrationThroughputUseCase(rollup).execute(
+            "hk-1", 'minute', '2025-08-01T07:30:00+00:00', '2025-08-01T07:31:00+00:00'
+        )
+
+        assert result.success
+        assert result.data['points'][0]['t'] == '2025-08-01T07:30:00+00:00'
+        assert result.data['tong'] == {'dangKy': 5, 'huyDangKy': 1}
+        rollup.breakdown.assert_not_called()
+
+    def test_validation(self):
+        use_case = GetRegistrationThroughputUseCase(Mock(series=Mock(return_value=[])))
+
+        assert use_case.execute("hk-1", 'second').status_code == 400
+        assert use_case.execute("hk-1", group_by='nganh').status_code == 400
+        assert use_case.execute("hk-1", since='yesterday').status_code == 400
+        assert use_case.execute("hk-1", 'minute', '2025-01-01T00:00:00+00:00', '2025-01-03T00:00:00+00:00').status_code == 400
+        assert use_case.execute("hk-1", 'hour', '2025-01-01T00:00:00+00:00', '2025-01-03T00:00:00+00:00').success
+
+
+class TestStreamRegistrationThroughputUseCase:
+    def test_feed_is_off_by_default_and_fits_the_worker_timeout(self):
+        rollup = Mock()
+        with patch('application.pdt.use_cases.registration_rollup_use_cases.config',
+                   side_effect=lambda key, default=None, cast=None: default):
+            use_case = StreamRegistrationThroughputUseCase(rollup)
+
+        result = use_case.execute("hk-1")
+
+        assert result.status_code == 503 and result.error_code == "FEED_DISABLED"
+        assert use_case.duration < 120
+        rollup.feed.assert_not_called()
@@ -0,0 +1,84 @@
+import threading
+from unittest.mock import Mock
+from domain.course_registration.events import LopHocPhanDaDangKy
+from infrastructure.persistence.pdt.report_cache import ReportCache
+from application.pdt.use_cases.report_use_cases import GetKhoaStatsUseCase, GetNganhStatsUseCase
+
+
+class TestReportCache:
+    def test_hit_within_ttl(self):
+        cache = ReportCache(ttl=60)
+        loader = Mock(return_value={"svUnique": 1})
+        key = ReportCache.key("overview", "hk-1")
+
+        cache.get(key, loader)
+        cache.get(key, loader)
+
+        assert loader.call_count == 1
+
+    def test_keys_differ_by_khoa_and_nganh(self):
+        assert ReportCache.key("overview", "hk-1", "k-1") != ReportCache.key("overview", "hk-1", "k-1", "n-1")
+
+    def test_registration_event_makes_hoc_ky_stale(self):
+        cache = ReportCache(ttl=60)
+        loader = Mock(side_effect=[1, 2])
+        other = Mock(return_value="other")
+        cache.get(ReportCache.key("overview", "hk-1"), loader)
+        cache.get(ReportCache.key("overview", "hk-2"), other)
+
+        cache.on_registration_changed(LopHocPhanDaDangKy("sv-1", "hk-1", "lop-1"))
+
+        assert cache.get(ReportCache.key("overview", "hk-1"), loader) == 2
+        assert cache.get(ReportCache.key("overview", "hk-2"), other) == "other"
+        assert other.call_count == 1
+
+    def test_stale_while_revalidate_serves_old_value_and_refreshes(self):
+        cache = ReportCache(ttl=60, stale_while_revalidate=30)
+        key = ReportCache.key("overview", "hk-1")
+        cache.get(key, lambda: "old")
+        cache.invalidate("hk-1")
+        refreshed = threading.Event()
+
+        def loader():
+            refreshed.set()
+            return "new"
+
+        assert cache.get(key, loader) == "old"
+        assert refreshed.wait(2)
+        for _ in range(100):
+            if cache.get(key, Mock(side_effect=AssertionError)) == "new":
+                break
+            threading.Event().wait(0.01)
+        assert cache.get(key, Mock(side_effect=AssertionError)) == "new"
+
+    def test_disabled_when_ttl_zero(self):
+        cache = ReportCache(ttl=0)
+        loader = Mock(return_value=1)
+
+        cache.get(ReportCache.key("overview", "hk-1"), loader)
+        cache.get(ReportCache.key("overview", "hk-1"), loader)
+
+        assert loader.call_count == 2
+
+
+class TestBreakdownsShareOneScan:
+    ROWS = [
+        {"sinh_vien__khoa_id": "k-1", "sinh_vien__khoa__ten_khoa": "CNTT",
+         "sinh_vien__nganh_id": "n-1", "sinh_vien__nganh__ten_nganh": "KHMT", "so_dang_ky": 5},
+        {"sinh_vien__khoa_id": "k-1", "sinh_vien__khoa__ten_khoa": "CNTT",
+         "sinh_vien__nganh_id": None, "sinh_vien__nganh__ten_nganh": None, "so_dang_ky": 2},
+        {"sinh_vien__khoa_id": "k-2", "sinh_vien__khoa__ten_khoa": "Toán",
+         "sinh_vien__nganh_id": "n-2", "sinh_vien__nganh__ten_nganh": "SP Toán", "so_dang_ky": 9},
+    ]
+
+    def test_khoa_and_nganh_from_same_rows(self):
+        engine = Mock()
+        engine.registrations_by_nganh.return_value = self.ROWS
+        cache = ReportCache(ttl=60)
+
+        khoa = GetKhoaStatsUseCase(engine, cache).execute("hk-1").data["data"]
+        nganh = GetNganhStatsUseCase(engine, cache).execute("hk-1", "k-1").data["data"]
+
+        assert khoa == [{"ten_khoa": "Toán", "so_dang_ky": 9}, {"ten_khoa": "CNTT", "so_dang_ky": 7}]
+        assert nganh == [{"ten_nganh": "KHMT", "so_dang_ky": 5}, {"ten_nganh": "Chưa phân ngành", "so_dang_ky": 2}]
+        assert engine.registrations_by_nganh.call_count == 1
@@ -0,0 +1,178 @@
+import io
+import os
+import re
+import time
+import zipfile
+import zlib
+from unittest.mock import Mock
+from xml.etree import ElementTree
+
+from infrastructure.exports import StreamingXlsxWriter, StreamingPdfWriter, ExportJobRunner
+from infrastructure.exports.pdf_stream import fold_text
+from infrastructure.persistence.pdt.report_export import ExportDataset
+from application.pdt.use_cases.report_export_use_cases import (
+    ExportReportUseCase, GetExportJobUseCase, DownloadExportJobUseCase
+)
+
+NS = {'m': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'}
+
+
+def _sheet_rows(archive, n):
+    root = ElementTree.fromstring(archive.read(f'xl/worksheets/sheet{n}.xml'))
+    return [[''.join(c.itertext()) for c in row.findall('m:c', NS)] for row in root.iter(f"{{{NS['m']}}}row")]
+
+
+def _wait(runner, job_id):
+    for _ in range(200):
+        job = runner.get(job_id)
+        if job.status in ('done', 'failed'):
+            return job
+        time.sleep(0.01)
+    raise AssertionError("export job did not finish")
+
+
+class TestStreamingXlsxWriter:
+    def test_rows_are_readable_and_streamed_in_chunks(self):
+        writer = StreamingXlsxWriter("HK1 2025", ["MSSV", "Họ tên", "Số TC"])
+        rows = ((f"S{i:05d}", f"Nguyễn Văn <{i}> & co", i % 5) for i in range(20000))
+
+        chunks = list(writer.stream(rows))
+
+        assert len(chunks) > 1
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(chunks)))
+        rows = _sheet_rows(archive, 1)
+        assert rows[0] == ["MSSV", "Họ tên", "Số TC"]
+        assert rows[1] == ["S00000", "Nguyễn Văn <0> & co", "0"]
+        assert len(rows) == 20001
+        assert writer.rows_written == 20000
+
+    def test_rolls_over_to_a_new_sheet(self):
+        writer = StreamingXlsxWriter("Data", ["n"], max_rows_per_sheet=4)
+
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(writer.stream([i] for i in range(7)))))
+
+        assert [len(_sheet_rows(archive, n)) for n in (1, 2, 3)] == [4, 4, 2]
+        assert b'name="Data (3)"' in archive.read('xl/workbook.xml')
+
+    def test_empty_source_gives_header_only_workbook(self):
+        writer = StreamingXlsxWriter("Data", ["a", "b"])
+
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(writer.stream(iter([])))))
+
+        assert _sheet_rows(archive, 1) == [["a", "b"]]
+
+
+class TestStreamingPdfWriter:
+    def test_pages_and_xref_offsets(self):
+        writer = StreamingPdfWriter("Báo cáo (HK1)", ["MSSV", "Họ tên"])
+
+        chunks = list(writer.stream((f"S{i}", "Trần Thị Đào") for i in range(500)))
+        data = b''.join(chunks)
+
+        assert data.startswith(b'%PDF-1.4') and data.rstrip().endswith(b'%%EOF')
+        assert writer.pages_written > 1 and len(chunks) >= writer.pages_written
+        assert f'/Count {writer.pages_written}'.encode() in data
+
+        xref_at = int(re.search(rb'startxref\n(\d+)', data).group(1))
+        entries = data[xref_at:].split(b'\n')[3:]
+        count = int(data[xref_at:].split(b'\n')[1].split()[1])
+        for obj_id in range(1, count):
+            offset = int(entries[obj_id - 1][:10])
+            assert data[offset:].startswith(f'{obj_id} 0 obj'.encode())
+
+        first_page = zlib.decompress(re.search(rb'stream\n(.*?)\nendstream', data, re.S).group(1))
+        assert b'(Bao cao \\(HK1\\)) Tj' in first_page
+        assert b'(Tran Thi Dao) Tj' in first_page
+
+    def test_fold_text(self):
+        assert fold_text("Đặng Thị Hường") == "Dang Thi Huong"
+        assert fold_text(None) == ""
+        assert fold_text(3.0) == "3"
+
+
+class TestExportJobRunner:
+    def test_job_writes_file_and_status(self, tmp_path):
+        runner = ExportJobRunner(directory=str(tmp_path), workers=1, retention_hours=1)
+
+        job = runner.submit("a.xlsx", "application/x", "user-1", lambda: iter([b"ab", b"cd"]))
+        done = _wait(runner, job.id)
+
+        assert job.status == 'queued'
+        assert done.status == 'done' and done.size == 4
+        assert runner.file_path(done).read_bytes() == b"abcd"
+        runner.shutdown()
+
+    def test_failed_job_records_error(self, tmp_path):
+        runner = ExportJobRunner(directory=str(tmp_path), workers=1, retention_hours=1)
+
+        def produce():
+            yield b"partial"
+            raise RuntimeError("db gone")
+
+        job = _wait(runner, runner.submit("a.pdf", "application/pdf", "user-1", produce).id)
+
+        assert job.status == 'failed' and job.error == "db gone"
+        assert not runner.file_path(job).exists()
+        assert not list(tmp_path.glob('*.part'))
+        runner.shutdown()
+
+    def test_cleanup_removes_expired_jobs(self, tmp_path):
+        runner = ExportJobRunner(directory=str(tmp_path), workers=1, retention_hours=1)
+        job = _wait(runner, runner.submit("a.xlsx", "application/x", "user-1", lambda: iter([b"x"])).id)
+        old = time.time() - 7200
+        os.utime(tmp_path / f"{job.id}.json", (old, old))
+
+        assert runner.cleanup() == 1
+        assert runner.get(job.id) is None
+        assert not runner.file_path(job).exists()
+        runner.shutdown()
+
+    def test_rejects_malformed_job_ids(self, tmp_path):
+        runner = ExportJobRunner(directory=str(tmp_path), workers=1)
+
+        assert runner.get("../../etc/passwd") is None
+        runner.shutdown()
+
+
+class TestExportReportUseCase:
+    def _source(self):
+        source = Mock()
+        source.hoc_ky_label.return_value = "HK1 2025"
+        source.dataset.return_value = ExportDataset(
+            'lop', "Lớp học phần", ["Mã lớp", "Số đăng ký"], [1, 1],
+            lambda: iter([("L1", 3), ("L2", 5)]),
+        )
+        return source
+
+    def test_streams_workbook(self):
+        result = ExportReportUseCase(source=self._source()).execute("hk-1", 'xlsx', 'lop')
+
+        assert result.success
+        assert result.data.filename == "bao-cao-lop-hk-1.xlsx"
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(result.data.chunks)))
+        assert _sheet_rows(archive, 1)[1:] == [["L1", "3"], ["L2", "5"]]
+
+    def test_validation(self):
+        source = self._source()
+        use_case = ExportReportUseCase(source=source)
+
+        assert use_case.execute("hk-1", 'csv').status_code == 400
+        assert use_case.execute("hk-1", 'xlsx', 'unknown').status_code == 400
+        source.hoc_ky_label.return_value = None
+        assert use_case.execute("hk-1", 'pdf').status_code == 404
+
+    def test_async_job_is_only_visible_to_its_requester(self, tmp_path):
+        runner = ExportJobRunner(directory=str(tmp_path), workers=1)
+
+        result = ExportReportUseCase(source=self._source(), runner=runner).execute(
+            "hk-1", 'pdf', 'lop', run_async=True, requested_by="user-1"
+        )
+        job_id = result.data['jobId']
+        _wait(runner, job_id)
+
+        assert result.status_code == 202
+        assert GetExportJobUseCase(runner).execute(job_id, "user-2").status_code == 404
+        download = DownloadExportJobUseCase(runner).execute(job_id, "user-1")
+        assert download.success
+        assert download.data.path.read_bytes().startswith(b'%PDF')
+        runner.shutdown()
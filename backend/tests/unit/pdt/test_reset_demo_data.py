@@ -0,0 +1,27 @@
+from unittest.mock import patch
+
+from application.pdt.use_cases.reset_demo_data_use_case import ResetDemoDataUseCase
+from benchmarks.registration_load.mongo_standin import InMemoryMongoService
+from infrastructure.persistence.tkb_read_model import TKBReadModel
+
+
+class TestClearMongoDB:
+    def test_read_model_is_empty_after_reset(self):
+        mongo = InMemoryMongoService()
+        mongo.db[mongo.TKB_COLLECTION].insert_many([
+            {'hoc_ky_id': 'hk-1', 'ma_hoc_phan': 'MH01', 'danhSachLop': [{'ten_lop': 'L1', 'thu': 2}]},
+            {'hoc_ky_id': 'hk-2', 'ma_hoc_phan': 'MH02', 'danhSachLop': [{'ten_lop': 'L1', 'thu': 2}]},
+        ])
+        mongo.bump_tkb_version('hk-1')
+        mongo.bump_tkb_version('hk-2')
+        read_model = TKBReadModel(mongo, check_interval=0)
+        assert len(read_model.get('hk-1')) == 1
+
+        with patch('infrastructure.persistence.mongodb_service.get_mongodb_service', return_value=mongo), \
+                patch('infrastructure.persistence.tkb_read_model.get_tkb_read_model', return_value=read_model), \
+                patch('application.pdt.use_cases.reset_demo_data_use_case.get_tkb_read_model', return_value=read_model):
+            assert ResetDemoDataUseCase()._clear_mongodb() is True
+
+        assert len(read_model.get('hk-1')) == 0
+        assert len(read_model.get('hk-2')) == 0
+        assert mongo.get_tkb_version('hk-1') == 2
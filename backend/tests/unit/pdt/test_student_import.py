@@ -0,0 +1,141 @@
+import io
+import time
+from datetime import date
+from unittest.mock import Mock, patch
+
+import pytest
+from django.db import IntegrityError
+
+from infrastructure.exports import StreamingXlsxWriter, ExportJobRunner
+from infrastructure.imports import read_table, normalize_header, TableFormatError
+from application.pdt.use_cases.student_import_use_cases import ImportSinhVienUseCase, GetImportSinhVienJobUseCase
+from infrastructure.security.password_hashing import hash_passwords, MIN_PARALLEL_BATCH
+
+
+def _repository(taken_mssv=()):
+    repository = Mock(chunk_size=2)
+    repository.khoa_lookup.return_value = {'K1': 'khoa-1', 'khoa-1': 'khoa-1'}
+    repository.nganh_lookup.return_value = {'N1': ('nganh-1', 'khoa-1'), 'N2': ('nganh-2', 'khoa-2')}
+    repository.taken_mssv.return_value = set(taken_mssv)
+    repository.taken_usernames.return_value = set()
+    repository.taken_emails.return_value = set()
+    return repository
+
+
+def _row(n, mssv, **values):
+    return n, {'masosinhvien': mssv, 'hoten': f"SV {mssv}", 'makhoa': 'K1', 'matkhau': 'pw', **values}
+
+
+def _use_case(repository):
+    return ImportSinhVienUseCase(repository, hasher=lambda passwords: [f"hashed:{p}" for p in passwords])
+
+
+class TestReadTable:
+    def test_xlsx_headers_are_normalised_and_rows_numbered(self):
+        writer = StreamingXlsxWriter("SV", ["Mã số sinh viên", "Họ và tên", "Ngày nhập học"])
+        data = b''.join(writer.stream([("4501", "Đặng Thị Hường", 45500), ("4502", "Lê B", None)]))
+
+        rows = list(read_table(io.BytesIO(data), "k50.XLSX"))
+
+        assert rows == [
+            (2, {'masosinhvien': '4501', 'hovaten': 'Đặng Thị Hường', 'ngaynhaphoc': '45500'}),
+            (3, {'masosinhvien': '4502', 'hovaten': 'Lê B', 'ngaynhaphoc': ''}),
+        ]
+
+    def test_csv_with_bom_and_blank_lines(self):
+        data = "﻿maSoSinhVien,ho_ten\n\n4501,A\n".encode('utf-8')
+
+        assert list(read_table(io.BytesIO(data), "a.csv")) == [(3, {'masosinhvien': '4501', 'hoten': 'A'})]
+
+    def test_rejects_other_formats(self):
+        with pytest.raises(TableFormatError):
+            read_table(io.BytesIO(b"x"), "a.xls")
+        with pytest.raises(TableFormatError):
+            list(read_table(io.BytesIO(b"not a zip"), "a.xlsx"))
+
+    def test_normalize_header(self):
+        assert normalize_header("Mã ngành") == normalize_header("ma_nganh") == normalize_header("maNganh") == "manganh"
+
+
+class TestImportSinhVienUseCase:
+    def test_creates_valid_rows_and_reports_the_rest(self):
+        repository = _repository(taken_mssv={'S3'})
+        rows = [
+            _row(2, 'S1', manganh='N1', ngaynhaphoc='05/09/2025'),
+            _row(3, 'S2', matkhau=''),
+            _row(4, 'S3'),
+            _row(5, 'S1'),
+            _row(6, 'S5', makhoa='ZZ'),
+            _row(7, 'S6', manganh='N2'),
+            _row(8, 'S7', ngaynhaphoc='45905'),
+            _row(9, 'S8', hoten=''),
+        ]
+
+        result = _use_case(repository).execute(rows, default_password='macdinh')
+
+        assert result.data['summary'] == {'total': 8, 'created': 3, 'failed': 5}
+        status = {r['row']: r['status'] for r in result.data['results']}
+        assert [row for row, s in status.items() if s == 'created'] == [2, 3, 8]
+        errors = {r['row']: r['error'] for r in result.data['results'] if r['status'] == 'failed'}
+        assert "đã tồn tại" in errors[4] and "Trùng" in errors[5] and "Khoa" in errors[6]
+        assert "Ngành" in errors[7] and "hoTen" in errors[9]
+
+        inserted = [s for call in repository.insert.call_args_list for s in call.args[0]]
+        assert [len(call.args[0]) for call in repository.insert.call_args_list] == [2, 1]
+        first, second, third = inserted
+        assert (first.nganh_id, first.ngay_nhap_hoc, first.mat_khau) == ('nganh-1', date(2025, 9, 5), 'hashed:pw')
+        assert (second.mat_khau, second.ten_dang_nhap, second.email) == ('hashed:macdinh', 'S2', 'S2@student.edu.vn')
+        assert third.ngay_nhap_hoc == date(2025, 9, 5)
+
+    def test_failed_chunk_is_reported_without_undoing_others(self):
+        repository = _repository()
+        repository.insert.side_effect = [None, IntegrityError("duplicate key")]
+
+        result = _use_case(repository).execute([_row(2, 'S1'), _row(3, 'S2'), _row(4, 'S3')])
+
+        assert result.data['summary'] == {'total': 3, 'created': 2, 'failed': 1}
+        assert "duplicate key" in result.data['results'][2]['error']
+
+    def test_limits(self):
+        use_case = _use_case(_repository())
+        use_case.max_rows = 1
+
+        assert use_case.execute([]).status_code == 400
+        assert use_case.execute([_row(2, 'S1'), _row(3, 'S2')]).error_code == 'TOO_MANY_ROWS'
+
+    def test_large_api_upload_runs_as_a_job(self, tmp_path):
+        runner = ExportJobRunner(directory=str(tmp_path), workers=1, retention_hours=1)
+        use_case = ImportSinhVienUseCase(_repository(), hasher=lambda passwords: passwords, runner=runner)
+        use_case.sync_max_rows = 1
+
+        small = use_case.execute([_row(2, 'S1')], requested_by="pdt-1")
+        queued = use_case.execute([_row(2, 'S1'), _row(3, 'S2'), _row(4, 'S3')], requested_by="pdt-1")
+        for _ in range(200):
+            status = GetImportSinhVienJobUseCase(runner).execute(queued.data['jobId'], "pdt-1")
+            if status.data['status'] in ('done', 'failed'):
+                break
+            time.sleep(0.01)
+        runner.shutdown()
+
+        assert small.status_code == 200 and small.data['summary']['created'] == 1
+        assert queued.status_code == 202 and queued.data['status'] == 'queued'
+        assert status.data['status'] == 'done'
+        assert status.data['summary'] == {'total': 3, 'created': 3, 'failed': 0}
+        assert GetImportSinhVienJobUseCase(runner).execute(queued.data['jobId'], "pdt-2").status_code == 404
+
+
+class TestHashPasswords:
+    def test_pool_workers_are_spawned_not_forked(self):
+        passwords = [f"pw{i}" for i in range(MIN_PARALLEL_BATCH)]
+        with patch('infrastructure.security.password_hashing.ProcessPoolExecutor') as pool_cls:
+            pool_cls.return_value.__enter__.return_value.map.return_value = iter(passwords)
+            hash_passwords(passwords, workers=2)
+
+        assert pool_cls.call_args.kwargs['mp_context'].get_start_method() == 'spawn'
+
+    def test_small_batch_hashed_inline(self):
+        with patch('infrastructure.security.password_hashing.ProcessPoolExecutor') as pool_cls:
+            hashed = hash_passwords(["a", "b"], workers=4)
+
+        pool_cls.assert_not_called()
+        assert len(set(hashed)) == 2
@@ -0,0 +1,27 @@
+from decimal import Decimal
+from infrastructure.persistence.pdt.tuition_calculator import TuitionPolicyIndex
+
+
+class TestTuitionPolicyIndex:
+    def make_index(self):
+        return TuitionPolicyIndex([
+            ("p-nganh", "khoa-1", "nganh-1", Decimal("500000")),
+            ("p-nganh-dup", "khoa-1", "nganh-1", Decimal("1")),
+            ("p-khoa", "khoa-2", None, Decimal("400000")),
+            ("p-chung", None, None, Decimal("300000")),
+        ])
+
+    def test_nganh_before_khoa_before_general(self):
+        index = self.make_index()
+
+        assert index.resolve("nganh-1", "khoa-2").id == "p-nganh"
+        assert index.resolve("nganh-9", "khoa-2").id == "p-khoa"
+        assert index.resolve(None, "khoa-9").id == "p-chung"
+
+    def test_first_policy_wins_for_same_key(self):
+        assert self.make_index().resolve("nganh-1", None).phi_moi_tin_chi == Decimal("500000")
+
+    def test_no_general_policy(self):
+        index = TuitionPolicyIndex([("p-khoa", "khoa-2", None, Decimal("400000"))])
+
+        assert index.resolve("nganh-1", "khoa-1") is None
@@ -0,0 +1,130 @@
+"""
+Unit Tests for multipart TaiLieu uploads
+Tests: Initiate / UploadPart / Get / Complete / Abort / Cleanup TaiLieu upload use cases
+"""
+import io
+import pytest
+from datetime import timedelta
+from unittest.mock import Mock
+
+from application.tai_lieu.interfaces import TaiLieuDTO
+from application.tai_lieu.use_cases import multipart_upload_tai_lieu_use_case as multipart
+from application.tai_lieu.use_cases import (
+    InitiateTaiLieuUploadUseCase,
+    UploadTaiLieuPartUseCase,
+    GetTaiLieuUploadUseCase,
+    CompleteTaiLieuUploadUseCase,
+    AbortTaiLieuUploadUseCase,
+    CleanupTaiLieuUploadsUseCase,
+)
+from infrastructure.persistence.s3_service import S3Service
+from infrastructure.storage.memory_backend import InMemoryStorageBackend
+
+DATA = b"0123456789" * 2 + b"abcde"
+
+
+@pytest.fixture(autouse=True)
+def small_parts(monkeypatch):
+    monkeypatch.setattr(multipart, 'MULTIPART_PART_SIZE', 10)
+
+
+@pytest.fixture
+def service():
+    return S3Service(InMemoryStorageBackend())
+
+
+@pytest.fixture
+def mock_repo():
+    repo = Mock()
+    repo.get_lop_hoc_phan_owner.return_value = "gv-001"
+    repo.create.side_effect = lambda dto: TaiLieuDTO(
+        id="doc-001", ten_tai_lieu=dto.ten_tai_lieu, file_path=dto.file_path, file_type=dto.file_type,
+        created_at=None, uploaded_by_id=dto.uploaded_by, uploaded_by_name=None,
+    )
+    return repo
+
+
+def _initiate(mock_repo, service, size=len(DATA)):
+    return InitiateTaiLieuUploadUseCase(mock_repo, service).execute(
+        "lhp-001", "gv-001", "ghi hinh.mp4", "video/mp4", size, ten_tai_lieu="Buổi 1"
+    )
+
+
+def _send(service, upload_id, part_number, data=None):
+    data = DATA[(part_number - 1) * 10:part_number * 10] if data is None else data
+    return UploadTaiLieuPartUseCase(service).execute(
+        "lhp-001", "gv-001", upload_id, part_number, io.BytesIO(data), len(data)
+    )
+
+
+class TestMultipartUpload:
+    def test_parts_in_any_order_then_complete(self, mock_repo, service):
+        """
+        Given: a 25-byte file with 10-byte parts
+        When: parts arrive out of order (one re-sent) and the upload is completed
+        Then: the object is the parts joined in order and the TaiLieu row is created
+        """
+        started = _initiate(mock_repo, service)
+        upload_id = started.data['uploadId']
+        assert (started.data['partSize'], started.data['partCount']) == (10, 3)
+
+        _send(service, upload_id, 3)
+        _send(service, upload_id, 1, b"x" * 10)
+        _send(service, upload_id, 1)
+        status = GetTaiLieuUploadUseCase(service).execute("lhp-001", "gv-001", upload_id)
+        assert status.data['missingParts'] == [2]
+
+        _send(service, upload_id, 2)
+        result = CompleteTaiLieuUploadUseCase(mock_repo, service).execute("lhp-001", "gv-001", upload_id)
+
+        assert result.success and result.data['tenTaiLieu'] == "Buổi 1"
+        created = mock_repo.create.call_args.args[0]
+        assert created.file_path.startswith("tai-lieu/lhp-001/") and created.file_type == "video/mp4"
+        assert service.download_file(created.file_path) == DATA
+        assert service.list_uploads() == []
+
+    def test_complete_with_missing_parts_is_rejected(self, mock_repo, service):
+        upload_id = _initiate(mock_repo, service).data['uploadId']
+        _send(service, upload_id, 1)
+
+        result = CompleteTaiLieuUploadUseCase(mock_repo, service).execute("lhp-001", "gv-001", upload_id)
+
+        assert (result.status_code, result.error_code) == (409, "INCOMPLETE_UPLOAD")
+        mock_repo.create.assert_not_called()
+
+    def test_part_number_and_size_are_checked(self, mock_repo, service):
+        upload_id = _initiate(mock_repo, service).data['uploadId']
+
+        assert _send(service, upload_id, 4, b"x").error_code == "INVALID_PART"
+        assert _send(service, upload_id, 1, b"short").error_code == "INVALID_PART_SIZE"
+        assert _send(service, upload_id, 3, b"x" * 10).error_code == "INVALID_PART_SIZE"
+
+    def test_session_is_bound_to_gv_and_lhp(self, mock_repo, service, monkeypatch):
+        upload_id = _initiate(mock_repo, service).data['uploadId']
+        status = GetTaiLieuUploadUseCase(service)
+
+        assert status.execute("lhp-001", "gv-002", upload_id).status_code == 403
+        assert status.execute("lhp-002", "gv-001", upload_id).status_code == 403
+        assert status.execute("lhp-001", "gv-001", upload_id[:-2] + "xx").error_code == "UPLOAD_NOT_FOUND"
+        monkeypatch.setenv('TAI_LIEU_UPLOAD_SESSION_HOURS', '-1')
+        assert status.execute("lhp-001", "gv-001", upload_id).error_code == "UPLOAD_EXPIRED"
+
+    def test_initiate_checks_size_and_owner(self, mock_repo, service):
+        assert _initiate(mock_repo, service, size=0).error_code == "INVALID_FILE_SIZE"
+        assert _initiate(mock_repo, service, size=3 * 1024 ** 3).error_code == "FILE_TOO_LARGE"
+        mock_repo.get_lop_hoc_phan_owner.return_value = "gv-002"
+        assert _initiate(mock_repo, service).error_code == "FORBIDDEN"
+
+    def test_abort_and_cleanup(self, mock_repo, service):
+        aborted = _initiate(mock_repo, service).data['uploadId']
+        _initiate(mock_repo, service)
+        _send(service, aborted, 1)
+
+        assert AbortTaiLieuUploadUseCase(service).execute("lhp-001", "gv-001", aborted).success
+        assert len(service.list_uploads()) == 1
+
+        cleanup = CleanupTaiLieuUploadsUseCase(service)
+        assert cleanup.execute(older_than=timedelta(hours=1)).data['found'] == 0
+        assert cleanup.execute(older_than=timedelta(0), dry_run=True).data == {'found': 1, 'aborted': 0, 'failed': []}
+        assert cleanup.execute(older_than=timedelta(0)).data['aborted'] == 1
+        assert service.list_uploads() == []
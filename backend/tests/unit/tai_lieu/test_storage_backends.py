@@ -0,0 +1,244 @@
+"""
+Unit Tests for the storage backends behind S3Service
+Tests: local filesystem and in-memory backends, tài liệu use cases on top of them
+"""
+import hashlib
+import io
+import os
+import pytest
+from contextlib import nullcontext
+
+from application.tai_lieu.interfaces import TaiLieuDTO
+from application.tai_lieu.use_cases.upload_tai_lieu_use_case import UploadTaiLieuUseCase
+from application.tai_lieu.use_cases.download_tai_lieu_use_case import DownloadTaiLieuUseCase
+from application.tai_lieu.use_cases.delete_tai_lieu_use_case import DeleteTaiLieuUseCase
+from infrastructure.persistence.s3_service import S3Service
+from infrastructure.storage import StorageBackendFactory
+from infrastructure.storage.local_backend import LocalStorageBackend
+from infrastructure.storage.memory_backend import InMemoryStorageBackend
+
+DATA = bytes(range(256)) * 40
+
+
+class _Repository:
+    """TaiLieu rows in a dict; every LHP belongs to gv-001"""
+
+    def __init__(self):
+        self.rows = {}
+
+    def get_lop_hoc_phan_owner(self, lhp_id):
+        return "gv-001"
+
+    def create(self, dto):
+        document = TaiLieuDTO(
+            id=f"doc-{len(self.rows) + 1}", ten_tai_lieu=dto.ten_tai_lieu, file_path=dto.file_path,
+            file_type=dto.file_type, created_at=None, uploaded_by_id=dto.uploaded_by, uploaded_by_name=None,
+        )
+        self.rows[document.id] = document
+        return document
+
+    def find_by_id(self, doc_id):
+        return self.rows.get(doc_id)
+
+    def delete(self, doc_id):
+        return self.rows.pop(doc_id, None) is not None
+
+    def count_by_file_path(self, file_path):
+        return sum(1 for row in self.rows.values() if row.file_path == file_path)
+
+    def file_lock(self, file_path):
+        return nullcontext()
+
+
+class _Unseekable(io.RawIOBase):
+    """A request body that can only be read once, front to back"""
+
+    def __init__(self, data):
+        self.source = io.BytesIO(data)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self.source.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+@pytest.fixture(params=['memory', 'local'])
+def service(request, tmp_path):
+    if request.param == 'memory':
+        return S3Service(InMemoryStorageBackend())
+    return S3Service(LocalStorageBackend(str(tmp_path / 'storage')))
+
+
+class TestStorageBackends:
+    """The same behaviour on every backend"""
+
+    def test_upload_head_and_stream(self, service):
+        uploaded = service.upload_file(io.BytesIO(DATA), "Bài 1.pdf", "lhp-001", "application/pdf")
+
+        assert uploaded['key'].startswith("tai-lieu/lhp-001/")
+        head = service.head_file(uploaded['key'])
+        assert head['size'] == len(DATA) and head['etag']
+        assert b''.join(service.open_file(uploaded['key'], chunk_size=1000)) == DATA
+        ranged = service.open_file(uploaded['key'], 100, 199)
+        assert ranged.content_length == 100
+        assert b''.join(ranged) == DATA[100:200]
+        assert service.download_file(uploaded['key']) == DATA
+
+    def test_list_and_batch_delete(self, service):
+        keys = [service.upload_bytes(b"x", f"{n}.txt", lhp, "text/plain")['key']
+                for lhp in ("lhp-001", "lhp-002") for n in range(3)]
+
+        listed = service.list_tai_lieu_by_lop("lhp-001")
+        assert [f['key'] for f in listed] == sorted(keys[:3])
+        assert [f['key'] for f in service.list_files("tai-lieu/", max_keys=4)] == sorted(keys)[:4]
+
+        assert service.delete_files(keys[:3] + ["tai-lieu/lhp-001/missing"])
+        assert service.list_tai_lieu_by_lop("lhp-001") == []
+        assert len(service.list_tai_lieu_by_lop("lhp-002")) == 3
+
+    def test_missing_key(self, service):
+        assert service.head_file("tai-lieu/none") is None
+        assert service.open_file("tai-lieu/none") is None
+        assert service.delete_file("tai-lieu/none")
+
+    def test_no_presigned_url(self, service):
+        assert service.get_file_url("tai-lieu/anything") is None
+
+    def test_multipart_upload(self, service):
+        started = service.create_upload("video.mp4", "lhp-001", "video/mp4")
+        key, upload_id = started['key'], started['upload_id']
+
+        service.upload_part(key, upload_id, 2, io.BytesIO(DATA[5000:]), len(DATA) - 5000)
+        service.upload_part(key, upload_id, 1, io.BytesIO(DATA[:5000]), 5000)
+        parts = service.list_parts(key, upload_id)
+
+        assert [(p.part_number, p.size) for p in parts] == [(1, 5000), (2, len(DATA) - 5000)]
+        assert [u.upload_id for u in service.list_uploads("tai-lieu/lhp-001/")] == [upload_id]
+        assert service.list_tai_lieu_by_lop("lhp-001") == []
+        assert service.complete_upload(key, upload_id, parts)
+        assert service.download_file(key) == DATA
+        assert service.list_uploads() == []
+        assert service.list_parts(key, upload_id) is None
+
+    def test_aborted_upload_cannot_be_completed(self, service):
+        started = service.create_upload("video.mp4", "lhp-001", "video/mp4")
+        key, upload_id = started['key'], started['upload_id']
+        service.upload_part(key, upload_id, 1, io.BytesIO(b"x"), 1)
+        parts = service.list_parts(key, upload_id)
+
+        assert service.abort_upload(key, upload_id)
+        assert not service.complete_upload(key, upload_id, parts)
+        assert service.head_file(key) is None
+
+
+class TestLocalStorageBackend:
+    def test_rejects_keys_outside_root(self, tmp_path):
+        backend = LocalStorageBackend(str(tmp_path / 'storage'))
+
+        for key in ("../escape", "/etc/passwd", "a/../../escape", ""):
+            with pytest.raises(ValueError):
+                backend.put(key, io.BytesIO(b"x"), "text/plain")
+
+    def test_whole_file_can_be_sent_with_sendfile(self, tmp_path):
+        backend = LocalStorageBackend(str(tmp_path))
+        backend.put("a/b.txt", io.BytesIO(b"hello"), "text/plain")
+
+        whole = backend.open("a/b.txt")
+        ranged = backend.open("a/b.txt", 1, 2)
+
+        assert whole.file is not None and whole.file.fileno() > 0
+        assert ranged.file is None and b''.join(ranged) == b"el"
+        whole.close()
+
+    def test_partial_writes_are_not_listed(self, tmp_path):
+        backend = LocalStorageBackend(str(tmp_path))
+        os.makedirs(tmp_path / "a")
+        (tmp_path / "a" / ".tmp-upload").write_bytes(b"x")
+
+        assert backend.list("a/") == []
+
+
+def test_factory_rejects_unknown_backend():
+    with pytest.raises(ValueError):
+        StorageBackendFactory.create("ftp")
+    assert isinstance(StorageBackendFactory.create("memory"), InMemoryStorageBackend)
+
+
+def test_tai_lieu_use_cases_run_on_memory_backend():
+    """
+    Given: S3Service on the in-memory backend
+    When: a document is uploaded, downloaded with presign=True and deleted
+    Then: the download falls back to streaming and the object is gone afterwards
+    """
+    service = S3Service(InMemoryStorageBackend())
+    repo = _Repository()
+
+    uploaded = UploadTaiLieuUseCase(repo, service).execute(
+        "lhp-001", "gv-001", io.BytesIO(DATA), "slide.pdf", "application/pdf", len(DATA)
+    )
+    document = repo.find_by_id(uploaded.data['id'])
+
+    download = DownloadTaiLieuUseCase(repo, service).execute("lhp-001", document.id, "gv-001", presign=True)
+    deleted = DeleteTaiLieuUseCase(repo, service).execute("lhp-001", document.id, "gv-001")
+
+    assert uploaded.success
+    assert download.data.url is None and download.data.size == len(DATA)
+    assert download.data.filename == "slide.pdf"
+    assert deleted.success
+    assert service.head_file(document.file_path) is None
+
+
+class TestContentAddressedUploads:
+    def test_identical_uploads_share_one_blob_until_the_last_delete(self, service):
+        """
+        Given: the same slides uploaded to two LHP (and different slides to a third)
+        When: the documents are deleted one by one
+        Then: identical content is stored once, under its SHA-256, and removed with its last reference
+        """
+        repo = _Repository()
+        upload = UploadTaiLieuUseCase(repo, service)
+        delete = DeleteTaiLieuUseCase(repo, service)
+
+        first = upload.execute("lhp-001", "gv-001", io.BytesIO(DATA), "slide.pdf", "application/pdf", len(DATA))
+        second = upload.execute("lhp-002", "gv-001", io.BytesIO(DATA), "slide.pdf", "application/pdf", len(DATA))
+        other = upload.execute("lhp-003", "gv-001", io.BytesIO(b"x"), "other.pdf", "application/pdf", 1)
+        key = repo.find_by_id(first.data['id']).file_path
+
+        assert key == "tai-lieu/sha256/" + hashlib.sha256(DATA).hexdigest()
+        assert repo.find_by_id(second.data['id']).file_path == key
+        assert len(service.list_files("tai-lieu/")) == 2
+
+        assert delete.execute("lhp-001", first.data['id'], "gv-001").success
+        assert service.download_file(key) == DATA
+        assert delete.execute("lhp-002", second.data['id'], "gv-001").success
+        assert service.head_file(key) is None
+        assert service.head_file(repo.find_by_id(other.data['id']).file_path) is not None
+
+    @pytest.mark.parametrize('stream', [io.BytesIO, _Unseekable])
+    def test_blob_deleted_meanwhile_is_uploaded_again(self, service, stream):
+        """
+        Given: the blob exists when the upload hashes its file (seekable or not)
+        When: its last other reference deletes it before the lock is taken
+        Then: the upload stores the same bytes again instead of referencing a missing blob
+        """
+        repo = _Repository()
+        key = service.upload_content(io.BytesIO(DATA))['key']
+        repo.file_lock = lambda file_path: (service.delete_file(file_path), nullcontext())[1]
+
+        result = UploadTaiLieuUseCase(repo, service).execute(
+            "lhp-001", "gv-001", stream(DATA), "slide.pdf", "application/pdf", len(DATA)
+        )
+
+        assert result.success
+        assert repo.find_by_id(result.data['id']).file_path == key
+        assert service.download_file(key) == DATA
+
+    def test_unseekable_input_is_hashed_while_spooled(self, service):
+        stored = service.upload_content(_Unseekable(DATA), "application/pdf")
+
+        assert stored['sha256'] == hashlib.sha256(DATA).hexdigest() and stored['size'] == len(DATA)
+        assert stored['created'] and not service.upload_content(io.BytesIO(DATA))['created']
+        assert service.download_file(stored['key']) == DATA
@@ -0,0 +1,162 @@
+"""
+Unit Tests for the "download all" TaiLieu ZIP
+Tests: DownloadSVTaiLieuBundleUseCase, StreamingZipWriter (including a multi-GB synthetic bundle)
+"""
+import io
+import tracemalloc
+from collections import deque
+import zipfile
+import pytest
+from unittest.mock import Mock
+
+from application.tai_lieu.interfaces import TaiLieuDTO
+from application.tai_lieu.use_cases import DownloadSVTaiLieuBundleUseCase
+from infrastructure.exports import StreamingZipWriter, ZipEntry
+from infrastructure.persistence.s3_service import S3Service
+from infrastructure.storage import StreamedObject
+from infrastructure.storage.memory_backend import InMemoryStorageBackend
+
+GB = 1024 ** 3
+
+
+def _document(doc_id, ten_tai_lieu, file_path, file_type="application/pdf"):
+    return TaiLieuDTO(
+        id=doc_id, ten_tai_lieu=ten_tai_lieu, file_path=file_path, file_type=file_type,
+        created_at="2025-09-01T08:00:00", uploaded_by_id="gv-001", uploaded_by_name="GV",
+    )
+
+
+@pytest.fixture
+def service():
+    return S3Service(InMemoryStorageBackend())
+
+
+@pytest.fixture
+def mock_repo():
+    repo = Mock()
+    repo.is_student_enrolled.return_value = True
+    return repo
+
+
+class TestDownloadSVTaiLieuBundleUseCase:
+    def test_bundle_contains_every_document_once_enrollment_checked_once(self, mock_repo, service):
+        """
+        Given: an enrolled SV and three documents (two share a name, one is a shared blob)
+        When: the bundle is streamed
+        Then: the ZIP holds every file under a unique name, after a single enrollment check
+        """
+        slide = service.upload_content(io.BytesIO(b"slide" * 1000))['key']
+        legacy = service.upload_bytes(b"de cuong", "de_cuong.docx", "lhp-001")['key']
+        mock_repo.find_by_lop_hoc_phan.return_value = [
+            _document("doc-1", "Slide", slide),
+            _document("doc-2", "Slide", slide),
+            _document("doc-3", "Đề cương", legacy, "application/msword"),
+        ]
+
+        result = DownloadSVTaiLieuBundleUseCase(mock_repo, service).execute("lhp-001", "sv-001")
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(result.data.chunks)))
+
+        assert result.success and result.data.filename == "tai-lieu-lhp-001.zip"
+        assert archive.namelist() == ["Slide.pdf", "Slide (2).pdf", "Đề cương.docx"]
+        assert archive.read("Slide (2).pdf") == b"slide" * 1000
+        assert archive.read("Đề cương.docx") == b"de cuong"
+        assert archive.getinfo("Slide.pdf").date_time == (2025, 9, 1, 8, 0, 0)
+        mock_repo.is_student_enrolled.assert_called_once_with("lhp-001", "sv-001")
+
+    def test_missing_file_is_left_out(self, mock_repo, service):
+        kept = service.upload_content(io.BytesIO(b"x"))['key']
+        mock_repo.find_by_lop_hoc_phan.return_value = [
+            _document("doc-1", "Gone", "tai-lieu/sha256/missing"),
+            _document("doc-2", "Kept", kept),
+        ]
+
+        result = DownloadSVTaiLieuBundleUseCase(mock_repo, service).execute("lhp-001", "sv-001")
+
+        assert zipfile.ZipFile(io.BytesIO(b''.join(result.data.chunks))).namelist() == ["Kept.pdf"]
+
+    def test_not_enrolled_or_no_documents(self, mock_repo, service):
+        use_case = DownloadSVTaiLieuBundleUseCase(mock_repo, service)
+        mock_repo.find_by_lop_hoc_phan.return_value = []
+        assert use_case.execute("lhp-001", "sv-001").status_code == 404
+
+        mock_repo.is_student_enrolled.return_value = False
+        assert use_case.execute("lhp-001", "sv-001").error_code == "FORBIDDEN"
+        mock_repo.find_by_lop_hoc_phan.assert_called_once()
+
+
+class _Synthetic:
+    """A body of `size` bytes that is never held in memory"""
+    BLOCK = bytes(range(256)) * 1024
+
+    def __init__(self, size):
+        self.left = size
+
+    def read(self, size):
+        size = min(size, self.left, len(self.BLOCK))
+        self.left -= size
+        return self.BLOCK[:size]
+
+    def close(self):
+        pass
+
+
+class _Tail(io.RawIOBase):
+    """The last bytes of a stream at their real offsets; enough for ZipFile to read the central directory"""
+
+    def __init__(self, size, tail):
+        self.size, self.tail, self.position = size, tail, 0
+
+    def seekable(self):
+        return True
+
+    def readable(self):
+        return True
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        self.position = {io.SEEK_SET: 0, io.SEEK_CUR: self.position, io.SEEK_END: self.size}[whence] + offset
+        return self.position
+
+    def tell(self):
+        return self.position
+
+    def readinto(self, buffer):
+        start = self.position - (self.size - len(self.tail))
+        assert start >= 0, "read before the kept tail"
+        data = self.tail[start:start + len(buffer)]
+        buffer[:len(data)] = data
+        self.position += len(data)
+        return len(data)
+
+
+def test_multi_gb_bundle_streams_in_bounded_memory():
+    """
+    Given: 2.5 GB + 2 GB of synthetic files and a small one past the 4 GB offset
+    When: the ZIP is streamed
+    Then: memory stays flat, chunks stay small and the archive is valid ZIP64
+    """
+    sizes = {"video.mp4": 5 * GB // 2, "slides.pdf": 2 * GB, "readme.txt": 5}
+    entries = [
+        ZipEntry(name, lambda size=size: StreamedObject(_Synthetic(size), size))
+        for name, size in sizes.items()
+    ]
+
+    total, largest_chunk, recent = 0, 0, deque(maxlen=16)
+    tracemalloc.start()
+    try:
+        for chunk in StreamingZipWriter().stream(entries):
+            total += len(chunk)
+            largest_chunk = max(largest_chunk, len(chunk))
+            recent.append(chunk)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    archive = zipfile.ZipFile(_Tail(total, b''.join(recent)))
+    info = {entry.filename: entry for entry in archive.infolist()}
+
+    assert peak < 8 * 1024 * 1024
+    assert largest_chunk < 1024 * 1024
+    assert {name: entry.file_size for name, entry in info.items()} == sizes
+    assert info["readme.txt"].header_offset > 4 * GB
+    assert archive.read("readme.txt") == _Synthetic.BLOCK[:5]
+    assert total > sum(sizes.values())
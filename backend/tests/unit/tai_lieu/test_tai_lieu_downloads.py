@@ -0,0 +1,179 @@
+"""
+Unit Tests for TaiLieu downloads
+Tests: DownloadTaiLieu / DownloadSVTaiLieu, Range parsing, streamed S3 bodies
+"""
+import io
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import Mock
+
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from application.tai_lieu.interfaces import TaiLieuDTO
+from application.tai_lieu.use_cases.download_tai_lieu_use_case import DownloadTaiLieuUseCase
+from application.tai_lieu.use_cases.download_sv_tai_lieu_use_case import DownloadSVTaiLieuUseCase
+from core.types.service_result import ServiceResult
+from infrastructure.persistence.s3_service import S3Service
+from infrastructure.storage import StreamedObject
+from infrastructure.storage.s3_backend import S3StorageBackend
+from presentation.api.common.downloads import parse_range, tai_lieu_response
+
+MODIFIED = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def _document():
+    return TaiLieuDTO(
+        id="doc-001", ten_tai_lieu="Bài giảng 1", file_path="tai-lieu/lhp-001/bai giang.pdf",
+        file_type="application/pdf", created_at=None, uploaded_by_id=None, uploaded_by_name=None,
+    )
+
+
+@pytest.fixture
+def mock_repo():
+    repo = Mock()
+    repo.get_lop_hoc_phan_owner.return_value = "gv-001"
+    repo.is_student_enrolled.return_value = True
+    repo.find_by_id.return_value = _document()
+    return repo
+
+
+@pytest.fixture
+def mock_s3():
+    s3 = Mock(is_available=True)
+    s3.head_file.return_value = {'size': 1000, 'etag': '"abc"', 'last_modified': MODIFIED, 'content_type': None}
+    s3.get_file_url.return_value = "https://bucket.s3/presigned"
+    return s3
+
+
+class TestDownloadTaiLieuUseCases:
+    """Tests for DownloadTaiLieuUseCase and DownloadSVTaiLieuUseCase"""
+
+    def test_describes_file_without_downloading_it(self, mock_repo, mock_s3):
+        """
+        Given: GV owns the LHP and the object exists
+        When: DownloadTaiLieuUseCase.execute() is called
+        Then: Return size / ETag from a HEAD request, the body is never read
+        """
+        result = DownloadTaiLieuUseCase(mock_repo, mock_s3).execute("lhp-001", "doc-001", "gv-001")
+
+        assert result.success
+        assert (result.data.key, result.data.filename, result.data.size, result.data.etag) == \
+            ("tai-lieu/lhp-001/bai giang.pdf", "bai giang.pdf", 1000, '"abc"')
+        assert result.data.url is None
+        mock_s3.download_file.assert_not_called()
+
+    def test_presign_returns_short_lived_attachment_url(self, mock_repo, mock_s3):
+        """
+        Given: SV is enrolled
+        When: DownloadSVTaiLieuUseCase.execute(presign=True) is called
+        Then: Return a presigned URL that answers as an attachment, without a HEAD request
+        """
+        result = DownloadSVTaiLieuUseCase(mock_repo, mock_s3).execute("lhp-001", "doc-001", "sv-001", presign=True)
+
+        assert result.data.url == "https://bucket.s3/presigned"
+        kwargs = mock_s3.get_file_url.call_args.kwargs
+        assert kwargs['expires_in'] == 300
+        assert kwargs['content_disposition'].startswith('attachment; filename=')
+        mock_s3.head_file.assert_not_called()
+
+    def test_missing_object_fails(self, mock_repo, mock_s3):
+        mock_s3.head_file.return_value = None
+
+        result = DownloadTaiLieuUseCase(mock_repo, mock_s3).execute("lhp-001", "doc-001", "gv-001")
+
+        assert result.error_code == "S3_DOWNLOAD_FAILED"
+
+    def test_not_enrolled_is_forbidden(self, mock_repo, mock_s3):
+        mock_repo.is_student_enrolled.return_value = False
+
+        result = DownloadSVTaiLieuUseCase(mock_repo, mock_s3).execute("lhp-001", "doc-001", "sv-001")
+
+        assert result.error_code == "FORBIDDEN"
+        mock_s3.head_file.assert_not_called()
+
+
+class TestParseRange:
+    @pytest.mark.parametrize("header, expected", [
+        (None, None),
+        ("bytes=0-99", (0, 99)),
+        ("bytes=900-", (900, 999)),
+        ("bytes=-100", (900, 999)),
+        ("bytes=-5000", (0, 999)),
+        ("bytes=990-5000", (990, 999)),
+        ("bytes=0-1,5-9", None),
+        ("items=0-1", None),
+        ("bytes=9-1", None),
+        ("bytes=abc", None),
+    ])
+    def test_ranges(self, header, expected):
+        assert parse_range(header, 1000) == expected
+
+    @pytest.mark.parametrize("header", ["bytes=1000-", "bytes=-0"])
+    def test_unsatisfiable(self, header):
+        with pytest.raises(ValueError):
+            parse_range(header, 1000)
+
+
+class TestTaiLieuResponse:
+    @pytest.fixture
+    def file_result(self, mock_repo, mock_s3):
+        return DownloadTaiLieuUseCase(mock_repo, mock_s3).execute("lhp-001", "doc-001", "gv-001")
+
+    def _get(self, **headers):
+        return Request(APIRequestFactory().get('/download', **headers))
+
+    def test_streams_requested_range(self, file_result, mock_s3):
+        mock_s3.open_file.return_value = StreamedObject(io.BytesIO(b"x" * 100), 100, chunk_size=40)
+
+        response = tai_lieu_response(self._get(HTTP_RANGE="bytes=100-199"), file_result, mock_s3)
+
+        assert response.status_code == 206
+        assert response['Content-Range'] == "bytes 100-199/1000"
+        assert response['Content-Length'] == "100"
+        assert response['ETag'] == '"abc"'
+        assert [len(chunk) for chunk in response.streaming_content] == [40, 40, 20]
+        mock_s3.open_file.assert_called_once_with("tai-lieu/lhp-001/bai giang.pdf", 100, 199)
+
+    def test_stale_if_range_sends_whole_file(self, file_result, mock_s3):
+        mock_s3.open_file.return_value = StreamedObject(io.BytesIO(b""), 1000)
+
+        response = tai_lieu_response(self._get(HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"old"'), file_result, mock_s3)
+
+        assert response.status_code == 200
+        mock_s3.open_file.assert_called_once_with("tai-lieu/lhp-001/bai giang.pdf", None, None)
+
+    def test_matching_etag_is_not_modified(self, file_result, mock_s3):
+        response = tai_lieu_response(self._get(HTTP_IF_NONE_MATCH='"zzz", "abc"'), file_result, mock_s3)
+
+        assert response.status_code == 304
+        mock_s3.open_file.assert_not_called()
+
+    def test_unsatisfiable_range(self, file_result, mock_s3):
+        response = tai_lieu_response(self._get(HTTP_RANGE="bytes=5000-"), file_result, mock_s3)
+
+        assert response.status_code == 416
+        assert response['Content-Range'] == "bytes */1000"
+
+    def test_presigned_url_redirects(self, mock_s3):
+        file = Mock(url="https://bucket.s3/presigned")
+
+        response = tai_lieu_response(self._get(), ServiceResult.ok(file), mock_s3)
+
+        assert (response.status_code, response['Location']) == (302, "https://bucket.s3/presigned")
+
+
+class TestS3ServiceOpenFile:
+    def test_ranged_get_is_read_in_chunks_and_closed(self):
+        client = Mock()
+        body = Mock()
+        body.read.side_effect = [b"ab", b"c", b""]
+        client.get_object.return_value = {'Body': body, 'ContentLength': 3}
+        service = S3Service(S3StorageBackend(client, bucket_name="bucket"))
+
+        stream = service.open_file("key", 10, 12, chunk_size=2)
+
+        assert stream.content_length == 3
+        assert list(stream) == [b"ab", b"c"]
+        client.get_object.assert_called_once_with(Bucket="bucket", Key="key", Range="bytes=10-12")
+        body.close.assert_called_once()
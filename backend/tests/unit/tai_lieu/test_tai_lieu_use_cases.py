@@ -111,7 +111,7 @@ class TestUploadTaiLieuUseCase:
     
     @pytest.fixture
     def mock_repo(self):
-        return Mock()
+        return MagicMock()
     
     @pytest.fixture
     def mock_s3(self):
@@ -130,12 +130,13 @@ class TestUploadTaiLieuUseCase:
         Then: Return success with new document
         """
         mock_repo.get_lop_hoc_phan_owner.return_value = "gv-001"
-        mock_s3.upload_file.return_value = {"key": "tai_lieu/lhp-001/new.pdf"}
+        mock_s3.hash_content.return_value = MagicMock()
+        mock_s3.put_content.return_value = {"key": "tai-lieu/sha256/abc", "created": True}
         
         mock_created = MagicMock()
         mock_created.id = "doc-new"
         mock_created.ten_tai_lieu = "New Doc"
-        mock_created.file_path = "tai_lieu/lhp-001/new.pdf"
+        mock_created.file_path = "tai-lieu/sha256/abc"
         mock_created.file_type = "pdf"
         mock_repo.create.return_value = mock_created
         
@@ -226,7 +227,7 @@ class TestDeleteTaiLieuUseCase:
     
     @pytest.fixture
     def mock_repo(self):
-        return Mock()
+        return MagicMock()
     
     @pytest.fixture
     def mock_s3(self):
@@ -250,12 +251,30 @@ class TestDeleteTaiLieuUseCase:
         mock_doc.file_path = "s3://bucket/doc1.pdf"
         mock_repo.find_by_id.return_value = mock_doc
         mock_repo.delete.return_value = True
+        mock_repo.count_by_file_path.return_value = 0
         
         result = use_case.execute("lhp-001", "doc-001", "gv-001")
         
         assert result.success is True
         mock_s3.delete_file.assert_called_once()
     
+    def test_execute_keeps_file_shared_with_other_documents(self, use_case, mock_repo, mock_s3):
+        """
+        Given: Another TaiLieu references the same stored file
+        When: DeleteTaiLieuUseCase.execute() is called
+        Then: Only the DB row is deleted
+        """
+        mock_repo.get_lop_hoc_phan_owner.return_value = "gv-001"
+        mock_repo.find_by_id.return_value = MagicMock(file_path="tai-lieu/sha256/abc")
+        mock_repo.delete.return_value = True
+        mock_repo.count_by_file_path.return_value = 1
+        
+        result = use_case.execute("lhp-001", "doc-001", "gv-001")
+        
+        assert result.success is True
+        mock_repo.delete.assert_called_once_with("doc-001")
+        mock_s3.delete_file.assert_not_called()
+    
     def test_execute_not_found(self, use_case, mock_repo, mock_s3):
         """
         Given: Document not found